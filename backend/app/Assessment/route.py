@@ -6,23 +6,72 @@ Handles overall assessment logic and final submission
 from flask import request, jsonify, current_app
 from . import Assessment
 from ..auth_helpers import verify_candidate_token
-from services.AI_rationale import process_ai_rationale
+from ..models import AIJob
+from ..job_queue import (
+    latest_jobs, has_pending_jobs, queue_rationale_job as _queue_rationale_job,
+    AI_RATIONALE, QUEUED, RUNNING
+)
+from ..sse import sse_response
+
+
+def touch_completion_timestamps(candidate_id):
+    """
+    Bump the completion timestamps of the candidate's finished rounds
+    
+    This effectively "bumps" the candidate to the top of the dashboard.
+    """
+    from ..models import CandidateAuth
+    from ..extensions import db
+    from datetime import datetime
+
+    candidate = CandidateAuth.query.get(candidate_id)
+    if not candidate:
+        return
+
+    now = datetime.now()
+    # Update timestamps for completed sections to ensure valid sorting
+    if candidate.mcq_completed:
+        candidate.mcq_completed_at = now
+    if candidate.psychometric_completed:
+        candidate.psychometric_completed_at = now
+    if candidate.technical_completed:
+        candidate.technical_completed_at = now
+    if candidate.text_based_completed:
+        candidate.text_based_completed_at = now
+    if candidate.coding_completed:
+        candidate.coding_completed_at = now
+
+    db.session.commit()
+    print(f"✅ Updated completion timestamps for Candidate {candidate_id}")
+
+
+def queue_rationale_job(candidate_id):
+    """Queue the AI Rationale job (retries with the same Idempotency-Key header, or unchanged results, return the same job)"""
+    return _queue_rationale_job(candidate_id, request.headers.get('Idempotency-Key'))
+
 
 @Assessment.route('/finish', methods=['POST'])
 def finish_assessment():
     """
     FINISH ASSESSMENT ENDPOINT
     
-    Triggers the final AI rationale generation after all rounds are completed.
+    Queues the final AI rationale generation after all rounds are completed.
+    The rationale job waits for the candidate's other grading jobs, so this
+    returns immediately; poll GET /api/assessment/jobs/<job_id> for progress.
     
     Authentication: Required (JWT Bearer token - candidate only)
     
+    Headers (optional):
+        Idempotency-Key: <client key>  // Retries with the same key return the same job
+                                       // (without it, retries return the same job until a result changes)
+    
     Response:
-        Success (200):
+        Success (202):
         {
             "success": true,
-            "message": "Assessment completed and rationale generated.",
-            "rationale": { ... }
+            "message": "Assessment completed successfully. AI Rationale is being generated.",
+            "rationale_status": "queued",
+            "job_id": 42
         }
     """
     # Verify authentication
@@ -33,48 +82,15 @@ def finish_assessment():
     print(f"\n🎓 Candidate {candidate_id} is finishing the assessment...")
     
     try:
-        from ..models import CandidateAuth
-        from ..extensions import db
-        from datetime import datetime
-
-        # Fetch candidate to update timestamps
-        candidate = CandidateAuth.query.get(candidate_id)
-        if candidate:
-            now = datetime.now()
-            # Update timestamps for completed sections to ensure valid sorting
-            # This effectively "bumps" the candidate to the top of the dashboard
-            if candidate.mcq_completed:
-                candidate.mcq_completed_at = now
-            if candidate.psychometric_completed:
-                candidate.psychometric_completed_at = now
-            if candidate.technical_completed:
-                candidate.technical_completed_at = now
-            if candidate.text_based_completed:
-                candidate.text_based_completed_at = now
-            if candidate.coding_completed:
-                candidate.coding_completed_at = now
-                
-            db.session.commit()
-            print(f"✅ Updated completion timestamps for Candidate {candidate_id}")
-        
-        # Trigger the AI Rationale Service
-        # We pass the current_app._get_current_object() to ensure the service 
-        # uses the same app context/config if needed (though the service handles context creation too)
-        
-        # Note: process_ai_rationale handles fetching data from DB for this candidate_id
-        rationale_result = process_ai_rationale(candidate_id, app_instance=current_app._get_current_object())
-        
-        if not rationale_result:
-            return jsonify({
-                "success": False,
-                "message": "Failed to generate rationale. Please contact support."
-            }), 500
+        touch_completion_timestamps(candidate_id)
+        job = queue_rationale_job(candidate_id)
 
         return jsonify({
             "success": True,
-            "message": "Assessment completed successfully. AI Rationale generated.",
-            "rationale": rationale_result
-        }), 200
+            "message": "Assessment completed successfully. AI Rationale is being generated.",
+            "rationale_status": job.status,
+            "job_id": job.id
+        }), 202
 
     except Exception as e:
         print(f"❌ FINISH ASSESSMENT ERROR: {str(e)}")
@@ -84,3 +100,136 @@ def finish_assessment():
             "success": False,
             "message": f"An error occurred: {str(e)}"
         }), 500
+
+
+@Assessment.route('/finish/stream', methods=['POST'])
+def finish_assessment_stream():
+    """
+    FINISH ASSESSMENT (STREAMING) ENDPOINT
+    
+    Same as /finish, but generates the AI rationale inside the request and
+    reports progress as Server-Sent Events while the LLM is writing it. The
+    rationale is saved once it is complete; if the stream fails or the
+    client disconnects first, the background job is queued to finish it.
+    The first event is sent immediately.
+    
+    Candidates only receive progress (section names and final status), never
+    the rationale contents. Recruiters can stream the text itself via
+    POST /api/recruiter/candidates/<id>/analyze/stream.
+    
+    If other grading jobs (text grading, resume parsing, ...) are still
+    running, the rationale cannot be generated yet: the usual background job
+    is queued and a single "queued" event is sent. The same happens while a
+    rationale job is already queued or running.
+    
+    Authentication: Required (JWT Bearer token - candidate only)
+    
+    Response: text/event-stream
+        event: started        data: {"candidate_id": 7}
+        event: stage          data: {"name": "inputs_ready", "elapsed_ms": 84.2}
+        event: section        data: {"name": "resume_fit"}
+        ...
+        event: done           data: {"status": "generated", "sections": [...], "elapsed_ms": 9120.5}
+        
+        or, while grading is pending:
+        event: queued         data: {"rationale_status": "queued", "job_id": 42}
+    """
+    candidate_id, error_response = verify_candidate_token()
+    if error_response:
+        return error_response
+    
+    print(f"\n🎓 Candidate {candidate_id} is finishing the assessment (streaming)...")
+    
+    try:
+        touch_completion_timestamps(candidate_id)
+        
+        if has_pending_jobs(candidate_id, exclude_types=[AI_RATIONALE]):
+            job = queue_rationale_job(candidate_id)
+            return sse_response([
+                ("queued", {"rationale_status": job.status, "job_id": job.id})
+            ])
+        
+        from services.AI_rationale import stream_rationale
+        app = current_app._get_current_object()
+        return sse_response(stream_rationale(candidate_id, app, include_text=False))
+    
+    except Exception as e:
+        print(f"❌ FINISH ASSESSMENT STREAM ERROR: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": f"An error occurred: {str(e)}"
+        }), 500
+
+
+@Assessment.route('/jobs', methods=['GET'])
+def get_assessment_jobs():
+    """
+    GET AI JOB STATUS ENDPOINT
+    
+    Returns the latest background AI job of each type for the candidate
+    (text grading, psychometric grading, resume parsing, final rationale).
+    
+    Authentication: Required (JWT Bearer token - candidate only)
+    
+    Response:
+        Success (200):
+        {
+            "success": true,
+            "jobs": {
+                "text_grading": {"id": 3, "status": "succeeded", ...},
+                "ai_rationale": {"id": 5, "status": "running", ...}
+            },
+            "pending": true  // Any job still queued or running
+        }
+    """
+    candidate_id, error_response = verify_candidate_token()
+    if error_response:
+        return error_response
+    
+    try:
+        jobs = latest_jobs(candidate_id)
+        return jsonify({
+            "success": True,
+            "jobs": {job_type: job.to_dict() for job_type, job in jobs.items()},
+            "pending": any(job.status in (QUEUED, RUNNING) for job in jobs.values())
+        }), 200
+        
+    except Exception as e:
+        print(f"❌ GET ASSESSMENT JOBS ERROR: {str(e)}")
+        return jsonify({
+            "success": False,
+            "message": f"An error occurred: {str(e)}"
+        }), 500
+
+
+@Assessment.route('/jobs/<int:job_id>', methods=['GET'])
+def get_assessment_job(job_id):
+    """
+    GET SINGLE AI JOB STATUS ENDPOINT
+    
+    Authentication: Required (JWT Bearer token - candidate only)
+    
+    Response:
+        Success (200):
+        {
+            "success": true,
+            "job": {"id": 5, "job_type": "ai_rationale", "status": "succeeded", ...}
+        }
+        
+        Error (404): Job not found or belongs to another candidate
+    """
+    candidate_id, error_response = verify_candidate_token()
+    if error_response:
+        return error_response
+    
+    job = AIJob.query.filter_by(id=job_id, candidate_id=candidate_id).first()
+    if not job:
+        return jsonify({
+            "success": False,
+            "message": "Job not found"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "job": job.to_dict()
+    }), 200
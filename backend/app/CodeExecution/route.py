@@ -9,6 +9,7 @@ from ..models import CodingProblem, CodingSubmission, CandidateAuth, CodingConfi
 from ..extensions import db
 from ..config import Config
 from ..auth_helpers import verify_candidate_token, verify_recruiter_token
+from ..services.question_cache import question_cache, bump_version, CODING_BANK
 from .piston_client import execute_code, run_test_cases, get_language_id
 import jwt
 import os
@@ -100,8 +101,15 @@ def get_coding_problems():
     try:
         print(f"\n✅ Getting problems for candidate_id: {candidate_id}")
         
-        # Get all problems
-        problems = CodingProblem.query.all()
+        # Get all problems (served from the versioned question bank cache)
+        problems = question_cache.get(CODING_BANK, 'problem_list', lambda: [
+            {
+                'id': problem.id,
+                'problem_id': problem.problem_id,
+                'title': problem.title,
+                'difficulty': problem.difficulty
+            } for problem in CodingProblem.query.all()
+        ])
         print(f"✅ Found {len(problems)} problems")
         
         # Get candidate's submissions to determine status
@@ -118,17 +126,11 @@ def get_coding_problems():
         
         problems_data = []
         for problem in problems:
-            problem_dict = {
-                'id': problem.id,
-                'problem_id': problem.problem_id,
-                'title': problem.title,
-                'difficulty': problem.difficulty,
-                'status': 'not_attempted'
-            }
+            problem_dict = dict(problem, status='not_attempted')
             
             # Determine status
-            if problem.problem_id in submission_map:
-                if submission_map[problem.problem_id] == 'Accepted':
+            if problem['problem_id'] in submission_map:
+                if submission_map[problem['problem_id']] == 'Accepted':
                     problem_dict['status'] = 'accepted'
                 else:
                     problem_dict['status'] = 'attempted'
@@ -748,6 +750,7 @@ def create_problem_admin():
         
         db.session.add(new_problem)
         db.session.commit()
+        bump_version(CODING_BANK)
         
         print(f"✅ Created new coding problem: {new_problem.title} (ID: {new_problem.problem_id})")
         
@@ -934,6 +937,7 @@ def import_batch_problems():
         
         # Commit all imports
         db.session.commit()
+        bump_version(CODING_BANK)
         
         print(f"✅ Imported {imported} problems, {failed} failed")
         
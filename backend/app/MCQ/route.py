@@ -9,11 +9,77 @@ from ..models import MCQQuestion, MCQAnswer, MCQResult, CandidateAuth as Candida
 from ..extensions import db
 from ..config import Config
 from ..auth_helpers import verify_candidate_token, verify_recruiter_token
+from ..db_helpers import bulk_upsert
+from ..services.question_cache import question_cache, MCQ_BANK
+from sqlalchemy import func, case
 import jwt
 from datetime import datetime
 import json
 from services.mcqresult_to_grading import evaluate_mcq_performance
 
+# Maximum number of answers accepted in a single batch submission
+MAX_BATCH_SIZE = 200
+
+
+def get_answer_key():
+    """
+    Get the cached MCQ answer key (kept apart from the candidate-facing payload)
+    
+    Returns:
+        dict: {question_id: correct_answer}
+    """
+    def load():
+        rows = db.session.query(MCQQuestion.question_id, MCQQuestion.correct_answer).all()
+        return {qid: correct for qid, correct in rows}
+    
+    return question_cache.get(MCQ_BANK, 'answer_key', load)
+
+
+def get_question_payload():
+    """
+    Get the cached candidate-facing MCQ question list (no correct answers)
+    
+    Returns:
+        list: Serialized questions
+    """
+    def load():
+        return [q.to_dict(include_answer=False) for q in MCQQuestion.query.all()]
+    
+    return question_cache.get(MCQ_BANK, 'questions', load)
+
+
+def _recalculate_result(candidate_id):
+    """
+    Recompute the candidate's MCQResult from stored answers with one aggregate query
+    
+    The performance evaluation is plain arithmetic, so it is refreshed inline
+    with the score (same as the single-answer /submit endpoint).
+    
+    Returns:
+        MCQResult: The (possibly new) result record, not yet committed
+    """
+    correct_count, total_answered = db.session.query(
+        func.coalesce(func.sum(case((MCQAnswer.is_correct == True, 1), else_=0)), 0),
+        func.count(MCQAnswer.id)
+    ).filter(MCQAnswer.candidate_id == candidate_id).one()
+    
+    result = MCQResult.query.filter_by(student_id=candidate_id).first()
+    if not result:
+        result = MCQResult(student_id=candidate_id)
+        db.session.add(result)
+    
+    result.correct_answers = int(correct_count)
+    result.wrong_answers = int(total_answered - correct_count)
+    result.percentage_correct = (correct_count / total_answered) * 100 if total_answered else 0.0
+    
+    if total_answered > 0:
+        try:
+            result.grading_json = evaluate_mcq_performance(int(correct_count), int(total_answered))
+        except Exception as e:
+            print(f"⚠️ AI Grading failed: {e}")
+    
+    return result
+
 
 @MCQ.route('/questions', methods=['GET'])
 def get_mcq_questions():
@@ -52,12 +118,8 @@ def get_mcq_questions():
     print(f"\n✅ Authenticated candidate {candidate_id} requesting questions")
     
     try:
-        # Get all questions
-        questions = MCQQuestion.query.all()
-        
-        print(f"📚 Found {len(questions)} questions in database")
-        
-        questions_data = [q.to_dict(include_answer=False) for q in questions]
+        # Get all questions (served from the versioned question bank cache)
+        questions_data = get_question_payload()
         print(f"📤 Returning {len(questions_data)} questions to frontend")
         
         return jsonify({
@@ -146,20 +208,28 @@ def submit_mcq_answer():
                 'message': 'selected_option must be a number'
             }), 400
         
-        # Get the question
-        question = MCQQuestion.query.filter_by(question_id=question_id).first()
-        if not question:
+        # Look up the correct answer in the cached answer key
+        try:
+            question_id = int(question_id)
+        except (ValueError, TypeError):
+            return jsonify({
+                'success': False,
+                'message': 'question_id must be a number'
+            }), 400
+        
+        correct_answer = get_answer_key().get(question_id)
+        if correct_answer is None:
             return jsonify({
                 'success': False,
                 'message': 'Question not found'
             }), 404
         
         # Check if answer is correct
-        is_correct = (selected_option == question.correct_answer)
+        is_correct = (selected_option == correct_answer)
         
         print(f"\n🔍 DEBUG - Candidate ID: {candidate_id}")
         print(f"🔍 DEBUG - Question ID: {question_id}")
-        print(f"🔍 DEBUG - Selected: {selected_option}, Correct: {question.correct_answer}")
+        print(f"🔍 DEBUG - Selected: {selected_option}, Correct: {correct_answer}")
         print(f"🔍 DEBUG - Is Correct: {is_correct}")
         
         # Check if answer already exists (prevent duplicate submissions)
@@ -236,7 +306,7 @@ def submit_mcq_answer():
         return jsonify({
             'success': True,
             'is_correct': is_correct,
-            'correct_answer': question.correct_answer,
+            'correct_answer': correct_answer,
             'result': result.to_dict()
         }), 200
         
@@ -251,6 +321,158 @@ def submit_mcq_answer():
         }), 500
 
 
+@MCQ.route('/submit-batch', methods=['POST'])
+def submit_mcq_answers_batch():
+    """
+    MCQ BATCH ANSWER SUBMISSION ENDPOINT
+    
+    Submits many answers at once (e.g. on page navigation or on a timer).
+    Answers are graded against the cached answer key, written with a single
+    bulk upsert and followed by one MCQResult recalculation.
+    
+    Authentication: Required (JWT Bearer token - candidate only)
+    
+    Request:
+        {
+            "answers": [
+                {"question_id": 101, "selected_option": 2},
+                {"question_id": 102, "selected_option": 4}
+            ]
+        }
+        
+    Response:
+        {
+            "success": true,
+            "items": [
+                {"question_id": 101, "success": true, "is_correct": true, "correct_answer": 2},
+                {"question_id": 999, "success": false, "message": "Question not found"}
+            ],
+            "saved": 1,
+            "failed": 1,
+            "result": {
+                "correct_answers": 5,
+                "wrong_answers": 2,
+                "percentage_correct": 71.43,
+                "total_answered": 7
+            }
+        }
+    """
+    # Verify authentication
+    candidate_id, error_response = verify_candidate_token()
+    if error_response:
+        return error_response
+    
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not isinstance(data.get('answers'), list):
+            return jsonify({
+                'success': False,
+                'message': 'answers (array) is required'
+            }), 400
+        
+        answers = data['answers']
+        
+        if len(answers) > MAX_BATCH_SIZE:
+            return jsonify({
+                'success': False,
+                'message': f'A maximum of {MAX_BATCH_SIZE} answers can be submitted at once'
+            }), 400
+        
+        answer_key = get_answer_key()
+        now = datetime.utcnow()
+        
+        items = []
+        rows_by_question = {}  # last answer wins if a question appears twice
+        
+        for entry in answers:
+            if not isinstance(entry, dict):
+                items.append({'question_id': None, 'success': False, 'message': 'Invalid answer entry'})
+                continue
+            
+            question_id = entry.get('question_id')
+            
+            try:
+                question_id = int(question_id)
+                selected_option = int(entry.get('selected_option'))
+            except (ValueError, TypeError):
+                items.append({
+                    'question_id': question_id,
+                    'success': False,
+                    'message': 'question_id and selected_option must be numbers'
+                })
+                continue
+            
+            if selected_option not in [1, 2, 3, 4]:
+                items.append({
+                    'question_id': question_id,
+                    'success': False,
+                    'message': 'selected_option must be 1, 2, 3, or 4'
+                })
+                continue
+            
+            correct_answer = answer_key.get(question_id)
+            if correct_answer is None:
+                items.append({
+                    'question_id': question_id,
+                    'success': False,
+                    'message': 'Question not found'
+                })
+                continue
+            
+            is_correct = (selected_option == correct_answer)
+            rows_by_question[question_id] = {
+                'candidate_id': candidate_id,
+                'question_id': question_id,
+                'selected_option': selected_option,
+                'is_correct': is_correct,
+                'submitted_at': now
+            }
+            items.append({
+                'question_id': question_id,
+                'success': True,
+                'is_correct': is_correct,
+                'correct_answer': correct_answer
+            })
+        
+        saved = bulk_upsert(
+            MCQAnswer,
+            list(rows_by_question.values()),
+            ['candidate_id', 'question_id'],
+            ['selected_option', 'is_correct', 'submitted_at']
+        )
+        
+        result = _recalculate_result(candidate_id)
+        
+        if saved:
+            candidate = CandidateAuthModel.query.get(candidate_id)
+            if candidate:
+                candidate.mcq_completed_at = datetime.now()
+        
+        db.session.commit()
+        
+        failed = sum(1 for item in items if not item['success'])
+        print(f"💾 Batch MCQ submit for candidate {candidate_id}: {saved} saved, {failed} failed")
+        
+        return jsonify({
+            'success': True,
+            'items': items,
+            'saved': saved,
+            'failed': failed,
+            'result': result.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"\n❌ BATCH SUBMIT ERROR: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
 @MCQ.route('/answers', methods=['GET'])
 def get_mcq_answers():
     """
@@ -1,43 +1,15 @@
 from flask import request, jsonify
 from . import ProctorService
-from ..models import CandidateAuth, ProctoringViolation, ProctorSession
+from ..models import CandidateAuth, ProctoringViolation, ProctoringViolationArchive, ProctorSession
 from ..extensions import db
 from ..config import Config
+from ..services.proctor_events import (
+    build_event, record_proctor_events, flush_proctor_events, parse_event_time, log_fields, logger,
+    session_violation_counts, risk_score, owns_session
+)
 import jwt
+import logging
 from datetime import datetime
-import json
-
-# ANSI color codes for console output
-class Colors:
-    RED = '\033[91m'
-    YELLOW = '\033[93m'
-    GREEN = '\033[92m'
-    CYAN = '\033[96m'
-    BOLD = '\033[1m'
-    END = '\033[0m'
-
-def log_proctor_event(event_type, session_id, user_id, details=None):
-    """Log proctor events to console with color formatting."""
-    timestamp = datetime.now().strftime('%H:%M:%S')
-    
-    # Determine color based on severity
-    if event_type in ['multiple_faces', 'no_face', 'phone_detected']:
-        color = Colors.RED
-        severity = 'CRITICAL'
-    elif event_type in ['looking_away', 'tab_switch']:
-        color = Colors.YELLOW
-        severity = 'WARNING'
-    else:
-        color = Colors.CYAN
-        severity = 'INFO'
-    
-    print(f"\n{color}{Colors.BOLD}" + "="*60 + f"{Colors.END}")
-    print(f"{color}{Colors.BOLD}[PROCTOR {severity}] {timestamp}{Colors.END}")
-    print(f"{color}  Session: {session_id} | User: {user_id}{Colors.END}")
-    print(f"{color}  Event: {event_type.upper()}{Colors.END}")
-    if details:
-        print(f"{color}  Details: {details}{Colors.END}")
-    print(f"{color}{Colors.BOLD}" + "="*60 + f"{Colors.END}\n")
 
 def verify_candidate_token():
     auth_header = request.headers.get('Authorization')
@@ -74,7 +46,7 @@ def start_session():
         db.session.add(session)
         db.session.commit()
         
-        print(f"[PROCTOR] Session started: {session_uuid} for user {user_id}")
+        log_fields(logging.INFO, 'proctor_session_started', session=session_uuid, candidate=user_id)
         
         return jsonify({
             'success': True,
@@ -82,9 +54,7 @@ def start_session():
             'message': 'Proctoring session started'
         })
     except Exception as e:
-        import traceback
-        print(f"[PROCTOR ERROR] Failed to start session: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"proctor_session_start_failed candidate={user_id}")
         db.session.rollback()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
@@ -124,96 +94,142 @@ def end_session():
         
         db.session.commit()
         
-        print(f"[PROCTOR] Session ended: {session.session_uuid}. Total Events: {len(violation_events)}")
+        flush_proctor_events()
+        log_fields(logging.INFO, 'proctor_session_ended', session=session.session_uuid,
+                   candidate=user_id, events=len(violation_events))
         
         return jsonify({
             'success': True,
             'total_events': len(violation_events),
             'events_stored': True
         })
-    except Exception as e:
-        import traceback
-        print(f"[PROCTOR ERROR] Failed to end session: {str(e)}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception(f"proctor_session_end_failed candidate={user_id}")
         db.session.rollback()
         return jsonify({'error': 'Failed to end session'}), 500
 
 @ProctorService.route('/log-event', methods=['POST'])
 def log_event():
+    """Log one proctoring event for the current candidate (buffered, see /events for batches)"""
     user_id = verify_candidate_token()
     if not user_id:
         return jsonify({'error': 'Unauthorized'}), 401
         
-    data = request.json
-    session_id = data.get('session_id')
-    event_type = data.get('event_type')
-    details = data.get('details')
-    
-    # Log to console for visibility
-    log_proctor_event(event_type, session_id, user_id, details)
-    
-    # Use ProctoringViolation instead of ProctorEvent
-    severity_map = {
-        'multiple_faces': 'high',
-        'no_face': 'high',
-        'phone_detected': 'high',
-        'looking_away': 'medium',
-        'tab_switch': 'medium'
-    }
-    
-    violation = ProctoringViolation(
-        session_id=session_id,
-        candidate_id=user_id,
-        violation_type=event_type,
-        violation_data={'details': details},
-        severity=severity_map.get(event_type, 'low'),
-        timestamp=datetime.utcnow()
-    )
-    db.session.add(violation)
-    db.session.commit()
+    data = request.json or {}
+    if data.get('session_id') and not owns_session(data.get('session_id'), user_id):
+        return jsonify({'error': 'Session not found'}), 404
+    try:
+        event = build_event(data.get('session_id'), user_id, data.get('event_type'),
+                            {'details': data.get('details')})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    record_proctor_events([event])
     
     return jsonify({'success': True})
 
 @ProctorService.route('/log-violation', methods=['POST'])
 def log_violation():
-    """Log a proctoring violation for the current candidate"""
+    """Log a proctoring violation for the current candidate (buffered, see /events for batches)"""
     user_id = verify_candidate_token()
     if not user_id:
         return jsonify({'error': 'Unauthorized'}), 401
         
-    data = request.json
-    session_id = data.get('session_id')
-    violation_type = data.get('violation_type')
-    violation_data = data.get('violation_data', {})
+    data = request.json or {}
+    if data.get('session_id') and not owns_session(data.get('session_id'), user_id):
+        return jsonify({'error': 'Session not found'}), 404
+    try:
+        event = build_event(data.get('session_id'), user_id, data.get('violation_type'),
+                            data.get('violation_data', {}))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    record_proctor_events([event])
+    
+    return jsonify({
+        'success': True,
+        'queued': True
+    })
+
+@ProctorService.route('/events', methods=['POST'])
+def log_events_batch():
+    """
+    BATCH PROCTORING EVENTS ENDPOINT
+    
+    Logs many proctoring events of the current candidate in one request.
+    Events are written through the per-process write-behind buffer
+    (app/services/proctor_events.py) with multi-row inserts, so clients
+    should collect events (e.g. for a few seconds) and send them together
+    instead of one request per tab switch.
+    
+    Authentication: Required (JWT Bearer token - candidate)
+    
+    Request Body:
+        {
+            "session_id": "<proctor session uuid>",
+            "events": [
+                {
+                    "type": "tab_switch",                      // or "event_type" / "violation_type"
+                    "timestamp": "2026-01-01T10:00:00Z",        // optional, client time (server time if missing/invalid)
+                    "details": {...}                           // optional, or "violation_data"
+                },
+                ...
+            ]
+        }
+    
+    Response:
+        {
+            "success": true,
+            "accepted": <count>,
+            "rejected": [{"index": 3, "error": "..."}]      // invalid events, the rest are stored
+        }
+    
+    Status Codes:
+        - 200: Events accepted (possibly with some rejected)
+        - 400: Missing session_id, events not a list, or too many events
+        - 401: Unauthorized
+        - 404: Session not found or belongs to another candidate
+    """
+    user_id = verify_candidate_token()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized'}), 401
     
-    # Determine severity based on violation type
-    severity_map = {
-        'multiple_faces': 'high',
-        'no_face': 'high',
-        'phone_detected': 'high',
-        'looking_away': 'medium',
-        'tab_switch': 'medium'
-    }
-    severity = severity_map.get(violation_type, 'low')
+    data = request.get_json(silent=True) or {}
+    session_id = data.get('session_id')
+    events = data.get('events')
+    if not session_id or not isinstance(session_id, str):
+        return jsonify({'success': False, 'message': 'session_id is required'}), 400
+    if not isinstance(events, list):
+        return jsonify({'success': False, 'message': 'events must be a list'}), 400
+    if len(events) > Config.PROCTOR_BATCH_MAX_EVENTS:
+        return jsonify({
+            'success': False,
+            'message': f'At most {Config.PROCTOR_BATCH_MAX_EVENTS} events per request'
+        }), 400
+    # Events feed the session's counters and risk score, so only its own candidate may add them
+    if not owns_session(session_id, user_id):
+        return jsonify({'success': False, 'message': 'Session not found'}), 404
     
-    # Log to console for visibility
-    log_proctor_event(violation_type, session_id, user_id, violation_data)
+    rows = []
+    rejected = []
+    for index, item in enumerate(events):
+        if not isinstance(item, dict):
+            rejected.append({'index': index, 'error': 'event must be an object'})
+            continue
+        violation_type = item.get('type') or item.get('event_type') or item.get('violation_type')
+        details = item.get('details', item.get('violation_data'))
+        try:
+            rows.append(build_event(session_id, user_id, violation_type, details,
+                                    timestamp=parse_event_time(item.get('timestamp'))))
+        except ValueError as e:
+            rejected.append({'index': index, 'error': str(e)})
     
-    # Save to database
-    violation = ProctoringViolation(
-        session_id=session_id,
-        candidate_id=user_id,
-        violation_type=violation_type,
-        violation_data=violation_data,
-        severity=severity,
-        timestamp=datetime.utcnow()
-    )
-    db.session.add(violation)
-    db.session.commit()
+    accepted = record_proctor_events(rows)
+    log_fields(logging.DEBUG, 'proctor_batch', session=session_id, candidate=user_id,
+               accepted=accepted, rejected=len(rejected))
     
     return jsonify({
         'success': True,
-        'violation_id': violation.id
+        'accepted': accepted,
+        'rejected': rejected
     })
 
 @ProctorService.route('/analyze-frame', methods=['POST'])
@@ -222,50 +238,60 @@ def analyze_frame():
     if not user_id:
         return jsonify({'error': 'Unauthorized'}), 401
         
-    data = request.json
+    data = request.json or {}
     session_id = data.get('session_id')
     image_data = data.get('image')
     
     if not image_data:
         return jsonify({'error': 'No image data provided'}), 400
+    # The session's cache of recent frames is only used by its own candidate
+    if session_id and not owns_session(session_id, user_id):
+        return jsonify({'error': 'Session not found'}), 404
 
-    # Call AI Service
-    from ..services.ai_service import analyze_frame_with_llama
-    result = analyze_frame_with_llama(image_data)
+    # Local CPU frame analysis (detectors are loaded once per worker process;
+    # near-duplicate frames of a session are not re-analyzed)
+    try:
+        from ..services.ai_service import analyze_frame, sampling_hint, FrameDecodeError, FrameQueueFullError
+    except ImportError as e:
+        log_fields(logging.ERROR, 'proctor_frame_analysis_unavailable', error=str(e))
+        return jsonify({'success': False, 'error': 'Frame analysis is not available on this server'}), 503
+    try:
+        result = analyze_frame(image_data, session_id=session_id)
+    except FrameDecodeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except FrameQueueFullError as e:
+        # Overloaded: drop the frame and ask the client to slow down
+        sampling = sampling_hint()
+        log_fields(logging.WARNING, 'proctor_frame_rejected', session=session_id, candidate=user_id,
+                   queue=sampling['queue_depth'], error=str(e))
+        response = jsonify({'success': False, 'error': 'Frame analysis is overloaded, retry later', 'sampling': sampling})
+        response.headers['Retry-After'] = str(max(1, sampling['interval_ms'] // 1000))
+        return response, 429
+    log_fields(logging.DEBUG, 'proctor_frame_analyzed', session=session_id, candidate=user_id,
+               faces=result['face_count'], people=result['person_count'], ms=result['latency_ms'],
+               batch=result.get('batch_size'), duplicate=result['deduplicated'])
+    
+    sampling = result.pop('sampling')
     
-    # Auto-log if suspicious behavior detected
-    if result.get('multiple_faces') or result.get('looking_away') or result.get('phone_detected') or not result.get('face_detected'):
+    # Auto-log if suspicious behavior detected (duplicate frames too: each frame counts, as if analyzed)
+    suspicious = result.get('multiple_faces') or result.get('looking_away') or result.get('phone_detected') or not result.get('face_detected')
+    if suspicious:
         # Log event internally
         event_type = 'suspicious_behavior'
         if result.get('multiple_faces'): event_type = 'multiple_faces'
         elif not result.get('face_detected'): event_type = 'no_face'
         elif result.get('looking_away'): event_type = 'looking_away'
         
-        # Log to console for visibility
-        log_proctor_event(event_type, session_id, user_id, result)
-        
-        # Map severity
-        severity_map = {
-            'multiple_faces': 'high',
-            'no_face': 'high',
-            'phone_detected': 'high',
-            'looking_away': 'medium'
-        }
-        
-        violation = ProctoringViolation(
-            session_id=session_id,
-            candidate_id=user_id,
-            violation_type=event_type,
-            violation_data=result,
-            severity=severity_map.get(event_type, 'medium'),
-            timestamp=datetime.utcnow()
-        )
-        db.session.add(violation)
-        db.session.commit()
+        severity = 'medium' if event_type == 'suspicious_behavior' else None
+        try:
+            record_proctor_events([build_event(session_id, user_id, event_type, result, severity=severity)])
+        except ValueError as e:
+            log_fields(logging.WARNING, 'proctor_frame_event_skipped', candidate=user_id, error=str(e))
     
     return jsonify({
         'success': True,
-        'analysis': result
+        'analysis': result,
+        'sampling': sampling
     })
 
 @ProctorService.route('/session/<string:session_id>/summary', methods=['GET'])
@@ -273,9 +299,16 @@ def get_session_summary(session_id):
     """
     Get complete proctoring data for a session.
     This endpoint is designed for the EVALUATION ENGINE to access candidate behavior data.
+    Pass ?events=false for counts and risk score only.
+    
+    Eventually consistent: events accepted by other worker processes appear
+    within about PROCTOR_FLUSH_SECONDS (see app/services/proctor_events.py).
     """
     # TODO: Add recruiter/admin auth check for production
     
+    # Include events still in this process's write buffer
+    flush_proctor_events()
+    
     # Try finding by UUID first
     session = ProctorSession.query.filter_by(session_uuid=session_id).first()
     if not session:
@@ -286,25 +319,21 @@ def get_session_summary(session_id):
     if not session:
         return jsonify({'error': 'Session not found'}), 404
     
-    # Get all violations for this session
-    # Use the session_uuid if available, otherwise might need another way to link
-    # But ProctoringViolation uses session_id string which should be the UUID
+    # ProctoringViolation uses session_id string which should be the UUID
     search_id = session.session_uuid if session.session_uuid else str(session.id)
-    events = ProctoringViolation.query.filter_by(session_id=search_id).order_by(ProctoringViolation.timestamp).all()
     
-    # Count violations by type
-    violation_counts = {}
-    for event in events:
-        violation_counts[event.violation_type] = violation_counts.get(event.violation_type, 0) + 1
+    # Counts and risk score come from the per-type counters; the event list
+    # grows with the session and can be skipped with ?events=false
+    violation_counts = session_violation_counts([search_id]).get(search_id, {})
     
-    # Calculate risk score (simple algorithm for now)
-    risk_score = 0
-    risk_score += violation_counts.get('no_face', 0) * 10
-    risk_score += violation_counts.get('multiple_faces', 0) * 25
-    risk_score += violation_counts.get('looking_away', 0) * 5
-    risk_score += violation_counts.get('tab_switch', 0) * 15
-    risk_score += violation_counts.get('phone_detected', 0) * 20
-    risk_score = min(risk_score, 100)  # Cap at 100
+    events = []
+    if request.args.get('events', 'true').lower() != 'false':
+        events = ProctoringViolation.query.filter_by(session_id=search_id).order_by(ProctoringViolation.timestamp).all()
+        if session.status != 'active':
+            # Older events of ended sessions may have been moved by services/archive_proctoring.py
+            archived = ProctoringViolationArchive.query.filter_by(session_id=search_id).all()
+            if archived:
+                events = sorted(events + archived, key=lambda e: e.timestamp)
     
     return jsonify({
         'success': True,
@@ -318,10 +347,10 @@ def get_session_summary(session_id):
             'duration_minutes': round((session.end_time - session.start_time).total_seconds() / 60, 2) if session.end_time and session.start_time else None
         },
         'violations': {
-            'total_count': len(events),
+            'total_count': sum(violation_counts.values()),
             'by_type': violation_counts
         },
-        'risk_score': risk_score,
+        'risk_score': risk_score(violation_counts),
         'events': [
             {
                 'id': e.id,
@@ -341,12 +370,13 @@ def get_candidate_sessions(candidate_id):
     """
     sessions = ProctorSession.query.filter_by(candidate_id=candidate_id).order_by(ProctorSession.start_time.desc()).all()
     
+    # Event counts of all sessions from the counters (one query)
+    flush_proctor_events()
+    event_counts = session_violation_counts([session.session_uuid for session in sessions])
+    
     result = []
     for session in sessions:
-        # Create default count if no uuid
-        event_count = 0
-        if session.session_uuid:
-            event_count = ProctoringViolation.query.filter_by(session_id=session.session_uuid).count()
+        event_count = sum(event_counts.get(session.session_uuid, {}).values())
         result.append({
             'id': session.id,
             'assessment_id': session.assessment_id,
@@ -0,0 +1,302 @@
+"""
+Psychometric Norms
+Population statistics and percentile ranks for Big Five traits.
+
+Norms are kept over each candidate's average item score per trait (1-5), so
+candidates who answered different numbers of questions are comparable. For
+every trait the database holds:
+    - `psychometric_norms`: count / sum / sum of squares (mean and variance)
+    - `psychometric_norm_bins`: a fixed-width histogram over 1-5, used as the
+      quantile sketch (one row per bin)
+
+The rows are seeded once (seed_norm_rows, at startup). A submission then
+only adds to them with atomic `UPDATE ... SET count = count + 1, ...`
+statements in its own transaction - no read-modify-write, no row locks taken
+before the update. Percentile lookups read an in-process snapshot (refreshed
+every NORMS_REFRESH_SECONDS) whose cumulative histograms make each lookup O(1).
+"""
+
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from sqlalchemy import update
+from app.extensions import db
+from app.config import Config
+from app.db_helpers import dialect_insert
+from app.models import PsychometricNorm, PsychometricNormBin, PsychometricResult
+
+NUM_TRAITS = 5
+MIN_SCORE = 1.0
+MAX_SCORE = 5.0
+NUM_BINS = 80  # 0.05-wide bins over 1-5
+BIN_WIDTH = (MAX_SCORE - MIN_SCORE) / NUM_BINS
+
+# Keys of PsychometricResult.trait_item_means / percentile output, by trait_type
+TRAIT_KEYS = {
+    1: 'extraversion',
+    2: 'agreeableness',
+    3: 'conscientiousness',
+    4: 'emotional_stability',
+    5: 'intellect_imagination'
+}
+
+
+def _bin_index(value):
+    """Histogram bin for an average item score"""
+    index = int((value - MIN_SCORE) / BIN_WIDTH)
+    return min(max(index, 0), NUM_BINS - 1)
+
+
+def trait_item_means(trait_scores, trait_counts):
+    """
+    Convert raw trait sums into average item scores
+
+    Args:
+        trait_scores: {trait_type: raw sum}
+        trait_counts: {trait_type: questions answered}
+
+    Returns:
+        dict: {trait_key: average item score} for traits with at least one answer
+    """
+    return {
+        TRAIT_KEYS[trait]: round(trait_scores[trait] / trait_counts[trait], 4)
+        for trait in TRAIT_KEYS
+        if trait_counts.get(trait)
+    }
+
+
+def result_item_means(result):
+    """
+    The average item scores a stored PsychometricResult contributes to the norms
+
+    Falls back to raw sum / 10 (10 questions per trait) for results stored
+    before trait_item_means existed.
+    """
+    if result is None:
+        return None
+    return result.trait_item_means or {
+        key: getattr(result, key) / 10 for key in TRAIT_KEYS.values()
+    }
+
+
+def seed_norm_rows():
+    """
+    Create the missing norms and histogram rows (ON CONFLICT DO NOTHING, safe to
+    run concurrently). Called at startup; does not commit.
+    """
+    db.session.execute(dialect_insert(PsychometricNorm.__table__).values([
+        {'trait_type': trait, 'count': 0, 'total': 0.0, 'total_sq': 0.0} for trait in TRAIT_KEYS
+    ]).on_conflict_do_nothing(index_elements=['trait_type']))
+    db.session.execute(dialect_insert(PsychometricNormBin.__table__).values([
+        {'trait_type': trait, 'bin_index': i, 'count': 0} for trait in TRAIT_KEYS for i in range(NUM_BINS)
+    ]).on_conflict_do_nothing(index_elements=['trait_type', 'bin_index']))
+
+
+def _apply(changes):
+    """
+    Add per-trait deltas to the norms with atomic UPDATEs
+
+    Args:
+        changes: {trait_type: [(value, +1 or -1), ...]}
+    """
+    norms = PsychometricNorm.__table__
+    bins = PsychometricNormBin.__table__
+    bin_deltas = {}
+    # Fixed (trait, bin) order so concurrent submissions lock rows in the same order
+    for trait in sorted(changes):
+        entries = changes[trait]
+        statement = update(norms).where(norms.c.trait_type == trait).values(
+            count=norms.c.count + sum(sign for _, sign in entries),
+            total=norms.c.total + sum(sign * value for value, sign in entries),
+            total_sq=norms.c.total_sq + sum(sign * value * value for value, sign in entries),
+            updated_at=datetime.utcnow()
+        )
+        if not db.session.execute(statement).rowcount:
+            # Startup seeding did not run (e.g. the database was down)
+            seed_norm_rows()
+            db.session.execute(statement)
+        for value, sign in entries:
+            key = (trait, _bin_index(value))
+            bin_deltas[key] = bin_deltas.get(key, 0) + sign
+
+    for (trait, bin_index), delta in sorted(bin_deltas.items()):
+        if delta:
+            db.session.execute(
+                update(bins).where(bins.c.trait_type == trait, bins.c.bin_index == bin_index)
+                .values(count=bins.c.count + delta)
+            )
+
+
+def record_submission(new_means, old_means=None):
+    """
+    Fold one submission into the norms (same transaction as the result write)
+
+    Args:
+        new_means: trait_item_means of the new submission (None = only remove old_means)
+        old_means: Item means previously counted for this candidate (see result_item_means),
+                   if any. Retakes replace the old contribution instead of double counting.
+
+    Does not commit.
+    """
+    changes = {}
+    for trait, key in TRAIT_KEYS.items():
+        entries = []
+        if (old_means or {}).get(key) is not None:
+            entries.append((old_means[key], -1))
+        if (new_means or {}).get(key) is not None:
+            entries.append((new_means[key], 1))
+        if entries:
+            changes[trait] = entries
+    if changes:
+        _apply(changes)
+        norms_snapshot.invalidate()
+
+
+def remove_submission(result):
+    """Take a PsychometricResult about to be deleted out of the norms (does not commit)"""
+    record_submission(None, result_item_means(result))
+
+
+def rebuild_norms():
+    """
+    Recompute all norms from stored results in one pass (e.g. after a re-score)
+
+    Locks the norms rows, so submissions wait for the rebuild instead of
+    adding to values it is about to overwrite. Does not commit.
+
+    Returns:
+        int: Number of results included
+    """
+    seed_norm_rows()
+    PsychometricNorm.query.with_for_update().all()
+    results = PsychometricResult.query.all()
+    means = [result_item_means(result) for result in results]
+
+    bin_rows = []
+    for trait, key in TRAIT_KEYS.items():
+        values = np.array([m[key] for m in means if m and m.get(key) is not None], dtype=float)
+        db.session.execute(
+            update(PsychometricNorm.__table__).where(PsychometricNorm.trait_type == trait).values(
+                count=int(values.size), total=float(values.sum()), total_sq=float((values ** 2).sum()),
+                updated_at=datetime.utcnow()
+            )
+        )
+        bins = np.clip(((values - MIN_SCORE) / BIN_WIDTH).astype(int), 0, NUM_BINS - 1)
+        counts = np.bincount(bins, minlength=NUM_BINS).astype(int).tolist()
+        bin_rows.extend({'trait_type': trait, 'bin_index': i, 'count': count} for i, count in enumerate(counts))
+    db.session.execute(update(PsychometricNormBin), bin_rows)
+
+    norms_snapshot.invalidate()
+    return len(results)
+
+
+class NormsSnapshot:
+    """Read-only in-process copy of the norms with precomputed cumulative histograms"""
+
+    def __init__(self, refresh_seconds=None):
+        self.refresh_seconds = Config.NORMS_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._cumulative = None  # (NUM_TRAITS, NUM_BINS + 1) counts below each bin edge
+        self._totals = None
+        self._stats = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Force a reload on the next lookup"""
+        self._loaded_at = 0.0
+
+    def _refresh(self):
+        """Reload the norms from the DB if the snapshot is stale"""
+        if time.monotonic() - self._loaded_at < self.refresh_seconds and self._cumulative is not None:
+            return
+
+        with self._lock:
+            rows = {row.trait_type: row for row in PsychometricNorm.query.all()}
+            histograms = np.zeros((NUM_TRAITS, NUM_BINS), dtype=np.int64)
+            for trait, bin_index, count in db.session.query(
+                    PsychometricNormBin.trait_type, PsychometricNormBin.bin_index, PsychometricNormBin.count):
+                if trait in TRAIT_KEYS and 0 <= bin_index < NUM_BINS:
+                    histograms[trait - 1, bin_index] = count
+            stats = {}
+            for trait, key in TRAIT_KEYS.items():
+                row = rows.get(trait)
+                stats[key] = row.to_dict() if row else {'trait_type': trait, 'count': 0, 'mean': 0.0, 'std': 0.0}
+
+            cumulative = np.zeros((NUM_TRAITS, NUM_BINS + 1), dtype=np.int64)
+            cumulative[:, 1:] = np.cumsum(histograms, axis=1)
+            self._cumulative = cumulative
+            self._totals = cumulative[:, -1]
+            self._stats = stats
+            self._loaded_at = time.monotonic()
+
+    def percentile(self, trait_type, value):
+        """
+        Percentile rank (0-100) of an average item score within the population
+
+        Interpolates linearly inside the value's histogram bin.
+
+        Returns:
+            float or None: None if there is no population data for the trait
+        """
+        self._refresh()
+        total = self._totals[trait_type - 1]
+        if not total or value is None:
+            return None
+
+        bin_index = _bin_index(value)
+        below = self._cumulative[trait_type - 1, bin_index]
+        in_bin = self._cumulative[trait_type - 1, bin_index + 1] - below
+        fraction = (value - (MIN_SCORE + bin_index * BIN_WIDTH)) / BIN_WIDTH
+        fraction = min(max(fraction, 0.0), 1.0)
+        return round(float((below + fraction * in_bin) / total * 100), 1)
+
+    def quantile(self, trait_type, q):
+        """
+        Approximate score at quantile q (0-1) from the histogram
+
+        Returns:
+            float or None: None if there is no population data for the trait
+        """
+        self._refresh()
+        total = self._totals[trait_type - 1]
+        if not total:
+            return None
+
+        cumulative = self._cumulative[trait_type - 1]
+        target = q * total
+        bin_index = int(np.searchsorted(cumulative, target, side='left'))
+        bin_index = min(max(bin_index - 1, 0), NUM_BINS - 1)
+        in_bin = cumulative[bin_index + 1] - cumulative[bin_index]
+        fraction = (target - cumulative[bin_index]) / in_bin if in_bin else 0.0
+        return round(MIN_SCORE + (bin_index + fraction) * BIN_WIDTH, 3)
+
+    def stats(self):
+        """Per-trait count/mean/std plus quartiles"""
+        self._refresh()
+        summary = {}
+        for trait, key in TRAIT_KEYS.items():
+            entry = dict(self._stats.get(key, {}))
+            entry['p25'] = self.quantile(trait, 0.25)
+            entry['p50'] = self.quantile(trait, 0.50)
+            entry['p75'] = self.quantile(trait, 0.75)
+            summary[key] = entry
+        return summary
+
+
+# Global snapshot instance (one per worker process)
+norms_snapshot = NormsSnapshot()
+
+
+def percentile_ranks(result):
+    """
+    Percentile rank of each trait for a PsychometricResult
+
+    Returns:
+        dict: {trait_key: percentile or None}
+    """
+    means = result_item_means(result)
+    return {
+        key: norms_snapshot.percentile(trait, means.get(key))
+        for trait, key in TRAIT_KEYS.items()
+    }
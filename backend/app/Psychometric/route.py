@@ -2,11 +2,14 @@ from flask import request, jsonify
 from app.extensions import db
 from app.models import PsychometricQuestion, PsychometricTestConfig, PsychometricResult, CandidateAuth
 from app.auth_helpers import verify_candidate_token, verify_recruiter_token
+from app.services.question_cache import question_cache, bump_version, PSYCHOMETRIC_BANK
+from app.job_queue import enqueue_job, PSYCHOMETRIC_GRADING
 from . import psychometric_bp
+from .scoring import score_answers, rescore_all_results
+from .sampler import QuestionSampler
+from .norms import record_submission, rebuild_norms, trait_item_means, result_item_means, percentile_ranks, norms_snapshot
 from datetime import datetime
 import json
-import random
-from services.psychoresult_to_grading import evaluate_psychometric_match
 
 # Trait type mapping
 TRAIT_NAMES = {
@@ -17,6 +20,29 @@ TRAIT_NAMES = {
     5: "Intellect/Imagination"
 }
 
+def get_question_bank():
+    """Get all psychometric questions, serialized and cached, ordered by question_id"""
+    return question_cache.get(PSYCHOMETRIC_BANK, 'questions', lambda: [
+        q.to_dict() for q in PsychometricQuestion.query.order_by(PsychometricQuestion.question_id).all()
+    ])
+
+def get_active_config():
+    """Get the most recent active test configuration as a cached dict (or None)"""
+    def load():
+        config = PsychometricTestConfig.query.filter_by(is_active=True).order_by(
+            PsychometricTestConfig.created_at.desc()
+        ).first()
+        return config.to_dict() if config else None
+    
+    return question_cache.get(PSYCHOMETRIC_BANK, 'active_config', load)
+
+def get_sampler():
+    """Get the question sampler for the current question bank and config version"""
+    return question_cache.get(
+        PSYCHOMETRIC_BANK, 'sampler',
+        lambda: QuestionSampler(get_question_bank(), get_active_config())
+    )
+
 #====================== Admin/Recruiter Routes ============================
 
 @psychometric_bp.route('/load-questions', methods=['POST'])
@@ -102,6 +128,7 @@ def load_questions():
             db.session.add(question)
         
         db.session.commit()
+        bump_version(PSYCHOMETRIC_BANK)
         
         return jsonify({
             'success': True,
@@ -208,6 +235,7 @@ def set_test_configuration():
         
         db.session.add(config)
         db.session.commit()
+        bump_version(PSYCHOMETRIC_BANK)
         
         return jsonify({
             'success': True,
@@ -254,6 +282,55 @@ def get_current_configuration():
             'error': str(e)
         }), 500
 
+@psychometric_bp.route('/rescore', methods=['POST'])
+def rescore_results():
+    """Re-score every stored psychometric result against the current answer key"""
+    # Verify recruiter authentication
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    try:
+        rescored = rescore_all_results()
+        rebuild_norms()
+        db.session.commit()
+        print(f"✅ Re-scored {rescored} psychometric results and rebuilt norms")
+        
+        return jsonify({
+            'success': True,
+            'message': f'Re-scored {rescored} psychometric results',
+            'count': rescored
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@psychometric_bp.route('/norms', methods=['GET'])
+def get_norms():
+    """Get population norms (count, mean, std, quartiles) for each Big Five trait"""
+    # Verify recruiter authentication
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    try:
+        return jsonify({
+            'success': True,
+            'scale': 'average item score (1-5)',
+            'norms': norms_snapshot.stats(),
+            'trait_names': TRAIT_NAMES
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 #====================== Candidate Routes ============================
 
 @psychometric_bp.route('/test/start', methods=['POST'])
@@ -266,29 +343,8 @@ def start_test():
     
     try:
         # Use authenticated candidate_id from token
-        # Get active configuration (use most recent if multiple exist)
-        config = PsychometricTestConfig.query.filter_by(is_active=True).order_by(
-            PsychometricTestConfig.created_at.desc()
-        ).first()
-        
-        if not config:
-            # Default: use all 50 questions randomly
-            all_questions = PsychometricQuestion.query.filter_by(is_active=True).all()
-            selected_questions = random.sample(all_questions, min(50, len(all_questions)))
-        else:
-            if config.selection_mode == 'manual' and config.selected_question_ids:
-                # Use manually selected questions
-                question_ids = json.loads(config.selected_question_ids)
-                selected_questions = PsychometricQuestion.query.filter(
-                    PsychometricQuestion.question_id.in_(question_ids)
-                ).all()
-            else:
-                # Random selection
-                all_questions = PsychometricQuestion.query.filter_by(is_active=True).all()
-                selected_questions = random.sample(all_questions, min(config.num_questions, len(all_questions)))
-        
-        # Randomize order for candidate
-        random.shuffle(selected_questions)
+        # Trait-stratified selection, deterministic per candidate (no DB hit on a warm cache)
+        selected_questions = get_sampler().sample(candidate_id)
         
         # Instructions for candidate
         instructions = """Describe yourself as you generally are now, not as you wish to be in the future.
@@ -306,7 +362,7 @@ Indicate for each statement which answer best fits as a description of you:
             'success': True,
             'instructions': instructions,
             'total_questions': len(selected_questions),
-            'questions': [q.to_dict() for q in selected_questions],
+            'questions': selected_questions,
             'answer_options': [
                 {'value': 1, 'label': 'Very Inaccurate'},
                 {'value': 2, 'label': 'Moderately Inaccurate'},
@@ -346,35 +402,24 @@ def submit_test():
                 'error': 'answers are required'
             }), 400
         
-        # Initialize trait scores
-        trait_scores = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        trait_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        
         print(f"🔄 Calculating scores...")
         
-        # Calculate scores
-        for ans in answers:
-            question = PsychometricQuestion.query.filter_by(question_id=ans['question_id']).first()
-            if question:
-                answer_value = int(ans['answer'])
-                trait_type = question.trait_type
-                
-                # Apply scoring direction
-                if question.scoring_direction == '+':
-                    score = answer_value
-                else:  # '-' means reverse scoring
-                    score = 6 - answer_value
-                
-                trait_scores[trait_type] += score
-                trait_counts[trait_type] += 1
+        # Vectorized scoring against the compiled answer key (no per-answer queries)
+        trait_scores, trait_counts = score_answers(answers)
         
         print(f"📊 Trait scores calculated:")
         for trait_id, score in trait_scores.items():
             print(f"   {TRAIT_NAMES[trait_id]}: {score} (from {trait_counts[trait_id]} questions)")
         
+        # Average item score per trait, used for population norms
+        item_means = trait_item_means(trait_scores, trait_counts)
+        
         # Check if result already exists
         existing_result = PsychometricResult.query.filter_by(student_id=candidate_id).first()
         
+        # Fold into population norms, replacing any previous attempt's contribution
+        record_submission(item_means, result_item_means(existing_result))
+        
         if existing_result:
             # Update existing result
             existing_result.extraversion = trait_scores[1]
@@ -385,6 +430,7 @@ def submit_test():
             existing_result.questions_answered = len(answers)
             existing_result.test_completed = True
             existing_result.answers_json = json.dumps(answers)
+            existing_result.trait_item_means = item_means
             existing_result.last_updated = datetime.utcnow()
             result = existing_result
         else:
@@ -398,7 +444,8 @@ def submit_test():
                 intellect_imagination=trait_scores[5],
                 questions_answered=len(answers),
                 test_completed=True,
-                answers_json=json.dumps(answers)
+                answers_json=json.dumps(answers),
+                trait_item_means=item_means
             )
             db.session.add(result)
         
@@ -413,12 +460,6 @@ def submit_test():
             "Intellect/Imagination": trait_scores[5]
         }
         
-        try:
-            grading_result = evaluate_psychometric_match(psycho_scores, target_trait)
-            result.grading_json = grading_result
-            print(f"🤖 Psychometric AI Grading: {grading_result.get('match_grade')}")
-        except Exception as e:
-            print(f"⚠️ AI Grading failed: {e}")
         
         # Update candidate completion completion status
         candidate = CandidateAuth.query.get(candidate_id)
@@ -430,9 +471,22 @@ def submit_test():
         db.session.commit()
         print(f"✅ Psychometric test completed successfully for candidate {candidate_id}\n")
         
+        # AI match grading runs in the background job queue
+        job = None
+        try:
+            job = enqueue_job(PSYCHOMETRIC_GRADING, candidate_id, {
+                'scores': psycho_scores,
+                'target_trait': target_trait
+            })
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Failed to enqueue psychometric grading: {e}")
+        
         return jsonify({
             'success': True,
             'message': 'Psychometric test completed successfully',
+            'grading_status': job.status if job else None,
+            'job_id': job.id if job else None,
             'results': {
                 'extraversion': trait_scores[1],
                 'agreeableness': trait_scores[2],
@@ -472,6 +526,7 @@ def get_candidate_results(candidate_id):
         
         result_dict = result.to_dict()
         result_dict['trait_names'] = TRAIT_NAMES
+        result_dict['percentiles'] = percentile_ranks(result)
         
         return jsonify({
             'success': True,
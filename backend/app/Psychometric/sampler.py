@@ -0,0 +1,107 @@
+"""
+Psychometric Question Sampler
+Trait-stratified, deterministic question selection for /test/start.
+
+A sampler is built once per psychometric bank version (question load or
+config change) from the cached question bank and active configuration.
+Each call to `sample(candidate_id)` then works purely in memory:
+
+    - random mode: each Big Five trait gets an equal share of num_questions
+      (remainders go to the config's desired_traits first), capped by the
+      number of active questions for that trait
+    - manual mode: the recruiter's fixed question set
+
+The selection and order are seeded by the config and candidate ID, so a
+refresh or resume returns the same questions without storing them.
+"""
+
+import json
+import random
+
+NUM_TRAITS = 5
+DEFAULT_NUM_QUESTIONS = 50
+
+
+class QuestionSampler:
+    """Precomputed per-trait question pools and quotas for one config version"""
+
+    def __init__(self, questions, config=None):
+        """
+        Build the sampler
+
+        Args:
+            questions: Serialized questions (PsychometricQuestion.to_dict()), ordered by question_id
+            config: Serialized active PsychometricTestConfig, or None for defaults
+        """
+        self.config_id = config['id'] if config else 0
+        self.manual_questions = None
+
+        if config and config['selection_mode'] == 'manual' and config['selected_question_ids']:
+            question_ids = set(json.loads(config['selected_question_ids']))
+            self.manual_questions = [q for q in questions if q['question_id'] in question_ids]
+            self.quotas = {}
+            self.pools = {}
+            return
+
+        self.pools = {trait: [] for trait in range(1, NUM_TRAITS + 1)}
+        for q in questions:
+            if q['is_active'] and q['trait_type'] in self.pools:
+                self.pools[q['trait_type']].append(q)
+
+        num_questions = config['num_questions'] if config else DEFAULT_NUM_QUESTIONS
+        desired_traits = json.loads(config['desired_traits']) if config and config['desired_traits'] else []
+        self.quotas = self._allocate(num_questions, desired_traits)
+
+    def _allocate(self, num_questions, desired_traits):
+        """
+        Split num_questions across traits as evenly as the pools allow
+
+        Remainder questions go to desired traits first, then to traits with the
+        largest pools. Shortfalls on small pools are redistributed.
+
+        Returns:
+            dict: {trait_type: number of questions}
+        """
+        available = {trait: len(pool) for trait, pool in self.pools.items()}
+        num_questions = min(num_questions, sum(available.values()))
+
+        priority = [t for t in desired_traits if t in available]
+        priority += sorted((t for t in available if t not in priority), key=lambda t: -available[t])
+
+        quotas = {trait: 0 for trait in available}
+        remaining = num_questions
+        while remaining > 0:
+            open_traits = [t for t in priority if quotas[t] < available[t]]
+            if not open_traits:
+                break
+            share = max(remaining // len(open_traits), 1)
+            for trait in open_traits:
+                if remaining == 0:
+                    break
+                take = min(share, available[trait] - quotas[trait], remaining)
+                quotas[trait] += take
+                remaining -= take
+        return quotas
+
+    def sample(self, candidate_id):
+        """
+        Get the candidate's question set in presentation order
+
+        Args:
+            candidate_id: Authenticated candidate ID (seeds the selection)
+
+        Returns:
+            list: Serialized questions (new list; the dicts are shared and read-only)
+        """
+        rng = random.Random(f"psychometric:{self.config_id}:{candidate_id}")
+
+        if self.manual_questions is not None:
+            selected = list(self.manual_questions)
+        else:
+            selected = []
+            for trait, quota in self.quotas.items():
+                if quota:
+                    selected.extend(rng.sample(self.pools[trait], quota))
+
+        rng.shuffle(selected)
+        return selected
@@ -0,0 +1,218 @@
+"""
+Psychometric Scoring
+Vectorized Big Five scoring against a compiled answer key.
+
+The answer key is compiled once per question bank version into two NumPy
+arrays indexed by question_id:
+    trait_index[qid] -> 0-4 (trait_type - 1), or -1 if the question is unknown
+    direction[qid]   -> +1 for '+' questions, -1 for reverse-scored '-' questions
+
+A submission is then scored with one gather and one bincount instead of a
+query per answer.
+"""
+
+import json
+import numpy as np
+from sqlalchemy import update
+from app.extensions import db
+from app.models import PsychometricQuestion, PsychometricResult
+from app.services.question_cache import question_cache, PSYCHOMETRIC_BANK
+
+NUM_TRAITS = 5
+
+# PsychometricResult column for each trait index (trait_type - 1)
+TRAIT_COLUMNS = [
+    'extraversion',
+    'agreeableness',
+    'conscientiousness',
+    'emotional_stability',
+    'intellect_imagination'
+]
+
+
+class ScoringKey:
+    """Compiled trait/direction lookup arrays for the psychometric question bank"""
+
+    def __init__(self, trait_index, direction):
+        self.trait_index = trait_index
+        self.direction = direction
+
+    @classmethod
+    def compile(cls, rows):
+        """
+        Build the key from (question_id, trait_type, scoring_direction) rows
+
+        Returns:
+            ScoringKey: Arrays sized to the largest question_id + 1
+        """
+        size = max((qid for qid, _, _ in rows), default=0) + 1
+        trait_index = np.full(size, -1, dtype=np.int8)
+        direction = np.zeros(size, dtype=np.int8)
+        for qid, trait_type, scoring_direction in rows:
+            if qid < 0 or not 1 <= trait_type <= NUM_TRAITS:
+                continue
+            trait_index[qid] = trait_type - 1
+            direction[qid] = 1 if scoring_direction == '+' else -1
+        return cls(trait_index, direction)
+
+    def _gather(self, question_ids, answer_values):
+        """
+        Look up trait/direction for each answer and apply reverse scoring
+
+        Returns:
+            tuple: (mask of scorable answers, trait indexes, item scores)
+        """
+        in_range = (question_ids >= 0) & (question_ids < len(self.trait_index))
+        safe_ids = np.where(in_range, question_ids, 0)
+        traits = self.trait_index[safe_ids]
+        valid = in_range & (traits >= 0) & (answer_values >= 1) & (answer_values <= 5)
+
+        # '+' keeps the answer, '-' reverses it (6 - answer)
+        directions = self.direction[safe_ids]
+        scores = np.where(directions > 0, answer_values, 6 - answer_values)
+        return valid, traits, scores
+
+    def score(self, question_ids, answer_values):
+        """
+        Score a single submission
+
+        Args:
+            question_ids: Sequence of question IDs
+            answer_values: Sequence of answers (1-5), same length
+
+        Returns:
+            tuple: (trait_scores array of 5 floats, trait_counts array of 5 ints)
+        """
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        answer_values = np.asarray(answer_values, dtype=np.int64)
+        valid, traits, scores = self._gather(question_ids, answer_values)
+
+        trait_scores = np.bincount(traits[valid], weights=scores[valid], minlength=NUM_TRAITS)
+        trait_counts = np.bincount(traits[valid], minlength=NUM_TRAITS)
+        return trait_scores, trait_counts
+
+    def score_many(self, row_index, question_ids, answer_values, num_rows):
+        """
+        Score many submissions in one pass
+
+        Args:
+            row_index: Submission index for each answer
+            question_ids: Question ID for each answer
+            answer_values: Answer (1-5) for each answer
+            num_rows: Number of submissions
+
+        Returns:
+            tuple: ((num_rows, 5) matrix of trait scores, (num_rows, 5) matrix of answer counts)
+        """
+        row_index = np.asarray(row_index, dtype=np.int64)
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        answer_values = np.asarray(answer_values, dtype=np.int64)
+        valid, traits, scores = self._gather(question_ids, answer_values)
+
+        flat = row_index[valid] * NUM_TRAITS + traits[valid]
+        totals = np.bincount(flat, weights=scores[valid], minlength=num_rows * NUM_TRAITS)
+        counts = np.bincount(flat, minlength=num_rows * NUM_TRAITS)
+        return totals.reshape(num_rows, NUM_TRAITS), counts.reshape(num_rows, NUM_TRAITS)
+
+
+def get_scoring_key():
+    """Get the compiled scoring key for the current psychometric bank version"""
+    def load():
+        rows = db.session.query(
+            PsychometricQuestion.question_id,
+            PsychometricQuestion.trait_type,
+            PsychometricQuestion.scoring_direction
+        ).all()
+        return ScoringKey.compile(rows)
+
+    return question_cache.get(PSYCHOMETRIC_BANK, 'scoring_key', load)
+
+
+def parse_answers(answers):
+    """
+    Convert [{question_id, answer}, ...] into parallel int lists, skipping malformed entries
+
+    Returns:
+        tuple: (question_ids, answer_values)
+    """
+    question_ids = []
+    answer_values = []
+    for ans in answers or []:
+        try:
+            qid = int(ans['question_id'])
+            value = int(ans['answer'])
+        except (KeyError, ValueError, TypeError):
+            continue
+        question_ids.append(qid)
+        answer_values.append(value)
+    return question_ids, answer_values
+
+
+def score_answers(answers):
+    """
+    Score one submission
+
+    Args:
+        answers: List of {question_id, answer (1-5)}
+
+    Returns:
+        tuple: (trait_scores dict {1..5: int}, trait_counts dict {1..5: int})
+    """
+    question_ids, answer_values = parse_answers(answers)
+    trait_scores, trait_counts = get_scoring_key().score(question_ids, answer_values)
+    return (
+        {i + 1: int(trait_scores[i]) for i in range(NUM_TRAITS)},
+        {i + 1: int(trait_counts[i]) for i in range(NUM_TRAITS)}
+    )
+
+
+def rescore_all_results():
+    """
+    Re-score every stored PsychometricResult.answers_json against the current key
+
+    Parses all stored answers, scores them with a single bincount and writes the
+    trait columns (and trait_item_means) back with one bulk UPDATE. Does not commit;
+    callers should rebuild the norms afterwards.
+
+    Returns:
+        int: Number of results re-scored
+    """
+    key = get_scoring_key()
+    rows = db.session.query(PsychometricResult.id, PsychometricResult.answers_json).filter(
+        PsychometricResult.answers_json.isnot(None)
+    ).all()
+
+    result_ids = []
+    row_index = []
+    question_ids = []
+    answer_values = []
+    for result_id, answers_json in rows:
+        try:
+            answers = json.loads(answers_json)
+        except (ValueError, TypeError):
+            continue
+        qids, values = parse_answers(answers)
+        row = len(result_ids)
+        result_ids.append(result_id)
+        row_index.extend([row] * len(qids))
+        question_ids.extend(qids)
+        answer_values.extend(values)
+
+    if not result_ids:
+        return 0
+
+    matrix, counts = key.score_many(row_index, question_ids, answer_values, len(result_ids))
+
+    updates = []
+    for row, result_id in enumerate(result_ids):
+        values = {'id': result_id}
+        item_means = {}
+        for trait, column in enumerate(TRAIT_COLUMNS):
+            values[column] = float(matrix[row, trait])
+            if counts[row, trait]:
+                item_means[column] = round(float(matrix[row, trait] / counts[row, trait]), 4)
+        values['trait_item_means'] = item_means
+        updates.append(values)
+
+    db.session.execute(update(PsychometricResult), updates)
+    return len(updates)
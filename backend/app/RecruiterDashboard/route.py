@@ -3,17 +3,32 @@ RecruiterDashboard Routes
 Handles all recruiter dashboard operations
 """
 
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from . import RecruiterDashboard
-from ..models import CandidateAuth, MCQQuestion, MCQAnswer, EvaluationCriteria, ProctorSession, MCQResult, PsychometricResult, TextAssessmentResult, CandidateRationale, CodingAssessmentResult, IntegrityLog, TextBasedAnswer, CodingSubmission, ProctoringViolation, ProctorEvent
+from ..models import CandidateAuth, MCQQuestion, MCQAnswer, EvaluationCriteria, ProctorSession, MCQResult, PsychometricResult, TextAssessmentResult, CandidateRationale, CodingAssessmentResult, IntegrityLog, TextBasedAnswer, CodingSubmission, ProctoringViolation, ProctoringViolationArchive, ProctorViolationCount, ProctorEvent, AIJob, ReanalysisRun, ResumeImport
 from ..extensions import db
 from ..config import Config
 from ..auth_helpers import verify_recruiter_token
+from ..sse import sse_response
 import jwt
+import json
 import pandas as pd
 import io
-from services.AI_rationale import process_ai_rationale
+from ..services.question_cache import bump_version, MCQ_BANK
+from ..Psychometric.norms import percentile_ranks, remove_submission
+from services.AI_rationale import process_ai_rationale, stream_rationale
+from services.llm_cache import get_cache_stats, purge_expired
+from services.llm_gateway import llm_gateway
+from services.structured_output import repair_stats
+from services.llm_router import task_metrics
+from services.bulk_reanalysis import SCOPES, active_run, create_run, start_reanalysis_thread, stop_reanalysis
+from ..services.skills import parse_skill_filter, candidates_with_skills, skill_counts
+from ..services.proctor_events import session_violation_counts, flush_proctor_events
+from services.bulk_resume_import import create_import, start_import_thread, pipeline_summary as import_pipeline_summary
 from datetime import datetime
+import os
+import shutil
+import tempfile
 
 
 @RecruiterDashboard.route('/candidates/upload', methods=['POST'])
@@ -275,6 +290,7 @@ def upload_mcq_questions():
             print(f"✅ Deleted {questions_deleted} existing MCQ questions")
             
             db.session.commit()
+            bump_version(MCQ_BANK)
             print(f"✅ Successfully cleared all existing MCQ data")
         except Exception as e:
             db.session.rollback()
@@ -378,6 +394,7 @@ def upload_mcq_questions():
         # Commit changes
         try:
             db.session.commit()
+            bump_version(MCQ_BANK)
             return jsonify({
                 'success': True,
                 'message': f'Processed {results["total"]} questions',
@@ -683,6 +700,48 @@ def reset_evaluation_criteria():
 
 #====================== CANDIDATE LIST AND DETAILS ENDPOINTS ============================
 
+def latest_violation_counts(sessions, counters):
+    """
+    Pick the proctoring session a fairplay score is based on, and its violation counts
+    
+    The most recent session with violations wins (else the most recent one).
+    Counts come from the server-side counters (proctor_violation_counts) when
+    the session has any, otherwise from the summary the client sent at
+    session end (ProctorSession.violation_counts JSON).
+    
+    Args:
+        sessions: The candidate's sessions, most recent first
+        counters: session_violation_counts() of those sessions
+    
+    Returns:
+        (ProctorSession or None, dict): The session and its counts by type
+    """
+    def client_data(session):
+        raw_data = session.violation_counts
+        # Ensure raw_data is a dict (handle if it's a string)
+        if isinstance(raw_data, str):
+            try:
+                raw_data = json.loads(raw_data)
+            except ValueError:
+                raw_data = {}
+        return raw_data if isinstance(raw_data, dict) else {}
+    
+    for session in sessions:
+        if sum(counters.get(session.session_uuid, {}).values()) > 0:
+            return session, counters[session.session_uuid]
+        raw_data = client_data(session)
+        if raw_data.get('events', []) or raw_data.get('total_count', 0) > 0:
+            return session, raw_data.get('summary', raw_data)
+    
+    if not sessions:
+        return None, {}
+    session = sessions[0]
+    if session.session_uuid in counters:
+        return session, counters[session.session_uuid]
+    raw_data = client_data(session)
+    return session, raw_data.get('summary', raw_data)
+
+
 @RecruiterDashboard.route('/candidates', methods=['GET'])
 def get_candidates():
     """
@@ -693,6 +752,11 @@ def get_candidates():
     
     Authentication: Required (JWT Bearer token - recruiter only)
     
+    Query Parameters (optional):
+        - skills: Comma-separated resume skills, e.g. "Python, AWS" (normalized,
+                  so "ReactJS" matches "react.js"; see app/services/skills.py)
+        - match: 'all' (default, candidates with every skill) or 'any'
+    
     Response:
         {
             "success": true,
@@ -719,11 +783,13 @@ def get_candidates():
                 "high_match": <count>,
                 "potential": <count>,
                 "reject": <count>
-            }
+            },
+            "skill_filter": {"skills": ["python", "aws"], "match": "all"}   // null without a filter
         }
         
     Status Codes:
         - 200: Success
+        - 400: Invalid match value
         - 401: Unauthorized
         - 403: Forbidden (not a recruiter)
         - 500: Server error
@@ -750,8 +816,33 @@ def get_candidates():
             soft_weight = criteria.soft_skill
             fair_weight = criteria.fairplay
         
-        # Get all candidates
-        candidates = CandidateAuth.query.all()
+        # Get all candidates (narrowed by the skills index when filtering)
+        query = CandidateAuth.query
+        skill_filter = None
+        if request.args.get('skills'):
+            match = request.args.get('match', 'all').lower()
+            if match not in ('all', 'any'):
+                return jsonify({
+                    'success': False,
+                    'message': "match must be 'all' or 'any'"
+                }), 400
+            skills = parse_skill_filter(request.args['skills'])
+            if skills:
+                query = query.filter(CandidateAuth.id.in_(candidates_with_skills(skills, match)))
+                skill_filter = {'skills': skills, 'match': match}
+        candidates = query.all()
+        
+        # Completed proctoring sessions and their violation counters for all listed candidates
+        completed_sessions = {}
+        if candidates:
+            for proctor_session in ProctorSession.query.filter(
+                ProctorSession.candidate_id.in_([c.id for c in candidates]),
+                ProctorSession.status == 'completed'
+            ).order_by(ProctorSession.start_time.desc()):
+                completed_sessions.setdefault(proctor_session.candidate_id, []).append(proctor_session)
+        session_counters = session_violation_counts(
+            [ps.session_uuid for sessions in completed_sessions.values() for ps in sessions]
+        )
         
         candidates_data = []
         stats = {
@@ -782,35 +873,12 @@ def get_candidates():
             # Psychometric is NOT included in overall score anymore
             
             # Calculate fairplay score (from Proctoring Violations)
-            # Query for the most recent COMPLETED session that has violation data
-            sessions = ProctorSession.query.filter_by(
-                candidate_id=candidate.id,
-                status='completed'
-            ).order_by(ProctorSession.start_time.desc()).all()
-            
-            session = None
-            # Find the most recent session with actual violation data
-            for s in sessions:
-                if s.violation_counts and isinstance(s.violation_counts, dict):
-                    events = s.violation_counts.get('events', [])
-                    total_count = s.violation_counts.get('total_count', 0)
-                    if events or total_count > 0:
-                        session = s
-                        break
-            
-            # If no session with violations found, use the most recent one anyway
-            if not session and sessions:
-                session = sessions[0]
+            # Most recent COMPLETED session that has violation data (preloaded above)
+            _, counts = latest_violation_counts(completed_sessions.get(candidate.id, []), session_counters)
             
             fairplay_score = 100  # Start with perfect score
             
-            if session and session.violation_counts:
-                raw_data = session.violation_counts
-                if "summary" in raw_data:
-                    counts = raw_data["summary"]
-                else:
-                    counts = raw_data
-                    
+            if counts:
                 # Deduct points based on counts from JSON
                 # Weights: Face/Screen (High) = -15, Tab/Mouse (Medium) = -8
                 
@@ -967,7 +1035,8 @@ def get_candidates():
         return jsonify({
             'success': True,
             'candidates': candidates_data,
-            'stats': stats
+            'stats': stats,
+            'skill_filter': skill_filter
         }), 200
         
     except Exception as e:
@@ -980,6 +1049,44 @@ def get_candidates():
         }), 500
 
 
+@RecruiterDashboard.route('/skills', methods=['GET'])
+def get_skill_suggestions():
+    """
+    SKILL SUGGESTIONS ENDPOINT
+    
+    Most common resume skills in the skills index, for the candidate list's
+    skill filter (e.g. autocomplete).
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Query Parameters (optional):
+        - prefix: Only skills starting with this text (e.g. "py")
+        - limit: Number of skills (default 20, max 100)
+    
+    Response:
+        {
+            "success": true,
+            "skills": [{"skill": "python", "candidates": 5230}, ...]
+        }
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        return jsonify({
+            'success': True,
+            'skills': skill_counts(request.args.get('prefix'), limit)
+        }), 200
+    except Exception as e:
+        print(f"\n❌ GET SKILLS ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
 @RecruiterDashboard.route('/candidates/<int:candidate_id>', methods=['GET'])
 def get_candidate_detail(candidate_id):
     """
@@ -1020,7 +1127,8 @@ def get_candidate_detail(candidate_id):
                     "agreeableness": <0-100>,
                     "conscientiousness": <0-100>,
                     "emotional_stability": <0-100>,
-                    "intellect_imagination": <0-100>
+                    "intellect_imagination": <0-100>,
+                    "percentiles": {"extraversion": <0-100 population percentile>, ...}
                 },
                 "text_answers": [
                     {"question_id": <id>, "answer": "<text>", "word_count": <count>}
@@ -1087,7 +1195,9 @@ def get_candidate_detail(candidate_id):
                 'agreeableness': round(psycho_result.agreeableness / 10, 1),
                 'conscientiousness': round(psycho_result.conscientiousness / 10, 1),
                 'emotional_stability': round(psycho_result.emotional_stability / 10, 1),
-                'intellect_imagination': round(psycho_result.intellect_imagination / 10, 1)
+                'intellect_imagination': round(psycho_result.intellect_imagination / 10, 1),
+                # Population percentile rank per trait (e.g. 90 = 90th percentile)
+                'percentiles': percentile_ranks(psycho_result)
             }
         else:
             psycho_data = {
@@ -1120,47 +1230,30 @@ def get_candidate_detail(candidate_id):
             else:
                 soft_skill_score = 0
         
-        # Get Proctoring violations from ProctorSession.violation_counts JSON
+        # Get Proctoring violations (server-side counters, else ProctorSession.violation_counts JSON)
         # Query for the most recent COMPLETED session that has violation data
         sessions = ProctorSession.query.filter_by(
             candidate_id=candidate.id,
             status='completed'
         ).order_by(ProctorSession.start_time.desc()).all()
-        
-        session = None
-        # Find the most recent session with actual violation data
-        for s in sessions:
-            if s.violation_counts and isinstance(s.violation_counts, dict):
-                events = s.violation_counts.get('events', [])
-                total_count = s.violation_counts.get('total_count', 0)
-                if events or total_count > 0:
-                    session = s
-                    break
-        
-        # If no session with violations found, use the most recent one anyway
-        if not session and sessions:
-            session = sessions[0]
+        session, counts = latest_violation_counts(
+            sessions, session_violation_counts([s.session_uuid for s in sessions])
+        )
         
         fairplay_score = 100
         integrity_logs = []
         integrity_status = "Clean"  # Clean, Moderate, Severe
         
-        if session and session.violation_counts:
+        if session and (counts or session.violation_counts):
             raw_data = session.violation_counts
             
             # Ensure raw_data is a dict (handle if it's a string)
             if isinstance(raw_data, str):
-                import json
                 try:
                     raw_data = json.loads(raw_data)
                 except:
                     raw_data = {}
-            
-            # Get summary counts for fairplay score calculation
-            if "summary" in raw_data:
-                counts = raw_data["summary"]
-            else:
-                counts = raw_data
+            raw_data = raw_data or {}
             
             # Extract violation counts
             no_face = counts.get('no_face', 0)
@@ -1608,20 +1701,14 @@ def reset_candidate_exam(candidate_id):
         candidate.coding_completed = False
         candidate.coding_completed_at = None
         
-        # Delete all assessment results
-        # Note: Different models use different column names (student_id vs candidate_id)
-        MCQResult.query.filter_by(student_id=candidate_id).delete()
-        MCQAnswer.query.filter_by(candidate_id=candidate_id).delete()  # Uses candidate_id
-        PsychometricResult.query.filter_by(student_id=candidate_id).delete()
-        TextBasedAnswer.query.filter_by(student_id=candidate_id).delete()  # Delete text answers
-        TextAssessmentResult.query.filter_by(candidate_id=candidate_id).delete()
-        CodingAssessmentResult.query.filter_by(candidate_id=candidate_id).delete()
-        CodingSubmission.query.filter_by(candidate_id=candidate_id).delete()  # Delete coding submissions
-        CandidateRationale.query.filter_by(candidate_id=candidate_id).delete()
-        ProctoringViolation.query.filter_by(candidate_id=candidate_id).delete()  # Delete proctoring violations
+        # Write this process's buffered proctoring events, so they are deleted below
+        # instead of written after the reset
+        flush_proctor_events()
         
         # Get all sessions for this candidate and delete their events
-        sessions = ProctorSession.query.filter_by(candidate_id=candidate_id).all()
+        # Terminated (and locked) before the violations are deleted: events of terminated
+        # sessions still buffered in other processes are dropped when they are flushed
+        sessions = ProctorSession.query.filter_by(candidate_id=candidate_id).with_for_update().all()
         for session in sessions:
             # Delete proctor events for this session
             ProctorEvent.query.filter_by(session_id=session.id).delete()
@@ -1640,6 +1727,26 @@ def reset_candidate_exam(candidate_id):
                 timestamp=datetime.utcnow()
             )
             db.session.add(integrity_log)
+        db.session.flush()
+        
+        # Delete all assessment results
+        # Note: Different models use different column names (student_id vs candidate_id)
+        MCQResult.query.filter_by(student_id=candidate_id).delete()
+        MCQAnswer.query.filter_by(candidate_id=candidate_id).delete()  # Uses candidate_id
+        # Take the deleted attempt out of the population norms, or a retake would count twice
+        psychometric_result = PsychometricResult.query.filter_by(student_id=candidate_id).first()
+        if psychometric_result:
+            remove_submission(psychometric_result)
+            db.session.delete(psychometric_result)
+        TextBasedAnswer.query.filter_by(student_id=candidate_id).delete()  # Delete text answers
+        TextAssessmentResult.query.filter_by(candidate_id=candidate_id).delete()
+        CodingAssessmentResult.query.filter_by(candidate_id=candidate_id).delete()
+        CodingSubmission.query.filter_by(candidate_id=candidate_id).delete()  # Delete coding submissions
+        CandidateRationale.query.filter_by(candidate_id=candidate_id).delete()
+        ProctoringViolation.query.filter_by(candidate_id=candidate_id).delete()  # Delete proctoring violations
+        ProctoringViolationArchive.query.filter_by(candidate_id=candidate_id).delete()
+        ProctorViolationCount.query.filter_by(candidate_id=candidate_id).delete()
+        AIJob.query.filter_by(candidate_id=candidate_id).delete()  # Retakes must not reuse old grading jobs
         
         db.session.commit()
         
@@ -1661,6 +1768,54 @@ def reset_candidate_exam(candidate_id):
         }), 500
 
 
+@RecruiterDashboard.route('/candidates/<int:candidate_id>/jobs', methods=['GET'])
+def get_candidate_jobs(candidate_id):
+    """
+    GET CANDIDATE AI JOBS ENDPOINT
+    
+    Lists the background AI jobs (text grading, psychometric grading, resume
+    parsing, final rationale) for a candidate, newest first, including
+    attempts and the last error of failed jobs.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Response:
+        Success (200):
+        {
+            "success": true,
+            "jobs": [
+                {
+                    "id": 5,
+                    "job_type": "ai_rationale",
+                    "status": "failed",
+                    "attempts": 3,
+                    "last_error": "...",
+                    "result": null,
+                    ...
+                }
+            ]
+        }
+    """
+    try:
+        recruiter_id, error = verify_recruiter_token()
+        if error:
+            return error
+        
+        jobs = AIJob.query.filter_by(candidate_id=candidate_id).order_by(AIJob.created_at.desc()).all()
+        
+        return jsonify({
+            'success': True,
+            'jobs': [job.to_dict(include_result=True) for job in jobs]
+        }), 200
+        
+    except Exception as e:
+        print(f"\n❌ GET CANDIDATE JOBS ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
 @RecruiterDashboard.route('/candidates/<int:candidate_id>/analyze', methods=['POST'])
 def analyze_candidate(candidate_id):
     """
@@ -1669,8 +1824,15 @@ def analyze_candidate(candidate_id):
     Manually triggers the AI Rationale generation for a specific candidate.
     Useful for refreshing analysis or generating it if it failed/was skipped.
     
+    LLM responses are cached by prompt hash, so re-analyzing a candidate whose
+    data has not changed returns instantly. Pass refresh to force fresh LLM calls.
+    
     Authentication: Required (JWT Bearer token - recruiter only)
     
+    Request (optional):
+        - Query: ?refresh=true
+        - Or JSON body: {"refresh": true}
+    
     Response:
         {
             "success": true,
@@ -1694,9 +1856,17 @@ def analyze_candidate(candidate_id):
                 'message': 'Candidate not found'
             }), 404
             
+        # Force fresh LLM calls instead of cached responses
+        data = request.get_json(silent=True) or {}
+        refresh = request.args.get('refresh', '').lower() == 'true' or bool(data.get('refresh'))
+        
         # Trigger analysis
         # We pass the current app context to the service function
-        rationale_result = process_ai_rationale(candidate_id, app_instance=current_app._get_current_object())
+        rationale_result = process_ai_rationale(
+            candidate_id,
+            app_instance=current_app._get_current_object(),
+            bypass_cache=refresh
+        )
         
         if not rationale_result:
              return jsonify({
@@ -1718,3 +1888,449 @@ def analyze_candidate(candidate_id):
             'success': False,
             'message': f'An error occurred: {str(e)}'
         }), 500
+
+
+@RecruiterDashboard.route('/candidates/<int:candidate_id>/analyze/stream', methods=['POST'])
+def analyze_candidate_stream(candidate_id):
+    """
+    STREAMING AI ANALYSIS ENDPOINT
+    
+    Same as /candidates/<id>/analyze, but forwards the 70b rationale text as
+    Server-Sent Events while it is generated. Each top-level section is
+    parsed as soon as it is complete and sent as a "section" event; the stored
+    rationale is replaced only once the whole rationale is valid. The first
+    event is sent immediately.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Request (optional):
+        - Query: ?refresh=true
+        - Or JSON body: {"refresh": true}
+    
+    Response: text/event-stream
+        event: started        data: {"candidate_id": 7}
+        event: stage          data: {"name": "inputs_ready", "elapsed_ms": 84.2}
+        event: token          data: {"text": "{\n  \"resume_fit\": {"}
+        event: section        data: {"name": "resume_fit", "value": {"grade": "Good", "reasoning": "..."}}
+        ...
+        event: done           data: {"status": "generated", "sections": [...], "elapsed_ms": 9120.5}
+        
+    On failure (or if the client disconnects) the previous rationale is kept
+    and an AI_RATIONALE job is queued to finish the work: an "error" event
+    ({"message": ...}) and a "queued" event ({"rationale_status", "job_id"})
+    precede "done" with status "queued". While such a job is already queued
+    or running, only "started" and "queued" are sent.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    candidate = CandidateAuth.query.get(candidate_id)
+    if not candidate:
+        return jsonify({
+            'success': False,
+            'message': 'Candidate not found'
+        }), 404
+    
+    data = request.get_json(silent=True) or {}
+    refresh = request.args.get('refresh', '').lower() == 'true' or bool(data.get('refresh'))
+    
+    return sse_response(stream_rationale(
+        candidate_id,
+        current_app._get_current_object(),
+        bypass_cache=refresh
+    ))
+
+
+@RecruiterDashboard.route('/llm-cache/stats', methods=['GET'])
+def llm_cache_stats():
+    """
+    LLM CACHE STATISTICS ENDPOINT
+    
+    Reports hit rate and token savings of the prompt-hash LLM response cache.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Request (optional):
+        - Query: ?purge=true  // Delete expired entries first
+    
+    Response:
+        {
+            "success": true,
+            "purged": 0,
+            "stats": {
+                "process": {"hits": 12, "misses": 4, "bypassed": 1, "errors": 0, "hit_rate": 0.75, "tokens_saved": 18234},
+                "table": {"entries": 40, "total_hits": 95, "tokens_saved": 150320, "expired_entries": 3},
+                "enabled": true,
+                "ttl_seconds": 604800
+            }
+        }
+        
+    Note: "process" counters cover this worker process since startup;
+          "table" totals cover all workers.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    try:
+        purged = purge_expired() if request.args.get('purge', '').lower() == 'true' else 0
+        
+        return jsonify({
+            'success': True,
+            'purged': purged,
+            'stats': get_cache_stats()
+        }), 200
+        
+    except Exception as e:
+        print(f"\n❌ LLM CACHE STATS ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
+@RecruiterDashboard.route('/llm-gateway/metrics', methods=['GET'])
+def llm_gateway_metrics():
+    """
+    LLM GATEWAY METRICS ENDPOINT
+    
+    Reports per-model call counts, retries, 429s, token usage, time spent
+    waiting on rate limits and latency percentiles for this worker process.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Response:
+        {
+            "success": true,
+            "metrics": {
+                "models": {
+                    "llama-3.3-70b-versatile": {
+                        "calls": 14, "failures": 0, "retries": 2, "rate_limited": 2,
+                        "prompt_tokens": 21000, "completion_tokens": 5400,
+                        "throttle_wait_seconds": 3.2,
+                        "latency_ms": {"avg": 2100.5, "p50": 1900.0, "p95": 4200.0, "max": 5100.0}
+                    }
+                },
+                "in_flight": 1,
+                "max_concurrency": 4,
+                "max_retries": 4,
+                "timeout_seconds": 60.0
+            },
+            "structured_output": {
+                "invalid_responses": 3,   // failed JSON/schema validation
+                "repaired": 2,            // fixed by a fragment-only re-prompt
+                "unrepairable": 1
+            },
+            "routing": {                  // per task, per routed model
+                "psychometric_narrative": {
+                    "llama-3.1-8b-instant": {
+                        "calls": 12, "failures": 0, "quality_failures": 1,
+                        "last_quality_problems": ["narrative has 131 words (limit 80)"],
+                        "cache_hits": 3, "prompt_tokens": 2100, "completion_tokens": 1080,
+                        "avg_prompt_tokens": 233, "latency_ms": {"p50": 410.0, "p95": 900.0}
+                    }
+                }
+            }
+        }
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    return jsonify({
+        'success': True,
+        'metrics': llm_gateway.metrics(),
+        'structured_output': repair_stats.to_dict(),
+        'routing': task_metrics.to_dict()
+    }), 200
+
+
+@RecruiterDashboard.route('/rationales/reanalyze', methods=['POST'])
+def start_bulk_reanalysis():
+    """
+    BULK RATIONALE RE-ANALYSIS ENDPOINT
+    
+    Regenerates AI rationales for the whole candidate pool in the background
+    (e.g. after a prompt or model change). Candidates whose rendered prompts
+    are unchanged since their last rationale are skipped unless forced.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Request (JSON, all optional):
+        {
+            "scope": "existing",     // "existing" (has a rationale) or "completed" (finished any round)
+            "force": false,          // Regenerate everything, bypassing the LLM cache
+            "resume_run_id": 12,     // Continue an interrupted run from its checkpoint
+            "concurrency": 4         // Candidates processed at once
+        }
+    
+    Response (202):
+        {
+            "success": true,
+            "message": "Re-analysis started",
+            "run": {"id": 13, "status": "running", "total": 250, "processed": 0, ...}
+        }
+    
+    Errors:
+        - 409: Another run is in progress
+        - 400: Invalid scope or run not resumable
+        
+    Poll GET /api/recruiter/rationales/reanalyze/<run_id> for progress.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        running = active_run()
+        if running:
+            return jsonify({
+                'success': False,
+                'message': f'Re-analysis run {running.id} is already in progress',
+                'run': running.to_dict()
+            }), 409
+        
+        if data.get('resume_run_id'):
+            run = ReanalysisRun.query.get(data['resume_run_id'])
+            if not run or run.status == 'completed':
+                return jsonify({
+                    'success': False,
+                    'message': 'Run not found or already completed'
+                }), 400
+        else:
+            scope = data.get('scope', 'existing')
+            if scope not in SCOPES:
+                return jsonify({
+                    'success': False,
+                    'message': f'scope must be one of {list(SCOPES)}'
+                }), 400
+            run = create_run(scope, bool(data.get('force', False)), started_by=recruiter_id)
+        
+        start_reanalysis_thread(current_app._get_current_object(), run.id, data.get('concurrency'))
+        print(f"🔁 Re-analysis run {run.id} started by recruiter {recruiter_id}")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Re-analysis started',
+            'run': run.to_dict()
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"\n❌ START RE-ANALYSIS ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
+@RecruiterDashboard.route('/rationales/reanalyze/<int:run_id>', methods=['GET'])
+def get_bulk_reanalysis(run_id):
+    """
+    BULK RE-ANALYSIS PROGRESS ENDPOINT
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Response:
+        {
+            "success": true,
+            "run": {
+                "id": 13, "status": "running", "scope": "existing", "force": false,
+                "total": 250, "processed": 120, "generated": 35, "skipped": 84, "failed": 1,
+                "last_candidate_id": 131, "failed_candidate_ids": [97], ...
+            }
+        }
+        
+    Note: Progress is checkpointed every REANALYSIS_CHECKPOINT_EVERY candidates.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    run = ReanalysisRun.query.get(run_id)
+    if not run:
+        return jsonify({
+            'success': False,
+            'message': 'Run not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'run': run.to_dict()
+    }), 200
+
+
+@RecruiterDashboard.route('/rationales/reanalyze/<int:run_id>/cancel', methods=['POST'])
+def cancel_bulk_reanalysis(run_id):
+    """
+    CANCEL BULK RE-ANALYSIS ENDPOINT
+    
+    Stops a run after its in-flight candidates finish. The run keeps its
+    checkpoint and can be resumed later with resume_run_id.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    run = ReanalysisRun.query.get(run_id)
+    if not run:
+        return jsonify({
+            'success': False,
+            'message': 'Run not found'
+        }), 404
+    
+    if run.status != 'running':
+        return jsonify({
+            'success': False,
+            'message': f'Run is not running (status: {run.status})'
+        }), 400
+    
+    if not stop_reanalysis(run_id):
+        # Not executing in this worker process: only an abandoned run can be closed from here
+        running = active_run()
+        if running and running.id == run_id:
+            return jsonify({
+                'success': False,
+                'message': 'Run is executing in another worker process; retry the request'
+            }), 409
+        run.status = 'cancelled'
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'message': 'Cancellation requested',
+        'run': run.to_dict()
+    }), 200
+
+
+@RecruiterDashboard.route('/resumes/bulk', methods=['POST'])
+def start_bulk_resume_import():
+    """
+    BULK RESUME IMPORT ENDPOINT
+    
+    Attaches a batch of resume PDFs to existing candidates by email, in the
+    background. Files are matched by a manifest CSV or by an email address in
+    the file name (see services/bulk_resume_import.py). Identical files are
+    stored and parsed once; text extraction and parsing run in the job queue.
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Request:
+        - Method: POST
+        - Content-Type: multipart/form-data
+        - Field: 'archive' (zip of PDFs, may contain manifest.csv) and/or
+          'files' (one or more PDFs)
+        - Field: 'manifest' (optional CSV with filename,email columns)
+    
+    Response (202):
+        {
+            "success": true,
+            "message": "Resume import started",
+            "import": {"id": 4, "status": "running", "total": 0, "processed": 0, ...}
+        }
+    
+    Errors:
+        - 400: No archive or PDF files provided
+        
+    Poll GET /api/recruiter/resumes/bulk/<import_id> for progress.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    workdir = None
+    try:
+        uploads = request.files.getlist('archive') + request.files.getlist('files')
+        uploads = [f for f in uploads if f and f.filename]
+        if not uploads:
+            return jsonify({
+                'success': False,
+                'message': "No files provided (use 'archive' for a zip or 'files' for PDFs)"
+            }), 400
+        
+        # Request files are closed after the response; copy them (streamed) for the background run
+        workdir = tempfile.mkdtemp(prefix='resume-import-')
+        paths = []
+        for index, upload in enumerate(uploads):
+            # Keep the original base name: it may carry the candidate's email
+            name = os.path.basename(upload.filename.replace('\\', '/'))
+            if name in ('', '.', '..'):
+                name = 'upload'
+            os.makedirs(os.path.join(workdir, str(index)))
+            path = os.path.join(workdir, str(index), name)
+            upload.save(path)
+            paths.append(path)
+        
+        manifest_path = None
+        manifest = request.files.get('manifest')
+        if manifest and manifest.filename:
+            manifest_path = os.path.join(workdir, 'manifest.csv')
+            manifest.save(manifest_path)
+        
+        run = create_import(", ".join(upload.filename for upload in uploads), started_by=recruiter_id)
+        start_import_thread(current_app._get_current_object(), run.id, paths, manifest_path, cleanup_dir=workdir)
+        print(f"📥 Resume import {run.id} started by recruiter {recruiter_id} ({len(uploads)} upload(s))")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Resume import started',
+            'import': run.to_dict()
+        }), 202
+        
+    except Exception as e:
+        db.session.rollback()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"\n❌ START RESUME IMPORT ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
+@RecruiterDashboard.route('/resumes/bulk/<int:import_id>', methods=['GET'])
+def get_bulk_resume_import(import_id):
+    """
+    BULK RESUME IMPORT PROGRESS ENDPOINT
+    
+    Authentication: Required (JWT Bearer token - recruiter only)
+    
+    Query Parameters:
+        - entries: 'true' to include the per-file results
+    
+    Response:
+        {
+            "success": true,
+            "import": {
+                "id": 4, "status": "running", "total": 300, "processed": 150,
+                "stored": 140, "deduplicated": 12, "unmatched": 8, "failed": 2, "jobs_queued": 128,
+                "entries": [{"file": "jane@example.com.pdf", "email": "jane@example.com",
+                             "candidate_id": 17, "status": "stored"}, ...]   // with entries=true
+            },
+            "pipeline": {"ready": 90, "processing": 48, "failed": 2}   // Resume processing of attached candidates
+        }
+        
+    Note: Progress is saved every RESUME_IMPORT_BATCH_SIZE files.
+    """
+    recruiter_id, error = verify_recruiter_token()
+    if error:
+        return error
+    
+    run = ResumeImport.query.get(import_id)
+    if not run:
+        return jsonify({
+            'success': False,
+            'message': 'Import not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'import': run.to_dict(include_entries=request.args.get('entries', 'false').lower() == 'true'),
+        'pipeline': import_pipeline_summary(run)
+    }), 200
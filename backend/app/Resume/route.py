@@ -3,20 +3,17 @@ Resume Routes
 Handles resume upload and management operations
 """
 
-from flask import request, jsonify
+from flask import request, jsonify, send_from_directory, abort
 from . import Resume
 from ..models import CandidateAuth as CandidateAuthModel
 from ..extensions import db
 from ..config import Config
 from ..auth_helpers import verify_candidate_token
+from ..services.resume_store import store_resume, attach_resume_data, ResumeStorageError, MAX_RESUME_BYTES
 import jwt
-from datetime import datetime
-from supabase import create_client, Client
 import os
-import io
-from pypdf import PdfReader
 import json
-from services.resume_to_json import parse_resume_to_json
+from ..job_queue import latest_jobs, RESUME_EXTRACT, RESUME_PARSE
 
 
 @Resume.route('/upload', methods=['POST'])
@@ -24,7 +21,14 @@ def upload_resume():
     """
     RESUME UPLOAD ENDPOINT
     
-    Uploads candidate resume to Supabase storage and saves reference in database.
+    Uploads candidate resume to storage (Supabase, or local files with
+    STORAGE_BACKEND=local) and saves reference in database.
+    Text extraction and AI parsing run afterwards as background jobs, so the
+    response returns as soon as the file is stored.
+    
+    Resumes are stored by SHA-256 of their bytes (see services/resume_store.py):
+    re-uploading the current file only updates the filename, and a file seen
+    before reuses its storage object, extracted text and parsed data.
     
     Authentication: Required (JWT Bearer token - candidate only)
     
@@ -44,7 +48,18 @@ def upload_resume():
             "success": true,
             "message": "Resume uploaded successfully",
             "resume_url": "https://supabase-url/...",
-            "filename": "resume.pdf"
+            "filename": "resume.pdf",
+            "parsing_status": "queued",  // Background job status (null when nothing had to run)
+            "job_id": 7,
+            "deduplicated": null,        // null (new file), "content" (seen before) or "current" (same as current resume)
+            "processing": {              // Pipeline status, see GET /api/resume/status
+                "status": "processing",
+                "current_stage": "extract",
+                "stages": {
+                    "upload": {"status": "done", "duration_ms": 412.5, "bytes": 183211, ...},
+                    "extract": {"status": "queued", "queued_at": "..."}
+                }
+            }
         }
         
         Error (400/401/500):
@@ -63,9 +78,13 @@ def upload_resume():
     Processing Logic:
         1. Verify candidate authentication
         2. Validate file presence and type
-        3. Upload to Supabase storage
-        4. Save URL and metadata in database
-        5. Return success with file URL
+        3. Hash the file; if it is the current resume, update the filename only
+        4. Upload to Supabase storage unless these bytes are already stored
+        5. Save URL, metadata and the upload stage in database
+        6. Queue the missing stages: extraction (PDF text in a process pool,
+           which then queues AI parsing), parsing only, or none if parsed data
+           for these bytes exists
+        7. Return success with file URL
     """
     try:
         # Verify candidate authentication
@@ -100,78 +119,30 @@ def upload_resume():
         file_size = file.tell()
         file.seek(0)
         
-        if file_size > 5 * 1024 * 1024:  # 5MB
+        if file_size > MAX_RESUME_BYTES:  # 5MB
             return jsonify({
                 'success': False,
                 'message': 'File size must be less than 5MB'
             }), 400
         
-        # Initialize Supabase client
-        supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
-        
-        # Generate unique filename
-        original_filename = file.filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"resume_{candidate_id}_{timestamp}.pdf"
+        candidate = CandidateAuthModel.query.get(candidate_id)
+        if not candidate:
+            return jsonify({
+                'success': False,
+                'message': 'Candidate not found'
+            }), 404
         
-        # Upload to Supabase storage
+        # Store by content hash (streamed from the spooled upload); identical
+        # bytes reuse their storage object, text and parsed data
         try:
-            file_data = file.read()
-            
-            response = supabase.storage.from_(Config.SUPABASE_BUCKET).upload(
-                path=unique_filename,
-                file=file_data,
-                file_options={"content-type": "application/pdf"}
-            )
-            
-            # Get public URL
-            public_url = supabase.storage.from_(Config.SUPABASE_BUCKET).get_public_url(unique_filename)
-            
-        except Exception as e:
-            print(f"\n❌ SUPABASE UPLOAD ERROR: {str(e)}")
+            stored = store_resume(candidate, file.stream, file.filename)
+        except ResumeStorageError as e:
+            db.session.rollback()
+            print(f"\n❌ STORAGE UPLOAD ERROR: {str(e)}")
             return jsonify({
                 'success': False,
                 'message': f'Failed to upload to storage: {str(e)}'
             }), 500
-        
-        # Update candidate record in database
-        try:
-            candidate = CandidateAuthModel.query.get(candidate_id)
-            
-            if not candidate:
-                return jsonify({
-                    'success': False,
-                    'message': 'Candidate not found'
-                }), 404
-            
-            candidate.resume_url = public_url
-            candidate.resume_filename = original_filename
-            candidate.resume_uploaded_at = datetime.now()
-            
-            # AI Resume Parsing
-            try:
-                # Create file-like object from byte data
-                pdf_file = io.BytesIO(file_data)
-                reader = PdfReader(pdf_file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                
-                parsed_json = parse_resume_to_json(text)
-                candidate.resume_data = parsed_json
-                print("✅ Resume parsed and saved to DB")
-            except Exception as e:
-                print(f"⚠️ Resume Parsing failed: {e}")
-            
-            db.session.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': 'Resume uploaded successfully',
-                'resume_url': public_url,
-                'filename': original_filename
-            }), 200
-            
         except Exception as e:
             db.session.rollback()
             print(f"\n❌ DATABASE ERROR: {str(e)}")
@@ -179,6 +150,18 @@ def upload_resume():
                 'success': False,
                 'message': f'Database error: {str(e)}'
             }), 500
+        job = stored['job']
+        
+        return jsonify({
+            'success': True,
+            'message': 'Resume uploaded successfully',
+            'resume_url': candidate.resume_url,
+            'filename': candidate.resume_filename,
+            'parsing_status': job.status if job else None,
+            'job_id': job.id if job else None,
+            'deduplicated': stored['deduplicated'],
+            'processing': candidate.resume_processing
+        }), 200
             
     except Exception as e:
         import traceback
@@ -190,6 +173,72 @@ def upload_resume():
         }), 500
 
 
+@Resume.route('/status', methods=['GET'])
+def get_resume_status():
+    """
+    RESUME PROCESSING STATUS ENDPOINT
+    
+    Reports the resume pipeline stages (upload -> extract -> parse) with their
+    status and timings, plus the latest background job of each resume stage.
+    
+    Authentication: Required (JWT Bearer token - candidate only)
+    
+    Response:
+        Success (200):
+        {
+            "success": true,
+            "processing": {
+                "status": "ready",          // processing | ready | failed
+                "current_stage": "parse",
+                "stages": {
+                    "upload": {"status": "done", "duration_ms": 412.5, "bytes": 183211, ...},
+                    "extract": {"status": "done", "queue_ms": 850.2, "duration_ms": 640.1,
+                                "pages": 2, "total_pages": 2, "truncated": false, "chars": 5210, ...},
+                    "parse": {"status": "done", "queue_ms": 12.4, "duration_ms": 2310.7, "fields": [...], ...}
+                },
+                "updated_at": "..."
+            },
+            "jobs": {
+                "resume_extract": {"id": 7, "status": "succeeded", ...},
+                "resume_parse": {"id": 8, "status": "succeeded", ...}
+            },
+            "has_resume_data": true
+        }
+        
+        Error (401/404/500):
+        {
+            "success": false,
+            "message": "Error message"
+        }
+    """
+    try:
+        candidate_id, error_response = verify_candidate_token()
+        if error_response:
+            return error_response
+        
+        candidate = CandidateAuthModel.query.get(candidate_id)
+        if not candidate:
+            return jsonify({
+                'success': False,
+                'message': 'Candidate not found'
+            }), 404
+        
+        jobs = latest_jobs(candidate_id)
+        return jsonify({
+            'success': True,
+            'processing': candidate.resume_processing,
+            'jobs': {job_type: jobs[job_type].to_dict() for job_type in (RESUME_EXTRACT, RESUME_PARSE) if job_type in jobs},
+            'has_resume_data': bool(candidate.resume_data)
+        }), 200
+        
+    except Exception as e:
+        print(f"\n❌ RESUME STATUS ERROR: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+
 @Resume.route('/delete', methods=['DELETE'])
 def delete_resume():
     """
@@ -225,7 +274,7 @@ def delete_resume():
     Processing Logic:
         1. Verify candidate authentication
         2. Find candidate record
-        3. Clear resume fields in database
+        3. Clear resume fields, parsed resume data and skills index rows (one transaction)
         4. Return success (file remains in Supabase for audit)
     """
     try:
@@ -253,6 +302,10 @@ def delete_resume():
         candidate.resume_url = None
         candidate.resume_filename = None
         candidate.resume_uploaded_at = None
+        candidate.resume_sha256 = None
+        candidate.resume_processing = None
+        # The candidate must stop matching skill filters with the deleted resume
+        attach_resume_data(candidate, None)
         
         db.session.commit()
         
@@ -268,3 +321,24 @@ def delete_resume():
             'success': False,
             'message': f'An error occurred: {str(e)}'
         }), 500
+
+
+@Resume.route('/files/<path:filename>', methods=['GET'])
+def get_resume_file(filename):
+    """
+    LOCAL RESUME FILE ENDPOINT
+    
+    Serves stored resume files when STORAGE_BACKEND=local (the local
+    counterpart of Supabase public URLs). Returns 404 with other backends.
+    
+    Request:
+        - Method: GET
+        - Path: /api/resume/files/resume_<sha256>.pdf
+        
+    Status Codes:
+        - 200: File contents
+        - 404: Unknown file, or storage is not local
+    """
+    if Config.STORAGE_BACKEND != 'local':
+        abort(404)
+    return send_from_directory(Config.LOCAL_STORAGE_DIR, filename)
@@ -5,11 +5,12 @@ Handles open-ended question management and answer submission
 
 from flask import request, jsonify
 from . import TextBased
-from ..models import TextBasedQuestion, TextBasedAnswer, CandidateAuth as CandidateAuthModel, TextAssessmentResult
+from ..models import TextBasedQuestion, TextBasedAnswer, CandidateAuth as CandidateAuthModel
 from ..extensions import db
 from ..config import Config
 from ..auth_helpers import verify_candidate_token, verify_recruiter_token
-from services.textresponse_to_grading import evaluate_text_responses, grade_text_responses
+from ..services.question_cache import question_cache, bump_version, TEXT_BASED_BANK
+from ..job_queue import enqueue_job, TEXT_GRADING
 import json
 import jwt
 from datetime import datetime
@@ -50,12 +51,11 @@ def get_text_based_questions():
     print(f"\n✅ Authenticated candidate {candidate_id} requesting text-based questions")
     
     try:
-        # Get all questions
-        questions = TextBasedQuestion.query.all()
-        
-        print(f"📚 Found {len(questions)} text-based questions in database")
-        
-        questions_data = [q.to_dict() for q in questions]
+        # Get all questions (served from the versioned question bank cache)
+        questions_data = question_cache.get(
+            TEXT_BASED_BANK, 'questions',
+            lambda: [q.to_dict() for q in TextBasedQuestion.query.all()]
+        )
         print(f"📤 Returning {len(questions_data)} questions to frontend")
         
         return jsonify({
@@ -284,14 +284,17 @@ def complete_text_based_test():
     """
     COMPLETE TEXT-BASED TEST ENDPOINT
     
-    Marks the text-based assessment as completed for the candidate.
+    Marks the text-based assessment as completed for the candidate and
+    queues AI grading of the responses as a background job.
     
     Authentication: Required (JWT Bearer token - candidate only)
     
     Response:
         {
             "success": true,
-            "message": "Text-based assessment completed successfully"
+            "message": "Text-based assessment completed successfully",
+            "grading_status": "queued",  // queued | running | succeeded | failed | null
+            "job_id": 12                 // Poll GET /api/assessment/jobs/<job_id>
         }
     """
     # Verify authentication
@@ -312,47 +315,33 @@ def complete_text_based_test():
         candidate.text_based_completed = True
         candidate.text_based_completed_at = datetime.now()
         
-        # AI Grading for Text Responses
-        try:
-            answers = TextBasedAnswer.query.filter_by(student_id=candidate_id).all()
-            qa_pairs = []
-            for ans in answers:
-                # Need to fetch question text. Join is better but lazy load might work if relationship set
-                # TextBasedAnswer has 'question' relationship
-                qa_pairs.append({
-                    "question": ans.question.question,
-                    "answer": ans.answer
-                })
-            
-            if qa_pairs:
-                grading_result = evaluate_text_responses(qa_pairs)
-                
-                # Grade each response 0-100 and compute average communication_score
-                grades_result = grade_text_responses(grading_result)
-                
-                # Merge grades and communication_score into the grading result
-                grading_result['grades'] = grades_result.get('grades', [])
-                grading_result['communication_score'] = grades_result.get('communication_score', 0)
-                
-                # Save to TextAssessmentResult
-                text_result = TextAssessmentResult.query.filter_by(candidate_id=candidate_id).first()
-                if not text_result:
-                    text_result = TextAssessmentResult(candidate_id=candidate_id)
-                    db.session.add(text_result)
-                
-                text_result.grading_json = grading_result
-                print(f"✅ Text Assessment Graded: communication_score={grading_result.get('communication_score')}, remark={grading_result.get('overall_remark', grading_result.get('remark'))}")
-                
-        except Exception as e:
-            print(f"⚠️ Text Assessment Grading failed: {e}")
-        
+        answers = TextBasedAnswer.query.filter_by(student_id=candidate_id).all()
+        qa_pairs = []
+        for ans in answers:
+            # TextBasedAnswer has 'question' relationship
+            qa_pairs.append({
+                "question": ans.question.question,
+                "answer": ans.answer
+            })
+
         db.session.commit()
-        
+
         print(f"✅ Text-based assessment completed for candidate {candidate_id}")
-        
+
+        # AI Grading for Text Responses runs in the background job queue
+        job = None
+        if qa_pairs:
+            try:
+                job = enqueue_job(TEXT_GRADING, candidate_id, {'qa_pairs': qa_pairs})
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Failed to enqueue text grading: {e}")
+
         return jsonify({
             'success': True,
-            'message': 'Text-based assessment completed successfully'
+            'message': 'Text-based assessment completed successfully',
+            'grading_status': job.status if job else None,
+            'job_id': job.id if job else None
         }), 200
         
     except Exception as e:
@@ -463,6 +452,7 @@ def upload_text_based_questions():
             # Then delete all questions
             deleted_questions = TextBasedQuestion.query.delete()
             db.session.commit()
+            bump_version(TEXT_BASED_BANK)
             print(f"\n✅ Deleted {deleted_answers} existing text-based answers and {deleted_questions} questions")
         except Exception as e:
             db.session.rollback()
@@ -533,6 +523,7 @@ def upload_text_based_questions():
         # Commit all changes
         try:
             db.session.commit()
+            bump_version(TEXT_BASED_BANK)
             
             print(f"✅ Text-based questions upload completed:")
             print(f"   Total: {results['total']}")
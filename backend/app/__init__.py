@@ -143,6 +143,15 @@ def create_app():
                     db.session.execute(text("ALTER TABLE candidate_auth ADD COLUMN resume_uploaded_at TIMESTAMP"))
                     print("✅ Added resume_uploaded_at column to candidate_auth")
                 
+                if 'resume_processing' not in existing_columns:
+                    db.session.execute(text("ALTER TABLE candidate_auth ADD COLUMN resume_processing JSON"))
+                    print("✅ Added resume_processing column to candidate_auth")
+                
+                if 'resume_sha256' not in existing_columns:
+                    db.session.execute(text("ALTER TABLE candidate_auth ADD COLUMN resume_sha256 VARCHAR(64)"))
+                    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_candidate_auth_resume_sha256 ON candidate_auth (resume_sha256)"))
+                    print("✅ Added resume_sha256 column to candidate_auth")
+                
                 # Add missing round completion columns
                 if 'mcq_completed' not in existing_columns:
                     db.session.execute(text("ALTER TABLE candidate_auth ADD COLUMN mcq_completed BOOLEAN DEFAULT FALSE NOT NULL"))
@@ -186,6 +195,59 @@ def create_app():
                 
                 db.session.commit()
                 print("✅ Database schema updated successfully")
+            
+            # Add columns to existing psychometric_results table if they don't exist
+            if 'psychometric_results' in inspector.get_table_names():
+                existing_columns = [col['name'] for col in inspector.get_columns('psychometric_results')]
+                
+                if 'trait_item_means' not in existing_columns:
+                    db.session.execute(text("ALTER TABLE psychometric_results ADD COLUMN trait_item_means JSON"))
+                    print("✅ Added trait_item_means column to psychometric_results")
+                
+                db.session.commit()
+            
+            # Add columns to existing candidate_rationale table if they don't exist
+            if 'candidate_rationale' in inspector.get_table_names():
+                existing_columns = [col['name'] for col in inspector.get_columns('candidate_rationale')]
+                
+                if 'stage_timings' not in existing_columns:
+                    db.session.execute(text("ALTER TABLE candidate_rationale ADD COLUMN stage_timings JSON"))
+                    print("✅ Added stage_timings column to candidate_rationale")
+                
+                if 'input_hash' not in existing_columns:
+                    db.session.execute(text("ALTER TABLE candidate_rationale ADD COLUMN input_hash VARCHAR(64)"))
+                    print("✅ Added input_hash column to candidate_rationale")
+                
+                db.session.commit()
+            
+            # One norms row per trait; results stored before the norms existed are backfilled
+            from .Psychometric.norms import seed_norm_rows, rebuild_norms
+            from .models import PsychometricNorm, PsychometricResult
+            seed_norm_rows()
+            if (not db.session.query(PsychometricNorm.query.filter(PsychometricNorm.count > 0).exists()).scalar()
+                    and db.session.query(PsychometricResult.query.exists()).scalar()):
+                print(f"✅ Rebuilt psychometric norms from {rebuild_norms()} results")
+            db.session.commit()
+            
+            # Indexes added to existing proctoring tables (create_all only indexes new tables).
+            # On a large production table, create them beforehand with CREATE INDEX CONCURRENTLY
+            # (same names) to avoid blocking writes; existing indexes are skipped here.
+            from .models import ProctorSession, ProctoringViolation
+            for model in (ProctorSession, ProctoringViolation):
+                if model.__tablename__ in inspector.get_table_names():
+                    existing_indexes = {ix['name'] for ix in inspector.get_indexes(model.__tablename__)}
+                    for index in model.__table__.indexes:
+                        if index.name not in existing_indexes:
+                            index.create(bind=db.engine)
+                            print(f"✅ Added index {index.name}")
+            
+            # Backfill the per-session violation counters of events stored before they existed
+            from .models import ProctorViolationCount, ProctoringViolationArchive
+            if (not db.session.query(ProctorViolationCount.query.exists()).scalar()
+                    and (db.session.query(ProctoringViolation.query.exists()).scalar()
+                         or db.session.query(ProctoringViolationArchive.query.exists()).scalar())):
+                from .services.proctor_events import rebuild_violation_counts
+                print(f"✅ Backfilled {rebuild_violation_counts()} proctoring violation counters")
         
         except Exception as e:
             print(f"⚠️  WARNING: Database initialization failed: {str(e)}")
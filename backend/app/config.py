@@ -33,4 +33,102 @@ class Config:
     # Supabase configuration
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "uploads")
\ No newline at end of file
+    SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "uploads")
+    
+    # File storage: "supabase" (default) or "local" (files on disk, for on-prem/offline), see app/services/storage.py
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+    STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", 20))  # Pooled HTTP connections to Supabase storage per worker process
+    STORAGE_TIMEOUT_SECONDS = float(os.getenv("STORAGE_TIMEOUT_SECONDS", 30))
+    STORAGE_CHUNK_BYTES = int(os.getenv("STORAGE_CHUNK_BYTES", 256 * 1024))  # Streamed upload chunk size
+    LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage"))
+    LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/api/resume/files")  # Public URL prefix of local files
+    
+    # Question bank cache: seconds between version checks against the DB (0 = every request)
+    QUESTION_CACHE_CHECK_SECONDS = float(os.getenv("QUESTION_CACHE_CHECK_SECONDS", 2))
+    
+    # Psychometric norms: seconds an in-process norms snapshot is reused for percentile lookups
+    NORMS_REFRESH_SECONDS = float(os.getenv("NORMS_REFRESH_SECONDS", 30))
+    
+    # Background AI job queue
+    AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", 2))  # In-process worker threads per app process (0 = use worker.py only)
+    AI_JOB_POLL_SECONDS = float(os.getenv("AI_JOB_POLL_SECONDS", 1))  # Idle wait between queue polls
+    AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", 3))  # Attempts before a job is marked failed
+    AI_JOB_LEASE_SECONDS = int(os.getenv("AI_JOB_LEASE_SECONDS", 600))  # Running jobs whose lease was not renewed for this long are requeued
+    AI_JOB_HEARTBEAT_SECONDS = int(os.getenv("AI_JOB_HEARTBEAT_SECONDS", 60))  # How often a worker renews the lease of its running job
+    AI_JOB_REQUEUE_SECONDS = int(os.getenv("AI_JOB_REQUEUE_SECONDS", 60))  # How often each process sweeps for expired leases
+    
+    # LLM response cache (prompt-hash keyed, stored in llm_cache table)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))  # 0 = entries never expire
+    
+    # LLM provider: "groq" (default) or "fake" (in-process stand-in for offline load tests), see services/llm_provider.py
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # Optional Groq/OpenAI-compatible server, e.g. the local stub at http://localhost:8090
+    LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY", "lognormal:800:0.4")  # Fake provider latency distribution (ms)
+    LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", 0))  # Fraction of fake calls failing with 429/500
+    LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", 42))
+    
+    # LLM gateway (per worker process; per-model limits in services/llm_gateway.py override the defaults)
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 30))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 6000))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))  # Simultaneous in-flight LLM calls
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))  # Retries on 429/5xx/timeouts
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))  # Per-attempt timeout
+    LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 1))
+    LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 30))
+    
+    # LLM model routing (per-task tiers in services/llm_router.py)
+    LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "llama-3.1-8b-instant")
+    LLM_LARGE_MODEL = os.getenv("LLM_LARGE_MODEL", "llama-3.3-70b-versatile")
+    LLM_TASK_TIERS = os.getenv("LLM_TASK_TIERS", "")  # Overrides, e.g. "psychometric_narrative=large,final_rationale=fast"
+    LLM_ESCALATE_PROMPT_TOKENS = int(os.getenv("LLM_ESCALATE_PROMPT_TOKENS", 3000))  # Larger prompts of escalating tasks use the large tier
+    LLM_COMPACT_PROMPTS = os.getenv("LLM_COMPACT_PROMPTS", "true").lower() == "true"  # Compact JSON + pruned resume/text data in prompts
+    
+    # Bulk rationale re-analysis
+    REANALYSIS_CONCURRENCY = int(os.getenv("REANALYSIS_CONCURRENCY", 4))  # Candidates processed at once (LLM limits still apply)
+    REANALYSIS_CHECKPOINT_EVERY = int(os.getenv("REANALYSIS_CHECKPOINT_EVERY", 10))  # Persist progress every N candidates
+    
+    # Resume processing pipeline (upload -> PDF extraction in a process pool -> queued LLM parse)
+    RESUME_EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", 2))  # Extraction processes per app process (0 = extract inline)
+    RESUME_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("RESUME_EXTRACT_TIMEOUT_SECONDS", 30))  # Per-file limit; the stuck worker is killed
+    RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", 10))  # Later pages are not read
+    RESUME_MAX_TEXT_CHARS = int(os.getenv("RESUME_MAX_TEXT_CHARS", 50000))  # Text sent to the LLM parser
+    RESUME_IMPORT_CONCURRENCY = int(os.getenv("RESUME_IMPORT_CONCURRENCY", 4))  # Bulk import: files hashed/stored at once
+    RESUME_IMPORT_BATCH_SIZE = int(os.getenv("RESUME_IMPORT_BATCH_SIZE", 25))  # Bulk import: progress saved every N files
+    RESUME_IMPORT_MAX_FILES = int(os.getenv("RESUME_IMPORT_MAX_FILES", 2000))  # Bulk import: PDFs accepted per upload
+    
+    # Proctoring event ingestion (write-behind buffer, see app/services/proctor_events.py)
+    PROCTOR_BUFFER_ENABLED = os.getenv("PROCTOR_BUFFER_ENABLED", "true").lower() == "true"  # false = insert + commit per request
+    PROCTOR_FLUSH_ROWS = int(os.getenv("PROCTOR_FLUSH_ROWS", 200))  # Buffered events that trigger a flush
+    PROCTOR_FLUSH_SECONDS = float(os.getenv("PROCTOR_FLUSH_SECONDS", 1))  # Longest time an event waits in the buffer
+    PROCTOR_BUFFER_MAX_ROWS = int(os.getenv("PROCTOR_BUFFER_MAX_ROWS", 10000))  # Buffered events at which requests flush inline
+    PROCTOR_BATCH_MAX_EVENTS = int(os.getenv("PROCTOR_BATCH_MAX_EVENTS", 500))  # Events accepted per batch request
+    PROCTOR_SESSION_CACHE_SIZE = int(os.getenv("PROCTOR_SESSION_CACHE_SIZE", 10000))  # Session owners remembered per worker (event ownership checks)
+    PROCTOR_LOG_LEVEL = os.getenv("PROCTOR_LOG_LEVEL", "WARNING")  # high severity = WARNING, medium = INFO, low = DEBUG
+    PROCTOR_RETENTION_DAYS = int(os.getenv("PROCTOR_RETENTION_DAYS", 90))  # Events of ended sessions older than this are archived
+    PROCTOR_ARCHIVE_BATCH_SIZE = int(os.getenv("PROCTOR_ARCHIVE_BATCH_SIZE", 5000))  # Events moved per archive transaction
+    
+    # Proctoring frame analysis (CPU, per worker process, see app/services/ai_service.py)
+    FRAME_DETECTOR_WEIGHTS = os.getenv("FRAME_DETECTOR_WEIGHTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "services", "models", "mobilenet_ssd_deploy.caffemodel"))  # MobileNet-SSD weights (missing = faces only)
+    FRAME_DETECTOR_LABELS = os.getenv("FRAME_DETECTOR_LABELS")  # Optional label file of custom weights (default: VOC classes)
+    FRAME_DETECTOR_CONFIDENCE = float(os.getenv("FRAME_DETECTOR_CONFIDENCE", 0.5))  # Minimum person/phone detection confidence
+    FRAME_DETECTOR_INPUT_SIZE = int(os.getenv("FRAME_DETECTOR_INPUT_SIZE", 300))  # Detector input (300 = trained size; smaller is faster, less accurate)
+    FRAME_ANALYSIS_WIDTH = int(os.getenv("FRAME_ANALYSIS_WIDTH", 320))  # Frames are downscaled to this width before detection
+    FRAME_ANALYSIS_THREADS = int(os.getenv("FRAME_ANALYSIS_THREADS", 1))  # OpenCV threads per worker process
+    FRAME_MAX_BYTES = int(os.getenv("FRAME_MAX_BYTES", 2 * 1024 * 1024))  # Largest accepted (decoded) frame
+    FRAME_DEDUP_ENABLED = os.getenv("FRAME_DEDUP_ENABLED", "true").lower() == "true"  # Reuse the result of a session's near-identical last frame
+    FRAME_DEDUP_MAX_DISTANCE = int(os.getenv("FRAME_DEDUP_MAX_DISTANCE", 8))  # Largest per-cell brightness change (0-255) of a duplicate frame
+    FRAME_DEDUP_MAX_AGE_SECONDS = float(os.getenv("FRAME_DEDUP_MAX_AGE_SECONDS", 15))  # A reused result is re-checked after this long
+    FRAME_SESSION_CACHE_SIZE = int(os.getenv("FRAME_SESSION_CACHE_SIZE", 5000))  # Sessions whose last frame is remembered per worker
+    FRAME_BATCH_ENABLED = os.getenv("FRAME_BATCH_ENABLED", "true").lower() == "true"  # false = each request runs the detectors itself
+    FRAME_BATCH_WINDOW_MS = float(os.getenv("FRAME_BATCH_WINDOW_MS", 5))  # How long a batch collects frames after the first one
+    FRAME_BATCH_MAX_SIZE = int(os.getenv("FRAME_BATCH_MAX_SIZE", 8))  # Frames per detector batch
+    FRAME_BATCH_TIMEOUT_SECONDS = float(os.getenv("FRAME_BATCH_TIMEOUT_SECONDS", 5))  # Longest a request waits for its batch
+    FRAME_QUEUE_MAX = int(os.getenv("FRAME_QUEUE_MAX", 64))  # Waiting frames at which new ones are refused (429)
+    FRAME_QUEUE_HIGH_WATER = int(os.getenv("FRAME_QUEUE_HIGH_WATER", 8))  # Each this many waiting frames adds one base interval to the sampling hint
+    FRAME_WAIT_BUDGET_MS = float(os.getenv("FRAME_WAIT_BUDGET_MS", 100))  # Queue wait above which clients are asked to slow down
+    FRAME_SAMPLE_INTERVAL_MS = int(os.getenv("FRAME_SAMPLE_INTERVAL_MS", 2000))  # Frame interval suggested to clients when idle
+    FRAME_SAMPLE_MAX_FACTOR = int(os.getenv("FRAME_SAMPLE_MAX_FACTOR", 8))  # Largest multiple of the base interval suggested
+    
+    # Text response grading: "single_pass" (remarks + scores in one LLM call, falls back to two-pass) or "two_pass"
+    TEXT_GRADING_MODE = os.getenv("TEXT_GRADING_MODE", "single_pass")
@@ -0,0 +1,43 @@
+"""
+Database Helper Functions
+Dialect-aware bulk write helpers shared across blueprints
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from .extensions import db
+
+
+def dialect_insert(table):
+    """Return an INSERT construct that supports ON CONFLICT for the bound engine"""
+    if db.engine.dialect.name == 'sqlite':
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+def bulk_upsert(model, rows, conflict_columns, update_columns):
+    """
+    Insert many rows in a single statement, updating rows that already exist
+
+    Args:
+        model: SQLAlchemy model class to write to
+        rows: List of dicts keyed by column name
+        conflict_columns: Columns of the unique constraint used to detect duplicates
+        update_columns: Columns overwritten when a row already exists
+
+    Returns:
+        int: Number of rows sent to the database
+
+    Usage:
+        bulk_upsert(MCQAnswer, rows, ['candidate_id', 'question_id'],
+                    ['selected_option', 'is_correct', 'submitted_at'])
+    """
+    if not rows:
+        return 0
+
+    stmt = dialect_insert(model.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={col: stmt.excluded[col] for col in update_columns}
+    )
+    db.session.execute(stmt)
+    return len(rows)
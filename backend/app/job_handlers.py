@@ -0,0 +1,258 @@
+"""
+AI Job Handlers
+Handlers for the background AI job types (see job_queue.py).
+
+Each handler receives the claimed AIJob, performs the LLM call and stages its
+DB writes on the session; the worker commits them together with the job
+status. The grading services swallow their own errors and return fallback
+dicts, so handlers detect those fallbacks and raise to trigger a retry.
+
+The resume handlers also record their stage on candidate.resume_processing;
+since a raised error rolls the session back, failures are committed first.
+Their outputs are kept on the resume's content row (see
+services/resume_store.py) so identical files are never processed twice.
+"""
+
+import time
+from datetime import datetime
+from flask import current_app
+from .extensions import db
+from .models import CandidateAuth, PsychometricResult, TextAssessmentResult, ResumeContent
+from .job_queue import (
+    register_job, enqueue_job, content_key, has_pending_jobs, JobRetryError, JobDeferred,
+    TEXT_GRADING, PSYCHOMETRIC_GRADING, RESUME_EXTRACT, RESUME_PARSE, AI_RATIONALE
+)
+from .services.storage import get_storage
+from .services.resume_store import attach_resume_data
+from services.pdf_extraction import extract_pdf_text, PdfExtractionError, PdfContentError
+from services.textresponse_to_grading import grade_text, TEXT_GRADING_ERROR_REMARK
+from services.psychoresult_to_grading import evaluate_psychometric_match
+from services.resume_to_json import parse_resume_to_json
+from services.AI_rationale import process_ai_rationale
+
+
+@register_job(TEXT_GRADING)
+def run_text_grading(job):
+    """
+    Grade the candidate's text responses
+
+    Payload:
+        {"qa_pairs": [{"question": str, "answer": str}, ...]}
+    """
+    qa_pairs = job.payload.get('qa_pairs', [])
+
+    # Single pass (remarks + scores in one call) with two-pass fallback, per Config.TEXT_GRADING_MODE
+    grading_result = grade_text(qa_pairs)
+    if grading_result.get('remark') == TEXT_GRADING_ERROR_REMARK:
+        raise JobRetryError('Text response evaluation failed')
+    if qa_pairs and not grading_result.get('grades'):
+        raise JobRetryError('Text response grading failed')
+
+    text_result = TextAssessmentResult.query.filter_by(candidate_id=job.candidate_id).first()
+    if not text_result:
+        text_result = TextAssessmentResult(candidate_id=job.candidate_id)
+        db.session.add(text_result)
+
+    text_result.grading_json = grading_result
+    print(f"✅ Text Assessment Graded ({grading_result['grading_mode']}): communication_score={grading_result.get('communication_score')}, remark={grading_result.get('overall_remark', grading_result.get('remark'))}")
+
+    return {'communication_score': grading_result['communication_score'], 'grading_mode': grading_result['grading_mode']}
+
+
+@register_job(PSYCHOMETRIC_GRADING)
+def run_psychometric_grading(job):
+    """
+    Evaluate the psychometric match against the target trait
+
+    Payload:
+        {"scores": {"Extraversion": int, ...}, "target_trait": str}
+    """
+    grading_result = evaluate_psychometric_match(job.payload['scores'], job.payload.get('target_trait'))
+    if grading_result.get('match_grade') == 'Error':
+        raise JobRetryError(grading_result.get('analysis', 'Psychometric evaluation failed'))
+
+    result = PsychometricResult.query.filter_by(student_id=job.candidate_id).first()
+    if not result:
+        raise RuntimeError('Psychometric result not found')
+
+    result.grading_json = grading_result
+    print(f"🤖 Psychometric AI Grading: {grading_result.get('match_grade')}")
+
+    return {'match_grade': grading_result.get('match_grade')}
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _resume_candidate(job):
+    """The job's candidate, or None if it has since uploaded a different resume"""
+    candidate = CandidateAuth.query.get(job.candidate_id)
+    if not candidate:
+        raise RuntimeError('Candidate not found')
+    if candidate.resume_url != job.payload.get('resume_url'):
+        print(f"⚠️ Skipping stale {job.job_type} for candidate {job.candidate_id}")
+        return None
+    return candidate
+
+
+def _fail_resume_stage(job, candidate, stage, started, error, retry=True):
+    """Commit a failed stage (retrying while attempts remain) and raise for the worker"""
+    will_retry = retry and job.attempts < job.max_attempts
+    candidate.record_resume_stage(
+        stage, 'retrying' if will_retry else 'failed',
+        error=error, attempts=job.attempts, duration_ms=_elapsed_ms(started)
+    )
+    db.session.commit()
+    raise JobRetryError(error)
+
+
+def _resume_content(job, candidate, stage):
+    """The content row of the job's resume (fails the stage if it is missing)"""
+    sha256 = job.payload.get('sha256')
+    content = ResumeContent.query.get(sha256) if sha256 else None
+    if content is None:
+        _fail_resume_stage(job, candidate, stage, time.perf_counter(), 'Resume content not found')
+    return content
+
+
+def _queue_resume_parse(job, candidate):
+    """Record the parse stage as queued and enqueue it (commits)"""
+    candidate.record_resume_stage('parse', 'queued')
+    return enqueue_job(
+        RESUME_PARSE, job.candidate_id,
+        {key: job.payload[key] for key in ('resume_url', 'storage_path', 'sha256')},
+        idempotency_key=content_key(job.payload['sha256'], job.id)
+    )
+
+
+@register_job(RESUME_EXTRACT)
+def run_resume_extract(job):
+    """
+    Extract the uploaded resume's text in the PDF process pool and queue the parse job
+
+    Text already extracted for the same bytes (by another upload) is reused.
+
+    Payload:
+        {"resume_url": str, "storage_path": str, "sha256": str}
+    """
+    candidate = _resume_candidate(job)
+    if candidate is None:
+        return {'skipped': True}
+
+    content = _resume_content(job, candidate, 'extract')
+    if content.extracted_text:
+        candidate.record_resume_stage('extract', 'done', reused=True, **(content.extraction or {}))
+        parse_job = _queue_resume_parse(job, candidate)
+        return {'reused': True, 'parse_job_id': parse_job.id}
+
+    candidate.record_resume_stage('extract', 'running', attempts=job.attempts)
+    db.session.commit()
+    started = time.perf_counter()
+
+    try:
+        pdf_bytes = get_storage().download(job.payload['storage_path'])
+    except Exception as e:
+        _fail_resume_stage(job, candidate, 'extract', started, f"Download failed: {e}")
+    download_ms = _elapsed_ms(started)
+
+    try:
+        extracted = extract_pdf_text(pdf_bytes)
+    except PdfContentError as e:
+        # A corrupt or encrypted file will not read on a retry (or a re-upload) either
+        content.extraction = {'error': str(e)}
+        candidate.record_resume_stage('extract', 'failed', error=str(e), duration_ms=_elapsed_ms(started))
+        return {'error': str(e)}
+    except PdfExtractionError as e:
+        # Timeouts and pool failures may pass on a retry; not remembered for the content
+        _fail_resume_stage(job, candidate, 'extract', started, str(e))
+
+    text = extracted['text']
+    extraction = {
+        'pages': extracted['pages'],
+        'total_pages': extracted['total_pages'],
+        'truncated': extracted['truncated'],
+        'chars': len(text)
+    }
+    details = {**extraction, 'download_ms': download_ms, 'duration_ms': _elapsed_ms(started)}
+    if not text.strip():
+        content.extraction = {'error': 'No extractable text (scanned PDF?)'}
+        candidate.record_resume_stage('extract', 'failed', error='No extractable text (scanned PDF?)', **details)
+        return {'error': 'No extractable text', **details}
+
+    content.extracted_text = text
+    content.extraction = extraction
+    candidate.record_resume_stage('extract', 'done', **details)
+    # Commits the stage updates together with the new job
+    parse_job = _queue_resume_parse(job, candidate)
+    print(f"📄 Resume text extracted for candidate {job.candidate_id}: {extracted['pages']}/{extracted['total_pages']} pages, {len(text)} chars in {details['duration_ms']} ms")
+
+    return {**details, 'parse_job_id': parse_job.id}
+
+
+@register_job(RESUME_PARSE)
+def run_resume_parse(job):
+    """
+    Parse extracted resume text into structured JSON
+
+    Resume data already parsed for the same bytes is reused.
+
+    Payload:
+        {"resume_url": str, "storage_path": str, "sha256": str}  (text from the content row)
+    """
+    candidate = _resume_candidate(job)
+    if candidate is None:
+        return {'skipped': True}
+
+    content = _resume_content(job, candidate, 'parse')
+    if content.resume_data is not None:
+        attach_resume_data(candidate, content.resume_data)
+        candidate.record_resume_stage('parse', 'done', reused=True, fields=sorted(content.resume_data.keys()))
+        return {'reused': True, 'fields': sorted(content.resume_data.keys())}
+
+    if not content.extracted_text:
+        raise RuntimeError('No extracted resume text to parse')
+
+    candidate.record_resume_stage('parse', 'running', attempts=job.attempts)
+    db.session.commit()
+    started = time.perf_counter()
+
+    parsed_json = parse_resume_to_json(content.extracted_text)
+    if not parsed_json:
+        _fail_resume_stage(job, candidate, 'parse', started, 'Resume parsing returned no data')
+
+    content.resume_data = parsed_json
+    content.parsed_at = datetime.utcnow()
+    skills = attach_resume_data(candidate, parsed_json)
+    candidate.record_resume_stage('parse', 'done', fields=sorted(parsed_json.keys()), duration_ms=_elapsed_ms(started))
+    print(f"✅ Resume parsed and saved to DB ({len(skills)} skills indexed)")
+
+    return {'fields': sorted(parsed_json.keys())}
+
+
+@register_job(AI_RATIONALE)
+def run_ai_rationale(job):
+    """
+    Generate the final AI rationale
+
+    Waits until the candidate's other grading jobs have finished so the
+    rationale sees their results.
+
+    Payload:
+        {}
+    """
+    if has_pending_jobs(job.candidate_id, exclude_types=(AI_RATIONALE,)):
+        raise JobDeferred('Waiting for grading jobs to finish')
+
+    # process_ai_rationale commits the rationale itself
+    rationale = process_ai_rationale(job.candidate_id, app_instance=current_app._get_current_object())
+    if not rationale:
+        raise JobRetryError('Failed to generate rationale')
+    if 'error' in rationale:
+        raise JobRetryError(rationale['error'])
+
+    final_decision = rationale.get('final_decision') or {}
+    return {
+        'status': final_decision.get('status'),
+        'overall_score': final_decision.get('overall_score')
+    }
@@ -0,0 +1,561 @@
+"""
+Background AI Job Queue
+Durable, DB-backed queue for slow AI grading steps (text grading, psychometric
+match, resume text extraction and parsing, final rationale).
+
+Endpoints enqueue a typed job and return immediately; a pool of worker
+threads claims jobs from the `ai_jobs` table, runs the registered handler
+and records the result. Failed attempts are retried with exponential
+backoff. Jobs share an idempotency key when they would do the same work,
+so re-submitting an unchanged request returns the existing job.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from .extensions import db
+from .config import Config
+from .models import (
+    AIJob, CandidateAuth, MCQResult, PsychometricResult, TextAssessmentResult,
+    CodingAssessmentResult, ProctorSession
+)
+from .db_helpers import dialect_insert
+
+# Job types
+TEXT_GRADING = 'text_grading'
+PSYCHOMETRIC_GRADING = 'psychometric_grading'
+RESUME_EXTRACT = 'resume_extract'
+RESUME_PARSE = 'resume_parse'
+AI_RATIONALE = 'ai_rationale'
+JOB_TYPES = (TEXT_GRADING, PSYCHOMETRIC_GRADING, RESUME_EXTRACT, RESUME_PARSE, AI_RATIONALE)
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Registered handlers: {job_type: callable(job) -> result dict}
+JOB_HANDLERS = {}
+
+
+class JobRetryError(Exception):
+    """Raised by a handler when the attempt failed but may succeed on retry"""
+
+
+class JobDeferred(Exception):
+    """Raised by a handler when the job is not ready yet; requeued without using an attempt"""
+
+    def __init__(self, message, delay_seconds=5):
+        super().__init__(message)
+        self.delay_seconds = delay_seconds
+
+
+def register_job(job_type):
+    """
+    Decorator registering a job handler
+
+    Usage:
+        @register_job('text_grading')
+        def run_text_grading(job):
+            ...
+            return {'communication_score': 72.5}
+    """
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def content_key(*parts):
+    """
+    Build a short stable hash for idempotency keys from JSON-serializable parts
+
+    Returns:
+        str: First 32 hex chars of the SHA-256 digest
+    """
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def enqueue_job(job_type, candidate_id, payload=None, idempotency_key=None, max_attempts=None):
+    """
+    Enqueue a job (or return the existing job with the same idempotency key)
+
+    An existing queued, running or succeeded job is returned unchanged. A job
+    that previously failed is reset and queued again.
+
+    Commits. Call after the request's own changes have been committed.
+
+    Args:
+        job_type: One of the registered job types
+        candidate_id: Candidate the job belongs to
+        payload: JSON-serializable job input
+        idempotency_key: Stable key for the work; defaults to a hash of the payload
+        max_attempts: Override Config.AI_JOB_MAX_ATTEMPTS
+
+    Returns:
+        AIJob: The queued (or existing) job
+    """
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    key = idempotency_key or content_key(payload)
+    key = f"{job_type}:{candidate_id}:{key}"
+
+    existing = AIJob.query.filter_by(idempotency_key=key).first()
+    if existing:
+        if existing.status == FAILED:
+            existing.status = QUEUED
+            existing.attempts = 0
+            existing.last_error = None
+            existing.run_after = datetime.utcnow()
+            existing.finished_at = None
+            db.session.commit()
+        return existing
+
+    job = AIJob(
+        job_type=job_type,
+        candidate_id=candidate_id,
+        idempotency_key=key,
+        payload=payload,
+        status=QUEUED,
+        max_attempts=max_attempts or Config.AI_JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow()
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(job)
+        db.session.commit()
+    except IntegrityError:
+        # Another request enqueued the same key concurrently
+        db.session.rollback()
+        job = AIJob.query.filter_by(idempotency_key=key).first()
+
+    return job
+
+
+def enqueue_jobs(specs, commit=True):
+    """
+    Enqueue many jobs with a single INSERT (batch imports)
+
+    Jobs whose idempotency key already exists are left unchanged (failed
+    ones are not reset, unlike enqueue_job).
+
+    Args:
+        specs: [(job_type, candidate_id, payload, idempotency_key), ...];
+               a None key defaults to a hash of the payload
+        commit: False leaves the INSERT in the caller's transaction, e.g. to
+                commit it together with the stage that says it is queued
+
+    Returns:
+        int: Number of jobs queued
+    """
+    now = datetime.utcnow()
+    rows = []
+    for job_type, candidate_id, payload, idempotency_key in specs:
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        rows.append({
+            'job_type': job_type,
+            'candidate_id': candidate_id,
+            'idempotency_key': f"{job_type}:{candidate_id}:{idempotency_key or content_key(payload)}",
+            'payload': payload,
+            'status': QUEUED,
+            'attempts': 0,
+            'max_attempts': Config.AI_JOB_MAX_ATTEMPTS,
+            'run_after': now,
+            'created_at': now,
+            'updated_at': now
+        })
+    if not rows:
+        return 0
+
+    stmt = dialect_insert(AIJob.__table__).values(rows).on_conflict_do_nothing(index_elements=['idempotency_key'])
+    queued = db.session.execute(stmt).rowcount
+    if commit:
+        db.session.commit()
+    return queued
+
+
+def latest_jobs(candidate_id):
+    """
+    Latest job of each type for a candidate
+
+    Returns:
+        dict: {job_type: AIJob}
+    """
+    jobs = AIJob.query.filter_by(candidate_id=candidate_id).order_by(AIJob.created_at.asc()).all()
+    return {job.job_type: job for job in jobs}
+
+
+def has_pending_jobs(candidate_id, exclude_types=()):
+    """Whether the candidate has queued or running jobs (optionally ignoring some types)"""
+    query = AIJob.query.filter(
+        AIJob.candidate_id == candidate_id,
+        AIJob.status.in_([QUEUED, RUNNING])
+    )
+    if exclude_types:
+        query = query.filter(~AIJob.job_type.in_(exclude_types))
+    return db.session.query(query.exists()).scalar()
+
+
+def pending_rationale_job(candidate_id):
+    """The candidate's queued or running AI_RATIONALE job, if any"""
+    return AIJob.query.filter(
+        AIJob.candidate_id == candidate_id,
+        AIJob.job_type == AI_RATIONALE,
+        AIJob.status.in_([QUEUED, RUNNING])
+    ).order_by(AIJob.created_at.desc()).first()
+
+
+def rationale_inputs_key(candidate_id):
+    """
+    Idempotency key for the rationale of the candidate's current grading inputs
+
+    Changes whenever a result the rationale is generated from changes (a new
+    grading job, a rewritten result row, a new resume or proctor session), so
+    retries of the same finish share a job while new data queues a fresh one.
+    """
+    def stamp(model, *criteria):
+        row = db.session.query(model).filter(*criteria).first()
+        return row and (row.id, str(getattr(row, 'last_updated', None) or getattr(row, 'updated_at', None)))
+
+    jobs = latest_jobs(candidate_id)
+    candidate = CandidateAuth.query.get(candidate_id)
+    last_session = ProctorSession.query.filter_by(candidate_id=candidate_id).order_by(ProctorSession.start_time.desc()).first()
+    return content_key(
+        {job_type: job.id for job_type, job in jobs.items() if job_type != AI_RATIONALE},
+        candidate.resume_url if candidate else None,
+        stamp(MCQResult, MCQResult.student_id == candidate_id),
+        stamp(PsychometricResult, PsychometricResult.student_id == candidate_id),
+        stamp(TextAssessmentResult, TextAssessmentResult.candidate_id == candidate_id),
+        stamp(CodingAssessmentResult, CodingAssessmentResult.candidate_id == candidate_id),
+        last_session and (last_session.id, last_session.status)
+    )
+
+
+def queue_rationale_job(candidate_id, idempotency_key=None):
+    """
+    Queue the AI Rationale job
+
+    A rationale job that has not started yet will already see the latest
+    data, so it is reused instead of queueing another. Without an explicit
+    key, the job is keyed by the candidate's grading inputs (see
+    rationale_inputs_key).
+
+    Commits.
+    """
+    pending = AIJob.query.filter(
+        AIJob.candidate_id == candidate_id,
+        AIJob.job_type == AI_RATIONALE,
+        AIJob.status == QUEUED
+    ).first()
+    if pending:
+        return pending
+
+    return enqueue_job(AI_RATIONALE, candidate_id, {}, idempotency_key=idempotency_key or rationale_inputs_key(candidate_id))
+
+
+class LeaseHeartbeat:
+    """
+    Renews the lease of a running job until stopped
+
+    Runs in its own thread and app context (and so its own DB session), so a
+    handler blocked in a long LLM call keeps its job from being requeued.
+    """
+
+    def __init__(self, app, job_id, lease, interval):
+        """
+        Initialize heartbeat
+
+        Args:
+            app: Flask application instance
+            job_id: Job being run
+            lease: The job's locked_by value for this claim
+            interval: Seconds between renewals
+        """
+        self.app = app
+        self.job_id = job_id
+        self.lease = lease
+        self.interval = interval
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name=f"{lease}:heartbeat", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.thread.join(timeout=5)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    renewed = AIJob.query.filter(
+                        AIJob.id == self.job_id,
+                        AIJob.status == RUNNING,
+                        AIJob.locked_by == self.lease
+                    ).update({'locked_at': datetime.utcnow()}, synchronize_session=False)
+                    db.session.commit()
+                if not renewed:
+                    print(f"⚠ Lost the lease on job {self.job_id}")
+                    return
+            except Exception as e:
+                print(f"❌ Error renewing the lease on job {self.job_id}: {e}")
+
+
+class JobWorker:
+    """Worker thread that claims and runs jobs until stopped"""
+
+    def __init__(self, app, name, poll_interval=None, lease_seconds=None, heartbeat_seconds=None, sweep_expired=True):
+        """
+        Initialize job worker
+
+        Args:
+            app: Flask application instance
+            name: Worker identifier stored on claimed jobs
+            poll_interval: Seconds to wait when the queue is empty (default: Config.AI_JOB_POLL_SECONDS)
+            lease_seconds: Running jobs whose lease was not renewed for this long are requeued
+                           (default: Config.AI_JOB_LEASE_SECONDS)
+            heartbeat_seconds: How often the running job's lease is renewed (default: Config.AI_JOB_HEARTBEAT_SECONDS)
+            sweep_expired: Whether this worker requeues expired jobs (every Config.AI_JOB_REQUEUE_SECONDS);
+                           one worker per process is enough
+        """
+        self.app = app
+        self.name = name
+        self.poll_interval = Config.AI_JOB_POLL_SECONDS if poll_interval is None else poll_interval
+        self.lease_seconds = Config.AI_JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.heartbeat_seconds = Config.AI_JOB_HEARTBEAT_SECONDS if heartbeat_seconds is None else heartbeat_seconds
+        self.sweep_expired = sweep_expired
+        self._next_sweep = 0.0
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start the worker thread"""
+        self.thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        """Signal the worker to stop and wait for the current job"""
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def _loop(self):
+        """Main worker loop"""
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    if self.sweep_expired and time.monotonic() >= self._next_sweep:
+                        self._next_sweep = time.monotonic() + Config.AI_JOB_REQUEUE_SECONDS
+                        self._requeue_expired()
+                    ran = self.run_once()
+            except Exception as e:
+                print(f"❌ Error in job worker {self.name}: {e}")
+                traceback.print_exc()
+                ran = False
+
+            if not ran:
+                self._stop.wait(self.poll_interval)
+
+    def _requeue_expired(self):
+        """Requeue running jobs whose worker died (lease not renewed in time)"""
+        threshold = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        requeued = AIJob.query.filter(
+            AIJob.status == RUNNING,
+            AIJob.locked_at < threshold
+        ).update({'status': QUEUED, 'locked_at': None, 'locked_by': None}, synchronize_session=False)
+        if requeued:
+            print(f"⚠ Requeued {requeued} job(s) with expired lease")
+        db.session.commit()
+
+    def _claim(self):
+        """
+        Atomically claim the next runnable job
+
+        Uses SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL so concurrent
+        workers never claim the same job.
+
+        Returns:
+            AIJob or None
+        """
+        now = datetime.utcnow()
+        job = AIJob.query.filter(
+            AIJob.status == QUEUED,
+            AIJob.run_after <= now
+        ).order_by(AIJob.run_after, AIJob.id).with_for_update(skip_locked=True).first()
+
+        if not job:
+            db.session.rollback()
+            return None
+
+        job.status = RUNNING
+        job.locked_at = now
+        # Unique per claim, so a requeued job re-claimed by this worker is a new lease
+        job.locked_by = f"{self.name}:{uuid.uuid4().hex[:8]}"
+        job.attempts += 1
+        db.session.commit()
+        return job
+
+    def _owns(self, job, lease):
+        """
+        Whether this claim still holds the job's lease
+
+        Locks the job row (PostgreSQL) until the caller commits, so the lease
+        cannot be taken over between this check and the status write.
+        """
+        locked_by = db.session.query(AIJob.locked_by).filter(
+            AIJob.id == job.id,
+            AIJob.status == RUNNING
+        ).with_for_update().scalar()
+        if locked_by == lease:
+            return True
+        db.session.rollback()
+        print(f"⚠ Job {job.id} ({job.job_type}) lease was taken over; discarding this attempt's result")
+        return False
+
+    def run_once(self):
+        """
+        Claim and run a single job
+
+        Returns:
+            bool: True if a job was claimed
+        """
+        job = self._claim()
+        if not job:
+            return False
+
+        handler = JOB_HANDLERS.get(job.job_type)
+        started = datetime.utcnow()
+        lease = job.locked_by
+        heartbeat = LeaseHeartbeat(self.app, job.id, lease, self.heartbeat_seconds).start()
+        try:
+            if not handler:
+                raise RuntimeError(f"No handler registered for job type {job.job_type}")
+
+            result = handler(job)
+            heartbeat.stop()
+            if not self._owns(job, lease):
+                return True
+
+            job.status = SUCCEEDED
+            job.result = result
+            job.last_error = None
+            job.finished_at = datetime.utcnow()
+            job.locked_at = None
+            db.session.commit()
+            elapsed = (job.finished_at - started).total_seconds()
+            print(f"✅ Job {job.id} ({job.job_type}) for candidate {job.candidate_id} succeeded in {elapsed:.1f}s")
+
+        except JobDeferred as e:
+            db.session.rollback()
+            heartbeat.stop()
+            if not self._owns(job, lease):
+                return True
+            job.status = QUEUED
+            job.attempts = max(job.attempts - 1, 0)
+            job.run_after = datetime.utcnow() + timedelta(seconds=e.delay_seconds)
+            job.locked_at = None
+            job.locked_by = None
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            heartbeat.stop()
+            if not self._owns(job, lease):
+                return True
+            job.last_error = str(e)[:2000]
+            job.locked_at = None
+            job.locked_by = None
+            if job.attempts < job.max_attempts:
+                # Exponential backoff: 5s, 10s, 20s, ...
+                delay = 5 * (2 ** (job.attempts - 1))
+                job.status = QUEUED
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+                print(f"⚠️ Job {job.id} ({job.job_type}) attempt {job.attempts} failed, retrying in {delay}s: {e}")
+            else:
+                job.status = FAILED
+                job.finished_at = datetime.utcnow()
+                print(f"❌ Job {job.id} ({job.job_type}) failed after {job.attempts} attempts: {e}")
+            db.session.commit()
+
+        return True
+
+
+class JobWorkerPool:
+    """Fixed-size pool of job worker threads"""
+
+    def __init__(self, app, num_workers):
+        """
+        Initialize worker pool
+
+        Args:
+            app: Flask application instance
+            num_workers: Number of worker threads
+        """
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers = [JobWorker(app, f"{prefix}:job-worker-{i}", sweep_expired=(i == 0)) for i in range(num_workers)]
+
+    def start(self):
+        """Start all worker threads"""
+        # Importing registers the handlers
+        from . import job_handlers  # noqa: F401
+        for worker in self.workers:
+            worker.start()
+        print(f"✓ AI job worker pool started ({len(self.workers)} worker(s))")
+
+    def stop(self):
+        """Stop all worker threads"""
+        for worker in self.workers:
+            worker._stop.set()
+        for worker in self.workers:
+            worker.stop()
+        print("✓ AI job worker pool stopped")
+
+
+# Global pool instance
+_pool = None
+
+
+def start_job_workers(app, num_workers=None):
+    """
+    Start the AI job worker pool for this process
+
+    Args:
+        app: Flask application instance
+        num_workers: Number of worker threads (default: Config.AI_JOB_WORKERS)
+
+    Returns:
+        JobWorkerPool or None: None if workers are disabled
+    """
+    global _pool
+
+    num_workers = Config.AI_JOB_WORKERS if num_workers is None else num_workers
+    if num_workers <= 0:
+        return None
+
+    if _pool is None:
+        _pool = JobWorkerPool(app, num_workers)
+        _pool.start()
+
+    return _pool
+
+
+def stop_job_workers():
+    """Stop the AI job worker pool"""
+    global _pool
+
+    if _pool:
+        _pool.stop()
+        _pool = None
@@ -13,6 +13,8 @@ class CandidateAuth(db.Model):
     resume_filename = db.Column(db.String(255), nullable=True)  # Original filename
     resume_uploaded_at = db.Column(db.DateTime, nullable=True)  # Upload timestamp
     resume_data = db.Column(db.JSON, nullable=True)  # AI parsed resume data
+    resume_processing = db.Column(db.JSON, nullable=True)  # Resume pipeline status and per-stage timings (see record_resume_stage)
+    resume_sha256 = db.Column(db.String(64), nullable=True, index=True)  # Content hash of the current resume (see ResumeContent)
     
     # Assessment round completion tracking
     mcq_completed = db.Column(db.Boolean, default=False, nullable=False)
@@ -34,6 +36,48 @@ class CandidateAuth(db.Model):
         """Verify password against hash"""
         return check_password_hash(self.password, password)
     
+    def record_resume_stage(self, stage, status, **details):
+        """
+        Record a resume pipeline stage ('upload', 'extract', 'parse') on resume_processing
+        
+        Statuses: 'queued', 'running', 'done', 'retrying', 'failed', 'skipped'.
+        'running' stamps started_at (and queue_ms since the stage was queued);
+        the other statuses stamp finished_at and, for a started stage, duration_ms
+        unless given. The overall status is 'ready' once parsing is done,
+        'failed' after a failed stage and 'processing' otherwise.
+        Does not commit.
+        """
+        now = datetime.utcnow()
+        processing = dict(self.resume_processing or {})
+        stages = dict(processing.get('stages') or {})
+        entry = dict(stages.get(stage) or {})
+        entry.update(details, status=status)
+        
+        if status == 'queued':
+            entry = {**details, 'status': status, 'queued_at': now.isoformat()}
+        elif status == 'running':
+            entry['started_at'] = now.isoformat()
+            entry.pop('error', None)
+            if entry.get('queued_at'):
+                entry['queue_ms'] = round((now - datetime.fromisoformat(entry['queued_at'])).total_seconds() * 1000, 1)
+        else:
+            entry['finished_at'] = now.isoformat()
+            if 'duration_ms' not in details and entry.get('started_at'):
+                entry['duration_ms'] = round((now - datetime.fromisoformat(entry['started_at'])).total_seconds() * 1000, 1)
+        
+        stages[stage] = entry
+        processing['stages'] = stages
+        processing['current_stage'] = stage
+        if status == 'failed':
+            processing['status'] = 'failed'
+        elif stage == 'parse' and status == 'done':
+            processing['status'] = 'ready'
+        else:
+            processing['status'] = 'processing'
+        processing['updated_at'] = now.isoformat()
+        # Reassign so SQLAlchemy sees the JSON change
+        self.resume_processing = processing
+    
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
         return {
@@ -240,6 +284,7 @@ class PsychometricResult(db.Model):
     questions_answered = db.Column(db.Integer, default=0, nullable=False)
     test_completed = db.Column(db.Boolean, default=False, nullable=False)
     answers_json = db.Column(db.Text, nullable=True)  # JSON array of all answers
+    trait_item_means = db.Column(db.JSON, nullable=True)  # Average item score (1-5) per trait type, used for norms
     grading_json = db.Column(db.JSON, nullable=True)  # AI grading result
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -261,6 +306,42 @@ class PsychometricResult(db.Model):
             'last_updated': self.last_updated.isoformat() if self.last_updated else None
         }
 
+#====================== Psychometric Norms ============================
+class PsychometricNorm(db.Model):
+    __tablename__ = 'psychometric_norms'
+    
+    trait_type = db.Column(db.Integer, primary_key=True)  # 1-5 for Big Five traits
+    
+    # Running sums over per-candidate average item scores (1-5); submissions add
+    # to them with one atomic UPDATE (no read-modify-write)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Float, default=0.0, nullable=False)  # Sum of scores
+    total_sq = db.Column(db.Float, default=0.0, nullable=False)  # Sum of squared scores
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        variance = (self.total_sq - self.total * self.mean) / (self.count - 1) if self.count > 1 else 0.0
+        return {
+            'trait_type': self.trait_type,
+            'count': self.count,
+            'mean': round(self.mean, 3),
+            'std': round(max(variance, 0.0) ** 0.5, 3),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class PsychometricNormBin(db.Model):
+    __tablename__ = 'psychometric_norm_bins'
+    
+    # Fixed-width histogram over the 1-5 range (the quantile sketch), one row per bin
+    trait_type = db.Column(db.Integer, primary_key=True)
+    bin_index = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
 #====================== Text-Based Questions ============================
 class TextBasedQuestion(db.Model):
     __tablename__ = 'text_based_questions'
@@ -336,6 +417,13 @@ class ProctorSession(db.Model):
     # Relationship to candidate
     candidate = db.relationship('CandidateAuth', backref=db.backref('proctor_sessions'))
     
+    __table_args__ = (
+        # Latest session of a candidate by status (heartbeat, login, dashboard, session end)
+        db.Index('ix_proctor_sessions_candidate_status_start', 'candidate_id', 'status', 'start_time'),
+        # Stale-session monitor: active sessions by last heartbeat
+        db.Index('ix_proctor_sessions_status_activity', 'status', 'last_activity'),
+    )
+    
     def to_dict(self):
         """Convert to dictionary for JSON serialization"""
         return {
@@ -439,6 +527,15 @@ class ProctoringViolation(db.Model):
     
     candidate = db.relationship('CandidateAuth', backref='proctoring_violations')
     
+    __table_args__ = (
+        # Session summary: a session's events in time order
+        db.Index('ix_proctoring_violations_session_time', 'session_id', 'timestamp'),
+        # Per-candidate grading/cleanup
+        db.Index('ix_proctoring_violations_candidate_time', 'candidate_id', 'timestamp'),
+        # Archival: oldest events first
+        db.Index('ix_proctoring_violations_timestamp', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -450,6 +547,60 @@ class ProctoringViolation(db.Model):
             'severity': self.severity
         }
 
+#====================== Proctoring Violation Counters ============================
+class ProctorViolationCount(db.Model):
+    """
+    Events per (proctor session, violation type), updated in the same
+    transaction as the events are inserted (app/services/proctor_events.py)
+    
+    Session summaries, risk scores and session lists read these instead of
+    counting proctoring_violations rows. Archiving events does not change them.
+    """
+    __tablename__ = 'proctor_violation_counts'
+    
+    session_id = db.Column(db.String(100), primary_key=True)
+    violation_type = db.Column(db.String(50), primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_auth.id', ondelete='CASCADE'), nullable=False, index=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    last_event_at = db.Column(db.DateTime, nullable=True)
+
+#====================== Proctoring Violation Archive ============================
+class ProctoringViolationArchive(db.Model):
+    """
+    Proctoring violations of ended sessions older than Config.PROCTOR_RETENTION_DAYS
+    
+    Moved here in batches by services/archive_proctoring.py so the live
+    proctoring_violations table stays small. Same columns and IDs, no
+    foreign key (rows are removed explicitly, e.g. on an exam reset).
+    """
+    __tablename__ = 'proctoring_violations_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    session_id = db.Column(db.String(100), nullable=False)
+    candidate_id = db.Column(db.Integer, nullable=False)
+    violation_type = db.Column(db.String(50), nullable=False)
+    violation_data = db.Column(db.JSON, nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    severity = db.Column(db.String(20), default='medium')
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_proctoring_violations_archive_session_time', 'session_id', 'timestamp'),
+        db.Index('ix_proctoring_violations_archive_candidate', 'candidate_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'candidate_id': self.candidate_id,
+            'violation_type': self.violation_type,
+            'violation_data': self.violation_data,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'severity': self.severity,
+            'archived': True
+        }
+
 #====================== Evaluation Criteria ============================
 class EvaluationCriteria(db.Model):
     __tablename__ = 'evaluation_criteria'
@@ -523,6 +674,8 @@ class CandidateRationale(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_auth.id'), nullable=False, unique=True)
     rationale_json = db.Column(db.JSON, nullable=True)  # Final AI decision
+    stage_timings = db.Column(db.JSON, nullable=True)  # Per-stage generation timings {stage: {start_ms, duration_ms}}
+    input_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the rendered prompts; unchanged inputs are skipped by bulk re-analysis
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -671,3 +824,235 @@ class CodingConfiguration(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+#====================== Cache Versions ============================
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    
+    bank = db.Column(db.String(50), primary_key=True)  # mcq, text_based, psychometric, coding
+    version = db.Column(db.Integer, nullable=False, default=1)  # Bumped on every upload/config change
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'bank': self.bank,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+#====================== AI Jobs ============================
+class AIJob(db.Model):
+    __tablename__ = 'ai_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # text_grading, psychometric_grading, resume_parse, ai_rationale
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_auth.id'), nullable=False)
+    idempotency_key = db.Column(db.String(255), unique=True, nullable=False)  # Same key = same job
+    payload = db.Column(db.JSON, nullable=True)  # Job input
+    result = db.Column(db.JSON, nullable=True)  # Handler output
+    
+    # Status: queued, running, succeeded, failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    # Scheduling and leasing
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Not picked up before this (retry backoff)
+    locked_at = db.Column(db.DateTime, nullable=True)  # When a worker claimed the job
+    locked_by = db.Column(db.String(100), nullable=True)  # Worker identifier
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_ai_jobs_status_run_after', 'status', 'run_after'),
+        db.Index('ix_ai_jobs_candidate_type', 'candidate_id', 'job_type'),
+    )
+    
+    candidate = db.relationship('CandidateAuth', backref=db.backref('ai_jobs'))
+    
+    def to_dict(self, include_result=False):
+        """Convert to dictionary for JSON serialization"""
+        data = {
+            'id': self.id,
+            'job_type': self.job_type,
+            'candidate_id': self.candidate_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+#====================== LLM Response Cache ============================
+class LLMCacheEntry(db.Model):
+    __tablename__ = 'llm_cache'
+    
+    cache_key = db.Column(db.String(64), primary_key=True)  # SHA-256 of model + messages + parameters
+    model = db.Column(db.String(100), nullable=False)
+    response_text = db.Column(db.Text, nullable=False)  # Raw completion content
+    
+    # Token usage of the original call (saved again on every hit)
+    prompt_tokens = db.Column(db.Integer, nullable=False, default=0)
+    completion_tokens = db.Column(db.Integer, nullable=False, default=0)
+    
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_hit_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # NULL = never expires
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'cache_key': self.cache_key,
+            'model': self.model,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'hit_count': self.hit_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_hit_at': self.last_hit_at.isoformat() if self.last_hit_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+#====================== Resume Contents ============================
+class ResumeContent(db.Model):
+    __tablename__ = 'resume_contents'
+    
+    sha256 = db.Column(db.String(64), primary_key=True)  # SHA-256 of the PDF bytes
+    storage_path = db.Column(db.String(255), nullable=False)  # Storage object shared by every upload of these bytes
+    resume_url = db.Column(db.String(500), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    
+    # Pipeline outputs, reused by later uploads of the same bytes
+    extracted_text = db.Column(db.Text, nullable=True)
+    extraction = db.Column(db.JSON, nullable=True)  # {pages, total_pages, truncated, chars} or {error} for unreadable files
+    resume_data = db.Column(db.JSON, nullable=True)  # AI parsed resume data
+    parsed_at = db.Column(db.DateTime, nullable=True)
+    
+    upload_count = db.Column(db.Integer, nullable=False, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'sha256': self.sha256,
+            'resume_url': self.resume_url,
+            'size_bytes': self.size_bytes,
+            'extraction': self.extraction,
+            'has_resume_data': self.resume_data is not None,
+            'parsed_at': self.parsed_at.isoformat() if self.parsed_at else None,
+            'upload_count': self.upload_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_uploaded_at': self.last_uploaded_at.isoformat() if self.last_uploaded_at else None
+        }
+
+#====================== Candidate Skills Index ============================
+class CandidateSkill(db.Model):
+    __tablename__ = 'candidate_skills'
+    
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate_auth.id', ondelete='CASCADE'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)  # Normalized key (see app/services/skills.py)
+    
+    __table_args__ = (
+        # Inverted lookups: skill -> candidates (index-only for AND/OR filters)
+        db.Index('ix_candidate_skills_skill_candidate', 'skill', 'candidate_id'),
+    )
+
+#====================== Bulk Resume Imports ============================
+class ResumeImport(db.Model):
+    __tablename__ = 'resume_imports'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, completed, failed
+    source = db.Column(db.String(500), nullable=True)  # Uploaded archive / file names
+    
+    # Progress counters (entries = PDFs found in the upload)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    stored = db.Column(db.Integer, nullable=False, default=0)  # Attached to a candidate
+    deduplicated = db.Column(db.Integer, nullable=False, default=0)  # Attached, bytes seen before (no storage write)
+    unmatched = db.Column(db.Integer, nullable=False, default=0)  # No candidate with the entry's email
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    jobs_queued = db.Column(db.Integer, nullable=False, default=0)
+    entries = db.Column(db.JSON, nullable=True)  # [{file, email, candidate_id, status, error}, ...]
+    
+    started_by = db.Column(db.Integer, nullable=True)  # Recruiter ID (NULL = command line)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self, include_entries=False):
+        """Convert to dictionary for JSON serialization"""
+        data = {
+            'id': self.id,
+            'status': self.status,
+            'source': self.source,
+            'total': self.total,
+            'processed': self.processed,
+            'stored': self.stored,
+            'deduplicated': self.deduplicated,
+            'unmatched': self.unmatched,
+            'failed': self.failed,
+            'jobs_queued': self.jobs_queued,
+            'started_by': self.started_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_entries:
+            data['entries'] = self.entries or []
+        return data
+
+#====================== Bulk Re-analysis Runs ============================
+class ReanalysisRun(db.Model):
+    __tablename__ = 'reanalysis_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, completed, failed, cancelled
+    scope = db.Column(db.String(20), nullable=False, default='existing')  # existing (has rationale) or completed (any finished round)
+    force = db.Column(db.Boolean, default=False, nullable=False)  # Regenerate even if inputs are unchanged
+    
+    # Progress counters
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    generated = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Checkpoint: every candidate with id <= last_candidate_id is done
+    last_candidate_id = db.Column(db.Integer, nullable=False, default=0)
+    failed_candidate_ids = db.Column(db.JSON, nullable=True)  # [candidate_id, ...]
+    
+    started_by = db.Column(db.Integer, nullable=True)  # Recruiter ID (NULL = command line)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'scope': self.scope,
+            'force': self.force,
+            'total': self.total,
+            'processed': self.processed,
+            'generated': self.generated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'last_candidate_id': self.last_candidate_id,
+            'failed_candidate_ids': self.failed_candidate_ids or [],
+            'started_by': self.started_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
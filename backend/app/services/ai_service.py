@@ -0,0 +1,517 @@
+"""
+Frame Analysis
+On-server, CPU-only analysis of proctoring webcam frames (POST /api/proctor/analyze-frame).
+
+Each worker process loads its detectors once (get_frame_analyzer) and
+reuses them for every frame:
+
+    - Faces: OpenCV Haar cascades (shipped with opencv-python). Frontal
+      faces are counted; when none is found, the profile cascade (both
+      directions) decides whether the candidate is looking away.
+    - People / phones: MobileNet-SSD through cv2.dnn, using
+      models/mobilenet_ssd_deploy.prototxt and the weights at
+      Config.FRAME_DETECTOR_WEIGHTS. The weights are not in the
+      repository; without them only the face detector runs. The stock
+      model is trained on VOC (person, no phone class): phone_detected
+      needs a model whose labels (Config.FRAME_DETECTOR_LABELS, one per
+      line, line number = class id) include a phone.
+
+The base64 frame is decoded straight into a NumPy array (cv2.imdecode)
+and downscaled to Config.FRAME_ANALYSIS_WIDTH before detection. When the
+object detector runs, the face cascades only search the upper part of the
+person boxes it found, and skip the profile passes when nobody is in view.
+The budget is 100 ms p95 per frame on one core; measure it on the target
+hardware with services/benchmark_frame_analysis.py and lower
+Config.FRAME_DETECTOR_INPUT_SIZE (e.g. 256) if the detector does not fit.
+
+Under load, analyze_frame (the route's entry point) saves detector work two ways:
+
+    - De-duplication: each frame gets a perceptual signature (a tiny
+      mean-normalized thumbnail). A frame within Config.FRAME_DEDUP_MAX_DISTANCE
+      of the session's last analyzed frame (a candidate sitting still)
+      reuses that result.
+    - Micro-batching: the remaining frames of concurrent requests are
+      collected for Config.FRAME_BATCH_WINDOW_MS and run through the object
+      detector as one batch (FrameBatcher). Batches only form when a worker
+      process serves requests concurrently (threaded workers, e.g. gunicorn
+      --worker-class gthread); a sync worker sees batches of one.
+
+Every result carries a sampling hint: when frames queue up for the detector
+the interval grows, and the client should send frames less often.
+
+Result (the keys the route and the frontend read, plus diagnostics):
+    {
+        "face_detected": bool, "multiple_faces": bool, "looking_away": bool,
+        "phone_detected": bool, "face_count": int, "person_count": int,
+        "detectors": ["faces", "objects"], "latency_ms": float,
+        "batch_size": int, "deduplicated": bool,
+        "sampling": {"interval_ms": int, "queue_depth": int, "reason": "normal" | "backlog"}
+    }
+"""
+
+import base64
+import binascii
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import cv2
+import numpy as np
+from ..config import Config
+from .proctor_events import log_fields
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+DETECTOR_PROTOTXT = os.path.join(MODELS_DIR, 'mobilenet_ssd_deploy.prototxt')
+
+# Class ids of the stock MobileNet-SSD (PASCAL VOC, 0 = background)
+VOC_LABELS = [
+    'background', 'aeroplane', 'bicycle', 'bird', 'boat', 'bottle', 'bus', 'car', 'cat', 'chair',
+    'cow', 'diningtable', 'dog', 'horse', 'motorbike', 'person', 'pottedplant', 'sheep', 'sofa',
+    'train', 'tvmonitor'
+]
+PERSON_LABELS = {'person'}
+PHONE_LABELS = {'cell phone', 'cellphone', 'mobile phone', 'phone'}
+
+SSD_SCALE = 0.007843  # 1/127.5
+SSD_MEAN = 127.5
+
+SIGNATURE_SIZE = (16, 12)  # Cells of a frame signature (width, height)
+
+
+class FrameDecodeError(ValueError):
+    """The frame is not a decodable image"""
+
+
+def decode_frame(image_data):
+    """
+    Base64 image (optionally a data URL) -> BGR NumPy array
+
+    Raises:
+        FrameDecodeError: Not base64, too large, or not an image
+    """
+    if isinstance(image_data, str):
+        if image_data.startswith('data:'):
+            image_data = image_data.split(',', 1)[-1]
+        image_data = image_data.encode('ascii', 'ignore')
+    if not image_data:
+        raise FrameDecodeError('Empty image')
+    if len(image_data) > Config.FRAME_MAX_BYTES * 4 // 3 + 4:
+        raise FrameDecodeError(f'Image larger than {Config.FRAME_MAX_BYTES} bytes')
+    try:
+        raw = base64.b64decode(image_data)
+    except (binascii.Error, ValueError) as e:
+        raise FrameDecodeError(f'Invalid base64 image: {e}') from e
+
+    frame = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise FrameDecodeError('Unsupported or corrupt image')
+    return frame
+
+
+class FrameQueueFullError(Exception):
+    """Too many frames are waiting for the detector; the client should back off"""
+
+
+class PreparedFrame:
+    """A decoded, downscaled frame and its perceptual signature"""
+
+    __slots__ = ('frame', 'gray', 'signature')
+
+    def __init__(self, frame, gray, signature):
+        self.frame = frame
+        self.gray = gray
+        self.signature = signature
+
+
+def frame_signature(gray):
+    """
+    Perceptual signature of a grayscale frame: a 16x12 thumbnail minus its mean
+
+    Area averaging over ~20x20 pixel cells removes sensor noise and JPEG
+    artifacts, and subtracting the mean ignores auto-exposure changes. Bit
+    hashes (aHash/dHash) were not used: their bits flip with noise in the
+    flat regions of a webcam frame and barely change when a phone or a
+    second face appears.
+    """
+    thumbnail = cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+    return thumbnail - int(thumbnail.mean())
+
+
+def signature_distance(a, b):
+    """Largest brightness change (0-255) of any cell between two frame signatures"""
+    return int(np.abs(a - b).max())
+
+
+def load_labels(path):
+    with open(path) as f:
+        return [line.strip().lower() for line in f]
+
+
+class FrameAnalyzer:
+    """Face cascades + optional MobileNet-SSD, loaded once per process"""
+
+    def __init__(self, weights=None, labels=None):
+        """
+        Load the detectors
+
+        Args:
+            weights: Caffe weights of the object detector (default: Config.FRAME_DETECTOR_WEIGHTS;
+                     missing file = face detection only)
+            labels: Label file of the detector (default: Config.FRAME_DETECTOR_LABELS, else VOC)
+        """
+        cv2.setNumThreads(Config.FRAME_ANALYSIS_THREADS)
+        cascades = cv2.data.haarcascades
+        self.frontal = cv2.CascadeClassifier(os.path.join(cascades, 'haarcascade_frontalface_default.xml'))
+        self.profile = cv2.CascadeClassifier(os.path.join(cascades, 'haarcascade_profileface.xml'))
+        if self.frontal.empty() or self.profile.empty():
+            raise RuntimeError(f"OpenCV face cascades not found in {cascades}")
+
+        self.net = None
+        self.labels = VOC_LABELS
+        weights = weights or Config.FRAME_DETECTOR_WEIGHTS
+        if weights and os.path.exists(weights):
+            self.net = cv2.dnn.readNetFromCaffe(DETECTOR_PROTOTXT, weights)
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            labels = labels or Config.FRAME_DETECTOR_LABELS
+            if labels:
+                self.labels = load_labels(labels)
+        self.person_ids = {i for i, label in enumerate(self.labels) if label in PERSON_LABELS}
+        self.phone_ids = {i for i, label in enumerate(self.labels) if label in PHONE_LABELS}
+
+        # Cascades and the dnn net keep per-call state: one frame at a time per process
+        self.lock = threading.Lock()
+        self.detectors = ['faces'] + (['objects'] if self.net is not None else [])
+        log_fields(logging.INFO, 'frame_analyzer_ready', detectors=self.detectors,
+                   phone_detection=bool(self.phone_ids and self.net is not None))
+
+    def _faces(self, gray, regions=None, profiles=True):
+        """
+        (frontal face count, profile face found)
+
+        Args:
+            gray: Equalized grayscale frame
+            regions: (x1, y1, x2, y2) pixel boxes to search instead of the whole frame
+            profiles: Look for a turned face when no frontal face is found
+        """
+        # A candidate in front of a webcam fills well over 1/6 of the frame width; skipping
+        # smaller scales is most of the cascade cost
+        min_size = max(32, gray.shape[1] // 6)
+        crops = [gray[y1:y2, x1:x2] for x1, y1, x2, y2 in regions] if regions is not None else [gray]
+        crops = [crop for crop in crops if crop.shape[0] >= min_size and crop.shape[1] >= min_size]
+
+        faces = sum(len(self.frontal.detectMultiScale(crop, scaleFactor=1.15, minNeighbors=5, minSize=(min_size, min_size)))
+                    for crop in crops)
+        if faces or not profiles:
+            return faces, False
+        # The profile cascade only finds faces turned one way; try the mirrored crop too
+        for crop in crops:
+            for image in (crop, cv2.flip(crop, 1)):
+                if len(self.profile.detectMultiScale(image, scaleFactor=1.15, minNeighbors=5, minSize=(min_size, min_size))):
+                    return 0, True
+        return 0, False
+
+    def _objects(self, frames):
+        """
+        [(person boxes in pixels, phones found)] per frame from the object detector
+
+        All frames go through the network as one batch (one forward pass).
+        """
+        size = Config.FRAME_DETECTOR_INPUT_SIZE
+        blob = cv2.dnn.blobFromImages([cv2.resize(frame, (size, size)) for frame in frames],
+                                      SSD_SCALE, (size, size), SSD_MEAN)
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]  # rows: [image, class, confidence, x1, y1, x2, y2] (0-1 coordinates)
+        confident = detections[detections[:, 2] >= Config.FRAME_DETECTOR_CONFIDENCE]
+        results = [([], 0) for _ in frames]
+        for row in confident:
+            index, class_id = int(row[0]), int(row[1])
+            if not 0 <= index < len(frames):
+                continue
+            people, phones = results[index]
+            if class_id in self.person_ids:
+                height, width = frames[index].shape[:2]
+                x1, y1, x2, y2 = np.clip(row[3:7], 0, 1) * [width, height, width, height]
+                # The face is in the upper part of a person box
+                people.append((int(x1), int(y1), int(x2), int(y1 + (y2 - y1) * 0.7)))
+            elif class_id in self.phone_ids:
+                results[index] = (people, phones + 1)
+        return results
+
+    def prepare(self, image_data):
+        """
+        Decode and downscale one base64 frame (no detector state; safe in any thread)
+
+        Returns:
+            PreparedFrame
+
+        Raises:
+            FrameDecodeError: The frame could not be decoded
+        """
+        frame = decode_frame(image_data)
+        height, width = frame.shape[:2]
+        if width > Config.FRAME_ANALYSIS_WIDTH:
+            scale = Config.FRAME_ANALYSIS_WIDTH / width
+            frame = cv2.resize(frame, (Config.FRAME_ANALYSIS_WIDTH, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return PreparedFrame(frame, gray, frame_signature(gray))
+
+    def detect(self, prepared):
+        """
+        Run the detectors on a batch of prepared frames
+
+        Returns:
+            list: One result per frame (see the module docstring), without latency_ms
+        """
+        grays = [cv2.equalizeHist(p.gray) for p in prepared]
+        with self.lock:
+            if self.net is None:
+                objects = [(None, 0)] * len(prepared)
+                faces = [self._faces(gray) for gray in grays]
+            else:
+                # The detector narrows the face search to the people it found; with
+                # nobody in view there is no one to be looking away
+                objects = self._objects([p.frame for p in prepared])
+                faces = [self._faces(gray, people or None, profiles=bool(people))
+                         for gray, (people, _) in zip(grays, objects)]
+
+        results = []
+        for (people, phones), (frontal, profile) in zip(objects, faces):
+            face_count = frontal or int(profile)
+            person_count = max(face_count, len(people or ()))
+            results.append({
+                'face_detected': face_count > 0,
+                'multiple_faces': person_count > 1,
+                'looking_away': profile,
+                'phone_detected': phones > 0,
+                'face_count': face_count,
+                'person_count': person_count,
+                'detectors': self.detectors
+            })
+        return results
+
+    def analyze(self, image_data):
+        """
+        Analyze one base64 frame right away (no batching, no de-duplication)
+
+        Raises:
+            FrameDecodeError: The frame could not be decoded
+        """
+        started = time.perf_counter()
+        result = self.detect([self.prepare(image_data)])[0]
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+
+class FrameBatcher:
+    """
+    Micro-batches detector work across concurrent requests of one process
+
+    Requests decode their frame themselves, submit it and wait. One thread
+    takes the first waiting frame, collects whatever else arrives within
+    Config.FRAME_BATCH_WINDOW_MS (up to Config.FRAME_BATCH_MAX_SIZE frames)
+    and runs the object detector once for the whole batch.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.queue = queue.Queue()
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.stats = {'batches': 0, 'frames': 0, 'largest_batch': 0, 'rejected': 0}
+        # Smoothed time frames spend waiting for the detector (ms)
+        self.wait_ms = 0.0
+
+    def depth(self):
+        """Frames waiting for the detector"""
+        return self.queue.qsize()
+
+    def _start(self):
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='frame-batcher', daemon=True)
+                self.thread.start()
+
+    def submit(self, prepared):
+        """
+        Queue a prepared frame
+
+        Returns:
+            concurrent.futures.Future resolving to the frame's result
+
+        Raises:
+            FrameQueueFullError: Config.FRAME_QUEUE_MAX frames are already waiting
+        """
+        if self.queue.qsize() >= Config.FRAME_QUEUE_MAX:
+            self.stats['rejected'] += 1
+            raise FrameQueueFullError(f'{Config.FRAME_QUEUE_MAX} frames are already waiting for analysis')
+        if self.thread is None or not self.thread.is_alive():
+            self._start()
+        future = Future()
+        self.queue.put((prepared, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        """The next batch: block for one frame, then gather for the batch window"""
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + Config.FRAME_BATCH_WINDOW_MS / 1000
+        while len(batch) < Config.FRAME_BATCH_MAX_SIZE:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            waited = max(started - queued for _, _, queued in batch) * 1000
+            self.wait_ms = 0.8 * self.wait_ms + 0.2 * waited
+            try:
+                results = self.analyzer.detect([prepared for prepared, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.stats['batches'] += 1
+            self.stats['frames'] += len(batch)
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+            for (_, future, _), result in zip(batch, results):
+                result['batch_size'] = len(batch)
+                future.set_result(result)
+
+
+class SessionFrameCache:
+    """
+    Last analyzed frame (signature + result) per proctoring session, LRU-bounded
+
+    A new frame whose signature is within Config.FRAME_DEDUP_MAX_DISTANCE of
+    the session's last analyzed frame reuses its result, unless that result is older than
+    Config.FRAME_DEDUP_MAX_AGE_SECONDS (a static scene is still re-checked
+    now and then).
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, session_id, signature):
+        with self.lock:
+            entry = self.entries.get(session_id)
+            if entry is None:
+                return None
+            last_signature, result, analyzed_at = entry
+            if (signature_distance(signature, last_signature) > Config.FRAME_DEDUP_MAX_DISTANCE
+                    or time.monotonic() - analyzed_at > Config.FRAME_DEDUP_MAX_AGE_SECONDS):
+                return None
+            self.entries.move_to_end(session_id)
+            return result
+
+    def store(self, session_id, signature, result):
+        with self.lock:
+            self.entries[session_id] = (signature, result, time.monotonic())
+            self.entries.move_to_end(session_id)
+            while len(self.entries) > Config.FRAME_SESSION_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+
+_analyzer = None
+_batcher = None
+_frame_cache = SessionFrameCache()
+_analyzer_lock = threading.Lock()
+
+
+def get_frame_analyzer():
+    """The process-wide analyzer (detectors are loaded on first use)"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = FrameAnalyzer()
+    return _analyzer
+
+
+def get_frame_batcher():
+    """The process-wide micro-batcher (None when Config.FRAME_BATCH_ENABLED is off)"""
+    global _batcher
+    if not Config.FRAME_BATCH_ENABLED:
+        return None
+    if _batcher is None:
+        analyzer = get_frame_analyzer()
+        with _analyzer_lock:
+            if _batcher is None:
+                _batcher = FrameBatcher(analyzer)
+    return _batcher
+
+
+def sampling_hint():
+    """
+    Frame interval the client should use, from this process's detector backlog
+
+    The base interval is Config.FRAME_SAMPLE_INTERVAL_MS. It grows by one base
+    interval per Config.FRAME_QUEUE_HIGH_WATER frames waiting, is at least
+    doubled while frames wait longer than Config.FRAME_WAIT_BUDGET_MS for the
+    detector, and is capped at Config.FRAME_SAMPLE_MAX_FACTOR times the base.
+
+    Returns:
+        dict: {"interval_ms": int, "queue_depth": int, "reason": "normal" | "backlog"}
+    """
+    batcher = _batcher
+    depth = batcher.depth() if batcher else 0
+    factor = 1 + depth // max(1, Config.FRAME_QUEUE_HIGH_WATER)
+    if batcher and batcher.wait_ms > Config.FRAME_WAIT_BUDGET_MS:
+        factor = max(factor, math.ceil(batcher.wait_ms / Config.FRAME_WAIT_BUDGET_MS))
+    factor = min(factor, Config.FRAME_SAMPLE_MAX_FACTOR)
+    return {
+        'interval_ms': Config.FRAME_SAMPLE_INTERVAL_MS * factor,
+        'queue_depth': depth,
+        'reason': 'backlog' if factor > 1 else 'normal'
+    }
+
+
+def analyze_frame(image_data, session_id=None):
+    """
+    Analyze a base64 webcam frame for proctoring
+
+    With a session_id, a near-duplicate of the session's last analyzed frame
+    returns that frame's result ("deduplicated": true) without running the
+    detectors. Other frames go through the micro-batcher (or straight to the
+    analyzer when batching is off).
+
+    Returns:
+        dict: The analysis result (see the module docstring) plus "deduplicated"
+              and "sampling" (see sampling_hint)
+
+    Raises:
+        FrameDecodeError: The frame could not be decoded
+        FrameQueueFullError: The detector backlog is full
+    """
+    started = time.perf_counter()
+    analyzer = get_frame_analyzer()
+    prepared = analyzer.prepare(image_data)
+
+    cached = _frame_cache.lookup(session_id, prepared.signature) if session_id and Config.FRAME_DEDUP_ENABLED else None
+    if cached is not None:
+        result = dict(cached, deduplicated=True)
+    else:
+        batcher = get_frame_batcher()
+        if batcher is None:
+            result = analyzer.detect([prepared])[0]
+        else:
+            try:
+                result = batcher.submit(prepared).result(timeout=Config.FRAME_BATCH_TIMEOUT_SECONDS)
+            except FutureTimeoutError as e:
+                raise FrameQueueFullError(f'No detector result within {Config.FRAME_BATCH_TIMEOUT_SECONDS} s') from e
+        result['deduplicated'] = False
+        if session_id:
+            _frame_cache.store(session_id, prepared.signature, dict(result))
+
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    result['sampling'] = sampling_hint()
+    return result
@@ -0,0 +1,496 @@
+"""
+Proctoring Event Ingestion
+Write-behind buffer for proctoring events, flushed to `proctoring_violations` with multi-row inserts.
+
+Proctoring events arrive in storms (every candidate of a sitting switching
+tabs at once), and one INSERT + COMMIT per event does not keep up. Events
+are appended to an in-process buffer instead, and a flusher thread writes
+them in one multi-row INSERT per transaction when either:
+
+    - Config.PROCTOR_FLUSH_ROWS events are waiting, or
+    - Config.PROCTOR_FLUSH_SECONDS have passed since the last flush.
+
+If the flusher falls behind and Config.PROCTOR_BUFFER_MAX_ROWS events are
+waiting, the request that adds more flushes inline (backpressure). Events
+that fail to insert stay buffered for the next flush; a batch rejected by
+the database (e.g. a deleted candidate) is retried row by row so one bad
+row does not drop the others. The buffer is flushed on shutdown. A hard
+crash loses at most the unflushed buffer, i.e. about PROCTOR_FLUSH_SECONDS
+of events.
+
+The buffer is per process: flush_proctor_events() only writes this
+process's events, so session summaries, counts and risk scores are
+eventually consistent. Events accepted by other workers show up within
+about PROCTOR_FLUSH_SECONDS (longer only while the database is rejecting
+flushes). A candidate reset terminates the candidate's sessions before
+deleting their events, and events of terminated sessions are dropped when
+written, so another process's buffer cannot bring them back.
+
+Every write also upserts the per-(session, type) counters in
+`proctor_violation_counts` in the same transaction, so summaries, risk
+scores and session lists are read from O(types) counter rows instead of
+counting events (see session_violation_counts).
+
+Events are logged through the "proctor" logger as one key=value line,
+leveled by severity (high -> WARNING, medium -> INFO, low -> DEBUG), with
+the threshold set by Config.PROCTOR_LOG_LEVEL.
+
+Usage:
+    event = build_event(session_id, candidate_id, 'tab_switch', {'details': ...})
+    record_proctor_events([event])
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import case, select, func
+from sqlalchemy.exc import IntegrityError
+from ..config import Config
+from ..extensions import db
+from ..db_helpers import dialect_insert
+from ..models import ProctoringViolation, ProctoringViolationArchive, ProctorViolationCount, ProctorSession
+
+# Violation type -> stored severity (anything else is 'low')
+SEVERITY_MAP = {
+    'multiple_faces': 'high',
+    'no_face': 'high',
+    'phone_detected': 'high',
+    'looking_away': 'medium',
+    'tab_switch': 'medium'
+}
+
+LOG_LEVELS = {'high': logging.WARNING, 'medium': logging.INFO, 'low': logging.DEBUG}
+
+# Risk score points per event of a type (capped at 100)
+RISK_WEIGHTS = {
+    'no_face': 10,
+    'multiple_faces': 25,
+    'looking_away': 5,
+    'tab_switch': 15,
+    'phone_detected': 20
+}
+
+MAX_TYPE_CHARS = 50  # proctoring_violations.violation_type
+MAX_SESSION_CHARS = 100  # proctoring_violations.session_id
+
+logger = logging.getLogger('proctor')
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+    logger.addHandler(_handler)
+    logger.propagate = False
+logger.setLevel(Config.PROCTOR_LOG_LEVEL.upper())
+
+
+def _format_value(value):
+    if isinstance(value, str) and value and not any(c in value for c in ' ="'):
+        return value
+    return json.dumps(value, default=str, separators=(',', ':'))
+
+
+def log_fields(level, message, **fields):
+    """Log one structured line: '<message> key=value ...'"""
+    if logger.isEnabledFor(level):
+        logger.log(level, ' '.join([message] + [f"{key}={_format_value(value)}" for key, value in fields.items()]))
+
+
+def severity_of(violation_type):
+    return SEVERITY_MAP.get(violation_type, 'low')
+
+
+def parse_event_time(value):
+    """Client event timestamp (ISO 8601) as naive UTC, or None if missing/invalid/in the future"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = datetime.utcfromtimestamp(parsed.timestamp())
+    return parsed if parsed <= datetime.utcnow() else None
+
+
+class SessionOwnerCache:
+    """
+    Candidate ID of each proctoring session (session UUID -> candidate), LRU-bounded
+
+    A session never changes owner, so known sessions are looked up once per
+    worker; unknown ones are queried every time (the session may be started
+    after a first miss).
+    """
+
+    def __init__(self):
+        self.owners = OrderedDict()
+        self.lock = threading.Lock()
+
+    def owner(self, session_id):
+        with self.lock:
+            if session_id in self.owners:
+                self.owners.move_to_end(session_id)
+                return self.owners[session_id]
+        candidate_id = db.session.query(ProctorSession.candidate_id).filter_by(session_uuid=session_id).scalar()
+        if candidate_id is not None:
+            with self.lock:
+                self.owners[session_id] = candidate_id
+                while len(self.owners) > Config.PROCTOR_SESSION_CACHE_SIZE:
+                    self.owners.popitem(last=False)
+        return candidate_id
+
+
+_session_owners = SessionOwnerCache()
+
+
+def owns_session(session_id, candidate_id):
+    """Whether the proctoring session (UUID) exists and belongs to the candidate"""
+    if not session_id or not isinstance(session_id, str):
+        return False
+    return _session_owners.owner(session_id) == candidate_id
+
+
+def build_event(session_id, candidate_id, violation_type, violation_data=None, severity=None, timestamp=None):
+    """
+    One proctoring_violations row (as a dict for the buffer), logged at its severity level
+
+    Raises:
+        ValueError: Missing session ID or violation type
+    """
+    if not session_id or not isinstance(session_id, str) or len(session_id) > MAX_SESSION_CHARS:
+        raise ValueError('session_id is required')
+    if not violation_type or not isinstance(violation_type, str) or len(violation_type) > MAX_TYPE_CHARS:
+        raise ValueError(f'event type is required (at most {MAX_TYPE_CHARS} characters)')
+
+    severity = severity or severity_of(violation_type)
+    event = {
+        'session_id': session_id,
+        'candidate_id': candidate_id,
+        'violation_type': violation_type,
+        'violation_data': violation_data,
+        'severity': severity,
+        'timestamp': timestamp or datetime.utcnow()
+    }
+    level = LOG_LEVELS.get(severity, logging.DEBUG)
+    if logger.isEnabledFor(logging.DEBUG):
+        log_fields(level, 'proctor_event', type=violation_type, severity=severity,
+                   session=session_id, candidate=candidate_id, details=violation_data)
+    else:
+        log_fields(level, 'proctor_event', type=violation_type, severity=severity,
+                   session=session_id, candidate=candidate_id)
+    return event
+
+
+def risk_score(counts):
+    """Session risk score (0-100) from its violation counts by type"""
+    return min(sum(counts.get(violation_type, 0) * weight for violation_type, weight in RISK_WEIGHTS.items()), 100)
+
+
+def _counter_rows(rows):
+    """Event rows aggregated to one counter increment per (session, type), in key order"""
+    counters = {}
+    for row in rows:
+        key = (row['session_id'], row['violation_type'])
+        counter = counters.get(key)
+        if counter is None:
+            counters[key] = {'session_id': key[0], 'violation_type': key[1], 'candidate_id': row['candidate_id'],
+                             'count': 1, 'last_event_at': row['timestamp']}
+        else:
+            counter['count'] += 1
+            counter['last_event_at'] = max(counter['last_event_at'], row['timestamp'])
+    # Sorted, so concurrent flushes lock counter rows in the same order
+    return [counters[key] for key in sorted(counters)]
+
+
+def _live_rows(conn, rows):
+    """
+    Event rows minus those of sessions terminated by a candidate reset
+
+    Share-locks the sessions, so a reset running concurrently (which
+    terminates them first) either waits for this write or is seen by it.
+    """
+    terminated = set(conn.execute(
+        select(ProctorSession.session_uuid)
+        .where(ProctorSession.session_uuid.in_({row['session_id'] for row in rows}))
+        .where(ProctorSession.status == 'terminated')
+        .with_for_update(read=True)
+    ).scalars())
+    if not terminated:
+        return rows
+    log_fields(logging.INFO, 'proctor_events_dropped', reason='session_reset',
+               rows=sum(row['session_id'] in terminated for row in rows))
+    return [row for row in rows if row['session_id'] not in terminated]
+
+
+def write_events(conn, rows):
+    """
+    Insert event rows and add them to the session counters (in the caller's transaction)
+
+    Returns:
+        int: Rows written (events of reset sessions are dropped)
+    """
+    rows = _live_rows(conn, rows)
+    if not rows:
+        return 0
+    conn.execute(ProctoringViolation.__table__.insert(), rows)
+    counters = ProctorViolationCount.__table__
+    stmt = dialect_insert(counters).values(_counter_rows(rows))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['session_id', 'violation_type'],
+        set_={
+            'count': counters.c['count'] + stmt.excluded['count'],
+            'last_event_at': case(
+                (stmt.excluded.last_event_at > counters.c.last_event_at, stmt.excluded.last_event_at),
+                else_=counters.c.last_event_at
+            )
+        }
+    )
+    conn.execute(stmt)
+    return len(rows)
+
+
+def session_violation_counts(session_ids):
+    """
+    Violation counts of sessions from the counters
+
+    Returns:
+        dict: {session_id: {violation_type: count}} (sessions without events are missing)
+    """
+    session_ids = [sid for sid in session_ids if sid]
+    if not session_ids:
+        return {}
+    rows = db.session.query(
+        ProctorViolationCount.session_id, ProctorViolationCount.violation_type, ProctorViolationCount.count
+    ).filter(ProctorViolationCount.session_id.in_(session_ids)).all()
+    counts = {}
+    for session_id, violation_type, count in rows:
+        counts.setdefault(session_id, {})[violation_type] = count
+    return counts
+
+
+def rebuild_violation_counts():
+    """
+    Recount every session's counters from the live and archived events (commits)
+
+    Used once to backfill the counters of events stored before they existed.
+
+    Returns:
+        int: Counter rows written
+    """
+    totals = {}
+    for model in (ProctoringViolation, ProctoringViolationArchive):
+        rows = db.session.execute(
+            select(model.session_id, model.violation_type, func.min(model.candidate_id),
+                   func.count(model.id), func.max(model.timestamp))
+            .group_by(model.session_id, model.violation_type)
+        ).all()
+        for session_id, violation_type, candidate_id, count, last_event_at in rows:
+            counter = totals.setdefault((session_id, violation_type), {
+                'session_id': session_id, 'violation_type': violation_type,
+                'candidate_id': candidate_id, 'count': 0, 'last_event_at': last_event_at
+            })
+            counter['count'] += count
+            counter['last_event_at'] = max(counter['last_event_at'], last_event_at)
+
+    ProctorViolationCount.query.delete(synchronize_session=False)
+    rows = list(totals.values())
+    for offset in range(0, len(rows), 1000):
+        db.session.execute(
+            dialect_insert(ProctorViolationCount.__table__).values(rows[offset:offset + 1000])
+            .on_conflict_do_nothing(index_elements=['session_id', 'violation_type'])
+        )
+    db.session.commit()
+    return len(rows)
+
+
+class ProctorEventBuffer:
+    """Per-process write-behind buffer of proctoring_violations rows"""
+
+    def __init__(self, app, flush_rows=None, flush_seconds=None, max_rows=None):
+        """
+        Initialize the buffer (the flusher thread starts on the first event)
+
+        Args:
+            app: Flask application instance
+            flush_rows: Waiting events that trigger a flush (default: Config.PROCTOR_FLUSH_ROWS)
+            flush_seconds: Longest time between flushes (default: Config.PROCTOR_FLUSH_SECONDS)
+            max_rows: Waiting events at which adds flush inline (default: Config.PROCTOR_BUFFER_MAX_ROWS)
+        """
+        self.app = app
+        self.flush_rows = flush_rows or Config.PROCTOR_FLUSH_ROWS
+        self.flush_seconds = flush_seconds or Config.PROCTOR_FLUSH_SECONDS
+        self.max_rows = max_rows or Config.PROCTOR_BUFFER_MAX_ROWS
+        self.rows = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # One flush at a time, so rows are written in arrival order
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.pid = os.getpid()
+        self.stats = {'events': 0, 'flushes': 0, 'rows_written': 0, 'rows_dropped': 0, 'flush_errors': 0}
+
+    def add(self, events):
+        """Buffer events; returns the number of events now waiting"""
+        with self.lock:
+            self.rows.extend(events)
+            self.stats['events'] += len(events)
+            waiting = len(self.rows)
+            if self.thread is None:
+                self._start()
+        if waiting >= self.max_rows:
+            # The flusher is behind (or the database is down): make the caller wait for a flush
+            self.flush()
+        elif waiting >= self.flush_rows:
+            self.wake.set()
+        return waiting
+
+    def _start(self):
+        self.thread = threading.Thread(target=self._flush_loop, name='proctor-event-flusher', daemon=True)
+        self.thread.start()
+        log_fields(logging.INFO, 'proctor_buffer_started', flush_rows=self.flush_rows,
+                   flush_seconds=self.flush_seconds, max_rows=self.max_rows)
+
+    def _flush_loop(self):
+        while not self.stopped.is_set():
+            self.wake.wait(self.flush_seconds)
+            self.wake.clear()
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception as e:
+                log_fields(logging.ERROR, 'proctor_flush_loop_error', error=str(e))
+
+    def flush(self):
+        """
+        Write every waiting event (needs an app context)
+
+        Returns:
+            int: Rows written
+        """
+        with self.flush_lock:
+            with self.lock:
+                rows, self.rows = self.rows, []
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                written = self._insert(rows)
+            except Exception as e:
+                self.stats['flush_errors'] += 1
+                self._requeue(rows)
+                log_fields(logging.ERROR, 'proctor_flush_failed', rows=len(rows), error=str(e)[:200])
+                return 0
+
+            self.stats['flushes'] += 1
+            self.stats['rows_written'] += written
+            log_fields(logging.DEBUG, 'proctor_flush', rows=written,
+                       ms=round((time.perf_counter() - started) * 1000, 1))
+            return written
+
+    def _insert(self, rows):
+        """One multi-row INSERT (+ counters); on a constraint error, row by row (bad rows are dropped)"""
+        try:
+            with db.engine.begin() as conn:
+                return write_events(conn, rows)
+        except IntegrityError:
+            written = 0
+            for row in rows:
+                try:
+                    with db.engine.begin() as conn:
+                        written += write_events(conn, [row])
+                except IntegrityError as e:
+                    self.stats['rows_dropped'] += 1
+                    log_fields(logging.ERROR, 'proctor_event_rejected', type=row['violation_type'],
+                               session=row['session_id'], candidate=row['candidate_id'], error=str(e.orig)[:200])
+            return written
+
+    def _requeue(self, rows):
+        """Put unwritten rows back in front, dropping the oldest beyond max_rows"""
+        with self.lock:
+            self.rows = rows + self.rows
+            overflow = len(self.rows) - self.max_rows
+            if overflow > 0:
+                del self.rows[:overflow]
+                self.stats['rows_dropped'] += overflow
+                log_fields(logging.ERROR, 'proctor_buffer_overflow', dropped=overflow)
+
+    def pending(self):
+        with self.lock:
+            return len(self.rows)
+
+    def stop(self):
+        """Stop the flusher and write what is left"""
+        self.stopped.set()
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        with self.app.app_context():
+            self.flush()
+
+
+# Global buffer instance (per process; recreated after a fork)
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_event_buffer(app=None):
+    """
+    The process-wide event buffer, created on first use
+
+    Args:
+        app: Flask application (default: the current app)
+    """
+    global _buffer
+    if _buffer is None or _buffer.pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer.pid != os.getpid():
+                if app is None:
+                    from flask import current_app
+                    app = current_app._get_current_object()
+                _buffer = ProctorEventBuffer(app)
+    return _buffer
+
+
+def record_proctor_events(events):
+    """
+    Queue built events for writing
+
+    With Config.PROCTOR_BUFFER_ENABLED off, they are inserted (with their counters) and committed immediately.
+
+    Returns:
+        int: Number of events accepted
+    """
+    if not events:
+        return 0
+    if not Config.PROCTOR_BUFFER_ENABLED:
+        with db.engine.begin() as conn:
+            return write_events(conn, events)
+    get_event_buffer().add(events)
+    return len(events)
+
+
+def flush_proctor_events():
+    """
+    Write this process's buffered events now (e.g. before reading a session's events)
+
+    Events buffered by other processes are written by their own flushers
+    within about Config.PROCTOR_FLUSH_SECONDS.
+    """
+    if _buffer is not None and _buffer.pid == os.getpid():
+        return _buffer.flush()
+    return 0
+
+
+def stop_proctor_buffer():
+    """Flush and stop the buffer of this process"""
+    global _buffer
+    if _buffer is not None and _buffer.pid == os.getpid():
+        _buffer.stop()
+    _buffer = None
+
+
+atexit.register(stop_proctor_buffer)
@@ -0,0 +1,140 @@
+"""
+Question Bank Cache
+Versioned in-process cache of serialized question banks (MCQ, text-based,
+psychometric, coding).
+
+Each bank has a version row in the `cache_versions` table. Recruiter
+upload/config endpoints call `bump_version(bank)` after committing, which
+drops this worker's entries immediately. Other gunicorn workers notice the
+new version on their next check (at most every QUESTION_CACHE_CHECK_SECONDS)
+with a single primary-key lookup.
+
+Candidate-facing payloads and answer keys are stored under separate entry
+names so answer keys never leak into a serialized response.
+"""
+
+import threading
+import time
+from datetime import datetime
+from ..extensions import db
+from ..config import Config
+from ..models import CacheVersion
+from ..db_helpers import dialect_insert
+
+# Known banks
+MCQ_BANK = 'mcq'
+TEXT_BASED_BANK = 'text_based'
+PSYCHOMETRIC_BANK = 'psychometric'
+CODING_BANK = 'coding'
+
+
+class QuestionBankCache:
+    """Per-worker cache keyed by (bank, entry name) and tagged with the bank version"""
+
+    def __init__(self, check_interval=None):
+        """
+        Initialize the cache
+
+        Args:
+            check_interval: Seconds between DB version checks per bank
+                            (default: Config.QUESTION_CACHE_CHECK_SECONDS)
+        """
+        self.check_interval = Config.QUESTION_CACHE_CHECK_SECONDS if check_interval is None else check_interval
+        self._entries = {}   # (bank, name) -> (version, value)
+        self._versions = {}  # bank -> (version, checked_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read_version(self, bank):
+        """Read the current version of a bank from the database"""
+        version = db.session.query(CacheVersion.version).filter_by(bank=bank).scalar()
+        return version or 0
+
+    def current_version(self, bank):
+        """
+        Get the bank version, re-reading the DB only when the check interval has elapsed
+
+        Returns:
+            int: Current version (0 if the bank has never been bumped)
+        """
+        now = time.monotonic()
+        cached = self._versions.get(bank)
+        if cached and now - cached[1] < self.check_interval:
+            return cached[0]
+
+        version = self._read_version(bank)
+        with self._lock:
+            self._versions[bank] = (version, now)
+        return version
+
+    def get(self, bank, name, loader):
+        """
+        Get a cached entry, rebuilding it with `loader()` if missing or stale
+
+        Args:
+            bank: Bank name (e.g. 'mcq')
+            name: Entry name within the bank (e.g. 'questions', 'answer_key')
+            loader: Zero-argument callable that queries and serializes the entry
+
+        Returns:
+            The cached value. Callers must treat it as read-only.
+        """
+        version = self.current_version(bank)
+        entry = self._entries.get((bank, name))
+        if entry and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[(bank, name)] = (version, value)
+        return value
+
+    def invalidate(self, bank):
+        """Drop this worker's entries for a bank without touching the DB"""
+        with self._lock:
+            self._versions.pop(bank, None)
+            for key in [k for k in self._entries if k[0] == bank]:
+                del self._entries[key]
+
+    def bump_version(self, bank):
+        """
+        Increment the bank version in the DB and invalidate this worker's entries
+
+        Commits its own statement, so call it after the upload/config change
+        has been committed.
+        """
+        now = datetime.utcnow()
+        stmt = dialect_insert(CacheVersion.__table__).values(bank=bank, version=1, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['bank'],
+            set_={'version': CacheVersion.__table__.c.version + 1, 'updated_at': now}
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        self.invalidate(bank)
+
+    def stats(self):
+        """Get hit/miss counters for monitoring"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries)
+        }
+
+
+# Global cache instance (one per worker process)
+question_cache = QuestionBankCache()
+
+
+def bump_version(bank):
+    """Invalidate a question bank across all workers"""
+    try:
+        question_cache.bump_version(bank)
+    except Exception as e:
+        # Never fail an upload because of the cache; drop local entries at least
+        db.session.rollback()
+        question_cache.invalidate(bank)
+        print(f"⚠️ Failed to bump cache version for {bank}: {e}")
@@ -0,0 +1,195 @@
+"""
+Resume Store
+Content-addressed resume storage: identical PDFs are stored, extracted and parsed once.
+
+Resumes are keyed by the SHA-256 of their bytes. A `resume_contents` row per
+hash holds the storage object, the extracted text and the parsed resume
+data, so an upload of bytes seen before (a re-upload, or a template shared
+by many candidates) skips whatever was already done:
+
+    - same bytes as the candidate's current resume: one hash and one row update
+    - bytes parsed before: resume_data is copied, no storage write or job
+    - bytes extracted before: only the parse job runs
+    - new bytes: stored under resume_<sha256>.pdf, then extract -> parse
+
+Uploads are hashed and stored from the request's (spooled) file stream in
+chunks, never read into memory as a whole. The job handlers (job_handlers.py) write their outputs back to the row.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime
+from ..extensions import db
+from ..models import ResumeContent, AIJob
+from ..db_helpers import dialect_insert
+from ..job_queue import enqueue_jobs, content_key, RESUME_EXTRACT, RESUME_PARSE
+from .storage import get_storage, iter_chunks
+from .skills import index_candidate_skills
+
+
+# Largest accepted resume file
+MAX_RESUME_BYTES = 5 * 1024 * 1024
+
+
+# Striped locks: concurrent uploads of the same new bytes in this process
+# (bulk imports) store them once. Across processes a duplicate write is
+# harmless - same object path, and the content row insert is ON CONFLICT DO NOTHING.
+_content_locks = [threading.Lock() for _ in range(64)]
+
+
+class ResumeStorageError(Exception):
+    """The PDF could not be written to storage"""
+
+
+def hash_stream(stream):
+    """
+    SHA-256 and size of a seekable binary stream, read in chunks
+
+    The stream is rewound to where it started.
+
+    Returns:
+        (hex digest, size in bytes)
+    """
+    start = stream.tell()
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter_chunks(stream):
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(start)
+    return digest.hexdigest(), size
+
+
+def content_path(sha256):
+    """Storage path shared by every upload of the same bytes"""
+    return f"resume_{sha256}.pdf"
+
+
+def _upload(sha256, stream, size):
+    """Stream new bytes to storage; returns (storage path, public URL)"""
+    path = content_path(sha256)
+    try:
+        storage = get_storage()
+        # upsert: a concurrent upload of the same bytes writes the same object
+        storage.upload(path, stream, "application/pdf", size=size, upsert=True)
+        return path, storage.public_url(path)
+    except Exception as e:
+        raise ResumeStorageError(str(e)) from e
+
+
+def attach_resume_data(candidate, resume_data):
+    """Set a candidate's parsed resume data and rewrite its skills index rows (does not commit)"""
+    candidate.resume_data = resume_data
+    return index_candidate_skills(candidate.id, resume_data)
+
+
+def get_or_create_content(sha256, stream, size):
+    """
+    The content row for these bytes, uploading them if they are new
+
+    Returns:
+        (ResumeContent, reused, upload_ms): reused is True when the bytes were already stored
+
+    Raises:
+        ResumeStorageError: The storage write failed
+    """
+    content = ResumeContent.query.get(sha256)
+    if content:
+        content.upload_count = ResumeContent.upload_count + 1
+        content.last_uploaded_at = datetime.utcnow()
+        return content, True, 0.0
+
+    started = time.perf_counter()
+    path, url = _upload(sha256, stream, size)
+    upload_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    now = datetime.utcnow()
+    stmt = dialect_insert(ResumeContent.__table__).values(
+        sha256=sha256, storage_path=path, resume_url=url, size_bytes=size,
+        upload_count=1, created_at=now, last_uploaded_at=now
+    ).on_conflict_do_nothing(index_elements=['sha256'])
+    db.session.execute(stmt)
+    return ResumeContent.query.get(sha256), False, upload_ms
+
+
+def store_resume(candidate, stream, filename, load_job=True):
+    """
+    Make these bytes the candidate's resume and queue whatever processing is still missing
+
+    Commits.
+
+    Args:
+        candidate: CandidateAuth row
+        stream: Seekable binary stream of the PDF (e.g. the request's FileStorage.stream)
+        filename: Original filename
+        load_job: Load the processing job for the response; False skips the
+                  query (batch imports, which only count "jobs_queued").
+                  The job is queued either way.
+
+    Returns:
+        dict: {"sha256", "deduplicated" (None, "content" or "current"), "job" (AIJob or None),
+               "jobs_queued" (jobs inserted: 0 if nothing had to run or the job already existed)}
+
+    Raises:
+        ResumeStorageError: The storage write failed (nothing was changed)
+    """
+    sha256, size = hash_stream(stream)
+    now = datetime.now()
+
+    # Same bytes as the current resume (unless its processing failed): keep everything
+    if (candidate.resume_sha256 == sha256 and candidate.resume_url
+            and (candidate.resume_processing or {}).get('status') != 'failed'):
+        candidate.resume_filename = filename
+        candidate.resume_uploaded_at = now
+        db.session.commit()
+        print(f"♻️ Resume re-upload for candidate {candidate.id} matches the current file ({sha256[:12]})")
+        return {'sha256': sha256, 'deduplicated': 'current', 'job': None, 'jobs_queued': 0}
+
+    with _content_locks[int(sha256[:8], 16) % len(_content_locks)]:
+        content, reused, upload_ms = get_or_create_content(sha256, stream, size)
+        db.session.commit()
+
+    candidate.resume_url = content.resume_url
+    candidate.resume_filename = filename
+    candidate.resume_uploaded_at = now
+    candidate.resume_sha256 = sha256
+    candidate.resume_processing = None
+    candidate.record_resume_stage('upload', 'done', bytes=size, duration_ms=upload_ms, deduplicated=reused)
+
+    job_type = None
+    if content.resume_data is not None:
+        attach_resume_data(candidate, content.resume_data)
+        candidate.record_resume_stage('extract', 'done', reused=True, **(content.extraction or {}))
+        candidate.record_resume_stage('parse', 'done', reused=True, fields=sorted(content.resume_data.keys()))
+    elif content.extraction and content.extraction.get('error'):
+        # Same unreadable file as before
+        candidate.record_resume_stage('extract', 'failed', reused=True, error=content.extraction['error'])
+    elif content.extracted_text:
+        candidate.record_resume_stage('extract', 'done', reused=True, **(content.extraction or {}))
+        candidate.record_resume_stage('parse', 'queued')
+        job_type = RESUME_PARSE
+    else:
+        candidate.record_resume_stage('extract', 'queued')
+        job_type = RESUME_EXTRACT
+
+    jobs_queued = 0
+    if job_type:
+        job_spec = (
+            job_type, candidate.id,
+            {'resume_url': content.resume_url, 'storage_path': content.storage_path, 'sha256': sha256},
+            content_key(sha256, now.isoformat())
+        )
+        # Committed together with its 'queued' stage, so a crash never leaves a stage without a job
+        jobs_queued = enqueue_jobs([job_spec], commit=False)
+    db.session.commit()
+
+    if reused:
+        reuse = job_type or ('parsed' if content.resume_data is not None else 'unreadable')
+        print(f"♻️ Resume for candidate {candidate.id} matches stored content {sha256[:12]} ({reuse})")
+
+    job = None
+    if job_type and load_job:
+        job = AIJob.query.filter_by(candidate_id=candidate.id, job_type=job_type).order_by(AIJob.id.desc()).first()
+
+    return {'sha256': sha256, 'deduplicated': 'content' if reused else None, 'job': job, 'jobs_queued': jobs_queued}
@@ -0,0 +1,175 @@
+"""
+Candidate Skills Index
+Normalized inverted index of resume skills (`candidate_skills` table) for candidate filtering.
+
+Parsed resumes list skills as free text ("ReactJS", "react.js", "Python 3",
+"AWS (EC2, S3)"). Each is normalized to one key - lowercased, versions and
+qualifiers dropped, common aliases mapped - and stored as one
+(candidate_id, skill) row. Filters then run on the (skill, candidate_id)
+index instead of scanning resume_data JSON:
+
+    - any: candidates with at least one of the skills
+    - all: candidates with every skill (GROUP BY candidate_id HAVING COUNT = n)
+
+The index is rewritten whenever a candidate's resume_data is set (see
+resume_store.attach_resume_data). Existing data is indexed with
+`python services/reindex_skills.py`.
+"""
+
+import re
+from sqlalchemy import func, select
+from ..extensions import db
+from ..models import CandidateSkill
+
+MAX_SKILL_CHARS = 100
+
+# Alias -> canonical key (applied after lowercasing and whitespace cleanup)
+SKILL_ALIASES = {
+    'js': 'javascript', 'ecmascript': 'javascript', 'es6': 'javascript',
+    'ts': 'typescript',
+    'py': 'python', 'python3': 'python',
+    'java8': 'java', 'java11': 'java', 'java17': 'java', 'java21': 'java',
+    'golang': 'go',
+    'reactjs': 'react', 'react.js': 'react', 'react js': 'react',
+    'vuejs': 'vue', 'vue.js': 'vue',
+    'angularjs': 'angular', 'angular.js': 'angular',
+    'nodejs': 'node.js', 'node': 'node.js', 'node js': 'node.js',
+    'expressjs': 'express', 'express.js': 'express',
+    'nextjs': 'next.js',
+    'postgres': 'postgresql', 'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'ms sql': 'sql server', 'mssql': 'sql server', 'microsoft sql server': 'sql server',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp', 'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'k8s': 'kubernetes',
+    'c sharp': 'c#', 'csharp': 'c#',
+    'cpp': 'c++',
+    'oauth 2': 'oauth2', 'oauth 2.0': 'oauth2', 'oauth2.0': 'oauth2',
+    'web 3': 'web3', 'amazon s3': 's3', 'aws s3': 's3', 'amazon ec2': 'ec2', 'aws ec2': 'ec2',
+    'dotnet': '.net', 'asp.net core': '.net', '.net core': '.net',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'tf': 'tensorflow',
+    'sklearn': 'scikit-learn', 'scikit learn': 'scikit-learn',
+    'html5': 'html', 'css3': 'css',
+    'rest': 'rest api', 'restful': 'rest api', 'restful api': 'rest api', 'rest apis': 'rest api',
+    'ci cd': 'ci/cd', 'cicd': 'ci/cd',
+    'github': 'git', 'gitlab': 'git',
+}
+
+# Skills whose digits are part of the name, never treated as a version
+DIGIT_SKILLS = {
+    'office 365', 'microsoft 365', 'dynamics 365', 'web 2.0', 'web 3', 'web3',
+    's3', 'ec2', 'h2', 'ipv4', 'ipv6', 'oauth2', 'log4j',
+}
+
+_QUALIFIER = re.compile(r'\s*[\(\[].*?[\)\]]\s*')  # "AWS (EC2, S3)" -> "AWS"
+# A version is separated from the name ("Python 3.11", "Angular v14") or dotted ("python3.11");
+# trailing digits glued to a name are kept ("S3", "EC2", "OAuth2")
+_VERSION = re.compile(r'(\s+v?\d+(\.\d+)*|(?<=[a-z+#])v?\d+(\.\d+)+)$')
+_SEPARATORS = re.compile(r'[,;|\n]+')
+
+
+def normalize_skill(name):
+    """
+    Canonical index key of a skill name, or None if nothing is left
+
+    "ReactJS" -> "react", "Python 3.11" -> "python", "AWS (EC2)" -> "aws", "S3" -> "s3"
+    """
+    if not isinstance(name, str):
+        return None
+    skill = _QUALIFIER.sub(' ', name.lower())
+    skill = re.sub(r'\s+', ' ', skill).strip(' -:*•').rstrip('.')  # keep the dot of ".net"
+    skill = SKILL_ALIASES.get(skill, skill)
+    if skill not in SKILL_ALIASES.values() and skill not in DIGIT_SKILLS:
+        skill = _VERSION.sub('', skill).strip()
+        skill = SKILL_ALIASES.get(skill, skill)
+    return skill[:MAX_SKILL_CHARS] or None
+
+
+def extract_skills(resume_data):
+    """Normalized, de-duplicated skills of a parsed resume (in resume order)"""
+    raw = (resume_data or {}).get('skills') if isinstance(resume_data, dict) else None
+    if isinstance(raw, str):
+        raw = [raw]
+    if not isinstance(raw, list):
+        return []
+
+    skills = []
+    for item in raw:
+        if isinstance(item, dict):
+            item = item.get('name') or item.get('skill')
+        if not isinstance(item, str):
+            continue
+        # Qualifiers go first: "AWS (EC2, S3)" must not be split at its inner comma
+        for part in _SEPARATORS.split(_QUALIFIER.sub(' ', item)):
+            skill = normalize_skill(part)
+            if skill and skill not in skills:
+                skills.append(skill)
+    return skills
+
+
+def index_candidate_skills(candidate_id, resume_data):
+    """
+    Replace a candidate's rows in the skills index (does not commit)
+
+    Returns:
+        list: The indexed skills
+    """
+    skills = extract_skills(resume_data)
+    CandidateSkill.query.filter_by(candidate_id=candidate_id).delete(synchronize_session=False)
+    if skills:
+        db.session.execute(
+            CandidateSkill.__table__.insert(),
+            [{'candidate_id': candidate_id, 'skill': skill} for skill in skills]
+        )
+    return skills
+
+
+def parse_skill_filter(value):
+    """Normalized skills from a comma-separated filter parameter ("Python, AWS")"""
+    skills = []
+    for part in _SEPARATORS.split(_QUALIFIER.sub(' ', value or '')):
+        skill = normalize_skill(part)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+def candidates_with_skills(skills, match='all'):
+    """
+    Select of candidate IDs having all (or any) of the given skills
+
+    Use as a filter: CandidateAuth.query.filter(CandidateAuth.id.in_(candidates_with_skills([...])))
+
+    Args:
+        skills: Normalized skills (see parse_skill_filter)
+        match: 'all' (AND) or 'any' (OR)
+    """
+    if match not in ('all', 'any'):
+        raise ValueError("match must be 'all' or 'any'")
+    query = select(CandidateSkill.candidate_id).where(CandidateSkill.skill.in_(skills))
+    if match == 'all':
+        # (candidate_id, skill) is unique, so the count is the number of matched skills
+        return query.group_by(CandidateSkill.candidate_id).having(func.count() == len(set(skills)))
+    return query.distinct()
+
+
+def skill_counts(prefix=None, limit=20):
+    """
+    Most common indexed skills (optionally starting with a prefix), for filter suggestions
+
+    Returns:
+        list: [{"skill": str, "candidates": int}, ...]
+    """
+    count = func.count(CandidateSkill.candidate_id)
+    query = db.session.query(CandidateSkill.skill, count)
+    if prefix:
+        # Raw prefix: aliases would turn "py" into "python"
+        key = re.sub(r'\s+', ' ', prefix.lower()).strip()
+        query = query.filter(CandidateSkill.skill.like(key.replace('%', r'\%').replace('_', r'\_') + '%', escape='\\'))
+    rows = query.group_by(CandidateSkill.skill).order_by(count.desc(), CandidateSkill.skill).limit(limit).all()
+    return [{'skill': skill, 'candidates': candidates} for skill, candidates in rows]
@@ -0,0 +1,192 @@
+"""
+File Storage
+Object storage for uploaded files, with a Supabase and a local-filesystem backend.
+
+Config.STORAGE_BACKEND selects the backend for the process:
+
+    - "supabase": Supabase Storage over one pooled HTTP client per worker
+      process (keep-alive connections, at most Config.STORAGE_MAX_CONNECTIONS).
+      Uploads stream the file in Config.STORAGE_CHUNK_BYTES chunks, so a
+      request's spooled upload is never read into memory as a whole.
+    - "local": files under Config.LOCAL_STORAGE_DIR, served at
+      Config.LOCAL_STORAGE_URL (on-prem deployments and offline testing).
+
+Usage:
+    storage = get_storage()
+    storage.upload("resume_<sha256>.pdf", stream, "application/pdf", size=size)
+    url = storage.public_url("resume_<sha256>.pdf")
+    data = storage.download("resume_<sha256>.pdf")
+"""
+
+import os
+import tempfile
+import threading
+from urllib.parse import quote
+import httpx
+from ..config import Config
+
+
+class StorageError(Exception):
+    """A storage operation failed"""
+
+
+def iter_chunks(stream, chunk_size=None):
+    """Read a file-like object in chunks"""
+    chunk_size = chunk_size or Config.STORAGE_CHUNK_BYTES
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class SupabaseStorage:
+    """Supabase Storage bucket over a pooled httpx client"""
+
+    def __init__(self, url=None, key=None, bucket=None):
+        url = url or Config.SUPABASE_URL
+        key = key or Config.SUPABASE_KEY
+        if not url or not key:
+            raise ValueError(
+                "Supabase configuration missing. "
+                "Please set SUPABASE_URL and SUPABASE_KEY in your .env file"
+            )
+        self.base_url = f"{url.rstrip('/')}/storage/v1"
+        self.bucket = bucket or Config.SUPABASE_BUCKET
+        self.client = httpx.Client(
+            headers={'Authorization': f"Bearer {key}", 'apikey': key},
+            limits=httpx.Limits(
+                max_connections=Config.STORAGE_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.STORAGE_MAX_CONNECTIONS
+            ),
+            timeout=Config.STORAGE_TIMEOUT_SECONDS
+        )
+        print(f"✅ Supabase storage client initialized: {url[:30]}... (bucket {self.bucket})")
+
+    def _object_url(self, path):
+        return f"{self.base_url}/object/{self.bucket}/{quote(path)}"
+
+    def upload(self, path, stream, content_type='application/octet-stream', size=None, upsert=True):
+        """
+        Stream a file-like object (or bytes) to the bucket
+
+        Args:
+            path: Object path in the bucket
+            stream: Readable binary file-like object, read from its current position, or bytes
+            content_type: Stored content type
+            size: Byte count, if known (sent as Content-Length instead of a chunked body)
+            upsert: Overwrite an existing object
+        """
+        headers = {'Content-Type': content_type, 'Cache-Control': 'max-age=3600', 'x-upsert': 'true' if upsert else 'false'}
+        if isinstance(stream, (bytes, bytearray)):
+            body = bytes(stream)
+        else:
+            body = iter_chunks(stream)
+            if size is not None:
+                headers['Content-Length'] = str(size)
+        try:
+            response = self.client.post(self._object_url(path), content=body, headers=headers)
+        except httpx.HTTPError as e:
+            raise StorageError(f"Upload of {path} failed: {e}") from e
+        if response.status_code >= 400:
+            raise StorageError(f"Upload of {path} failed ({response.status_code}): {response.text[:200]}")
+
+    def download(self, path):
+        """Object contents as bytes"""
+        try:
+            response = self.client.get(self._object_url(path))
+        except httpx.HTTPError as e:
+            raise StorageError(f"Download of {path} failed: {e}") from e
+        if response.status_code >= 400:
+            raise StorageError(f"Download of {path} failed ({response.status_code}): {response.text[:200]}")
+        return response.content
+
+    def public_url(self, path):
+        return f"{self.base_url}/object/public/{self.bucket}/{quote(path)}"
+
+    def close(self):
+        self.client.close()
+
+
+class LocalStorage:
+    """Directory on the local filesystem"""
+
+    def __init__(self, root=None, url_prefix=None):
+        self.root = os.path.abspath(root or Config.LOCAL_STORAGE_DIR)
+        self.url_prefix = (url_prefix or Config.LOCAL_STORAGE_URL).rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+        print(f"✅ Local storage initialized: {self.root}")
+
+    def _full_path(self, path):
+        """Absolute path of an object; refuses paths outside the storage root"""
+        full = os.path.abspath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, full]) != self.root or full == self.root:
+            raise StorageError(f"Invalid storage path: {path}")
+        return full
+
+    def upload(self, path, stream, content_type='application/octet-stream', size=None, upsert=True):
+        """Stream a file-like object (or bytes) into the directory (content_type/size unused)"""
+        full = self._full_path(path)
+        if not upsert and os.path.exists(full):
+            raise StorageError(f"Object already exists: {path}")
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if isinstance(stream, (bytes, bytearray)):
+                    out.write(stream)
+                else:
+                    for chunk in iter_chunks(stream):
+                        out.write(chunk)
+            os.replace(tmp_path, full)
+        except OSError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise StorageError(f"Upload of {path} failed: {e}") from e
+
+    def download(self, path):
+        try:
+            with open(self._full_path(path), 'rb') as f:
+                return f.read()
+        except OSError as e:
+            raise StorageError(f"Download of {path} failed: {e}") from e
+
+    def public_url(self, path):
+        return f"{self.url_prefix}/{quote(path)}"
+
+    def close(self):
+        pass
+
+
+BACKENDS = {'supabase': SupabaseStorage, 'local': LocalStorage}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """
+    The process-wide storage backend (created on first use from Config.STORAGE_BACKEND)
+
+    Raises:
+        ValueError: Unknown backend or missing Supabase configuration
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                backend = BACKENDS.get(Config.STORAGE_BACKEND)
+                if backend is None:
+                    raise ValueError(f"Unknown STORAGE_BACKEND: {Config.STORAGE_BACKEND}")
+                _storage = backend()
+    return _storage
+
+
+def reset_storage():
+    """Close and forget the current backend (the next get_storage() re-reads Config)"""
+    global _storage
+    with _storage_lock:
+        if _storage is not None:
+            _storage.close()
+        _storage = None
@@ -0,0 +1,39 @@
+"""
+Server-Sent Events Helpers
+Formatting and response wrapping for text/event-stream endpoints
+"""
+
+import json
+from flask import Response, stream_with_context
+
+
+def sse_event(event, data):
+    """Format one SSE message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream (event, data) tuples to the client as text/event-stream
+
+    The request and app context stay active while the generator runs, so it
+    can use the DB session. Proxy buffering is disabled so each event is
+    flushed as soon as it is yielded.
+
+    Args:
+        events: Iterable of (event name, JSON-serializable data)
+    """
+    def generate():
+        # Padding comment so the response headers and first bytes go out immediately
+        yield ": stream open\n\n"
+        for event, data in events:
+            yield sse_event(event, data)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -1,8 +1,16 @@
 from app import create_app
+from app.job_queue import start_job_workers
 import os
 
-# Create the Flask app instance
-app = create_app()
+# PDF extraction workers (services/pdf_extraction.py) re-import this file as
+# __mp_main__ when started with `python run.py`; they need no app of their own
+if __name__ != '__mp_main__':
+    # Create the Flask app instance
+    app = create_app()
+
+    # Background AI job workers (each gunicorn worker process runs its own pool;
+    # set AI_JOB_WORKERS=0 to run them only in a separate `python worker.py` process)
+    start_job_workers(app)
 
 if __name__ == '__main__':
     # This block only runs for local development (python run.py)
@@ -28,5 +36,7 @@ if __name__ == '__main__':
         print("Shutting down...")
         print("="*60)
         from app.background_tasks import stop_session_monitor
+        from app.job_queue import stop_job_workers
         stop_session_monitor()
+        stop_job_workers()
         print("\n✓ Shutdown complete")
\ No newline at end of file
@@ -1,44 +1,54 @@
+import hashlib
 import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db
 from app.models import CandidateAuth, MCQResult, PsychometricResult, TextAssessmentResult, CandidateRationale, CodingAssessmentResult, ProctorSession
-from services.placeholder_functions import client, clean_json_output
+from app.job_queue import pending_rationale_job, queue_rationale_job
+from services.llm_cache import cached_stream, track_usage
+from services.llm_schemas import RATIONALE_SCHEMA
+from services.llm_router import route, routed_completion, task_metrics, check_narrative, check_rationale
+from services.prompt_compaction import prompt_json, prune_resume, prune_text_grading
+from services.structured_output import parse_structured, parse_or_repair
+from services.json_stream import SectionStreamParser
 from services.coding_result_to_grading import process_coding_grading
 from services.proctor_result_to_grading import process_proctor_grading
+from services.stage_graph import StageGraph
 
-def generate_final_rationale(resume_data, mcq_score, text_remark, psychometric_analysis, coding_data, proctor_data):
+def build_final_rationale_prompt(resume_data, mcq_score, text_remark, psychometric_analysis, coding_data, proctor_data):
     """
     Inputs: Data objects/dicts from previous steps.
-    Output: JSON object with final verdict.
+    Output: Rendered prompt for the final rationale.
     """
-    prompt = f"""
+    return f"""
     Act as a Senior Technical Recruiter and Assessment Expert writing a polished candidate evaluation report.
     Your goal is to provide a comprehensive, transparent, and balanced evaluation that reads like a professional hiring committee memo.
 
     DATA PROVIDED:
 
     1. RESUME DATA:
-    {json.dumps(resume_data, indent=2) if isinstance(resume_data, dict) else resume_data}
+    {prompt_json(prune_resume(resume_data))}
 
     2. TECHNICAL SCORE (MCQ Based):
-    {json.dumps(mcq_score, indent=2) if isinstance(mcq_score, dict) else mcq_score}
+    {prompt_json(mcq_score)}
 
     3. SOFT SKILLS (Text Assessment Based):
-    {json.dumps(text_remark, indent=2) if isinstance(text_remark, dict) else text_remark}
+    {prompt_json(prune_text_grading(text_remark))}
 
     4. PSYCHOMETRIC TRAITS (For Reference Only - Do NOT grade pass/fail):
-    {json.dumps(psychometric_analysis, indent=2) if isinstance(psychometric_analysis, dict) else psychometric_analysis}
+    {prompt_json(psychometric_analysis)}
 
     5. CODING SKILLS (Sandbox Result):
-    {json.dumps(coding_data, indent=2) if isinstance(coding_data, dict) else coding_data}
+    {prompt_json(coding_data)}
 
     6. PROCTORING / INTEGRITY (Malpractice Check):
-    {json.dumps(proctor_data, indent=2) if isinstance(proctor_data, dict) else proctor_data}
+    {prompt_json(proctor_data)}
 
     INSTRUCTIONS:
     Produce a Final Rationale Report. Each "reasoning" / "summary" field must be a RICH, FLOWING NARRATIVE PARAGRAPH — not bullet points, not a single sentence.
@@ -172,29 +182,44 @@ def generate_final_rationale(resume_data, mcq_score, text_remark, psychometric_a
         }}
     }}
     """
-    
+
+def complete_final_rationale(prompt, bypass_cache=False):
+    """
+    Runs a rendered final rationale prompt.
+    Output: JSON object with final verdict ({"error": ...} on failure).
+    """
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile",
+        return routed_completion(
+            'final_rationale',
+            [{"role": "user", "content": prompt}],
+            schema=RATIONALE_SCHEMA,
+            quality=check_rationale,
+            bypass_cache=bypass_cache
         )
-        return json.loads(clean_json_output(response.choices[0].message.content))
     except Exception as e:
         print(f"Error generating rationale: {e}")
         return {"error": str(e)}
 
-def generate_psychometric_narrative(traits_data):
+def generate_final_rationale(resume_data, mcq_score, text_remark, psychometric_analysis, coding_data, proctor_data, bypass_cache=False):
+    """
+    Inputs: Data objects/dicts from previous steps.
+            bypass_cache: Force a fresh LLM call instead of the cached response
+    Output: JSON object with final verdict.
+    """
+    prompt = build_final_rationale_prompt(resume_data, mcq_score, text_remark, psychometric_analysis, coding_data, proctor_data)
+    return complete_final_rationale(prompt, bypass_cache)
+
+def build_psychometric_narrative_prompt(traits_data):
     """
-    Uses a smaller, faster model (Llama-3 8b) to convert raw trait scores into a readable paragraph.
     Input: Dict of traits {'extraversion': 3.5, ...}
-    Output: String (paragraph)
+    Output: Rendered prompt for the psychometric narrative.
     """
-    prompt = f"""
+    return f"""
     Act as an Industrial-Organizational Psychologist.
     Convert the following Big Five personality trait scores (0-5 scale) into a single, professional, easy-to-read paragraph summarizing the candidate's personality profile.
     
     TRAIT SCORES:
-    {json.dumps(traits_data, indent=2)}
+    {prompt_json(traits_data)}
     
     GUIDELINES:
     - Do NOT list the scores numbers in the text.
@@ -203,23 +228,433 @@ def generate_psychometric_narrative(traits_data):
     - Keep it under 80 words.
     - Return ONLY the paragraph text. No JSON, no intro.
     """
-    
+
+def complete_psychometric_narrative(prompt, bypass_cache=False):
+    """
+    Runs a rendered psychometric narrative prompt.
+    Output: String (paragraph), or a fallback sentence on failure.
+    """
     try:
-        # User requested 70b for better quality even for summary if possible, but 8b is fast.
-        # User said "use 70b model for generating output instead of 8b" generally.
-        # Let's switch this to 70b as well to be safe and high quality.
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile", 
+        return routed_completion(
+            'psychometric_narrative',
+            [{"role": "user", "content": prompt}],
+            parse=str.strip,
+            quality=check_narrative,
+            bypass_cache=bypass_cache
         )
-        return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"Error generating psychometric narrative: {e}")
         return "Psychometric analysis available but narrative generation failed."
 
-def process_ai_rationale(candidate_id, app_instance=None):
+def generate_psychometric_narrative(traits_data, bypass_cache=False):
+    """
+    Uses a smaller, faster model (Llama-3 8b) to convert raw trait scores into a readable paragraph.
+    Input: Dict of traits {'extraversion': 3.5, ...}
+           bypass_cache: Force a fresh LLM call instead of the cached response
+    Output: String (paragraph)
+    """
+    return complete_psychometric_narrative(build_psychometric_narrative_prompt(traits_data), bypass_cache)
+
+def rationale_input_hash(prompts):
+    """
+    Fingerprint of everything the rationale is generated from.
+    Hashes the fully rendered prompts and the model each is routed to, so data
+    changes, prompt edits and routing changes all change it.
+    Input: Dict {stage name: rendered prompt}
+    Output: SHA-256 hex string
+    """
+    routed = {stage: [route(stage, [{"role": "user", "content": prompt}]), prompt] for stage, prompt in prompts.items()}
+    return hashlib.sha256(json.dumps(routed, sort_keys=True).encode('utf-8')).hexdigest()
+
+def load_rationale_inputs(candidate_id, app):
+    """
+    Loads the raw score data the rationale prompts are built from.
+    Must be called inside an app context.
+
+    Output: Dict of inputs (see add_prompt_stages), or None if the candidate does not exist.
+            Coding and proctor data are zero-argument callables, since missing
+            gradings are computed on the fly.
+    """
+    print(f"🔄 Fetching raw score data for Candidate {candidate_id}...")
+
+    # 1. Resume Data
+    candidate = CandidateAuth.query.get(candidate_id)
+    if not candidate:
+         print(f"❌ Candidate {candidate_id} not found.")
+         return None
+    resume_data = candidate.resume_data if candidate.resume_data else {"error": "Resume data not processed yet."}
+
+    # 2. MCQ Data (Raw Score)
+    mcq_result = MCQResult.query.filter_by(student_id=candidate_id).first()
+    if mcq_result:
+        mcq_data = {
+            "percentage": mcq_result.percentage_correct,
+            "correct": mcq_result.correct_answers,
+            "total": mcq_result.correct_answers + mcq_result.wrong_answers
+        }
+    else:
+        mcq_data = {"percentage": 0, "error": "MCQ not taken."}
+
+    # 3. Psychometric Data (Raw Traits)
+    psycho_result = PsychometricResult.query.filter_by(student_id=candidate_id).first()
+    if psycho_result:
+        # Map 0-50 scores to 0-5 for clarity in prompt. No population percentiles: they shift
+        # with every submission and would change every stored input hash (shown at display time instead)
+        psycho_data = {
+            "extraversion": round(psycho_result.extraversion / 10, 1),
+            "agreeableness": round(psycho_result.agreeableness / 10, 1),
+            "conscientiousness": round(psycho_result.conscientiousness / 10, 1),
+            "emotional_stability": round(psycho_result.emotional_stability / 10, 1),
+            "intellect_imagination": round(psycho_result.intellect_imagination / 10, 1)
+        }
+    else:
+        psycho_data = None
+
+    # 4. Text Assessment Data (Grading JSON directly)
+    text_result = TextAssessmentResult.query.filter_by(candidate_id=candidate_id).first()
+    text_data = text_result.grading_json if text_result and text_result.grading_json else {"error": "Text responses not graded yet."}
+
+    # 5. Coding Data
+    coding_result = CodingAssessmentResult.query.filter_by(candidate_id=candidate_id).first()
+    if coding_result and coding_result.grading_json:
+        coding_data = coding_result.grading_json
+        coding = lambda: coding_data
+    else:
+        # Try grading on the fly if missing
+        coding = lambda: process_coding_grading(candidate_id, app) or {"error": "Coding not submitted."}
+
+    # 6. Proctor Data
+    # Fetch latest session to check grading
+    last_session = ProctorSession.query.filter_by(candidate_id=candidate_id).order_by(ProctorSession.start_time.desc()).first()
+    if last_session and last_session.grading_json:
+        proctor_data = last_session.grading_json
+        proctor = lambda: proctor_data
+    else:
+        proctor = lambda: process_proctor_grading(candidate_id, app) or {"severity": "Unknown", "remark": "No session data."}
+
+    return {
+        "resume": resume_data,
+        "mcq": mcq_data,
+        "psychometric": psycho_data,
+        "text": text_data,
+        "coding": coding,
+        "proctor": proctor,
+        "rationale_record": CandidateRationale.query.filter_by(candidate_id=candidate_id).first()
+    }
+
+def render_narrative_prompt(inputs):
+    """
+    Renders the psychometric narrative prompt from the loaded inputs.
+    Readable Psychometric Summary only needs the trait scores, so this never
+    waits for the coding or proctor grading.
+    Output: Prompt string, or None if the psychometric test was not taken.
+    """
+    psycho_data = inputs["psychometric"]
+    return build_psychometric_narrative_prompt(psycho_data) if psycho_data else None
+
+def add_prompt_stages(graph, inputs, skip_unchanged=False):
+    """
+    Adds the 'coding', 'proctor', 'narrative_prompt' and 'prompts' stages to a StageGraph.
+    The 'narrative_prompt' stage depends on nothing, so the narrative LLM call can start at once.
+    The 'prompts' stage result is {"prompts": {stage: prompt}, "input_hash": str, "unchanged": bool}.
+    """
+    rationale_record = inputs["rationale_record"]
+    stored_hash = rationale_record.input_hash if rationale_record and rationale_record.rationale_json else None
+    psycho_data = inputs["psychometric"]
+
+    def render_prompts(coding, proctor, narrative_prompt):
+        prompts = {'final_rationale': build_final_rationale_prompt(
+            inputs["resume"], inputs["mcq"], inputs["text"],
+            psycho_data or {"error": "Psychometric not taken."}, coding, proctor
+        )}
+        if narrative_prompt:
+            prompts['psychometric_narrative'] = narrative_prompt
+        input_hash = rationale_input_hash(prompts)
+        return {'prompts': prompts, 'input_hash': input_hash, 'unchanged': skip_unchanged and input_hash == stored_hash}
+
+    graph.add('coding', inputs["coding"])
+    graph.add('proctor', inputs["proctor"])
+    graph.add('narrative_prompt', lambda: render_narrative_prompt(inputs))
+    graph.add('prompts', render_prompts, deps=['coding', 'proctor', 'narrative_prompt'])
+
+def inject_psychometric_narrative(rationale_data, psycho_narrative):
+    """Puts the narrative into the rationale's psychometric_evaluation section (in place)."""
+    if "psychometric_evaluation" in rationale_data:
+        # Replacing 'reasoning' as that's what is displayed on the frontend.
+        rationale_data["psychometric_evaluation"]["reasoning"] = psycho_narrative
+    else:
+         rationale_data["psychometric_evaluation"] = {
+             "grade": "Insight",
+             "reasoning": psycho_narrative
+         }
+
+def generate_rationale(candidate_id, app, bypass_cache=False, skip_unchanged=False):
+    """
+    Loads all candidate data, generates the rationale and saves it to DB.
+    Must be called inside an app context.
+
+    Inputs:
+        candidate_id: Candidate to analyze
+        app: Flask app (pipeline stages run in their own app contexts)
+        bypass_cache: Force fresh LLM calls instead of cached responses
+        skip_unchanged: Return the stored rationale without calling the LLM if the
+                        rendered prompts (data + templates) match the stored input_hash
+
+    Output: (rationale_data, status) where status is "generated", "skipped", "failed" or "not_found"
+            ("failed" returns the {"error": ...} data and leaves the stored rationale untouched)
+    """
+    load_started = time.perf_counter()
+    inputs = load_rationale_inputs(candidate_id, app)
+    if inputs is None:
+        return None, "not_found"
+    rationale_record = inputs["rationale_record"]
+
+    # Independent stages run concurrently; the final rationale waits only for
+    # the coding and proctor grading that feeds its prompt, the narrative only
+    # for the trait scores.
+    graph = StageGraph(app)
+    add_prompt_stages(graph, inputs, skip_unchanged)
+    graph.add(
+        'final_rationale',
+        lambda prompts: None if prompts['unchanged'] else complete_final_rationale(prompts['prompts']['final_rationale'], bypass_cache),
+        deps=['prompts']
+    )
+    if inputs["psychometric"] and skip_unchanged:
+        # Whether anything changed is only known once every prompt is rendered;
+        # skipping unchanged candidates saves the narrative call too.
+        graph.add(
+            'psychometric_narrative',
+            lambda prompts: None if prompts['unchanged'] else complete_psychometric_narrative(prompts['prompts']['psychometric_narrative'], bypass_cache),
+            deps=['prompts']
+        )
+    elif inputs["psychometric"]:
+        graph.add(
+            'psychometric_narrative',
+            lambda narrative_prompt: complete_psychometric_narrative(narrative_prompt, bypass_cache),
+            deps=['narrative_prompt']
+        )
+
+    load_ms = round((time.perf_counter() - load_started) * 1000, 1)
+
+    print("🤖 Generating Final Rationale and Psychometric Narrative (in parallel)...")
+    results = graph.run(started_at=load_started)
+
+    if results['prompts']['unchanged']:
+        print(f"⏭️ Inputs unchanged for Candidate {candidate_id}, keeping stored rationale")
+        return rationale_record.rationale_json, "skipped"
+
+    rationale_data = results['final_rationale']
+
+    if results.get('psychometric_narrative') is not None:
+        # Inject into the main rationale JSON
+        inject_psychometric_narrative(rationale_data, results['psychometric_narrative'])
+
+    stage_timings = {'load': {'start_ms': 0.0, 'duration_ms': load_ms}, **graph.timings}
+    print("⏱️ Rationale stage timings (ms): " + ", ".join(
+        f"{name}={timing['duration_ms']}" for name, timing in stage_timings.items()
+    ))
+
+    if 'error' in rationale_data:
+        # Keep the stored rationale; only make sure the next run does not skip this candidate
+        if rationale_record and rationale_record.input_hash:
+            rationale_record.input_hash = None
+            db.session.commit()
+        print(f"❌ Rationale generation failed for Candidate {candidate_id}, keeping stored rationale")
+        return rationale_data, "failed"
+
+    # Save to DB
+    if not rationale_record:
+        rationale_record = CandidateRationale(candidate_id=candidate_id)
+        db.session.add(rationale_record)
+
+    rationale_record.rationale_json = rationale_data
+    rationale_record.stage_timings = stage_timings
+    rationale_record.input_hash = results['prompts']['input_hash']
+    db.session.commit()
+    print(f"✅ Final Rationale saved for Candidate {candidate_id}")
+    return rationale_data, "generated"
+
+def stream_rationale(candidate_id, app, bypass_cache=False, include_text=True):
+    """
+    Generates the rationale while streaming the model output.
+    Must be called inside an app context that outlives the generator.
+
+    Every completed top-level section ("resume_fit", "technical_evaluation", ...)
+    is parsed as soon as its closing brace arrives and sent to the client. The
+    stored rationale is only replaced once the whole rationale (with its final
+    decision) is parsed, in one commit, so the previous rationale stays intact
+    until then. If the generation fails or the client disconnects first, an
+    AI_RATIONALE job is queued to finish the work.
+
+    While an AI_RATIONALE job of the candidate is queued or running, nothing is
+    generated (the two would overwrite each other): a single "queued" event
+    points at that job.
+
+    Inputs:
+        candidate_id: Candidate to analyze
+        app: Flask app
+        bypass_cache: Force a fresh LLM call instead of the cached response
+        include_text: Include raw text chunks and section contents in the events
+                      (False = progress only: section names and final status)
+
+    Yields: (event, data) tuples:
+        ("started", {"candidate_id"})                     immediately
+        ("stage", {"name": "inputs_ready", "elapsed_ms"}) prompts rendered
+        ("token", {"text"})                               raw text (include_text only)
+        ("section", {"name", "value"?})                   section parsed
+        ("done", {"status": "generated" | "queued", "sections", "elapsed_ms"})
+        ("error", {"message"})                            candidate missing / generation failed
+        ("queued", {"rationale_status", "job_id"})        a job generates (or finishes) the rationale
+    """
+    started = time.perf_counter()
+
+    def elapsed_ms():
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    def hand_over(reason):
+        """Queue the background job to generate what this stream could not"""
+        db.session.rollback()
+        job = queue_rationale_job(candidate_id)
+        print(f"⚠️ Streamed rationale for Candidate {candidate_id} not finished ({reason}), queued job {job.id}")
+        return job
+
+    pending_job = pending_rationale_job(candidate_id)
+    try:
+        yield "started", {"candidate_id": candidate_id}
+        if pending_job:
+            yield "queued", {"rationale_status": pending_job.status, "job_id": pending_job.id}
+            return
+
+        inputs = load_rationale_inputs(candidate_id, app)
+        if inputs is None:
+            yield "error", {"message": "Candidate not found"}
+            return
+
+        # The short narrative only needs the trait scores: it starts before the
+        # coding and proctor grading and runs alongside the streamed rationale
+        narrative_prompt = render_narrative_prompt(inputs)
+
+        def narrative():
+            with app.app_context():
+                return complete_psychometric_narrative(narrative_prompt, bypass_cache)
+
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='narrative')
+        narrative_future = pool.submit(narrative) if narrative_prompt else None
+        narrative_started = elapsed_ms()
+
+        graph = StageGraph(app)
+        add_prompt_stages(graph, inputs)
+        try:
+            results = graph.run(started_at=started)
+            prompts = results['prompts']
+            stage_timings = dict(graph.timings)
+            yield "stage", {"name": "inputs_ready", "elapsed_ms": elapsed_ms()}
+        except BaseException:
+            pool.shutdown(wait=False)
+            raise
+
+        messages = [{"role": "user", "content": prompts['prompts']['final_rationale']}]
+        model = route('final_rationale', messages)
+        print(f"🤖 Streaming Final Rationale for Candidate {candidate_id} ({model})...")
+        parser = SectionStreamParser()
+        partial = {}
+        rationale_started = elapsed_ms()
+        first_token_ms = None
+        error = None
+        with track_usage() as usage:
+            try:
+                try:
+                    for chunk in cached_stream(
+                        messages,
+                        model=model,
+                        parse=lambda text: parse_structured(text, RATIONALE_SCHEMA),
+                        bypass_cache=bypass_cache
+                    ):
+                        if first_token_ms is None:
+                            first_token_ms = elapsed_ms()
+                        if include_text:
+                            yield "token", {"text": chunk}
+
+                        for name, value in parser.feed(chunk):
+                            if name == "psychometric_evaluation" and narrative_future and narrative_future.done() and isinstance(value, dict):
+                                value["reasoning"] = narrative_future.result()
+                            partial[name] = value
+                            yield "section", {"name": name, "value": value} if include_text else {"name": name}
+                except Exception as e:
+                    print(f"Error streaming rationale: {e}")
+                    error = str(e)
+
+                if error is None:
+                    try:
+                        # Malformed or invalid sections are re-prompted on their own
+                        rationale_data = parse_or_repair(parser.text, RATIONALE_SCHEMA, model)
+                    except ValueError as e:
+                        error = f"Invalid rationale JSON: {e}"
+
+                if error is None:
+                    if narrative_future:
+                        inject_psychometric_narrative(rationale_data, narrative_future.result())
+                        stage_timings['psychometric_narrative'] = {'start_ms': narrative_started, 'duration_ms': round(elapsed_ms() - narrative_started, 1)}
+
+                    # Sections that were repaired (or got the narrative late) since they were streamed
+                    for name, value in rationale_data.items():
+                        if partial.get(name) != value:
+                            yield "section", {"name": name, "value": value} if include_text else {"name": name}
+            finally:
+                pool.shutdown(wait=False)
+
+        task_metrics.record(
+            'final_rationale', model, (elapsed_ms() - rationale_started) / 1000, usage,
+            failed=error is not None, problems=None if error else check_rationale(rationale_data)
+        )
+
+        if error is not None:
+            # The stored rationale is left as it was; the job generates a complete one
+            job = hand_over(error)
+            yield "error", {"message": error}
+            yield "queued", {"rationale_status": job.status, "job_id": job.id}
+            yield "done", {"status": "queued", "sections": list(partial.keys()), "elapsed_ms": elapsed_ms()}
+            return
+
+        stage_timings['final_rationale'] = {
+            'start_ms': rationale_started,
+            'duration_ms': round(elapsed_ms() - rationale_started, 1),
+            'first_token_ms': first_token_ms
+        }
+        stage_timings['total'] = {'start_ms': 0.0, 'duration_ms': elapsed_ms()}
+
+        # Replace the stored rationale in one commit, only now that it is complete
+        rationale_record = inputs["rationale_record"]
+        if not rationale_record:
+            rationale_record = CandidateRationale(candidate_id=candidate_id)
+            db.session.add(rationale_record)
+        rationale_record.rationale_json = rationale_data
+        rationale_record.stage_timings = stage_timings
+        rationale_record.input_hash = prompts['input_hash']
+        db.session.commit()
+    except GeneratorExit:
+        # Client disconnected: nothing was written, a job finishes the rationale
+        if not pending_job:
+            hand_over("client disconnected")
+        raise
+    except Exception as e:
+        print(f"Error generating streamed rationale: {e}")
+        job = hand_over(str(e))
+        yield "error", {"message": str(e)}
+        yield "queued", {"rationale_status": job.status, "job_id": job.id}
+        return
+
+    print(f"✅ Streamed Final Rationale saved for Candidate {candidate_id} (first token at {first_token_ms} ms)")
+    yield "done", {
+        "status": "generated",
+        "sections": list(rationale_data.keys()),
+        "elapsed_ms": elapsed_ms()
+    }
+
+def process_ai_rationale(candidate_id, app_instance=None, bypass_cache=False):
     """
     Fetches all candidate data, generates rationale, and saves to DB.
+    Identical inputs are served from the LLM response cache unless bypass_cache is set.
     """
     # Use provided app instance or create new one
     app = app_instance if app_instance else create_app()
@@ -230,93 +665,11 @@ def process_ai_rationale(candidate_id, app_instance=None):
         context.push()
 
     try:
-        print(f"🔄 Fetching raw score data for Candidate {candidate_id}...")
-        
-        # 1. Resume Data
-        candidate = CandidateAuth.query.get(candidate_id)
-        if not candidate:
-             print(f"❌ Candidate {candidate_id} not found.")
-             return None
-        resume_data = candidate.resume_data if candidate.resume_data else {"error": "Resume data not processed yet."}
-        
-        # 2. MCQ Data (Raw Score)
-        mcq_result = MCQResult.query.filter_by(student_id=candidate_id).first()
-        if mcq_result:
-            mcq_data = {
-                "percentage": mcq_result.percentage_correct,
-                "correct": mcq_result.correct_answers,
-                "total": mcq_result.correct_answers + mcq_result.wrong_answers
-            }
-        else:
-            mcq_data = {"percentage": 0, "error": "MCQ not taken."}
-        
-        # 3. Psychometric Data (Raw Traits)
-        psycho_result = PsychometricResult.query.filter_by(student_id=candidate_id).first()
-        if psycho_result:
-            # Map 0-50 scores to 0-5 for clarity in prompt
-            psycho_data = {
-                "extraversion": round(psycho_result.extraversion / 10, 1),
-                "agreeableness": round(psycho_result.agreeableness / 10, 1),
-                "conscientiousness": round(psycho_result.conscientiousness / 10, 1),
-                "emotional_stability": round(psycho_result.emotional_stability / 10, 1),
-                "intellect_imagination": round(psycho_result.intellect_imagination / 10, 1)
-            }
-        else:
-            psycho_data = {"error": "Psychometric not taken."}
-        
-        # 4. Text Assessment Data (Grading JSON directly)
-        text_result = TextAssessmentResult.query.filter_by(candidate_id=candidate_id).first()
-        text_data = text_result.grading_json if text_result and text_result.grading_json else {"error": "Text responses not graded yet."}
-
-        # 5. Coding Data
-        coding_result = CodingAssessmentResult.query.filter_by(candidate_id=candidate_id).first()
-        if coding_result and coding_result.grading_json:
-             coding_data = coding_result.grading_json
-        else:
-             # Try grading on the fly if missing
-             coding_data = process_coding_grading(candidate_id, app) or {"error": "Coding not submitted."}
-
-        # 6. Proctor Data
-        # Fetch latest session to check grading
-        last_session = ProctorSession.query.filter_by(candidate_id=candidate_id).order_by(ProctorSession.start_time.desc()).first()
-        if last_session and last_session.grading_json:
-            proctor_data = last_session.grading_json
-        else:
-            proctor_data = process_proctor_grading(candidate_id, app) or {"severity": "Unknown", "remark": "No session data."}
-
-        
-        print("🤖 Generating Final Rationale (Llama-70b)...")
-        rationale_data = generate_final_rationale(resume_data, mcq_data, text_data, psycho_data, coding_data, proctor_data)
-        
-        # 5. Generate Readable Psychometric Summary (Llama-8b)
-        if psycho_result:
-            print("🧠 Generating Psychometric Narrative (Llama-8b)...")
-            psycho_narrative = generate_psychometric_narrative(psycho_data)
-            
-            # Inject into the main rationale JSON
-            if "psychometric_evaluation" in rationale_data:
-                rationale_data["psychometric_evaluation"]["reasoning"] = psycho_narrative
-                # Or keep the old reasoning and add this as summary? 
-                # User request: "converts it into a neat formal paragraph which is easily readable"
-                # Replacing 'reasoning' seems best as that's what is displayed on the frontend.
-            else:
-                 rationale_data["psychometric_evaluation"] = {
-                     "grade": "Insight",
-                     "reasoning": psycho_narrative
-                 }
-        
-        # Save to DB
-        rationale_record = CandidateRationale.query.filter_by(candidate_id=candidate_id).first()
-        if not rationale_record:
-            rationale_record = CandidateRationale(candidate_id=candidate_id)
-            db.session.add(rationale_record)
-            
-        rationale_record.rationale_json = rationale_data
-        db.session.commit()
-        print(f"✅ Final Rationale saved for Candidate {candidate_id}")
+        rationale_data, status = generate_rationale(candidate_id, app, bypass_cache=bypass_cache)
         return rationale_data
         
     except Exception as e:
+        db.session.rollback()
         print(f"Error in process_ai_rationale: {e}")
         return None
     finally:
@@ -0,0 +1,129 @@
+"""
+Proctoring Event Archival
+Moves old proctoring events out of the live `proctoring_violations` table.
+
+proctoring_violations grows with every tab switch of every candidate, and
+the live queries (session summary, per-candidate grading) only need recent
+sessions. Events older than Config.PROCTOR_RETENTION_DAYS whose session is
+no longer active are moved to `proctoring_violations_archive` in batches
+of Config.PROCTOR_ARCHIVE_BATCH_SIZE (INSERT ... SELECT + DELETE, one
+transaction per batch), so the live table and its indexes stay bounded by
+the retention window. The session summary endpoint still returns archived
+events of ended sessions.
+
+Run it periodically (e.g. a nightly cron job); an interrupted run simply
+continues on the next run:
+    python services/archive_proctoring.py [--days 90] [--batch-size 5000] [--dry-run]
+    python services/archive_proctoring.py --purge-archive-days 730   # also delete archived events older than 2 years
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, exists, and_
+from app import create_app, db
+from app.config import Config
+from app.models import ProctoringViolation, ProctoringViolationArchive, ProctorSession
+
+ARCHIVED_COLUMNS = ('id', 'session_id', 'candidate_id', 'violation_type', 'violation_data', 'timestamp', 'severity')
+
+
+def archivable_ids(cutoff, after_id, limit):
+    """IDs of events older than cutoff whose session is not active, in ID order"""
+    active_session = exists().where(and_(
+        ProctorSession.session_uuid == ProctoringViolation.session_id,
+        ProctorSession.status == 'active'
+    ))
+    query = (select(ProctoringViolation.id)
+             .where(ProctoringViolation.id > after_id,
+                    ProctoringViolation.timestamp < cutoff,
+                    ~active_session)
+             .order_by(ProctoringViolation.id)
+             .limit(limit))
+    return [row[0] for row in db.session.execute(query)]
+
+
+def archive_batch(ids):
+    """Copy the events to the archive and delete them from the live table (one transaction)"""
+    live = ProctoringViolation.__table__
+    archive = ProctoringViolationArchive.__table__
+    now = datetime.utcnow()
+    columns = [live.c[name] for name in ARCHIVED_COLUMNS]
+    db.session.execute(archive.insert().from_select(
+        list(ARCHIVED_COLUMNS) + ['archived_at'],
+        select(*columns, db.literal(now)).where(live.c.id.in_(ids))
+    ))
+    db.session.execute(live.delete().where(live.c.id.in_(ids)))
+    db.session.commit()
+
+
+def archive_events(days=None, batch_size=None, dry_run=False):
+    """
+    Move every archivable event
+
+    Returns:
+        dict: {"cutoff": str, "archived": int, "batches": int}
+    """
+    days = Config.PROCTOR_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or Config.PROCTOR_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    archived = batches = 0
+    last_id = 0
+    while True:
+        ids = archivable_ids(cutoff, last_id, batch_size)
+        if not ids:
+            break
+        last_id = ids[-1]
+        if not dry_run:
+            archive_batch(ids)
+        archived += len(ids)
+        batches += 1
+        print(f"📦 {'Would archive' if dry_run else 'Archived'} {archived} events (up to ID {last_id})")
+    return {'cutoff': cutoff.isoformat(), 'archived': archived, 'batches': batches}
+
+
+def purge_archive(days, batch_size=None):
+    """Delete archived events older than `days`; returns the number deleted"""
+    batch_size = batch_size or Config.PROCTOR_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    archive = ProctoringViolationArchive.__table__
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.session.execute(
+            select(archive.c.id).where(archive.c.timestamp < cutoff).limit(batch_size)
+        )]
+        if not ids:
+            break
+        db.session.execute(archive.delete().where(archive.c.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old proctoring events")
+    parser.add_argument('--days', type=int, default=None, help="Retention in days (default: PROCTOR_RETENTION_DAYS)")
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help="Count the events without moving them")
+    parser.add_argument('--purge-archive-days', type=int, default=None,
+                        help="Also delete archived events older than this many days")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        result = archive_events(args.days, args.batch_size, args.dry_run)
+        print(f"🏁 {result['archived']} events before {result['cutoff']} "
+              f"{'archivable' if args.dry_run else 'archived'} in {time.perf_counter() - started:.1f}s")
+        if args.purge_archive_days is not None and not args.dry_run:
+            deleted = purge_archive(args.purge_archive_days, args.batch_size)
+            print(f"🗑️ Deleted {deleted} archived events older than {args.purge_archive_days} days")
+
+
+if __name__ == "__main__":
+    main()
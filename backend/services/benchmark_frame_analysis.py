@@ -0,0 +1,190 @@
+"""
+Benchmark proctoring frame analysis latency against the 100 ms p95 budget.
+Usage: python3 benchmark_frame_analysis.py [--images DIR] [--frames 300] [--width 640] [--height 480]
+                                           [--quality 80] [--weights PATH] [--budget-ms 100]
+                                           [--concurrency 16 --sessions 50 --repeat-rate 0.6]
+  - Runs app/services/ai_service.py in-process on base64 JPEG frames, the
+    way /api/proctor/analyze-frame receives them (decode + detection)
+  - --images uses the .jpg/.png files of a directory (e.g. saved webcam
+    frames); otherwise synthetic webcam-sized frames are generated
+  - --weights overrides FRAME_DETECTOR_WEIGHTS (without weights only the
+    face detector runs)
+  - Reports the first call (detector loading) separately, then p50/p95/p99
+    and whether p95 is within --budget-ms; exits with status 1 if it is not
+  - --concurrency N instead sends the frames from N threads through
+    analyze_frame, the route's path: --sessions webcams, each resending its
+    previous frame with probability --repeat-rate (a candidate sitting
+    still). Reports end-to-end latency, throughput, the share of
+    de-duplicated frames, detector batch sizes and the largest sampling
+    interval suggested to clients (no budget check: waiting is expected)
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 1) if values else None
+
+
+def synthetic_frames(count, width, height, quality):
+    """Webcam-like JPEGs: gradient background, a face-sized ellipse, sensor noise"""
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(42)
+    frames = []
+    for i in range(min(count, 16)):
+        x = np.linspace(60, 200, width, dtype=np.float32)
+        frame = np.repeat(np.tile(x, (height, 1))[:, :, None], 3, axis=2)
+        center = (width // 2 + int(rng.integers(-60, 60)), height // 2 + int(rng.integers(-40, 40)))
+        cv2.ellipse(frame, center, (width // 8, height // 5), 0, 0, 360, (140, 160, 200), -1)
+        frame = np.clip(frame + rng.normal(0, 8, frame.shape), 0, 255).astype(np.uint8)
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(base64.b64encode(jpeg.tobytes()).decode())
+    return frames
+
+
+def directory_frames(path):
+    frames = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+            with open(os.path.join(path, name), 'rb') as f:
+                frames.append(base64.b64encode(f.read()).decode())
+    return frames
+
+
+def run_concurrent(frames, args):
+    """Frames from --sessions webcams sent by --concurrency threads through analyze_frame"""
+    from app.services.ai_service import analyze_frame, get_frame_batcher, FrameQueueFullError
+
+    rng = random.Random(42)
+    jobs = []
+    last = {}
+    for i in range(args.frames):
+        session = f"bench-{i % args.sessions}"
+        if session not in last or rng.random() >= args.repeat_rate:
+            last[session] = frames[rng.randrange(len(frames))]
+        jobs.append((session, last[session]))
+
+    latencies, results, rejected = [], [], [0]
+    lock = threading.Lock()
+    next_job = iter(jobs)
+
+    def worker():
+        while True:
+            with lock:
+                job = next(next_job, None)
+            if job is None:
+                return
+            started = time.perf_counter()
+            try:
+                result = analyze_frame(job[1], session_id=job[0])
+            except FrameQueueFullError:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                results.append(result)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    batcher = get_frame_batcher()
+    batches = batcher.stats if batcher else None
+    analyzed = [r for r in results if not r['deduplicated']]
+    return {
+        'concurrency': args.concurrency,
+        'sessions': args.sessions,
+        'repeat_rate': args.repeat_rate,
+        'latency_ms': {'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95),
+                       'p99': percentile(latencies, 0.99)},
+        'frames_per_second': round(len(results) / elapsed, 1),
+        'deduplicated': round(1 - len(analyzed) / max(len(results), 1), 3),
+        'rejected': rejected[0],
+        'batches': batches,
+        'mean_batch_size': round(batches['frames'] / max(batches['batches'], 1), 2) if batches else None,
+        'max_interval_ms': max((r['sampling']['interval_ms'] for r in results), default=None)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proctoring frame analysis latency")
+    parser.add_argument('--images', default=None, help="Directory of frames to analyze")
+    parser.add_argument('--frames', type=int, default=300, help="Frames analyzed (cycling through the inputs)")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--quality', type=int, default=80, help="JPEG quality of synthetic frames")
+    parser.add_argument('--weights', default=None, help="Object detector weights (default: FRAME_DETECTOR_WEIGHTS)")
+    parser.add_argument('--budget-ms', type=float, default=100)
+    parser.add_argument('--concurrency', type=int, default=0, help="Threads sending frames through analyze_frame (0 = direct analyzer calls)")
+    parser.add_argument('--sessions', type=int, default=50, help="Webcams simulated with --concurrency")
+    parser.add_argument('--repeat-rate', type=float, default=0.6, help="Chance a webcam resends its previous frame")
+    args = parser.parse_args()
+
+    from app.config import Config
+    if args.weights:
+        Config.FRAME_DETECTOR_WEIGHTS = args.weights
+    from app.services.ai_service import get_frame_analyzer
+
+    frames = directory_frames(args.images) if args.images else synthetic_frames(args.frames, args.width, args.height, args.quality)
+    if not frames:
+        print(f"❌ No .jpg/.png frames in {args.images}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    analyzer = get_frame_analyzer()
+    analyzer.analyze(frames[0])
+    first_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if args.concurrency > 0:
+        report = run_concurrent(frames, args)
+        report.update({'frames': args.frames, 'detectors': analyzer.detectors, 'first_call_ms': first_ms})
+        print(json.dumps(report, indent=2))
+        return
+
+    latencies = []
+    detections = {'face_detected': 0, 'multiple_faces': 0, 'looking_away': 0, 'phone_detected': 0}
+    for i in range(args.frames):
+        started = time.perf_counter()
+        result = analyzer.analyze(frames[i % len(frames)])
+        latencies.append(time.perf_counter() - started)
+        for key in detections:
+            detections[key] += bool(result[key])
+
+    p95 = percentile(latencies, 0.95)
+    report = {
+        'frames': args.frames,
+        'inputs': len(frames),
+        'detectors': analyzer.detectors,
+        'analysis_width': Config.FRAME_ANALYSIS_WIDTH,
+        'opencv_threads': Config.FRAME_ANALYSIS_THREADS,
+        'first_call_ms': first_ms,
+        'latency_ms': {'p50': percentile(latencies, 0.5), 'p95': p95, 'p99': percentile(latencies, 0.99),
+                       'max': round(max(latencies) * 1000, 1)},
+        'frames_per_second': round(len(latencies) / sum(latencies), 1),
+        'detections': detections,
+        'within_budget': p95 <= args.budget_ms
+    }
+    print(json.dumps(report, indent=2))
+    if not report['within_budget']:
+        print(f"❌ p95 {p95} ms exceeds the {args.budget_ms} ms budget")
+        sys.exit(1)
+    print(f"✅ p95 {p95} ms within the {args.budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Benchmark the hot proctoring queries with and without the proctoring indexes.
+Usage: python3 benchmark_proctoring_queries.py [--database-url URL] [--events 1000000]
+                                               [--sessions 20000] [--candidates 5000] [--repeat 200]
+  - Builds the proctoring tables in a scratch database (default: a temporary
+    SQLite file; pass a Postgres URL of an EMPTY scratch database for
+    production-like numbers - existing proctoring tables are refused) and
+    fills them with --events violations across --sessions sessions
+  - Times each query --repeat times with random parameters, first with only
+    the primary keys/unique constraints, then after creating the indexes
+    declared on ProctorSession and ProctoringViolation (index build time is
+    reported too)
+  - Reports p50/p95 in ms per query and phase; the tables are dropped at the
+    end unless --keep
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, select, func, exists, and_, desc
+
+CHUNK_ROWS = 10000
+EVENT_TYPES = ['tab_switch', 'tab_switch', 'tab_switch', 'looking_away', 'looking_away', 'no_face', 'multiple_faces', 'phone_detected']
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 2) if values else None
+
+
+def populate(engine, tables, args, rng):
+    """Candidates, sessions (~5% active) and violations spread over the last year"""
+    candidates, sessions, violations = tables['candidate_auth'], tables['proctor_sessions'], tables['proctoring_violations']
+    now = datetime.utcnow()
+    session_rows = []
+    with engine.begin() as conn:
+        conn.execute(candidates.insert(), [
+            {'id': i, 'email': f"bench{i}@example.com", 'password': 'x'} for i in range(1, args.candidates + 1)
+        ])
+        for i in range(1, args.sessions + 1):
+            start = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+            active = rng.random() < 0.05
+            session_rows.append({
+                'id': i,
+                'candidate_id': rng.randint(1, args.candidates),
+                'session_uuid': str(uuid.UUID(int=rng.getrandbits(128))),
+                'start_time': start,
+                'end_time': None if active else start + timedelta(minutes=60),
+                'status': 'active' if active else rng.choice(['completed', 'completed', 'terminated']),
+                'last_activity': start + timedelta(minutes=rng.randint(0, 60)),
+                'is_suspended': False
+            })
+        for offset in range(0, len(session_rows), CHUNK_ROWS):
+            conn.execute(sessions.insert(), session_rows[offset:offset + CHUNK_ROWS])
+
+    written = 0
+    while written < args.events:
+        chunk = []
+        for i in range(written + 1, min(written + CHUNK_ROWS, args.events) + 1):
+            session = session_rows[rng.randrange(len(session_rows))]
+            chunk.append({
+                'id': i,
+                'session_id': session['session_uuid'],
+                'candidate_id': session['candidate_id'],
+                'violation_type': rng.choice(EVENT_TYPES),
+                'violation_data': None,
+                'timestamp': session['start_time'] + timedelta(seconds=rng.randint(0, 3600)),
+                'severity': 'medium'
+            })
+        with engine.begin() as conn:
+            conn.execute(violations.insert(), chunk)
+        written += len(chunk)
+        print(f"  ... {written}/{args.events} events", end='\r')
+    print()
+    return session_rows
+
+
+def hot_queries(tables):
+    """name -> function(conn, session_row, rng) running one query as the app does"""
+    sessions, violations = tables['proctor_sessions'], tables['proctoring_violations']
+    archive_batch = 5000
+
+    def session_summary(conn, s, rng):
+        # ProctorService.get_session_summary
+        return conn.execute(select(violations).where(violations.c.session_id == s['session_uuid'])
+                            .order_by(violations.c.timestamp)).fetchall()
+
+    def candidate_session_counts(conn, s, rng):
+        # ProctorService.get_candidate_sessions
+        uuids = [row[0] for row in conn.execute(
+            select(sessions.c.session_uuid).where(sessions.c.candidate_id == s['candidate_id'])
+            .order_by(desc(sessions.c.start_time)))]
+        return conn.execute(select(violations.c.session_id, func.count(violations.c.id))
+                            .where(violations.c.session_id.in_(uuids))
+                            .group_by(violations.c.session_id)).fetchall()
+
+    def latest_active_session(conn, s, rng):
+        # Heartbeat, session end, login suspension check
+        return conn.execute(select(sessions).where(sessions.c.candidate_id == s['candidate_id'],
+                                                   sessions.c.status == 'active')
+                            .order_by(desc(sessions.c.start_time)).limit(1)).fetchall()
+
+    def completed_sessions(conn, s, rng):
+        # Recruiter dashboard candidate list/detail
+        return conn.execute(select(sessions).where(sessions.c.candidate_id == s['candidate_id'],
+                                                   sessions.c.status == 'completed')
+                            .order_by(desc(sessions.c.start_time))).fetchall()
+
+    def stale_sessions(conn, s, rng):
+        # background_tasks.SessionMonitor
+        threshold = datetime.utcnow() - timedelta(seconds=120)
+        return conn.execute(select(sessions.c.id).where(sessions.c.status == 'active',
+                                                        sessions.c.is_suspended == False,  # noqa: E712
+                                                        sessions.c.last_activity < threshold)).fetchall()
+
+    def candidate_violations(conn, s, rng):
+        # Exam reset / per-candidate grading
+        return conn.execute(select(func.count()).select_from(violations)
+                            .where(violations.c.candidate_id == s['candidate_id'])).fetchall()
+
+    def archive_scan(conn, s, rng):
+        # services/archive_proctoring.archivable_ids, one batch
+        active = exists().where(and_(sessions.c.session_uuid == violations.c.session_id, sessions.c.status == 'active'))
+        cutoff = datetime.utcnow() - timedelta(days=90)
+        return conn.execute(select(violations.c.id).where(violations.c.id > rng.randint(0, 1000),
+                                                          violations.c.timestamp < cutoff, ~active)
+                            .order_by(violations.c.id).limit(archive_batch)).fetchall()
+
+    return {
+        'session_summary': session_summary,
+        'candidate_session_counts': candidate_session_counts,
+        'latest_active_session': latest_active_session,
+        'completed_sessions': completed_sessions,
+        'stale_sessions': stale_sessions,
+        'candidate_violations': candidate_violations,
+        'archive_scan': archive_scan,
+    }
+
+
+def run_queries(engine, queries, session_rows, repeat, seed):
+    rng = random.Random(seed)
+    report = {}
+    with engine.connect() as conn:
+        for name, query in queries.items():
+            # Full-scan queries get fewer repetitions without indexes; keep the total time sane
+            latencies = []
+            deadline = time.perf_counter() + 60
+            for _ in range(repeat):
+                session = session_rows[rng.randrange(len(session_rows))]
+                started = time.perf_counter()
+                query(conn, session, rng)
+                latencies.append(time.perf_counter() - started)
+                if time.perf_counter() > deadline:
+                    break
+            report[name] = {'runs': len(latencies), 'p50_ms': percentile(latencies, 0.5), 'p95_ms': percentile(latencies, 0.95)}
+            print(f"  {name}: p50 {report[name]['p50_ms']} ms, p95 {report[name]['p95_ms']} ms ({len(latencies)} runs)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot proctoring queries with and without indexes")
+    parser.add_argument('--database-url', default=None, help="Empty scratch database (default: temporary SQLite file)")
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--candidates', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200, help="Runs per query and phase")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help="Keep the generated tables")
+    args = parser.parse_args()
+
+    from app.models import CandidateAuth, ProctorSession, ProctoringViolation
+
+    workdir = None
+    url = args.database_url
+    if not url:
+        workdir = tempfile.mkdtemp(prefix='proctor-bench-')
+        url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    engine = create_engine(url)
+
+    models = (CandidateAuth, ProctorSession, ProctoringViolation)
+    existing = set(inspect(engine).get_table_names()) & {m.__tablename__ for m in models}
+    if existing:
+        print(f"❌ Refusing to run: {', '.join(sorted(existing))} already exist in this database")
+        sys.exit(1)
+
+    tables = {m.__tablename__: m.__table__ for m in models}
+    indexes = [index for m in (ProctorSession, ProctoringViolation) for index in m.__table__.indexes]
+    report = {'database': engine.dialect.name, 'events': args.events, 'sessions': args.sessions}
+    try:
+        for table in tables.values():
+            table.create(bind=engine)
+        # Start from primary keys + unique constraints only
+        for index in indexes:
+            index.drop(bind=engine)
+
+        print(f"🚀 Generating {args.events} events over {args.sessions} sessions ({engine.dialect.name})")
+        started = time.perf_counter()
+        session_rows = populate(engine, tables, args, random.Random(args.seed))
+        report['populate_seconds'] = round(time.perf_counter() - started, 1)
+        if engine.dialect.name == 'postgresql':
+            with engine.begin() as conn:
+                for name in tables:
+                    conn.exec_driver_sql(f"ANALYZE {name}")
+
+        queries = hot_queries(tables)
+        print("📊 Without proctoring indexes")
+        report['without_indexes'] = run_queries(engine, queries, session_rows, args.repeat, args.seed)
+
+        started = time.perf_counter()
+        for index in indexes:
+            index.create(bind=engine)
+        if engine.dialect.name == 'postgresql':
+            with engine.begin() as conn:
+                for name in tables:
+                    conn.exec_driver_sql(f"ANALYZE {name}")
+        else:
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        report['index_build_seconds'] = round(time.perf_counter() - started, 1)
+
+        print("📊 With proctoring indexes")
+        report['with_indexes'] = run_queries(engine, queries, session_rows, args.repeat, args.seed)
+        report['speedup_p50'] = {
+            name: round(report['without_indexes'][name]['p50_ms'] / max(report['with_indexes'][name]['p50_ms'], 0.001), 1)
+            for name in queries
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        if not args.keep:
+            for table in reversed(list(tables.values())):
+                table.drop(bind=engine, checkfirst=True)
+        engine.dispose()
+        if workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
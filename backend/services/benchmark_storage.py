@@ -0,0 +1,180 @@
+"""
+Benchmark concurrent resume uploads through the storage backends.
+Usage: python3 benchmark_storage.py [--backend supabase|local] [--stub] [--stub-latency-ms 20]
+                                    [--uploads 200] [--concurrency 16] [--size-kb 300]
+                                    [--client pooled|per-upload|both] [--body stream|bytes]
+  - Uploads random PDF-sized files from a thread pool via app/services/storage.py
+  - --stub starts an in-process stand-in for the Supabase Storage API on
+    localhost (reads and discards the body after --stub-latency-ms), so the
+    HTTP path can be measured without a Supabase project; without it the
+    configured SUPABASE_URL/SUPABASE_KEY/SUPABASE_BUCKET are used (objects
+    are written under benchmark/)
+  - --backend local writes to a temporary directory (LOCAL_STORAGE_DIR is not touched)
+  - --client per-upload opens a new client for every upload (the old
+    per-request create_client behaviour); both compares it with the pooled client
+  - --body bytes reads each file into memory before uploading instead of streaming it
+  - Reports uploads/s, MB/s, latency percentiles and the connections the
+    stub accepted (with --stub)
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubStorageHandler(BaseHTTPRequestHandler):
+    """Accepts Supabase Storage object uploads and discards them"""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse is visible
+    latency = 0.0
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                self.rfile.read(size + 2)
+                if size == 0:
+                    break
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 65536)))
+        time.sleep(self.latency)
+        body = json.dumps({'Key': self.path.split('/object/', 1)[-1]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(latency_ms):
+    StubStorageHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubStorageHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 1) if values else None
+
+
+def run(make_storage, pooled, args, files):
+    """Upload every file once; returns the report for this variant"""
+    shared = make_storage() if pooled else None
+
+    def upload(index):
+        storage = shared or make_storage()
+        path = f"benchmark/resume_{index}.pdf"
+        started = time.perf_counter()
+        try:
+            with open(files[index % len(files)], 'rb') as f:
+                body = f.read() if args.body == 'bytes' else f
+                storage.upload(path, body, 'application/pdf', size=args.size_kb * 1024)
+            return True, time.perf_counter() - started
+        except Exception as e:
+            print(f"❌ Upload {index} failed: {e}")
+            return False, time.perf_counter() - started
+        finally:
+            if shared is None:
+                storage.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(upload, range(args.uploads)))
+    elapsed = time.perf_counter() - started
+    if shared is not None:
+        shared.close()
+
+    latencies = [seconds for ok, seconds in results if ok]
+    return {
+        'uploads': len(results),
+        'failed': sum(1 for ok, _ in results if not ok),
+        'elapsed_seconds': round(elapsed, 2),
+        'uploads_per_second': round(len(latencies) / elapsed, 1),
+        'mb_per_second': round(len(latencies) * args.size_kb / 1024 / elapsed, 1),
+        'latency_ms': {'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95), 'p99': percentile(latencies, 0.99)}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent uploads through the storage backends")
+    parser.add_argument('--backend', choices=['supabase', 'local'], default='supabase')
+    parser.add_argument('--stub', action='store_true', help="Upload to an in-process Supabase Storage stand-in")
+    parser.add_argument('--stub-latency-ms', type=float, default=20, help="Stub processing time per upload")
+    parser.add_argument('--uploads', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--size-kb', type=int, default=300, help="Size of each uploaded file")
+    parser.add_argument('--client', choices=['pooled', 'per-upload', 'both'], default='both')
+    parser.add_argument('--body', choices=['stream', 'bytes'], default='stream')
+    args = parser.parse_args()
+
+    from app.config import Config
+    from app.services.storage import SupabaseStorage, LocalStorage
+
+    workdir = tempfile.mkdtemp(prefix='storage-bench-')
+    files = []
+    for i in range(min(args.uploads, 8)):
+        path = os.path.join(workdir, f"source_{i}.pdf")
+        with open(path, 'wb') as f:
+            f.write(b'%PDF-1.4\n' + os.urandom(args.size_kb * 1024 - 9))
+        files.append(path)
+
+    stub = None
+    if args.backend == 'local':
+        target = os.path.join(workdir, 'storage')
+
+        def make_storage():
+            return LocalStorage(root=target, url_prefix='/files')
+    else:
+        url, key = Config.SUPABASE_URL, Config.SUPABASE_KEY
+        if args.stub:
+            stub = start_stub(args.stub_latency_ms)
+            url, key = f"http://127.0.0.1:{stub.server_address[1]}", 'stub-key'
+
+        def make_storage():
+            return SupabaseStorage(url=url, key=key)
+
+    variants = ['pooled', 'per-upload'] if args.client == 'both' else [args.client]
+    print(f"🚀 {args.uploads} uploads of {args.size_kb} KB ({args.backend}{', stub' if stub else ''}), concurrency={args.concurrency}, body={args.body}")
+
+    # Client construction logs once per instance; keep the output readable
+    report = {}
+    for variant in variants:
+        connections_before = stub.connections if stub else 0
+        stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+        try:
+            report[variant] = run(make_storage, variant == 'pooled', args, files)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        if stub:
+            report[variant]['connections_opened'] = stub.connections - connections_before
+
+    print(json.dumps(report, indent=2))
+    if stub:
+        stub.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
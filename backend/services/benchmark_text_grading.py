@@ -0,0 +1,96 @@
+"""
+Benchmark: single-pass vs two-pass text response grading.
+Usage: python3 benchmark_text_grading.py [--runs N] [--questions N]
+  - Calls the real LLM (GROQ_API_KEY must be set); the response cache is
+    not used because no app context is active
+  - Reports per-mode latency, LLM calls and prompt/completion tokens taken
+    from the LLM gateway metrics, plus how often single-pass fell back
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_gateway import llm_gateway
+from services.textresponse_to_grading import grade_text
+
+SAMPLE_QA = [
+    {"question": "Tell me about yourself", "answer": "I am a backend developer with three years of experience building REST APIs in Python and Flask, mostly for logistics clients."},
+    {"question": "What is your greatest strength?", "answer": "I work hard and learn fast."},
+    {"question": "Describe a conflict with a teammate and how you resolved it.", "answer": "We disagreed on whether to rewrite a legacy module. I proposed a spike to measure both options, we reviewed the numbers together and agreed to refactor incrementally."},
+    {"question": "Why do you want to join our company?", "answer": "good company"},
+    {"question": "Where do you see yourself in five years?", "answer": "Leading a small team, still writing code, and mentoring junior engineers on testing and code review practices."},
+]
+
+
+def _usage_totals():
+    """Summed call/token counters across all models"""
+    models = llm_gateway.metrics()['models'].values()
+    return {
+        'calls': sum(m['calls'] for m in models),
+        'prompt_tokens': sum(m['prompt_tokens'] for m in models),
+        'completion_tokens': sum(m['completion_tokens'] for m in models),
+    }
+
+
+def benchmark(mode, qa_pairs, runs):
+    """Run grade_text `runs` times in one mode and collect latency/token figures"""
+    latencies = []
+    fallbacks = 0
+    before = _usage_totals()
+    scores = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = grade_text(qa_pairs, mode=mode, bypass_cache=True)
+        latencies.append(time.perf_counter() - started)
+        if result.get('grading_mode') != mode:
+            fallbacks += 1
+        scores.append(result.get('communication_score'))
+    after = _usage_totals()
+
+    return {
+        'runs': runs,
+        'latency_s': {
+            'mean': round(statistics.mean(latencies), 2),
+            'min': round(min(latencies), 2),
+            'max': round(max(latencies), 2),
+        },
+        'llm_calls_per_run': round((after['calls'] - before['calls']) / runs, 2),
+        'prompt_tokens_per_run': round((after['prompt_tokens'] - before['prompt_tokens']) / runs),
+        'completion_tokens_per_run': round((after['completion_tokens'] - before['completion_tokens']) / runs),
+        'fallbacks': fallbacks,
+        'communication_scores': scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-pass and two-pass text grading")
+    parser.add_argument('--runs', type=int, default=3, help="Gradings per mode")
+    parser.add_argument('--questions', type=int, default=len(SAMPLE_QA), help="Number of sample Q&A pairs to grade")
+    args = parser.parse_args()
+
+    qa_pairs = (SAMPLE_QA * (args.questions // len(SAMPLE_QA) + 1))[:args.questions]
+    report = {}
+    for mode in ('two_pass', 'single_pass'):
+        print(f"⏱️  Benchmarking {mode} ({args.runs} runs, {len(qa_pairs)} questions)...")
+        report[mode] = benchmark(mode, qa_pairs, args.runs)
+
+    two, one = report['two_pass'], report['single_pass']
+
+    def total(r):
+        return r['prompt_tokens_per_run'] + r['completion_tokens_per_run']
+
+    report['single_pass_vs_two_pass'] = {
+        'latency_ratio': round(one['latency_s']['mean'] / two['latency_s']['mean'], 2) if two['latency_s']['mean'] else None,
+        'token_ratio': round(total(one) / total(two), 2) if total(two) else None,
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
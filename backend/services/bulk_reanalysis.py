@@ -0,0 +1,306 @@
+"""
+Bulk Rationale Re-analysis
+Regenerates AI rationales for a whole candidate pool (e.g. after a prompt change).
+
+Candidates are streamed in ID order through a bounded thread pool that shares
+one Flask app; every LLM call still goes through the rate-limited gateway.
+Progress is checkpointed in the `reanalysis_runs` table (every candidate up to
+last_candidate_id is done), so an interrupted run resumes where it stopped.
+Unless forced, candidates whose rendered prompts match the stored input_hash
+are skipped without any LLM call.
+
+Command line:
+    python services/bulk_reanalysis.py [--scope existing|completed] [--force]
+                                       [--resume RUN_ID] [--concurrency N]
+
+API:
+    POST /api/recruiter/rationales/reanalyze
+    GET  /api/recruiter/rationales/reanalyze/<run_id>
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_
+from app import create_app, db
+from app.config import Config
+from app.models import CandidateAuth, CandidateRationale, ReanalysisRun
+from services.AI_rationale import generate_rationale
+
+SCOPES = ('existing', 'completed')
+
+# A "running" run whose updated_at is older than this is considered abandoned.
+# Live runs bump updated_at every HEARTBEAT_SECONDS, even while one slow
+# candidate (rate-limited LLM calls) holds up the next checkpoint.
+STALE_RUN_SECONDS = 300
+HEARTBEAT_SECONDS = 30
+
+
+def candidate_ids(scope, after_id=0):
+    """
+    IDs of the candidates a run covers, in processing order
+
+    Args:
+        scope: 'existing' = candidates that already have a rationale,
+               'completed' = candidates who finished at least one round
+        after_id: Only IDs greater than this (resume checkpoint)
+    """
+    query = db.session.query(CandidateAuth.id).filter(CandidateAuth.id > after_id)
+    if scope == 'existing':
+        query = query.join(CandidateRationale, CandidateRationale.candidate_id == CandidateAuth.id)
+    else:
+        query = query.filter(or_(
+            CandidateAuth.mcq_completed,
+            CandidateAuth.psychometric_completed,
+            CandidateAuth.text_based_completed,
+            CandidateAuth.coding_completed
+        ))
+    return [cid for (cid,) in query.order_by(CandidateAuth.id).all()]
+
+
+def active_run():
+    """The run currently in progress (recent heartbeat), if any"""
+    threshold = datetime.utcnow() - timedelta(seconds=STALE_RUN_SECONDS)
+    return ReanalysisRun.query.filter(
+        ReanalysisRun.status == 'running',
+        ReanalysisRun.updated_at >= threshold
+    ).order_by(ReanalysisRun.id.desc()).first()
+
+
+def create_run(scope='existing', force=False, started_by=None):
+    """Create and commit a new run covering the current candidate pool"""
+    if scope not in SCOPES:
+        raise ValueError(f"scope must be one of {SCOPES}")
+
+    run = ReanalysisRun(
+        status='running',
+        scope=scope,
+        force=force,
+        total=len(candidate_ids(scope)),
+        failed_candidate_ids=[],
+        started_by=started_by
+    )
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+def _analyze_one(app, candidate_id, force):
+    """Worker task: regenerate one candidate's rationale in its own app context"""
+    with app.app_context():
+        try:
+            rationale, status = generate_rationale(
+                candidate_id, app,
+                bypass_cache=force,
+                skip_unchanged=not force
+            )
+            if status == 'not_found':
+                return status
+            if rationale is None or 'error' in rationale:
+                return 'failed'
+            return status
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Re-analysis failed for candidate {candidate_id}: {e}")
+            return 'failed'
+
+
+def run_reanalysis(app, run_id, concurrency=None, stop_event=None):
+    """
+    Execute (or resume) a run until every candidate is processed
+
+    Must be called inside an app context of `app`.
+
+    Args:
+        app: Flask app shared by all worker threads
+        run_id: ReanalysisRun to execute
+        concurrency: Candidates in flight at once (default: Config.REANALYSIS_CONCURRENCY)
+        stop_event: threading.Event; when set, no new candidates are started and
+                    the run is checkpointed as 'cancelled'
+
+    Returns:
+        dict: Final run state
+    """
+    concurrency = concurrency or Config.REANALYSIS_CONCURRENCY
+    run = ReanalysisRun.query.get(run_id)
+    if not run:
+        raise ValueError(f"Run {run_id} not found")
+
+    ids = candidate_ids(run.scope, after_id=run.last_candidate_id)
+    force = run.force
+    run.status = 'running'
+    run.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    print(f"🔁 Re-analysis run {run_id}: {len(ids)} candidate(s) left (scope={run.scope}, force={force}, concurrency={concurrency})")
+
+    results = {}         # Finished candidates not counted in the run yet: {candidate_id: status}
+    next_index = 0       # Next candidate to submit
+    watermark_index = 0  # ids[:watermark_index] are all done
+    counted_index = 0    # ids[:counted_index] are counted in the run's totals
+    since_checkpoint = 0
+    last_beat = time.monotonic()
+
+    def checkpoint(status=None):
+        """
+        Count the candidates up to the watermark and move last_candidate_id there
+
+        Candidates finished beyond the watermark stay in `results`: after a
+        crash a resume processes them again, so counting them now would count
+        them twice.
+        """
+        nonlocal counted_index, since_checkpoint, last_beat
+        run = ReanalysisRun.query.get(run_id)
+        failed_ids = list(run.failed_candidate_ids or [])
+        for cid in ids[counted_index:watermark_index]:
+            status_of = results.pop(cid)
+            run.processed += 1
+            if status_of == 'generated':
+                run.generated += 1
+            elif status_of == 'failed':
+                run.failed += 1
+                failed_ids.append(cid)
+            else:
+                run.skipped += 1
+        counted_index = watermark_index
+        if watermark_index:
+            run.last_candidate_id = ids[watermark_index - 1]
+        run.failed_candidate_ids = failed_ids
+        run.updated_at = datetime.utcnow()
+        if status:
+            run.status = status
+            run.finished_at = datetime.utcnow()
+        db.session.commit()
+        since_checkpoint = 0
+        last_beat = time.monotonic()
+        return run
+
+    def heartbeat():
+        """Keep the run from looking abandoned while candidates are slow"""
+        nonlocal last_beat
+        ReanalysisRun.query.filter_by(id=run_id).update({'updated_at': datetime.utcnow()})
+        db.session.commit()
+        last_beat = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='reanalysis') as pool:
+        in_flight = {}
+        while next_index < len(ids) or in_flight:
+            # Keep the pool full without queueing the whole pool in memory
+            while next_index < len(ids) and len(in_flight) < concurrency and not (stop_event and stop_event.is_set()):
+                cid = ids[next_index]
+                in_flight[pool.submit(_analyze_one, app, cid, force)] = cid
+                next_index += 1
+
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, timeout=HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+            for future in finished:
+                cid = in_flight.pop(future)
+                results[cid] = future.result()
+                since_checkpoint += 1
+
+            while watermark_index < len(ids) and ids[watermark_index] in results:
+                watermark_index += 1
+
+            if since_checkpoint >= Config.REANALYSIS_CHECKPOINT_EVERY:
+                run = checkpoint()
+                print(f"💾 Re-analysis run {run_id}: {run.processed}/{run.total} processed")
+            elif time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+                heartbeat()
+
+    cancelled = stop_event is not None and stop_event.is_set() and next_index < len(ids)
+    run = checkpoint('cancelled' if cancelled else 'completed')
+    print(f"✅ Re-analysis run {run_id} {run.status}: {run.generated} generated, {run.skipped} skipped, {run.failed} failed")
+    return run.to_dict()
+
+
+class ReanalysisThread:
+    """Runs a re-analysis in a background thread of the web process"""
+
+    def __init__(self, app, run_id, concurrency=None):
+        self.app = app
+        self.run_id = run_id
+        self.concurrency = concurrency
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                run_reanalysis(self.app, self.run_id, self.concurrency, self.stop_event)
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Re-analysis run {self.run_id} crashed: {e}")
+                run = ReanalysisRun.query.get(self.run_id)
+                if run:
+                    run.status = 'failed'
+                    run.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                _threads.pop(self.run_id, None)
+
+
+# Runs executing in this process: {run_id: ReanalysisThread}
+_threads = {}
+
+
+def start_reanalysis_thread(app, run_id, concurrency=None):
+    """Start a run in the background of this process"""
+    worker = ReanalysisThread(app, run_id, concurrency)
+    _threads[run_id] = worker
+    worker.start()
+    return worker
+
+
+def stop_reanalysis(run_id):
+    """
+    Ask a run executing in this process to stop after its in-flight candidates
+
+    Returns:
+        bool: True if the run was running in this process
+    """
+    worker = _threads.get(run_id)
+    if not worker:
+        return False
+    worker.stop()
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate AI rationales for the candidate pool")
+    parser.add_argument('--scope', choices=SCOPES, default='existing',
+                        help="existing: candidates with a rationale (default); completed: anyone who finished a round")
+    parser.add_argument('--force', action='store_true', help="Regenerate even if inputs are unchanged (bypasses the LLM cache)")
+    parser.add_argument('--resume', type=int, metavar='RUN_ID', help="Resume an interrupted run from its checkpoint")
+    parser.add_argument('--concurrency', type=int, default=None, help="Candidates processed at once")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.resume:
+            run_id = args.resume
+        else:
+            run_id = create_run(args.scope, args.force).id
+            print(f"📝 Created re-analysis run {run_id}")
+
+        try:
+            run_reanalysis(app, run_id, args.concurrency)
+        except KeyboardInterrupt:
+            # Progress up to the last checkpoint is kept; already-done candidates are skipped on resume
+            print(f"\n⏸️ Interrupted. Resume with: python services/bulk_reanalysis.py --resume {run_id}")
+            sys.exit(1)
@@ -0,0 +1,380 @@
+"""
+Bulk Resume Import
+Attaches a batch of resume PDFs (a zip archive and/or loose files) to existing candidates by email.
+
+Each PDF is matched to a candidate email from, in order:
+
+    - a manifest CSV with `filename,email` columns (the `manifest` upload
+      field, or manifest.csv inside the archive)
+    - an email address in the file name, e.g. "jane.doe@example.com.pdf" or
+      "jane.doe@example.com_resume.pdf"
+
+Archive entries are streamed one at a time (never extracted to disk as a
+whole) and stored through services/resume_store.py on a bounded thread pool,
+so identical files are stored and parsed once. Each file's extract/parse job
+is inserted in the same commit as the candidate's queued stage (no extra
+commit per job); the job workers then extract text in parallel in the PDF
+process pool. Progress is saved in the `resume_imports` table every
+Config.RESUME_IMPORT_BATCH_SIZE files.
+
+Command line:
+    python services/bulk_resume_import.py resumes.zip [more.pdf ...] [--manifest map.csv] [--concurrency N]
+
+API:
+    POST /api/recruiter/resumes/bulk
+    GET  /api/recruiter/resumes/bulk/<import_id>
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app import create_app, db
+from app.config import Config
+from app.models import CandidateAuth, ResumeImport
+from app.services.resume_store import store_resume, ResumeStorageError, MAX_RESUME_BYTES
+from app.services.storage import iter_chunks
+
+EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+
+MANIFEST_NAME = 'manifest.csv'
+
+# Entries kept in memory while streaming out of the archive (larger ones spill to disk)
+SPOOL_BYTES = 1024 * 1024
+
+
+class EntryTooLarge(Exception):
+    """An archive entry exceeds MAX_RESUME_BYTES"""
+
+
+def read_manifest(stream):
+    """
+    Parse a `filename,email` CSV (header names are case-insensitive)
+
+    Returns:
+        dict: {lowercased base filename: lowercased email}
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    fields = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+    if 'filename' not in fields or 'email' not in fields:
+        raise ValueError("Manifest needs 'filename' and 'email' columns")
+    mapping = {}
+    for row in reader:
+        filename = (row.get(fields['filename']) or '').strip()
+        email = (row.get(fields['email']) or '').strip()
+        if filename and email:
+            mapping[os.path.basename(filename).lower()] = email.lower()
+    return mapping
+
+
+def entry_email(name, manifest):
+    """Candidate email for an entry: manifest first, then an address in the file name"""
+    base = os.path.basename(name)
+    if base.lower() in manifest:
+        return manifest[base.lower()]
+    stem = base[:-4] if base.lower().endswith('.pdf') else base
+    match = EMAIL_PATTERN.search(stem)
+    return match.group(0).lower() if match else None
+
+
+def _is_hidden(name):
+    return name.startswith('__MACOSX/') or os.path.basename(name).startswith('.')
+
+
+def collect_entries(paths, manifest_path=None):
+    """
+    List the PDFs of an import without reading their contents
+
+    Args:
+        paths: Zip archives and/or PDF files
+        manifest_path: Optional manifest CSV
+
+    Returns:
+        (entries, skipped): entries are {"file", "path", "member" (archive
+        entry name or None), "size"}; skipped are {"file", "status", "error"}
+    """
+    manifest = {}
+    if manifest_path:
+        with open(manifest_path, 'rb') as f:
+            manifest.update(read_manifest(f))
+
+    entries = []
+    skipped = []
+    for path in paths:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                members = [info for info in archive.infolist() if not info.is_dir() and not _is_hidden(info.filename)]
+                for info in members:
+                    if os.path.basename(info.filename).lower() == MANIFEST_NAME:
+                        with archive.open(info) as f:
+                            manifest.update({k: v for k, v in read_manifest(f).items() if k not in manifest})
+                for info in members:
+                    base = os.path.basename(info.filename)
+                    if base.lower() == MANIFEST_NAME:
+                        continue
+                    if not base.lower().endswith('.pdf'):
+                        skipped.append({'file': info.filename, 'status': 'skipped', 'error': 'Not a PDF'})
+                        continue
+                    entries.append({'file': info.filename, 'path': path, 'member': info.filename, 'size': info.file_size})
+        elif path.lower().endswith('.pdf'):
+            entries.append({'file': os.path.basename(path), 'path': path, 'member': None, 'size': os.path.getsize(path)})
+        else:
+            skipped.append({'file': os.path.basename(path), 'status': 'skipped', 'error': 'Not a PDF or zip archive'})
+
+    for entry in entries:
+        entry['email'] = entry_email(entry['file'], manifest)
+    return entries, skipped
+
+
+def _open_entry(entry):
+    """
+    Seekable stream of an entry's bytes
+
+    Archive members are decompressed chunk by chunk into a spooled temp file
+    (the declared size is not trusted), so hashing and uploading can rewind.
+    """
+    if entry['member'] is None:
+        if entry['size'] > MAX_RESUME_BYTES:
+            raise EntryTooLarge()
+        return open(entry['path'], 'rb')
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+    # One ZipFile per call: handles are not shared between threads
+    with zipfile.ZipFile(entry['path']) as archive, archive.open(entry['member']) as member:
+        for chunk in iter_chunks(member):
+            size += len(chunk)
+            if size > MAX_RESUME_BYTES:
+                spool.close()
+                raise EntryTooLarge()
+            spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def _store_one(app, entry, candidate_id):
+    """Worker task: store one entry for its candidate in its own app context"""
+    with app.app_context():
+        try:
+            candidate = CandidateAuth.query.get(candidate_id)
+            with _open_entry(entry) as stream:
+                stored = store_resume(candidate, stream, os.path.basename(entry['file']), load_job=False)
+            status = 'deduplicated' if stored['deduplicated'] else 'stored'
+            return status, None, stored['jobs_queued']
+        except EntryTooLarge:
+            return 'failed', 'File size must be less than 5MB', 0
+        except (ResumeStorageError, zipfile.BadZipFile, OSError) as e:
+            db.session.rollback()
+            return 'failed', str(e)[:300], 0
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Resume import failed for {entry['file']}: {e}")
+            return 'failed', str(e)[:300], 0
+
+
+def _candidate_ids_by_email(emails):
+    """{lowercased email: candidate id} for the emails that exist"""
+    found = {}
+    emails = sorted(emails)
+    for start in range(0, len(emails), 500):
+        rows = db.session.query(func.lower(CandidateAuth.email), CandidateAuth.id).filter(
+            func.lower(CandidateAuth.email).in_(emails[start:start + 500])
+        ).all()
+        found.update(dict(rows))
+    return found
+
+
+def create_import(source, started_by=None):
+    """Create and commit a new import run"""
+    run = ResumeImport(status='running', source=(source or '')[:500], started_by=started_by, entries=[])
+    db.session.add(run)
+    db.session.commit()
+    return run
+
+
+def run_import(app, import_id, paths, manifest_path=None, concurrency=None):
+    """
+    Execute an import until every entry is processed
+
+    Must be called inside an app context of `app`.
+
+    Args:
+        app: Flask app shared by all worker threads
+        import_id: ResumeImport to execute
+        paths: Zip archives and/or PDF files
+        manifest_path: Optional manifest CSV
+        concurrency: Files stored at once (default: Config.RESUME_IMPORT_CONCURRENCY)
+
+    Returns:
+        dict: Final import state
+    """
+    concurrency = concurrency or Config.RESUME_IMPORT_CONCURRENCY
+    run = ResumeImport.query.get(import_id)
+    if not run:
+        raise ValueError(f"Import {import_id} not found")
+
+    entries, results = collect_entries(paths, manifest_path)
+    not_pdf = len(results)  # Skipped non-PDF files are reported but not counted in total
+    if len(entries) > Config.RESUME_IMPORT_MAX_FILES:
+        run.status = 'failed'
+        run.entries = [{'file': run.source, 'status': 'failed', 'error': f"{len(entries)} PDFs exceed the limit of {Config.RESUME_IMPORT_MAX_FILES}"}]
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        return run.to_dict()
+
+    # Match emails in one pass; a candidate listed twice keeps the last file
+    ids_by_email = _candidate_ids_by_email({e['email'] for e in entries if e['email']})
+    last_for_candidate = {}
+    for index, entry in enumerate(entries):
+        entry['candidate_id'] = ids_by_email.get(entry['email']) if entry['email'] else None
+        if entry['candidate_id']:
+            last_for_candidate[entry['candidate_id']] = index
+
+    todo = []
+    counts = {'stored': 0, 'deduplicated': 0, 'unmatched': 0, 'failed': 0}
+    for index, entry in enumerate(entries):
+        result = {'file': entry['file'], 'email': entry['email'], 'candidate_id': entry['candidate_id']}
+        if not entry['email']:
+            results.append({**result, 'status': 'unmatched', 'error': 'No email in manifest or file name'})
+            counts['unmatched'] += 1
+        elif not entry['candidate_id']:
+            results.append({**result, 'status': 'unmatched', 'error': 'No candidate with this email'})
+            counts['unmatched'] += 1
+        elif last_for_candidate[entry['candidate_id']] != index:
+            results.append({**result, 'status': 'skipped', 'error': 'Superseded by a later file for the same candidate'})
+        else:
+            todo.append(entry)
+
+    run.total = len(entries)
+    run.status = 'running'
+    db.session.commit()
+    print(f"📥 Resume import {import_id}: {len(entries)} PDF(s), {len(todo)} matched to candidates (concurrency={concurrency})")
+
+    queued = 0
+    since_checkpoint = 0
+
+    def checkpoint(status=None):
+        nonlocal counts, since_checkpoint, queued
+        run = ResumeImport.query.get(import_id)
+        run.processed = len(results) - not_pdf
+        run.stored += counts['stored'] + counts['deduplicated']
+        run.deduplicated += counts['deduplicated']
+        run.unmatched += counts['unmatched']
+        run.failed += counts['failed']
+        run.jobs_queued += queued
+        run.entries = list(results)
+        run.updated_at = datetime.utcnow()
+        if status:
+            run.status = status
+            run.finished_at = datetime.utcnow()
+        db.session.commit()
+        counts = dict.fromkeys(counts, 0)
+        queued = 0
+        since_checkpoint = 0
+        return run
+
+    next_index = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='resume-import') as pool:
+        in_flight = {}
+        while next_index < len(todo) or in_flight:
+            # Keep the pool full without holding every entry's bytes at once
+            while next_index < len(todo) and len(in_flight) < concurrency:
+                entry = todo[next_index]
+                in_flight[pool.submit(_store_one, app, entry, entry['candidate_id'])] = entry
+                next_index += 1
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entry = in_flight.pop(future)
+                status, error, jobs_queued = future.result()
+                counts[status] += 1
+                results.append({
+                    'file': entry['file'], 'email': entry['email'], 'candidate_id': entry['candidate_id'],
+                    'status': status, **({'error': error} if error else {})
+                })
+                # Queued by store_resume (0 if the job already existed)
+                queued += jobs_queued
+                since_checkpoint += 1
+
+            if since_checkpoint >= Config.RESUME_IMPORT_BATCH_SIZE:
+                run = checkpoint()
+                print(f"💾 Resume import {import_id}: {run.processed}/{run.total} processed, {run.jobs_queued} job(s) queued")
+
+    run = checkpoint('completed')
+    print(f"✅ Resume import {import_id} completed: {run.stored} stored ({run.deduplicated} deduplicated), {run.unmatched} unmatched, {run.failed} failed")
+    return run.to_dict()
+
+
+def pipeline_summary(run):
+    """
+    Processing status of the candidates an import attached resumes to
+
+    Returns:
+        dict: {"ready": n, "processing": n, "failed": n}
+    """
+    ids = [e['candidate_id'] for e in (run.entries or []) if e.get('status') in ('stored', 'deduplicated')]
+    summary = {'ready': 0, 'processing': 0, 'failed': 0}
+    for start in range(0, len(ids), 500):
+        rows = db.session.query(CandidateAuth.resume_processing).filter(CandidateAuth.id.in_(ids[start:start + 500])).all()
+        for (processing,) in rows:
+            status = (processing or {}).get('status', 'processing')
+            summary[status if status in summary else 'processing'] += 1
+    return summary
+
+
+def _run_in_thread(app, import_id, paths, manifest_path, concurrency, cleanup_dir):
+    with app.app_context():
+        try:
+            run_import(app, import_id, paths, manifest_path, concurrency)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Resume import {import_id} crashed: {e}")
+            run = ResumeImport.query.get(import_id)
+            if run:
+                run.status = 'failed'
+                run.finished_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            if cleanup_dir:
+                shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
+def start_import_thread(app, import_id, paths, manifest_path=None, concurrency=None, cleanup_dir=None):
+    """Run an import in the background of this process (cleanup_dir is removed afterwards)"""
+    thread = threading.Thread(
+        target=_run_in_thread,
+        args=(app, import_id, paths, manifest_path, concurrency, cleanup_dir),
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attach a batch of resume PDFs to candidates by email")
+    parser.add_argument('paths', nargs='+', help="Zip archives and/or PDF files")
+    parser.add_argument('--manifest', help="CSV with filename,email columns")
+    parser.add_argument('--concurrency', type=int, default=None, help="Files stored at once")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        run = create_import(", ".join(os.path.basename(p) for p in args.paths))
+        print(f"📝 Created resume import {run.id}")
+        run_import(app, run.id, args.paths, args.manifest, args.concurrency)
+        for entry in ResumeImport.query.get(run.id).entries or []:
+            if entry['status'] not in ('stored', 'deduplicated'):
+                print(f"  {entry['status']}: {entry['file']} ({entry.get('error')})")
@@ -0,0 +1,249 @@
+"""
+JSON Extraction from LLM Output
+Brace-aware helpers for pulling JSON out of model responses.
+
+    - find_json / extract_json: locate and decode the first complete JSON
+      value in a response, ignoring code fences, preambles and stray braces
+      in surrounding prose
+    - SectionStreamParser: emits the top-level members of a streamed JSON
+      object as soon as each one is complete, and keeps the raw text of
+      members that fail to decode so only those need repairing
+
+Both scan with string/escape state and bracket depth, so braces inside
+string values never confuse them.
+
+Usage:
+    parser = SectionStreamParser()
+    for chunk in stream:
+        for name, value in parser.feed(chunk):
+            save_section(name, value)
+"""
+
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_OPENERS = re.compile(r'[\{\[]')
+_TRAILING_COMMA = re.compile(r',(\s*[\}\]])')
+
+
+def _match_close(text, start):
+    """Index of the bracket closing the one at `start`, or None if the text ends first"""
+    depth = 0
+    in_string = False
+    escape = False
+    for index in range(start, len(text)):
+        ch = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            depth += 1
+        elif ch in '}]':
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+
+def _strip_trailing_commas(span):
+    """Remove commas directly before a closing bracket, outside string values"""
+    out = []
+    in_string = False
+    escape = False
+    for index, ch in enumerate(span):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ',' and _TRAILING_COMMA.match(span, index):
+            continue
+        out.append(ch)
+    return ''.join(out)
+
+
+def find_json(text, expect=(dict, list)):
+    """
+    Locate the first complete top-level JSON object or array in text
+
+    Candidates are tried left to right. A balanced but invalid span (e.g.
+    "{placeholder}" in prose) is skipped as a whole, so values nested inside a
+    broken document are never returned in its place. Trailing commas are
+    tolerated.
+
+    Args:
+        text: LLM response
+        expect: Type(s) the value must have; e.g. dict skips a "[1]" citation before the object
+
+    Returns:
+        tuple: (value, start, end) with text[start:end] the JSON source
+
+    Raises:
+        ValueError: No JSON found, or the document is truncated
+    """
+    position = 0
+    while True:
+        match = _OPENERS.search(text, position)
+        if not match:
+            raise ValueError("No JSON object or array found in response")
+        start = match.start()
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except ValueError as e:
+            close = _match_close(text, start)
+            if close is None:
+                raise ValueError(f"Unterminated JSON starting at character {start}: {e}")
+            end = close + 1
+            try:
+                value = json.loads(_strip_trailing_commas(text[start:end]))
+            except ValueError:
+                position = end
+                continue
+        if isinstance(value, expect):
+            return value, start, end
+        position = end
+
+
+def extract_json(text, expect=(dict, list)):
+    """Decode the first complete JSON object or array in an LLM response (see find_json)"""
+    return find_json(text, expect)[0]
+
+
+class SectionStreamParser:
+    """Incremental parser for the top-level members of one JSON object"""
+
+    def __init__(self):
+        self.buffer = []          # All characters seen (list for cheap appends)
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expecting = None     # 'key' | 'key_string' | 'colon' | 'value' | 'in_value' | 'after_value'
+        self.key_start = None
+        self.value_start = None
+        self.current_key = None
+        self.done = False
+        self.sections = {}
+        self.failed = {}          # {key: raw text} of members that did not decode
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        return ''.join(self.buffer)
+
+    def _emit(self, end):
+        """Decode buffer[value_start:end] as the current key's value"""
+        raw = ''.join(self.buffer[self.value_start:end])
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            try:
+                value = json.loads(_strip_trailing_commas(raw))
+            except ValueError:
+                # Malformed member; kept for a targeted repair
+                self.failed[self.current_key] = raw
+                return None
+        self.sections[self.current_key] = value
+        return self.current_key, value
+
+    def incomplete(self):
+        """(key, raw text) of a member cut off by the end of the input, or None"""
+        if self.done or self.expecting not in ('colon', 'value', 'in_value'):
+            return None
+        start = self.value_start if self.expecting == 'in_value' else len(self.buffer)
+        return self.current_key, ''.join(self.buffer[start:])
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of text
+
+        Returns:
+            list: (name, value) for every top-level member completed by this chunk
+        """
+        completed = []
+        for ch in chunk:
+            index = len(self.buffer)
+            self.buffer.append(ch)
+            if self.done:
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.expecting == 'key_string':
+                        self.current_key = json.loads(''.join(self.buffer[self.key_start:index + 1]))
+                        self.expecting = 'colon'
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expecting == 'key':
+                    self.key_start = index
+                    self.expecting = 'key_string'
+                elif self.depth == 1 and self.expecting == 'value':
+                    self.value_start = index
+                    self.expecting = 'in_value'
+                continue
+
+            if ch in '{[':
+                if self.depth == 0:
+                    if ch == '{':
+                        self.depth = 1
+                        self.expecting = 'key'
+                    continue
+                if self.depth == 1 and self.expecting == 'value':
+                    self.value_start = index
+                    self.expecting = 'in_value'
+                self.depth += 1
+                continue
+
+            if ch in '}]':
+                if self.depth == 0:
+                    continue
+                self.depth -= 1
+                if self.depth == 1 and self.expecting == 'in_value':
+                    # Closing bracket of an object/array value
+                    section = self._emit(index + 1)
+                    if section:
+                        completed.append(section)
+                    self.expecting = 'after_value'
+                elif self.depth == 0:
+                    if self.expecting == 'in_value':
+                        # Scalar value terminated by the closing brace
+                        section = self._emit(index)
+                        if section:
+                            completed.append(section)
+                    self.done = True
+                continue
+
+            if self.depth != 1:
+                continue
+
+            if ch == ':' and self.expecting == 'colon':
+                self.expecting = 'value'
+            elif ch == ',':
+                if self.expecting == 'in_value':
+                    section = self._emit(index)
+                    if section:
+                        completed.append(section)
+                self.expecting = 'key'
+            elif self.expecting == 'value' and not ch.isspace():
+                # Scalar value (number, true/false/null)
+                self.value_start = index
+                self.expecting = 'in_value'
+
+        return completed
@@ -0,0 +1,327 @@
+"""
+LLM Response Cache
+Prompt-hash keyed cache of chat completions, persisted in the `llm_cache` table.
+
+Every LLM call in services/ goes through `cached_completion` (or
+`cached_stream` for streamed output), which sits in
+front of the rate-limited LLM gateway (llm_gateway.py). The cache key is
+a SHA-256 over the model, messages and call parameters, so an identical
+request (e.g. re-analyzing a candidate whose data has not changed, or
+re-grading an identical remark set) returns the stored completion instantly
+instead of paying the LLM latency and tokens again.
+
+Cache reads and writes use their own short connection, never the caller's
+session, so they cannot commit or roll back the caller's work. Any cache
+failure falls back to calling the LLM directly.
+
+Usage:
+    result = cached_completion(
+        [{"role": "user", "content": prompt}],
+        model="llama-3.1-8b-instant",
+        parse=extract_json,  # services/json_stream.py
+        bypass_cache=refresh
+    )
+"""
+
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import has_app_context
+from sqlalchemy import select, update, func, case
+from app.extensions import db
+from app.config import Config
+from app.models import LLMCacheEntry
+from app.db_helpers import dialect_insert
+from services.llm_gateway import llm_gateway
+
+
+class LLMCacheStats:
+    """In-process hit/miss and token-savings counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+        self.tokens_saved = 0
+
+    def record(self, field, tokens=0):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+            self.tokens_saved += tokens
+
+    def to_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'errors': self.errors,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'tokens_saved': self.tokens_saved
+        }
+
+
+# Global counters (one per worker process)
+cache_stats = LLMCacheStats()
+
+# Per-thread usage totals while inside track_usage()
+_usage = threading.local()
+
+
+@contextmanager
+def track_usage():
+    """
+    Collect the calls and tokens of every completion made by this thread in the block
+
+    Yields:
+        dict: {'calls', 'cache_hits', 'prompt_tokens', 'completion_tokens'}, filled in as calls finish
+    """
+    previous = getattr(_usage, 'totals', None)
+    totals = {'calls': 0, 'cache_hits': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+    _usage.totals = totals
+    try:
+        yield totals
+    finally:
+        _usage.totals = previous
+
+
+def _note_usage(usage, cache_hit=False):
+    """Add one completion to the current track_usage() totals (cache hits cost no tokens)"""
+    totals = getattr(_usage, 'totals', None)
+    if totals is None:
+        return
+    totals['calls'] += 1
+    if cache_hit:
+        totals['cache_hits'] += 1
+        return
+    totals['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+    totals['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+
+def make_cache_key(model, messages, params):
+    """SHA-256 over the model, messages and call parameters"""
+    raw = json.dumps({'model': model, 'messages': messages, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _lookup(cache_key):
+    """Fetch a live cache row and count the hit. Returns (response_text, total_tokens) or None."""
+    table = LLMCacheEntry.__table__
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        row = conn.execute(
+            select(table.c.response_text, table.c.prompt_tokens, table.c.completion_tokens).where(
+                table.c.cache_key == cache_key,
+                (table.c.expires_at.is_(None)) | (table.c.expires_at > now)
+            )
+        ).first()
+        if row is None:
+            return None
+        conn.execute(
+            update(table).where(table.c.cache_key == cache_key).values(
+                hit_count=table.c.hit_count + 1, last_hit_at=now
+            )
+        )
+    return row.response_text, row.prompt_tokens + row.completion_tokens
+
+
+def _store(cache_key, model, response_text, usage, ttl_seconds):
+    """Insert or overwrite a cache row"""
+    now = datetime.utcnow()
+    values = {
+        'cache_key': cache_key,
+        'model': model,
+        'response_text': response_text,
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        'hit_count': 0,
+        'created_at': now,
+        'last_hit_at': None,
+        'expires_at': now + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+    }
+    stmt = dialect_insert(LLMCacheEntry.__table__).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['cache_key'],
+        # Keep the accumulated hit_count when a forced refresh overwrites an entry
+        set_={k: v for k, v in values.items() if k not in ('cache_key', 'hit_count')}
+    )
+    with db.engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def cached_completion(messages, model, parse=None, bypass_cache=False, ttl_seconds=None, **params):
+    """
+    Run a chat completion through the persistent cache
+
+    Args:
+        messages: Chat messages
+        model: Model name
+        parse: Optional callable applied to the completion text. A completion is
+               only cached if parse succeeds, so malformed output is never replayed.
+        bypass_cache: Skip the lookup and force a fresh call (the new result is stored)
+        ttl_seconds: Entry lifetime (default: Config.LLM_CACHE_TTL_SECONDS, 0 = no expiry)
+        **params: Extra completion parameters (temperature, response_format, ...), part of the key
+
+    Returns:
+        parse(text) if parse is given, else the completion text
+
+    Raises:
+        Whatever the LLM gateway (after its retries) or parse raises
+    """
+    parse = parse or (lambda text: text)
+    use_cache = Config.LLM_CACHE_ENABLED and has_app_context()
+    ttl_seconds = Config.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    cache_key = make_cache_key(model, messages, params)
+
+    if use_cache and not bypass_cache:
+        try:
+            cached = _lookup(cache_key)
+        except Exception as e:
+            cache_stats.record('errors')
+            print(f"⚠️ LLM cache lookup failed: {e}")
+            cached = None
+
+        if cached is not None:
+            response_text, tokens = cached
+            try:
+                result = parse(response_text)
+                cache_stats.record('hits', tokens)
+                _note_usage(None, cache_hit=True)
+                return result
+            except Exception:
+                pass  # Treat an unparseable entry as a miss and overwrite it
+        cache_stats.record('misses')
+    elif use_cache:
+        cache_stats.record('bypassed')
+
+    response = llm_gateway.complete(messages, model, **params)
+    response_text = response.choices[0].message.content
+    _note_usage(getattr(response, 'usage', None))
+    result = parse(response_text)
+
+    if use_cache:
+        try:
+            _store(cache_key, model, response_text, getattr(response, 'usage', None), ttl_seconds)
+        except Exception as e:
+            cache_stats.record('errors')
+            print(f"⚠️ LLM cache store failed: {e}")
+
+    return result
+
+
+def cached_stream(messages, model, parse=None, bypass_cache=False, ttl_seconds=None, **params):
+    """
+    Streamed variant of cached_completion
+    
+    Shares cache entries with cached_completion (same key for the same request).
+    A hit is yielded as a single chunk; a miss streams from the LLM gateway and
+    stores the full text afterwards if parse accepts it.
+    
+    Args:
+        Same as cached_completion
+    
+    Yields:
+        str: Completion text chunks (the caller parses the joined text)
+    """
+    parse = parse or (lambda text: text)
+    use_cache = Config.LLM_CACHE_ENABLED and has_app_context()
+    ttl_seconds = Config.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    cache_key = make_cache_key(model, messages, params)
+    
+    if use_cache and not bypass_cache:
+        try:
+            cached = _lookup(cache_key)
+        except Exception as e:
+            cache_stats.record('errors')
+            print(f"⚠️ LLM cache lookup failed: {e}")
+            cached = None
+        
+        if cached is not None:
+            response_text, tokens = cached
+            try:
+                parse(response_text)
+                cache_stats.record('hits', tokens)
+                _note_usage(None, cache_hit=True)
+                yield response_text
+                return
+            except Exception:
+                pass  # Treat an unparseable entry as a miss and overwrite it
+        cache_stats.record('misses')
+    elif use_cache:
+        cache_stats.record('bypassed')
+    
+    stream = llm_gateway.stream(messages, model, **params)
+    parts = []
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as stop:
+            usage = stop.value
+            break
+        parts.append(chunk)
+        yield chunk
+    _note_usage(usage)
+    
+    if use_cache:
+        response_text = ''.join(parts)
+        try:
+            parse(response_text)
+        except Exception:
+            return  # Malformed output is never cached
+        try:
+            _store(cache_key, model, response_text, usage, ttl_seconds)
+        except Exception as e:
+            cache_stats.record('errors')
+            print(f"⚠️ LLM cache store failed: {e}")
+
+
+def get_cache_stats():
+    """
+    Cache statistics for monitoring
+
+    Returns:
+        dict: This process's counters plus table-wide totals
+    """
+    table = LLMCacheEntry.__table__
+    now = datetime.utcnow()
+    totals = db.session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(table.c.hit_count), 0),
+            func.coalesce(func.sum(table.c.hit_count * (table.c.prompt_tokens + table.c.completion_tokens)), 0),
+            func.coalesce(func.sum(
+                case((table.c.expires_at.isnot(None) & (table.c.expires_at <= now), 1), else_=0)
+            ), 0)
+        ).select_from(table)
+    ).one()
+
+    return {
+        'process': cache_stats.to_dict(),
+        'table': {
+            'entries': totals[0],
+            'total_hits': int(totals[1]),
+            'tokens_saved': int(totals[2]),
+            'expired_entries': int(totals[3])
+        },
+        'enabled': Config.LLM_CACHE_ENABLED,
+        'ttl_seconds': Config.LLM_CACHE_TTL_SECONDS
+    }
+
+
+def purge_expired():
+    """
+    Delete expired cache entries
+
+    Returns:
+        int: Number of rows deleted
+    """
+    deleted = LLMCacheEntry.query.filter(
+        LLMCacheEntry.expires_at.isnot(None),
+        LLMCacheEntry.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,282 @@
+"""
+LLM Fakes
+Deterministic stand-ins for the LLM used by the fake provider and the local stub server.
+
+    - canned_response(messages): schema-valid output for every prompt in
+      services/ (text grading, resume parsing, psychometric match, final
+      rationale, narrative), derived from a hash of the prompt so the same
+      request always gets the same answer
+    - LatencyModel: sampled response latency ("fixed:300", "uniform:200:900",
+      "normal:600:150", "lognormal:800:0.4"; all in milliseconds)
+    - ErrorInjector: random 429 / 500 / timeout failures at configured rates
+    - FakeLLMClient: in-process client with the Groq SDK interface
+      (client.chat.completions.create, incl. stream=True)
+
+Nothing here talks to the network; see llm_stub_server.py for the HTTP variant.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+from groq import APITimeoutError, InternalServerError, RateLimitError
+
+
+def _seed(text):
+    """Stable integer derived from a prompt"""
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:12], 16)
+
+
+def _count_items(prompt, field):
+    """Number of data items in a prompt, counted by a JSON field that is not a <placeholder>"""
+    return len(re.findall(rf'"{field}":(?!\s*"?<)', prompt))
+
+
+def _grade(score):
+    if score >= 80:
+        return "Excellent"
+    if score >= 60:
+        return "Good"
+    if score >= 40:
+        return "Average"
+    return "Poor"
+
+
+def _text_single_pass(prompt, rng):
+    count = _count_items(prompt, 'index')
+    return {
+        "evaluations": [
+            {"index": i, "remark": f"Answer {i} is relevant but could show more depth.", "score": rng.randint(35, 95), "justification": "Clear but brief."}
+            for i in range(1, count + 1)
+        ],
+        "overall_remark": "The candidate communicates clearly with uneven depth across answers."
+    }
+
+
+def _text_remarks(prompt, rng):
+    count = _count_items(prompt, 'question')
+    return {
+        "remarks": [
+            {"question": f"Question {i}", "answer": "", "remark": "Relevant answer with limited depth."}
+            for i in range(1, count + 1)
+        ],
+        "overall_remark": "The candidate communicates clearly with uneven depth across answers."
+    }
+
+
+def _text_grades(prompt, rng):
+    count = _count_items(prompt, 'question')
+    return {
+        "grades": [
+            {"question": f"Question {i}", "score": rng.randint(35, 95), "justification": "Clear but brief."}
+            for i in range(1, count + 1)
+        ]
+    }
+
+
+def _psychometric_match(prompt, rng):
+    return {
+        "match_grade": rng.choice(["High Match", "Medium Match", "Low Match"]),
+        "analysis": "The candidate's trait profile is broadly aligned with the role requirements."
+    }
+
+
+def _resume(prompt, rng):
+    return {
+        "name": "Test Candidate",
+        "email": "candidate@example.com",
+        "skills": rng.sample(["Python", "Flask", "SQL", "React", "Docker", "AWS", "Java", "Git"], 4),
+        "experience_years": rng.randint(0, 10),
+        "projects": ["Inventory management API", "Personal portfolio site"],
+        "education": [{"degree": "B.Tech Computer Science", "gpa": round(rng.uniform(6.5, 9.5), 1)}]
+    }
+
+
+def _rationale(prompt, rng):
+    score = rng.randint(20, 95)
+
+    def section():
+        return {"grade": _grade(rng.randint(20, 95)), "reasoning": "Stand-in evaluation generated for load testing. " * 3}
+
+    return {
+        "resume_fit": section(),
+        "technical_evaluation": section(),
+        "coding_evaluation": section(),
+        "soft_skills_evaluation": section(),
+        "psychometric_evaluation": {"grade": "Insight", "reasoning": "Stand-in behavioral insight. " * 2},
+        "integrity_observation": {"status": "Acceptable", "reasoning": "No integrity concerns in the stand-in data. " * 2},
+        "final_decision": {
+            "status": "Hire" if score >= 70 else "Potential" if score >= 40 else "No Hire",
+            "overall_score": score,
+            "summary": "Stand-in final verdict generated for load testing. " * 4
+        }
+    }
+
+
+def _narrative(prompt, rng):
+    return "The candidate appears organized and cooperative, with a balanced approach to new ideas and steady composure under pressure."
+
+
+# (marker in prompt, builder) - first match wins; builders return a dict (sent as JSON) or a str.
+# The rationale prompt embeds other gradings (e.g. "grades"), so it is matched first.
+CANNED_RESPONSES = [
+    ('"final_decision"', _rationale),
+    ('"evaluations"', _text_single_pass),
+    ('"grades"', _text_grades),
+    ('"remarks"', _text_remarks),
+    ('"match_grade"', _psychometric_match),
+    ('Industrial-Organizational Psychologist', _narrative),
+    ('from the resume text', _resume),
+]
+
+
+def canned_response(messages):
+    """
+    Deterministic, schema-valid completion text for a chat request
+
+    Returns:
+        str: JSON text (or plain text for the narrative prompt)
+    """
+    prompt = "\n".join(m.get('content') or '' for m in messages)
+    rng = random.Random(_seed(prompt))
+    for marker, builder in CANNED_RESPONSES:
+        if marker in prompt:
+            result = builder(prompt, rng)
+            return result if isinstance(result, str) else json.dumps(result, indent=2)
+    return json.dumps({"result": "ok"})
+
+
+class LatencyModel:
+    """Response latency distribution (milliseconds)"""
+
+    def __init__(self, spec="fixed:0", seed=None):
+        """
+        Args:
+            spec: "fixed:MS", "uniform:MIN:MAX", "normal:MEAN:STD" or "lognormal:MEDIAN:SIGMA"
+            seed: RNG seed for a reproducible latency sequence
+        """
+        kind, *args = spec.split(':')
+        if kind not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Latency of one request in seconds"""
+        with self._lock:
+            if self.kind == 'fixed':
+                ms = self.args[0]
+            elif self.kind == 'uniform':
+                ms = self._rng.uniform(self.args[0], self.args[1])
+            elif self.kind == 'normal':
+                ms = self._rng.gauss(self.args[0], self.args[1])
+            else:
+                ms = self._rng.lognormvariate(0, self.args[1]) * self.args[0]
+        return max(ms, 0.0) / 1000
+
+
+class ErrorInjector:
+    """Randomly fails requests with 429, 500 or a timeout"""
+
+    def __init__(self, rate_limit=0.0, server_error=0.0, timeout=0.0, seed=None):
+        """
+        Args:
+            rate_limit: Fraction of requests answered with 429
+            server_error: Fraction answered with 500
+            timeout: Fraction that never answer in time
+        """
+        self.rates = [('rate_limit', rate_limit), ('server_error', server_error), ('timeout', timeout)]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.injected = {name: 0 for name, _ in self.rates}
+
+    def pick(self):
+        """Failure to inject for the next request, or None"""
+        with self._lock:
+            roll = self._rng.random()
+            for name, rate in self.rates:
+                if roll < rate:
+                    self.injected[name] += 1
+                    return name
+                roll -= rate
+        return None
+
+
+def _usage(messages, text):
+    prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4
+    completion_tokens = len(text) // 4
+    return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, total_tokens=prompt_tokens + completion_tokens)
+
+
+class _FakeCompletions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def create(self, messages, model, stream=False, timeout=None, **params):
+        return self.owner.complete(messages, model, stream, timeout)
+
+
+class FakeLLMClient:
+    """In-process LLM client with the Groq SDK's chat.completions interface"""
+
+    def __init__(self, latency=None, errors=None, stream_chunk_chars=16):
+        """
+        Args:
+            latency: LatencyModel for the full response (default: no delay)
+            errors: ErrorInjector (default: never fails)
+            stream_chunk_chars: Characters per streamed chunk (latency is spread across chunks)
+        """
+        self.latency = latency or LatencyModel()
+        self.errors = errors or ErrorInjector()
+        self.stream_chunk_chars = stream_chunk_chars
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _raise(self, failure, model, timeout):
+        request = httpx.Request('POST', 'http://fake-llm/openai/v1/chat/completions')
+        if failure == 'rate_limit':
+            response = httpx.Response(429, headers={'retry-after': '1'}, request=request)
+            raise RateLimitError(f"Rate limit reached for model {model}", response=response, body=None)
+        if failure == 'server_error':
+            response = httpx.Response(500, request=request)
+            raise InternalServerError("Injected server error", response=response, body=None)
+        time.sleep(timeout or 0)
+        raise APITimeoutError(request=request)
+
+    def complete(self, messages, model, stream=False, timeout=None):
+        with self._lock:
+            self.requests += 1
+        failure = self.errors.pick()
+        if failure:
+            self._raise(failure, model, timeout)
+
+        text = canned_response(messages)
+        delay = self.latency.sample()
+        usage = _usage(messages, text)
+        if not stream:
+            time.sleep(delay)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(role='assistant', content=text), finish_reason='stop')],
+                usage=usage,
+                model=model
+            )
+        return self._stream(text, delay, usage)
+
+    def _stream(self, text, delay, usage):
+        pieces = [text[i:i + self.stream_chunk_chars] for i in range(0, len(text), self.stream_chunk_chars)] or ['']
+        # Time to first token ~ 30% of the latency, the rest spread over the chunks
+        time.sleep(delay * 0.3)
+        per_chunk = delay * 0.7 / len(pieces)
+        for piece in pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)])
+            time.sleep(per_chunk)
+        yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))
@@ -0,0 +1,379 @@
+"""
+LLM Gateway
+Shared, rate-limited entry point for every Groq chat completion.
+
+All LLM traffic from services/ goes through `llm_gateway.complete` (via the
+response cache in llm_cache.py). Per process it provides:
+
+    - per-model request and token buckets (requests/min, tokens/min)
+    - bounded concurrency across all models
+    - a per-call timeout
+    - exponential backoff with jitter on 429, 5xx, timeouts and connection
+      errors, honouring the Retry-After header when the API sends one
+    - streamed completions (`llm_gateway.stream`) under the same limits
+    - per-model latency, token and error metrics
+
+Limits are per worker process; with several gunicorn workers the effective
+limit is multiplied, so size LLM_*_PER_MINUTE accordingly.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from groq import APIStatusError, APIConnectionError, APITimeoutError
+from app.config import Config
+from services.placeholder_functions import client
+
+# Per-model limits (requests/min, tokens/min); unknown models use the Config defaults
+MODEL_LIMITS = {
+    'llama-3.1-8b-instant': {'rpm': 30, 'tpm': 6000},
+    'llama-3.3-70b-versatile': {'rpm': 30, 'tpm': 12000},
+}
+
+# Assumed completion size when reserving tokens before a call (reconciled afterwards)
+DEFAULT_COMPLETION_TOKENS = 1024
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` tokens are available and take them
+
+        Requests larger than the bucket are clamped to its capacity.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def adjust(self, delta):
+        """Return (positive) or take (negative) tokens after the real usage is known"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+    def drain(self, seconds):
+        """Empty the bucket so the next single-token request waits about `seconds` (server-side throttling)"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1.0 - seconds * self.rate)
+
+
+class ModelMetrics:
+    """Per-model call counters and recent latencies"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.throttle_wait_seconds = 0.0
+        self.latencies = deque(maxlen=500)
+        self.first_token_latencies = deque(maxlen=500)  # Streamed calls only
+
+    def to_dict(self):
+        latencies = sorted(self.latencies)
+        first_token = sorted(self.first_token_latencies)
+
+        def percentile(q, values=latencies):
+            if not values:
+                return None
+            return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 1)
+
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'throttle_wait_seconds': round(self.throttle_wait_seconds, 2),
+            'latency_ms': {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'max': round(latencies[-1] * 1000, 1) if latencies else None
+            },
+            'first_token_ms': {
+                'p50': percentile(0.50, first_token),
+                'p95': percentile(0.95, first_token)
+            }
+        }
+
+
+def estimate_tokens(messages):
+    """Rough prompt token estimate (~4 characters per token)"""
+    return sum(len(m.get('content') or '') for m in messages) // 4 + 4 * len(messages)
+
+
+def _retry_after(error):
+    """Seconds requested by the Retry-After (or retry-after-ms) header, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _is_retryable(error):
+    """Whether an exception from the client is worth retrying"""
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class LLMGateway:
+    """Rate-limited, retrying wrapper around the Groq client"""
+
+    def __init__(self, llm_client, max_concurrency=None, max_retries=None, timeout=None):
+        """
+        Initialize the gateway
+
+        Args:
+            llm_client: OpenAI-compatible client (client.chat.completions.create)
+            max_concurrency: Simultaneous in-flight calls (default: Config.LLM_MAX_CONCURRENCY)
+            max_retries: Retries per call (default: Config.LLM_MAX_RETRIES)
+            timeout: Per-attempt timeout in seconds (default: Config.LLM_TIMEOUT_SECONDS)
+        """
+        self.client = llm_client
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = Config.LLM_TIMEOUT_SECONDS if timeout is None else timeout
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._request_buckets = {}
+        self._token_buckets = {}
+        self._metrics = {}
+        self.in_flight = 0
+
+    def _buckets(self, model):
+        """Get (creating on first use) the request and token buckets for a model"""
+        with self._lock:
+            if model not in self._request_buckets:
+                limits = MODEL_LIMITS.get(model, {})
+                self._request_buckets[model] = TokenBucket(limits.get('rpm', Config.LLM_REQUESTS_PER_MINUTE))
+                self._token_buckets[model] = TokenBucket(limits.get('tpm', Config.LLM_TOKENS_PER_MINUTE))
+                self._metrics[model] = ModelMetrics()
+            return self._request_buckets[model], self._token_buckets[model], self._metrics[model]
+
+    def complete(self, messages, model, **params):
+        """
+        Run a chat completion with rate limiting, bounded concurrency and retries
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            **params: Extra completion parameters (max_tokens, temperature, ...)
+
+        Returns:
+            The client's completion response
+
+        Raises:
+            The last client error once retries are exhausted, or immediately for
+            non-retryable errors (auth, bad request)
+        """
+        request_bucket, token_bucket, metrics = self._buckets(model)
+        reserved = estimate_tokens(messages) + params.get('max_tokens', DEFAULT_COMPLETION_TOKENS)
+        params.setdefault('timeout', self.timeout)
+
+        attempt = 0
+        while True:
+            waited = request_bucket.acquire(1)
+            waited += token_bucket.acquire(reserved)
+
+            with self._semaphore:
+                with self._lock:
+                    self.in_flight += 1
+                    metrics.calls += 1
+                    metrics.throttle_wait_seconds += waited
+                started = time.perf_counter()
+                try:
+                    response = self.client.chat.completions.create(messages=messages, model=model, **params)
+                    error = None
+                except Exception as e:
+                    response = None
+                    error = e
+                finally:
+                    elapsed = time.perf_counter() - started
+                    with self._lock:
+                        self.in_flight -= 1
+
+            if error is None:
+                usage = getattr(response, 'usage', None)
+                prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+                completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+                if usage is not None:
+                    token_bucket.adjust(reserved - (prompt_tokens + completion_tokens))
+                with self._lock:
+                    metrics.latencies.append(elapsed)
+                    metrics.prompt_tokens += prompt_tokens
+                    metrics.completion_tokens += completion_tokens
+                return response
+
+            delay = self._retry_delay(error, attempt, model, request_bucket, metrics)
+            attempt += 1
+            time.sleep(delay)
+
+    def _retry_delay(self, error, attempt, model, request_bucket, metrics, retry_allowed=True):
+        """
+        Count a failed attempt and decide whether to retry
+
+        Returns:
+            float: Seconds to wait before the next attempt
+
+        Raises:
+            error: If it is not retryable or retries are exhausted
+        """
+        retryable = retry_allowed and _is_retryable(error)
+        status = getattr(error, 'status_code', None)
+        with self._lock:
+            if status == 429:
+                metrics.rate_limited += 1
+            if not retryable or attempt >= self.max_retries:
+                metrics.failures += 1
+            else:
+                metrics.retries += 1
+
+        if not retryable or attempt >= self.max_retries:
+            raise error
+
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(Config.LLM_BACKOFF_BASE_SECONDS * (2 ** attempt), Config.LLM_BACKOFF_MAX_SECONDS)
+            delay *= random.uniform(0.5, 1.0)
+        if status == 429:
+            # Hold back other callers of this model too
+            request_bucket.drain(delay)
+
+        print(f"⚠️ LLM call to {model} failed ({status or type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def stream(self, messages, model, **params):
+        """
+        Streamed chat completion with the same limits and retries as complete()
+
+        A failed attempt is only retried if no text has been yielded yet.
+        The concurrency slot is held until the stream is exhausted or closed.
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            **params: Extra completion parameters (max_tokens, temperature, ...)
+
+        Yields:
+            str: Completion text deltas as they arrive
+
+        Returns:
+            The usage object reported at the end of the stream (None if absent),
+            as the generator's return value
+        """
+        request_bucket, token_bucket, metrics = self._buckets(model)
+        reserved = estimate_tokens(messages) + params.get('max_tokens', DEFAULT_COMPLETION_TOKENS)
+        params.setdefault('timeout', self.timeout)
+
+        attempt = 0
+        while True:
+            waited = request_bucket.acquire(1)
+            waited += token_bucket.acquire(reserved)
+
+            yielded = False
+            usage = None
+            error = None
+            with self._semaphore:
+                with self._lock:
+                    self.in_flight += 1
+                    metrics.calls += 1
+                    metrics.throttle_wait_seconds += waited
+                started = time.perf_counter()
+                response = None
+                try:
+                    response = self.client.chat.completions.create(messages=messages, model=model, stream=True, **params)
+                    for chunk in response:
+                        # Groq reports usage on the last chunk (x_groq.usage); OpenAI-style servers on chunk.usage
+                        chunk_usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None) or getattr(chunk, 'usage', None)
+                        if chunk_usage is not None:
+                            usage = chunk_usage
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            if not yielded:
+                                yielded = True
+                                with self._lock:
+                                    metrics.first_token_latencies.append(time.perf_counter() - started)
+                            yield delta
+                except Exception as e:
+                    error = e
+                finally:
+                    # Also reached when the caller stops iterating early; free the HTTP connection
+                    if response is not None and hasattr(response, 'close'):
+                        response.close()
+                    elapsed = time.perf_counter() - started
+                    with self._lock:
+                        self.in_flight -= 1
+
+            if error is None:
+                prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+                completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+                if usage is not None:
+                    token_bucket.adjust(reserved - (prompt_tokens + completion_tokens))
+                with self._lock:
+                    metrics.latencies.append(elapsed)
+                    metrics.prompt_tokens += prompt_tokens
+                    metrics.completion_tokens += completion_tokens
+                return usage
+
+            # Text already forwarded to the caller cannot be taken back
+            delay = self._retry_delay(error, attempt, model, request_bucket, metrics, retry_allowed=not yielded)
+            attempt += 1
+            time.sleep(delay)
+
+    def metrics(self):
+        """Per-model metrics plus gateway settings"""
+        with self._lock:
+            models = {model: m.to_dict() for model, m in self._metrics.items()}
+            return {
+                'models': models,
+                'in_flight': self.in_flight,
+                'max_concurrency': self.max_concurrency,
+                'max_retries': self.max_retries,
+                'timeout_seconds': self.timeout
+            }
+
+
+# Global gateway instance (one per worker process)
+llm_gateway = LLMGateway(client)
@@ -0,0 +1,72 @@
+"""
+LLM Provider
+Builds the chat client the LLM gateway sends every request through.
+
+The provider is chosen with Config.LLM_PROVIDER:
+
+    groq   Groq SDK (default). With LLM_BASE_URL set it talks to any server
+           exposing the Groq/OpenAI chat API under /openai/v1, e.g. the
+           local stub: python services/llm_stub_server.py
+    fake   In-process deterministic fake (services/llm_fakes.py), no network;
+           latency and errors from LLM_FAKE_LATENCY / LLM_FAKE_ERROR_RATE
+
+Any client exposing `client.chat.completions.create(messages=..., model=...,
+stream=..., **params)` and raising Groq SDK exceptions can be plugged in
+with @register_provider.
+"""
+
+import os
+from app.config import Config
+
+# Registry: {provider name: factory()}
+PROVIDERS = {}
+
+
+def register_provider(name):
+    """Decorator registering a client factory under a provider name"""
+    def decorator(fn):
+        PROVIDERS[name] = fn
+        return fn
+    return decorator
+
+
+@register_provider('groq')
+def _groq_client():
+    from groq import Groq
+
+    # Retries are handled by services/llm_gateway.py (which honours Retry-After),
+    # so the SDK's own retry loop is disabled.
+    return Groq(
+        api_key=os.getenv("GROQ_API_KEY") or ("local" if Config.LLM_BASE_URL else None),
+        base_url=Config.LLM_BASE_URL,
+        max_retries=0
+    )
+
+
+@register_provider('fake')
+def _fake_client():
+    from services.llm_fakes import FakeLLMClient, LatencyModel, ErrorInjector
+
+    rate = Config.LLM_FAKE_ERROR_RATE
+    return FakeLLMClient(
+        latency=LatencyModel(Config.LLM_FAKE_LATENCY, seed=Config.LLM_FAKE_SEED),
+        # Split the error rate between 429s and 500s
+        errors=ErrorInjector(rate_limit=rate / 2, server_error=rate / 2, seed=Config.LLM_FAKE_SEED)
+    )
+
+
+def create_llm_client(provider=None):
+    """
+    Build the LLM client for a provider
+
+    Args:
+        provider: Provider name (default: Config.LLM_PROVIDER)
+
+    Raises:
+        ValueError: For an unknown provider
+    """
+    provider = provider or Config.LLM_PROVIDER
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{provider}' (available: {', '.join(sorted(PROVIDERS))})")
+    print(f"🔌 LLM provider: {provider}" + (f" ({Config.LLM_BASE_URL})" if provider == 'groq' and Config.LLM_BASE_URL else ""))
+    return PROVIDERS[provider]()
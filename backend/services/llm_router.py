@@ -0,0 +1,220 @@
+"""
+LLM Model Routing
+Picks the model for each grading task and records per-task latency, tokens and quality.
+
+Every grading call names its task; `route` maps it to a model tier:
+
+    task                    tier    escalates on large prompts
+    final_rationale         large   -
+    psychometric_narrative  fast    -      (80-word paragraph)
+    psychometric_match      fast    -
+    text_remarks            fast    yes
+    text_grades             fast    yes
+    text_single_pass        fast    yes
+    resume_parse            fast    yes    (long resumes)
+
+Escalating tasks use the large tier when the prompt estimate exceeds
+Config.LLM_ESCALATE_PROMPT_TOKENS. Config.LLM_TASK_TIERS overrides a task's
+tier (e.g. "psychometric_narrative=large") to compare variants.
+
+`routed_completion` records per task and model: calls, failures, latency,
+actual token usage (cache hits cost none) and quality-check failures. Quality
+checks never fail a call; they count outputs that are valid JSON but look
+wrong (a 300-word "80-word" paragraph, a one-line final summary, ...), so the
+latency saved by a smaller model can be weighed against its output quality.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from app.config import Config
+from services.llm_cache import cached_completion, track_usage
+from services.llm_gateway import estimate_tokens
+from services.structured_output import structured_completion
+
+TASK_ROUTES = {
+    'final_rationale': {'tier': 'large'},
+    'psychometric_narrative': {'tier': 'fast'},
+    'psychometric_match': {'tier': 'fast'},
+    'text_remarks': {'tier': 'fast', 'escalate': True},
+    'text_grades': {'tier': 'fast', 'escalate': True},
+    'text_single_pass': {'tier': 'fast', 'escalate': True},
+    'resume_parse': {'tier': 'fast', 'escalate': True},
+}
+
+TIERS = ('fast', 'large')
+
+
+def _tier_overrides():
+    """Parse Config.LLM_TASK_TIERS ("task=tier,task=tier"); unknown entries are ignored"""
+    overrides = {}
+    for entry in Config.LLM_TASK_TIERS.split(','):
+        task, _, tier = entry.partition('=')
+        if task.strip() in TASK_ROUTES and tier.strip() in TIERS:
+            overrides[task.strip()] = tier.strip()
+    return overrides
+
+
+def route(task, messages):
+    """
+    Model for a task given its messages
+
+    Raises:
+        ValueError: Unknown task
+    """
+    if task not in TASK_ROUTES:
+        raise ValueError(f"Unknown LLM task: {task}")
+    spec = TASK_ROUTES[task]
+    tier = _tier_overrides().get(task, spec['tier'])
+    if tier == 'fast' and spec.get('escalate') and estimate_tokens(messages) > Config.LLM_ESCALATE_PROMPT_TOKENS:
+        tier = 'large'
+    return Config.LLM_LARGE_MODEL if tier == 'large' else Config.LLM_FAST_MODEL
+
+
+class TaskMetrics:
+    """Per (task, model) call counters, token usage and recent latencies"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, task, model, seconds, usage, failed=False, problems=None):
+        """
+        Add one routed call
+
+        Args:
+            usage: track_usage() totals of the call (repairs included)
+            problems: Quality-check failures (empty/None = passed)
+        """
+        with self._lock:
+            entry = self._entries.setdefault((task, model), {
+                'calls': 0, 'failures': 0, 'quality_failures': 0, 'cache_hits': 0,
+                'llm_calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'latencies': deque(maxlen=500), 'last_quality_problems': []
+            })
+            entry['calls'] += 1
+            entry['failures'] += 1 if failed else 0
+            entry['cache_hits'] += usage['cache_hits']
+            entry['llm_calls'] += usage['calls'] - usage['cache_hits']
+            entry['prompt_tokens'] += usage['prompt_tokens']
+            entry['completion_tokens'] += usage['completion_tokens']
+            entry['latencies'].append(seconds)
+            if problems:
+                entry['quality_failures'] += 1
+                entry['last_quality_problems'] = problems
+
+    def to_dict(self):
+        with self._lock:
+            report = {}
+            for (task, model), entry in self._entries.items():
+                latencies = sorted(entry['latencies'])
+
+                def percentile(q):
+                    return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+
+                llm_calls = entry['llm_calls']
+                report.setdefault(task, {})[model] = {
+                    'calls': entry['calls'],
+                    'failures': entry['failures'],
+                    'quality_failures': entry['quality_failures'],
+                    'last_quality_problems': entry['last_quality_problems'],
+                    'cache_hits': entry['cache_hits'],
+                    'prompt_tokens': entry['prompt_tokens'],
+                    'completion_tokens': entry['completion_tokens'],
+                    'avg_prompt_tokens': round(entry['prompt_tokens'] / llm_calls) if llm_calls else None,
+                    'latency_ms': {'p50': percentile(0.50), 'p95': percentile(0.95)}
+                }
+            return report
+
+
+# Global counters (one per worker process)
+task_metrics = TaskMetrics()
+
+
+def routed_completion(task, messages, schema=None, parse=None, quality=None, bypass_cache=False, **params):
+    """
+    Cached completion on the task's routed model, with per-task metrics
+
+    Args:
+        task: Key of TASK_ROUTES
+        messages: Chat messages
+        schema: Response schema (structured_completion, with repair); else `parse` is used
+        parse: Parser for unstructured or custom-validated output (cached_completion)
+        quality: Optional callable(result) -> list of problems (recorded, never raised)
+        bypass_cache: Force a fresh LLM call
+        **params: Extra completion parameters
+
+    Returns:
+        The parsed result
+
+    Raises:
+        Whatever the completion raises (recorded as a failure first)
+    """
+    model = route(task, messages)
+    started = time.perf_counter()
+    with track_usage() as usage:
+        try:
+            if schema is not None:
+                result = structured_completion(messages, model, schema, bypass_cache=bypass_cache, **params)
+            else:
+                result = cached_completion(messages, model=model, parse=parse, bypass_cache=bypass_cache, **params)
+        except Exception:
+            task_metrics.record(task, model, time.perf_counter() - started, usage, failed=True)
+            raise
+
+    problems = quality(result) if quality else []
+    if problems:
+        print(f"⚠️ Quality check failed for {task} ({model}): {'; '.join(problems)}")
+    task_metrics.record(task, model, time.perf_counter() - started, usage, problems=problems)
+    return result
+
+
+#====================== Quality checks ============================
+
+_SENTENCE_END = re.compile(r'[.!?](\s|$)')
+
+
+def _sentences(text):
+    return len(_SENTENCE_END.findall(text.strip())) if isinstance(text, str) else 0
+
+
+def check_narrative(text):
+    """Psychometric narrative: one plain paragraph of about 80 words without raw scores"""
+    problems = []
+    words = len(text.split())
+    if words > 120:
+        problems.append(f"narrative has {words} words (limit 80)")
+    if text.lstrip().startswith(('{', '[')):
+        problems.append("narrative is JSON, not a paragraph")
+    if re.search(r'\b\d\.\d\b', text):
+        problems.append("narrative quotes raw trait scores")
+    return problems
+
+
+def check_rationale(rationale):
+    """Final rationale: narrative reasoning in every section and a 3+ sentence summary"""
+    problems = []
+    for name, section in rationale.items():
+        if name != 'final_decision' and isinstance(section, dict) and _sentences(section.get('reasoning')) < 2:
+            problems.append(f"{name} reasoning is under 2 sentences")
+    if _sentences(rationale.get('final_decision', {}).get('summary')) < 3:
+        problems.append("final summary is under 3 sentences")
+    return problems
+
+
+def check_scores_spread(scores):
+    """Text grading: identical scores for 3+ different answers usually mean the answers were not read"""
+    if len(scores) >= 3 and len(set(scores)) == 1:
+        return [f"all {len(scores)} answers scored {scores[0]}"]
+    return []
+
+
+def check_resume(resume):
+    """Resume parse: a name and at least one skill were found"""
+    problems = []
+    if not resume.get('name'):
+        problems.append("no name extracted")
+    if not resume.get('skills'):
+        problems.append("no skills extracted")
+    return problems
@@ -0,0 +1,180 @@
+"""
+LLM Output Schemas
+Expected shape of each structured LLM response, plus a small validator.
+
+Schemas use a subset of JSON Schema (type, properties, required, items,
+enum, minimum, maximum, minItems, minLength). The validator returns all
+errors with their JSON paths (e.g. "$.final_decision.overall_score"), so
+a repair prompt can target just the failing members (see structured_output.py).
+"""
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+}
+
+
+def _is_type(value, name):
+    if name == 'null':
+        return value is None
+    if name in ('integer', 'number') and isinstance(value, bool):
+        return False
+    return isinstance(value, _TYPES[name])
+
+
+def validate(value, schema, path='$'):
+    """
+    Validate a decoded JSON value against a schema
+
+    Returns:
+        list: Error strings "<path>: <problem>" (empty if valid)
+    """
+    errors = []
+    expected = schema.get('type')
+    if expected:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_is_type(value, name) for name in names):
+            return [f"{path}: expected {' or '.join(names)}, got {type(value).__name__}"]
+
+    if 'enum' in schema and value not in schema['enum']:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if 'minimum' in schema and value < schema['minimum']:
+            errors.append(f"{path}: {value} is below the minimum {schema['minimum']}")
+        if 'maximum' in schema and value > schema['maximum']:
+            errors.append(f"{path}: {value} is above the maximum {schema['maximum']}")
+
+    if isinstance(value, str) and len(value.strip()) < schema.get('minLength', 0):
+        errors.append(f"{path}: string is too short")
+
+    if isinstance(value, dict):
+        for key in schema.get('required', []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing required field")
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key in value:
+                errors.extend(validate(value[key], sub_schema, f"{path}.{key}"))
+
+    if isinstance(value, list):
+        if len(value) < schema.get('minItems', 0):
+            errors.append(f"{path}: expected at least {schema['minItems']} items")
+        if 'items' in schema:
+            for index, item in enumerate(value):
+                errors.extend(validate(item, schema['items'], f"{path}[{index}]"))
+
+    return errors
+
+
+def _text(min_length=1):
+    return {'type': 'string', 'minLength': min_length}
+
+
+def _graded_section(grades, grade_key='grade'):
+    return {
+        'type': 'object',
+        'required': [grade_key, 'reasoning'],
+        'properties': {grade_key: {'type': 'string', 'enum': grades}, 'reasoning': _text()}
+    }
+
+
+_SKILL_GRADES = ['Excellent', 'Good', 'Average', 'Poor']
+
+# services/AI_rationale.py: build_final_rationale_prompt
+RATIONALE_SCHEMA = {
+    'type': 'object',
+    'required': [
+        'resume_fit', 'technical_evaluation', 'coding_evaluation', 'soft_skills_evaluation',
+        'psychometric_evaluation', 'integrity_observation', 'final_decision'
+    ],
+    'properties': {
+        'resume_fit': _graded_section(_SKILL_GRADES),
+        'technical_evaluation': _graded_section(_SKILL_GRADES),
+        'coding_evaluation': _graded_section(_SKILL_GRADES),
+        'soft_skills_evaluation': _graded_section(_SKILL_GRADES),
+        'psychometric_evaluation': _graded_section(['Insight', 'Neutral']),
+        'integrity_observation': _graded_section(['Acceptable', 'Observation'], grade_key='status'),
+        'final_decision': {
+            'type': 'object',
+            'required': ['status', 'overall_score', 'summary'],
+            'properties': {
+                # Legacy variants are still mapped by the recruiter dashboard
+                'status': {'type': 'string', 'enum': ['Hire', 'No Hire', 'Potential', 'Strong Hire', 'No-Hire']},
+                'overall_score': {'type': ['integer', 'number'], 'minimum': 0, 'maximum': 100},
+                'summary': _text()
+            }
+        }
+    }
+}
+
+_SCORE = {'type': ['integer', 'number'], 'minimum': 0, 'maximum': 100}
+
+# services/textresponse_to_grading.py: evaluate_text_responses
+TEXT_REMARKS_SCHEMA = {
+    'type': 'object',
+    'required': ['remarks', 'overall_remark'],
+    'properties': {
+        'remarks': {
+            'type': 'array',
+            'items': {'type': 'object', 'required': ['remark'], 'properties': {'remark': _text()}}
+        },
+        'overall_remark': _text()
+    }
+}
+
+# services/textresponse_to_grading.py: grade_text_responses
+TEXT_GRADES_SCHEMA = {
+    'type': 'object',
+    'required': ['grades'],
+    'properties': {
+        'grades': {
+            'type': 'array',
+            'items': {'type': 'object', 'required': ['score'], 'properties': {'score': _SCORE}}
+        }
+    }
+}
+
+# services/textresponse_to_grading.py: grade_text_responses_single_pass
+TEXT_SINGLE_PASS_SCHEMA = {
+    'type': 'object',
+    'required': ['evaluations', 'overall_remark'],
+    'properties': {
+        'evaluations': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['index', 'remark', 'score'],
+                'properties': {'index': {'type': 'integer', 'minimum': 1}, 'remark': _text(), 'score': _SCORE}
+            }
+        },
+        'overall_remark': _text()
+    }
+}
+
+# services/psychoresult_to_grading.py: evaluate_psychometric_match
+PSYCHOMETRIC_MATCH_SCHEMA = {
+    'type': 'object',
+    'required': ['match_grade', 'analysis'],
+    'properties': {
+        'match_grade': {'type': 'string', 'enum': ['High Match', 'Medium Match', 'Low Match']},
+        'analysis': _text()
+    }
+}
+
+# services/resume_to_json.py: parse_resume_to_json
+RESUME_SCHEMA = {
+    'type': 'object',
+    'required': ['name', 'skills'],
+    'properties': {
+        'name': {'type': ['string', 'null']},
+        'email': {'type': ['string', 'null']},
+        'skills': {'type': 'array', 'items': {'type': 'string'}},
+        'experience_years': {'type': ['integer', 'number', 'null'], 'minimum': 0},
+        'projects': {'type': 'array'},
+        'education': {'type': ['array', 'object', 'string', 'null']}
+    }
+}
@@ -0,0 +1,162 @@
+"""
+Local LLM Stub Server
+OpenAI-compatible chat completions server returning canned, schema-valid outputs.
+
+Lets the grading pipeline (text grading, resume parsing, rationale
+generation) run and be load-tested offline, without a Groq key or quota.
+Responses come from services/llm_fakes.py, so they are deterministic per
+prompt. Latency and failures are configurable.
+
+Usage:
+    python services/llm_stub_server.py [--port 8090] [--latency lognormal:800:0.4]
+                                       [--rate-limit 0.05] [--server-error 0.02]
+                                       [--timeout 0.01] [--seed 42]
+
+    # then point the backend at it
+    LLM_BASE_URL=http://localhost:8090 python run.py
+
+Endpoints:
+    POST /openai/v1/chat/completions   (path used by the Groq SDK)
+    POST /v1/chat/completions          (plain OpenAI path)
+    GET  /v1/models
+    GET  /stats                        request / injected error counters
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify, request
+from services.llm_fakes import canned_response, LatencyModel, ErrorInjector
+
+STUB_MODELS = ['llama-3.1-8b-instant', 'llama-3.3-70b-versatile']
+
+
+def create_stub_app(latency, errors, timeout_seconds=120, stream_chunk_chars=16):
+    """
+    Build the stub Flask app
+
+    Args:
+        latency: LatencyModel for full responses
+        errors: ErrorInjector deciding which requests fail
+        timeout_seconds: How long an injected timeout hangs before answering 504
+        stream_chunk_chars: Characters per streamed chunk
+    """
+    app = Flask(__name__)
+    stats = {'requests': 0, 'streamed': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+    lock = threading.Lock()
+
+    def error_response(status, message, error_type, headers=None):
+        return jsonify({'error': {'message': message, 'type': error_type}}), status, headers or {}
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    @app.route('/openai/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(silent=True) or {}
+        messages = body.get('messages')
+        model = body.get('model', STUB_MODELS[0])
+        if not isinstance(messages, list) or not messages:
+            return error_response(400, "'messages' must be a non-empty list", 'invalid_request_error')
+
+        with lock:
+            stats['requests'] += 1
+
+        failure = errors.pick()
+        if failure == 'rate_limit':
+            return error_response(429, f'Rate limit reached for model {model}', 'rate_limit_exceeded', {'retry-after': '1'})
+        if failure == 'server_error':
+            return error_response(500, 'Injected server error', 'internal_server_error')
+        if failure == 'timeout':
+            time.sleep(timeout_seconds)
+            return error_response(504, 'Injected timeout', 'timeout')
+
+        text = canned_response(messages)
+        delay = latency.sample()
+        prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4
+        completion_tokens = len(text) // 4
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens, 'total_tokens': prompt_tokens + completion_tokens}
+        with lock:
+            stats['prompt_tokens'] += prompt_tokens
+            stats['completion_tokens'] += completion_tokens
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get('stream'):
+            time.sleep(delay)
+            return jsonify({
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': usage
+            })
+
+        with lock:
+            stats['streamed'] += 1
+
+        def chunk(delta, finish_reason=None, **extra):
+            data = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+                **extra
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        def generate():
+            pieces = [text[i:i + stream_chunk_chars] for i in range(0, len(text), stream_chunk_chars)] or ['']
+            # Time to first token ~ 30% of the latency, the rest spread over the chunks
+            time.sleep(delay * 0.3)
+            yield chunk({'role': 'assistant', 'content': ''})
+            for piece in pieces:
+                yield chunk({'content': piece})
+                time.sleep(delay * 0.7 / len(pieces))
+            # Groq reports usage in x_groq on the last chunk; OpenAI in a top-level usage field
+            yield chunk({}, 'stop', usage=usage, x_groq={'id': completion_id, 'usage': usage})
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/v1/models', methods=['GET'])
+    @app.route('/openai/v1/models', methods=['GET'])
+    def list_models():
+        return jsonify({'object': 'list', 'data': [{'id': m, 'object': 'model', 'owned_by': 'stub'} for m in STUB_MODELS]})
+
+    @app.route('/stats', methods=['GET'])
+    def get_stats():
+        with lock:
+            return jsonify({**stats, 'injected_errors': dict(errors.injected), 'latency': latency.spec})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub server for offline load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', default='lognormal:800:0.4', help="fixed:MS | uniform:MIN:MAX | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--server-error', type=float, default=0.0, help="Fraction answered with 500")
+    parser.add_argument('--timeout', type=float, default=0.0, help="Fraction that hang (client timeout)")
+    parser.add_argument('--timeout-seconds', type=float, default=120, help="How long an injected timeout hangs")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible latency and error sequences")
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        LatencyModel(args.latency, seed=args.seed),
+        ErrorInjector(args.rate_limit, args.server_error, args.timeout, seed=args.seed),
+        timeout_seconds=args.timeout_seconds
+    )
+    print(f"🧪 LLM stub listening on http://{args.host}:{args.port} (latency={args.latency}, "
+          f"429={args.rate_limit}, 500={args.server_error}, timeout={args.timeout})")
+    app.run(host=args.host, port=args.port, threaded=True)
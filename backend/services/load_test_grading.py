@@ -0,0 +1,163 @@
+"""
+Load test for the AI grading pipeline.
+Usage: python3 load_test_grading.py [--provider fake] [--requests 200] [--concurrency 16]
+                                    [--mix text,resume,psychometric,rationale]
+                                    [--repeat 0.3] [--with-cache] [--unlimited]
+  - Fires a mixed workload of grading calls from a thread pool through the
+    real service functions, LLM cache and rate-limited gateway
+  - --provider fake needs no network or key; for HTTP-level tests start
+    services/llm_stub_server.py and use --provider groq with LLM_BASE_URL set
+  - --unlimited lifts the gateway's per-model rate limits (concurrency and
+    retries still apply); by default the real Groq limits throttle the run
+  - --repeat re-sends that fraction of earlier inputs (cache hits with --with-cache)
+  - --with-cache runs inside an app context, so the llm_cache table of the
+    configured DATABASE_URL is used
+  - Reports throughput, latency percentiles per call type, fallbacks,
+    gateway metrics (throttling, retries), per-task routing metrics (model,
+    tokens, quality checks) and cache counters
+  - Compare routing/compaction variants with LLM_TASK_TIERS and
+    LLM_COMPACT_PROMPTS, e.g. LLM_COMPACT_PROMPTS=false
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = "team project deadline python api database customer design testing deploy review mentor scale".split()
+
+
+def _sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_input(kind, rng):
+    """Random input for one call type"""
+    if kind == 'text':
+        return [{"question": f"Question {i}: {_sentence(rng, 6)}", "answer": _sentence(rng, rng.randint(3, 40))} for i in range(1, 6)]
+    if kind == 'resume':
+        return "Name: Test Candidate\nEmail: test@example.com\n" + "\n".join(_sentence(rng, 20) for _ in range(30))
+    if kind == 'psychometric':
+        traits = ["Extraversion", "Agreeableness", "Conscientiousness", "Emotional Stability", "Intellect/Imagination"]
+        return {t: round(rng.uniform(1, 5), 1) for t in traits}
+    return {
+        "resume": {"name": "Test Candidate", "skills": rng.sample(WORDS, 4)},
+        "mcq": {"percentage": rng.randint(0, 100), "correct": 5, "total": 10},
+        "text": {"communication_score": rng.randint(0, 100), "overall_remark": _sentence(rng)},
+        "psychometric": {"extraversion": 3.1},
+        "coding": {"score": rng.randint(0, 100)},
+        "proctor": {"severity": "Low"}
+    }
+
+
+def run_call(kind, data):
+    """Run one grading call; returns (ok, seconds)"""
+    from services.textresponse_to_grading import grade_text
+    from services.resume_to_json import parse_resume_to_json
+    from services.psychoresult_to_grading import evaluate_psychometric_match
+    from services.AI_rationale import build_final_rationale_prompt, complete_final_rationale
+
+    started = time.perf_counter()
+    if kind == 'text':
+        result = grade_text(data)
+        ok = bool(result.get('grades'))
+    elif kind == 'resume':
+        ok = bool(parse_resume_to_json(data))
+    elif kind == 'psychometric':
+        ok = evaluate_psychometric_match(data, "Conscientiousness").get('match_grade') != 'Error'
+    else:
+        prompt = build_final_rationale_prompt(data['resume'], data['mcq'], data['text'], data['psychometric'], data['coding'], data['proctor'])
+        ok = 'error' not in complete_final_rationale(prompt)
+    return ok, time.perf_counter() - started
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 1) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the AI grading pipeline")
+    parser.add_argument('--provider', default=None, help="LLM provider (default: LLM_PROVIDER or groq)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mix', default='text,resume,psychometric,rationale', help="Comma-separated call types")
+    parser.add_argument('--repeat', type=float, default=0.0, help="Fraction of calls re-sending an earlier input")
+    parser.add_argument('--with-cache', action='store_true', help="Use the LLM cache (runs inside an app context)")
+    parser.add_argument('--unlimited', action='store_true', help="Lift the per-model requests/tokens per minute limits")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.provider:
+        # Must be set before services/ import the client
+        os.environ['LLM_PROVIDER'] = args.provider
+
+    from app.config import Config
+    from services import llm_gateway as gateway_module
+    from services.llm_gateway import llm_gateway
+    from services.llm_cache import cache_stats
+    from services.llm_router import task_metrics
+
+    if args.unlimited:
+        # Buckets are created on first use, so this applies to the whole run
+        gateway_module.MODEL_LIMITS.clear()
+        Config.LLM_REQUESTS_PER_MINUTE = Config.LLM_TOKENS_PER_MINUTE = 10 ** 9
+
+    app = None
+    if args.with_cache:
+        from app import create_app
+        app = create_app()
+
+    rng = random.Random(args.seed)
+    kinds = args.mix.split(',')
+    workload = []
+    for _ in range(args.requests):
+        if workload and rng.random() < args.repeat:
+            workload.append(rng.choice(workload))
+        else:
+            kind = rng.choice(kinds)
+            workload.append((kind, make_input(kind, rng)))
+
+    def task(item):
+        if app is None:
+            return item[0], run_call(*item)
+        with app.app_context():
+            return item[0], run_call(*item)
+
+    print(f"🚀 {args.requests} calls ({args.mix}), concurrency={args.concurrency}, repeat={args.repeat}, cache={'on' if app else 'off'}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(task, workload))
+    elapsed = time.perf_counter() - started
+
+    by_kind = {}
+    for kind, (ok, seconds) in results:
+        entry = by_kind.setdefault(kind, {'calls': 0, 'failed': 0, 'latencies': []})
+        entry['calls'] += 1
+        entry['failed'] += 0 if ok else 1
+        entry['latencies'].append(seconds)
+
+    report = {
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_per_second': round(len(results) / elapsed, 2),
+        'calls': {
+            kind: {
+                'calls': e['calls'],
+                'failed': e['failed'],
+                'latency_ms': {'p50': percentile(e['latencies'], 0.5), 'p95': percentile(e['latencies'], 0.95), 'p99': percentile(e['latencies'], 0.99)}
+            }
+            for kind, e in by_kind.items()
+        },
+        'gateway': llm_gateway.metrics(),
+        'routing': task_metrics.to_dict(),
+        'cache': cache_stats.to_dict()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+PDF Text Extraction
+Resume PDF text extraction in a pool of worker processes.
+
+pypdf is pure Python and CPU-bound: extracting in a request or job thread
+holds the GIL and stalls every other request in the process. Extraction
+runs in a small process pool instead, with
+
+    - a page limit (only the first Config.RESUME_MAX_PAGES pages are read)
+    - a text limit (Config.RESUME_MAX_TEXT_CHARS)
+    - a per-file timeout; a worker stuck on a pathological PDF is killed by
+      terminating the pool, which is rebuilt on the next call (extractions in
+      flight on the killed pool time out too and are retried by their jobs)
+
+Workers are started through a forkserver (where available): the pool is
+created lazily in a process already running request, job and flusher
+threads, and forking it directly could leave the children holding locks
+that those threads had taken. The forkserver is a clean single-threaded
+process that preloads only this module (and pypdf). Its workers still
+re-import the main module as __mp_main__ (as with spawn, used where there
+is no forkserver), so a main script must not build an app outside an
+`if __name__` guard (see run.py; gunicorn's and worker.py's are guarded).
+
+Usage:
+    result = extract_pdf_text(pdf_bytes)
+    # {"text": str, "pages": 3, "total_pages": 3, "truncated": False}
+"""
+
+import atexit
+import io
+import multiprocessing
+import threading
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+
+class PdfExtractionError(Exception):
+    """The PDF could not be read (the file itself, or the extraction pool failed)"""
+
+
+class PdfContentError(PdfExtractionError):
+    """The file itself cannot be read (corrupt, encrypted, not a PDF); retrying will not help"""
+
+
+class PdfExtractionTimeout(PdfExtractionError):
+    """Extraction took longer than the per-file timeout"""
+
+
+def _extract(data, max_pages, max_chars):
+    """Runs in a pool worker: text of the first max_pages pages, capped at max_chars"""
+    reader = PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    parts = []
+    size = 0
+    pages = 0
+    for index in range(min(total_pages, max_pages)):
+        page_text = reader.pages[index].extract_text() or ""
+        parts.append(page_text)
+        pages += 1
+        size += len(page_text) + 1
+        if size >= max_chars:
+            break
+
+    text = "\n".join(parts)
+    return {
+        'text': text[:max_chars],
+        'pages': pages,
+        'total_pages': total_pages,
+        'truncated': pages < total_pages or len(text) > max_chars
+    }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+                # Replaces the default ['__main__'] preload (no effect once the server runs)
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _pool = context.Pool(processes=workers, maxtasksperchild=100)
+        return _pool
+
+
+def _discard_pool(pool):
+    """Kill a pool with a stuck worker; the next call builds a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.terminate()
+
+
+def shutdown_pool():
+    """Terminate the worker processes (registered at exit)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.terminate()
+
+
+atexit.register(shutdown_pool)
+
+
+def extract_pdf_text(data, timeout=None, max_pages=None, max_chars=None):
+    """
+    Extract the text of a PDF in the process pool
+
+    Args:
+        data: PDF bytes
+        timeout: Seconds before the extraction is abandoned (default: Config.RESUME_EXTRACT_TIMEOUT_SECONDS)
+        max_pages: Pages to read (default: Config.RESUME_MAX_PAGES)
+        max_chars: Text limit (default: Config.RESUME_MAX_TEXT_CHARS)
+
+    Returns:
+        dict: {"text", "pages" (read), "total_pages", "truncated"}
+
+    Raises:
+        PdfContentError: pypdf rejected the file
+        PdfExtractionTimeout: The worker did not finish in time
+        PdfExtractionError: The PDF could not be read for another reason (e.g. a crashed pool)
+    """
+    from app.config import Config
+
+    timeout = Config.RESUME_EXTRACT_TIMEOUT_SECONDS if timeout is None else timeout
+    max_pages = Config.RESUME_MAX_PAGES if max_pages is None else max_pages
+    max_chars = Config.RESUME_MAX_TEXT_CHARS if max_chars is None else max_chars
+
+    if Config.RESUME_EXTRACT_WORKERS <= 0:
+        # Inline extraction (no timeout), e.g. where subprocesses are not available
+        try:
+            return _extract(data, max_pages, max_chars)
+        except PyPdfError as e:
+            raise PdfContentError(f"Could not read PDF: {e}") from e
+        except Exception as e:
+            raise PdfExtractionError(f"Could not read PDF: {e}") from e
+
+    pool = _get_pool(Config.RESUME_EXTRACT_WORKERS)
+    pending = pool.apply_async(_extract, (data, max_pages, max_chars))
+    try:
+        return pending.get(timeout)
+    except multiprocessing.TimeoutError:
+        _discard_pool(pool)
+        raise PdfExtractionTimeout(f"PDF extraction timed out after {timeout}s")
+    except PyPdfError as e:
+        # Raised in the worker and re-raised here
+        raise PdfContentError(f"Could not read PDF: {e}") from e
+    except Exception as e:
+        raise PdfExtractionError(f"Could not read PDF: {e}") from e
@@ -0,0 +1,70 @@
+"""
+Prompt Compaction
+Shrinks the data embedded in grading prompts without dropping what the model grades on.
+
+    - prompt_json: compact separators instead of indent=2 (roughly a third
+      fewer tokens for nested data)
+    - prune_resume: drops contact details and raw text, caps long lists and strings
+    - prune_text_grading: keeps per-question remarks and scores, drops the
+      echoed questions/answers already summarised by the remarks
+
+All helpers return their input unchanged when Config.LLM_COMPACT_PROMPTS is
+off, so the two variants can be compared (see services/llm_router.py metrics).
+"""
+
+import json
+from app.config import Config
+
+# Resume keys never used in grading (a key is dropped if any of its words is listed)
+RESUME_DROP_WORDS = {'email', 'phone', 'mobile', 'contact', 'address', 'linkedin', 'github', 'url', 'website', 'raw'}
+
+MAX_LIST_ITEMS = 15
+MAX_STRING_CHARS = 400
+
+
+def prompt_json(value):
+    """Serialize prompt data (compact unless compaction is disabled); strings pass through"""
+    if not isinstance(value, (dict, list)):
+        return value
+    if Config.LLM_COMPACT_PROMPTS:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    return json.dumps(value, indent=2)
+
+
+def _trim(value):
+    """Cap list lengths and string sizes recursively, dropping empty fields"""
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING_CHARS else value[:MAX_STRING_CHARS].rstrip() + "…"
+    if isinstance(value, list):
+        return [_trim(item) for item in value[:MAX_LIST_ITEMS]]
+    if isinstance(value, dict):
+        return {key: _trim(item) for key, item in value.items() if item not in (None, '', [], {})}
+    return value
+
+
+def prune_resume(resume_data):
+    """Resume JSON reduced to the fields the rationale grades (name, skills, experience, projects, education)"""
+    if not Config.LLM_COMPACT_PROMPTS or not isinstance(resume_data, dict) or 'error' in resume_data:
+        return resume_data
+    kept = {
+        key: value for key, value in resume_data.items()
+        if not RESUME_DROP_WORDS & set(key.lower().replace(' ', '_').split('_'))
+    }
+    return _trim(kept)
+
+
+def prune_text_grading(text_data):
+    """Text grading JSON reduced to the overall remark, score and per-question remark/score"""
+    if not Config.LLM_COMPACT_PROMPTS or not isinstance(text_data, dict) or 'error' in text_data:
+        return text_data
+    scores = [grade.get('score') for grade in text_data.get('grades', []) if isinstance(grade, dict)]
+    remarks = [remark.get('remark') for remark in text_data.get('remarks', []) if isinstance(remark, dict)]
+    answers = [
+        {'remark': remark, **({'score': scores[i]} if i < len(scores) else {})}
+        for i, remark in enumerate(remarks)
+    ]
+    return {
+        'overall_remark': text_data.get('overall_remark') or text_data.get('remark'),
+        'communication_score': text_data.get('communication_score'),
+        'answers': answers
+    }
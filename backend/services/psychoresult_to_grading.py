@@ -7,13 +7,16 @@ import sys
 # For running as script:
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.placeholder_functions import client, clean_json_output
+from services.llm_schemas import PSYCHOMETRIC_MATCH_SCHEMA
+from services.llm_router import routed_completion
+from services.prompt_compaction import prompt_json
 
-def evaluate_psychometric_match(psychometric_scores, target_trait):
+def evaluate_psychometric_match(psychometric_scores, target_trait, bypass_cache=False):
     """
     Input: 
         psychometric_scores: Dict { "Extraversion": float, "Agreeableness": float, ... }
         target_trait: String (e.g., "Conscientiousness") or None
+        bypass_cache: Force a fresh LLM call instead of the cached response
     Output: JSON object { "match_grade": "High"|"Medium"|"Low", "analysis": str }
     """
     if not target_trait:
@@ -26,7 +29,7 @@ def evaluate_psychometric_match(psychometric_scores, target_trait):
     Evaluate the candidate's psychometric fit for a role requiring high {target_trait}.
     
     Candidate Scores (0-5 scale):
-    {json.dumps(psychometric_scores, indent=2)}
+    {prompt_json(psychometric_scores)}
     
     Target Trait: {target_trait}
     
@@ -38,11 +41,12 @@ def evaluate_psychometric_match(psychometric_scores, target_trait):
     """
     
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
+        return routed_completion(
+            'psychometric_match',
+            [{"role": "user", "content": prompt}],
+            schema=PSYCHOMETRIC_MATCH_SCHEMA,
+            bypass_cache=bypass_cache
         )
-        return json.loads(clean_json_output(response.choices[0].message.content))
     except Exception as e:
         print(f"Error in evaluate_psychometric_match: {e}")
         return {"match_grade": "Error", "analysis": "Failed to evaluate due to AI error."}
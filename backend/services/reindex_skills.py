@@ -0,0 +1,69 @@
+"""
+Candidate Skills Reindex
+Rebuilds the `candidate_skills` index from every candidate's parsed resume_data.
+
+New resumes are indexed as they are parsed (resume_store.attach_resume_data);
+run this once after deploying the index, or after changing the normalization
+rules in app/services/skills.py. Candidates are processed in ID order in
+batches, one commit per batch.
+
+Command line:
+    python services/reindex_skills.py [--batch-size 500] [--after-id 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models import CandidateAuth
+from app.services.skills import index_candidate_skills
+
+
+def reindex(batch_size=500, after_id=0):
+    """
+    Rewrite the skills index of every candidate with ID > after_id
+
+    Returns:
+        dict: {"candidates": int, "skills": int, "last_candidate_id": int}
+    """
+    candidates = skills = 0
+    last_id = after_id
+    while True:
+        batch = (CandidateAuth.query
+                 .filter(CandidateAuth.id > last_id)
+                 .order_by(CandidateAuth.id)
+                 .limit(batch_size)
+                 .all())
+        if not batch:
+            break
+        for candidate in batch:
+            # Candidates without resume_data get their stale rows removed
+            skills += len(index_candidate_skills(candidate.id, candidate.resume_data))
+        candidates += len(batch)
+        last_id = batch[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+        print(f"✅ Indexed {candidates} candidates (up to ID {last_id}), {skills} skills")
+    return {'candidates': candidates, 'skills': skills, 'last_candidate_id': last_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the candidate skills index")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--after-id', type=int, default=0, help="Resume after this candidate ID")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        result = reindex(args.batch_size, args.after_id)
+        print(f"🏁 Skills index rebuilt for {result['candidates']} candidates "
+              f"({result['skills']} skills) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
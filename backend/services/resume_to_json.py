@@ -1,14 +1,15 @@
-import json
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.placeholder_functions import client, clean_json_output
+from services.llm_schemas import RESUME_SCHEMA
+from services.llm_router import routed_completion, check_resume
 
-def parse_resume_to_json(resume_text):
+def parse_resume_to_json(resume_text, bypass_cache=False):
     """
     Input: Raw string text extracted from PDF.
+           bypass_cache: Force a fresh LLM call instead of the cached response
     Output: JSON object { "name": str, "email": str, "skills": list, "experience_years": int }
     """
     prompt = f"""
@@ -23,15 +24,25 @@ def parse_resume_to_json(resume_text):
     Resume Text:
     {resume_text}
 
-    Return ONLY valid JSON. No preamble.
+    Return ONLY valid JSON in this exact format. No preamble:
+    {{
+        "name": "<full name or null>",
+        "email": "<email or null>",
+        "skills": ["<skill>", ...],
+        "experience_years": <integer or null>,
+        "projects": ["<short summary>", ...],
+        "education": [{{ "degree": "<degree>", "gpa": <gpa or null> }}, ...]
+    }}
     """
     
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
+        return routed_completion(
+            'resume_parse',
+            [{"role": "user", "content": prompt}],
+            schema=RESUME_SCHEMA,
+            quality=check_resume,
+            bypass_cache=bypass_cache
         )
-        return json.loads(clean_json_output(response.choices[0].message.content))
     except Exception as e:
         print(f"Error in parse_resume_to_json: {e}")
         return {}
@@ -0,0 +1,239 @@
+"""
+Structured LLM Output
+Schema-validated JSON completions with targeted repair re-prompts.
+
+`structured_completion` runs a cached completion whose response must decode
+(brace-aware, see json_stream.py) and match the call site's schema (see
+llm_schemas.py); a response that does not is never cached. Instead of
+discarding the expensive call, the failing top-level members are repaired:
+
+    - members that decoded but break the schema are re-sent with the errors
+    - members that are malformed or cut off are re-sent as raw text
+    - members that are valid are kept as they are
+
+The repair prompt contains only those fragments, the errors and the
+members' schema - never the original prompt - so it is a small, fast call.
+A response that cannot be repaired this way (missing members, wrong
+top-level type) raises StructuredOutputError so the caller's fallback runs.
+"""
+
+import json
+import re
+import threading
+from services.json_stream import extract_json, SectionStreamParser
+from services.llm_schemas import validate
+from services.llm_cache import cached_completion
+
+
+class StructuredOutputError(ValueError):
+    """LLM response that is not valid JSON or does not match its schema"""
+
+    def __init__(self, errors, text=None, value=None):
+        super().__init__("; ".join(errors[:5]) + (f" (+{len(errors) - 5} more)" if len(errors) > 5 else ""))
+        self.errors = errors
+        self.text = text
+        self.value = value
+
+
+class RepairStats:
+    """In-process counters for repair re-prompts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.invalid = 0
+        self.repaired = 0
+        self.unrepairable = 0
+
+    def record(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def to_dict(self):
+        return {'invalid_responses': self.invalid, 'repaired': self.repaired, 'unrepairable': self.unrepairable}
+
+
+# Global counters (one per worker process)
+repair_stats = RepairStats()
+
+_MEMBER_PATH = re.compile(r'^\$\.([^.\[:]+)')
+
+
+def _expected_type(schema):
+    return {'object': dict, 'array': list}.get(schema.get('type'), (dict, list))
+
+
+def parse_structured(text, schema):
+    """
+    Decode an LLM response and validate it against a schema
+
+    Raises:
+        StructuredOutputError: With the raw text (and decoded value, if any) for repair
+    """
+    try:
+        value = extract_json(text, _expected_type(schema))
+    except ValueError as e:
+        raise StructuredOutputError([f"$: {e}"], text=text)
+    errors = validate(value, schema)
+    if errors:
+        raise StructuredOutputError(errors, text=text, value=value)
+    return value
+
+
+def _repair_targets(error, schema):
+    """
+    Split a failed response into valid members and fragments to repair
+
+    Returns:
+        (valid members dict, {key: fragment text}, {key: [errors]}) or None if a
+        targeted repair is not possible
+    """
+    if schema.get('type') != 'object':
+        return None
+    properties = schema.get('properties', {})
+
+    if isinstance(error.value, dict):
+        members = dict(error.value)
+        broken = {}
+        problems = {}
+        for message in error.errors:
+            match = _MEMBER_PATH.match(message)
+            if not match:
+                return None  # Top-level problem
+            key = match.group(1)
+            if key not in members:
+                return None  # Missing member; cannot be written without the original prompt
+            problems.setdefault(key, []).append(message)
+        for key in problems:
+            broken[key] = json.dumps(members.pop(key), indent=2)
+        return members, broken, problems
+
+    if error.text is None:
+        return None
+
+    # Not decodable as a whole: recover the members that are complete
+    parser = SectionStreamParser()
+    parser.feed(error.text)
+    members = dict(parser.sections)
+    broken = dict(parser.failed)
+    problems = {key: [f"$.{key}: malformed JSON"] for key in broken}
+    cut_off = parser.incomplete()
+    if cut_off and cut_off[0]:
+        broken[cut_off[0]] = cut_off[1]
+        problems[cut_off[0]] = [f"$.{cut_off[0]}: output was cut off"]
+
+    for key in list(members):
+        member_errors = validate(members[key], properties.get(key, {}), f"$.{key}")
+        if member_errors:
+            broken[key] = json.dumps(members.pop(key), indent=2)
+            problems[key] = member_errors
+
+    missing = [key for key in schema.get('required', []) if key not in members and key not in broken]
+    if missing or not broken:
+        return None
+    return members, broken, problems
+
+
+def repair_output(error, schema, model):
+    """
+    Repair the failing members of a response with a fragment-only re-prompt
+
+    Raises:
+        StructuredOutputError: If the response is not repairable or the repair fails
+    """
+    targets = _repair_targets(error, schema)
+    if targets is None:
+        repair_stats.record('unrepairable')
+        raise error
+    members, broken, problems = targets
+
+    properties = schema.get('properties', {})
+    fragment_schema = {
+        'type': 'object',
+        'required': list(broken),
+        'properties': {key: properties.get(key, {}) for key in broken}
+    }
+    fragments = "\n".join(f'"{key}": {text}' for key, text in broken.items())
+    problem_lines = "\n".join(f"- {message}" for key in broken for message in problems[key])
+
+    prompt = f"""
+    The following members of a JSON object you produced are invalid.
+
+    PROBLEMS:
+    {problem_lines}
+
+    MEMBERS (may be malformed or cut off):
+    {fragments}
+
+    Each member must match this JSON schema:
+    {json.dumps(fragment_schema)}
+
+    Fix ONLY the listed problems and keep the content otherwise unchanged. Finish any cut-off text briefly.
+    Return ONLY a valid JSON object with exactly these keys: {', '.join(broken)}
+    """
+
+    print(f"🔧 Repairing {len(broken)} invalid member(s) of {model} output: {', '.join(broken)}")
+    try:
+        fixed = cached_completion(
+            [{"role": "user", "content": prompt}],
+            model=model,
+            parse=lambda text: parse_structured(text, fragment_schema)
+        )
+    except Exception as e:
+        repair_stats.record('unrepairable')
+        print(f"⚠️ Repair failed: {e}")
+        raise error
+
+    merged = {**members, **{key: fixed[key] for key in broken}}
+    # Keep the schema's member order
+    ordered = {key: merged[key] for key in properties if key in merged}
+    ordered.update({key: value for key, value in merged.items() if key not in ordered})
+
+    errors = validate(ordered, schema)
+    if errors:
+        repair_stats.record('unrepairable')
+        raise StructuredOutputError(errors, value=ordered)
+    repair_stats.record('repaired')
+    return ordered
+
+
+def parse_or_repair(text, schema, model):
+    """parse_structured, falling back to a repair re-prompt (for streamed output)"""
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError as e:
+        repair_stats.record('invalid')
+        return repair_output(e, schema, model)
+
+
+def structured_completion(messages, model, schema, bypass_cache=False, repair=True, **params):
+    """
+    Cached completion that must return JSON matching a schema
+
+    Args:
+        messages: Chat messages
+        model: Model name (also used for repairs)
+        schema: Expected response schema (llm_schemas.py)
+        bypass_cache: Force a fresh LLM call
+        repair: Re-prompt with the failing fragments instead of failing outright
+        **params: Extra completion parameters
+
+    Returns:
+        The validated (possibly repaired) JSON value
+
+    Raises:
+        StructuredOutputError: Invalid response that could not be repaired
+        Whatever the LLM gateway raises after its retries
+    """
+    try:
+        return cached_completion(
+            messages,
+            model=model,
+            parse=lambda text: parse_structured(text, schema),
+            bypass_cache=bypass_cache,
+            **params
+        )
+    except StructuredOutputError as e:
+        repair_stats.record('invalid')
+        if not repair:
+            raise
+        return repair_output(e, schema, model)
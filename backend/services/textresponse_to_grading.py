@@ -4,11 +4,20 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.placeholder_functions import client, clean_json_output
+from services.llm_schemas import TEXT_REMARKS_SCHEMA, TEXT_GRADES_SCHEMA, TEXT_SINGLE_PASS_SCHEMA
+from services.llm_router import routed_completion, check_scores_spread
+from services.prompt_compaction import prompt_json
+from services.structured_output import parse_structured
+from app.config import Config
 
-def evaluate_text_responses(qa_pairs):
+# Fallback remark returned by evaluate_text_responses on LLM failure
+TEXT_GRADING_ERROR_REMARK = "Error during AI evaluation."
+
+
+def evaluate_text_responses(qa_pairs, bypass_cache=False):
     """
     Input: qa_pairs (List[Dict]) - List of { "question": str, "answer": str }
+           bypass_cache (bool) - Force a fresh LLM call instead of the cached response
     Output: JSON Object with per-question remarks:
     {
         "remarks": [
@@ -21,7 +30,7 @@ def evaluate_text_responses(qa_pairs):
     """
     prompt = f"""
     Analyze the following Candidate Q&A responses:
-    {json.dumps(qa_pairs, indent=2)}
+    {prompt_json(qa_pairs)}
     
     Task:
     1. For EACH question-answer pair, write a brief 1-2 sentence professional remark evaluating the quality, relevance, depth, and articulation of the answer.
@@ -40,11 +49,12 @@ def evaluate_text_responses(qa_pairs):
     """
     
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
+        result = routed_completion(
+            'text_remarks',
+            [{"role": "user", "content": prompt}],
+            schema=TEXT_REMARKS_SCHEMA,
+            bypass_cache=bypass_cache
         )
-        result = json.loads(clean_json_output(response.choices[0].message.content))
         
         # Ensure backward compatibility: also set top-level 'remark' key
         if 'overall_remark' in result and 'remark' not in result:
@@ -53,14 +63,15 @@ def evaluate_text_responses(qa_pairs):
         return result
     except Exception as e:
         print(f"Error in evaluate_text_responses: {e}")
-        return {"remark": "Error during AI evaluation.", "remarks": [], "overall_remark": "Error during AI evaluation."}
+        return {"remark": TEXT_GRADING_ERROR_REMARK, "remarks": [], "overall_remark": TEXT_GRADING_ERROR_REMARK}
 
 
-def grade_text_responses(remarks_data):
+def grade_text_responses(remarks_data, bypass_cache=False):
     """
     Takes the per-question remarks from evaluate_text_responses and assigns a numerical score (0-100) to each.
     
     Input: remarks_data - the output of evaluate_text_responses, containing 'remarks' list
+           bypass_cache - Force a fresh LLM call instead of the cached response
     Output: JSON Object:
     {
         "grades": [
@@ -96,7 +107,7 @@ def grade_text_responses(remarks_data):
     - 0-19: Very Poor — blank, gibberish, completely irrelevant, or single-word non-answer.
     
     DATA:
-    {json.dumps(remarks_list, indent=2)}
+    {prompt_json(remarks_list)}
     
     Return ONLY valid JSON in this exact format:
     {{
@@ -108,27 +119,184 @@ def grade_text_responses(remarks_data):
     """
     
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
+        result = routed_completion(
+            'text_grades',
+            [{"role": "user", "content": prompt}],
+            schema=TEXT_GRADES_SCHEMA,
+            quality=lambda result: check_scores_spread([g['score'] for g in result['grades']]),
+            bypass_cache=bypass_cache
         )
-        result = json.loads(clean_json_output(response.choices[0].message.content))
-        
-        grades = result.get('grades', [])
         
         # Calculate average score
-        if grades:
-            scores = [g.get('score', 0) for g in grades]
-            avg_score = round(sum(scores) / len(scores), 1)
-        else:
-            avg_score = 0
-        
-        result['communication_score'] = avg_score
+        result['communication_score'] = _average_score(result.get('grades', []))
         return result
     except Exception as e:
         print(f"Error in grade_text_responses: {e}")
         return {"grades": [], "communication_score": 0}
 
+def _average_score(grades):
+    """Average of the per-question scores (communication_score)"""
+    if not grades:
+        return 0
+    scores = [g.get('score', 0) for g in grades]
+    return round(sum(scores) / len(scores), 1)
+
+
+def _single_pass_parser(qa_pairs):
+    """
+    Build a parser that validates the single-pass response against the submitted Q&A
+
+    The response must match TEXT_SINGLE_PASS_SCHEMA and contain exactly one entry
+    per question (by index). Anything else raises ValueError, so the completion is
+    not cached and the caller falls back (no repair: the two-pass path is cheaper).
+    """
+    def parse(text):
+        result = parse_structured(text, TEXT_SINGLE_PASS_SCHEMA)
+
+        evaluations = result['evaluations']
+        if len(evaluations) != len(qa_pairs):
+            raise ValueError(f"Expected {len(qa_pairs)} evaluations, got {len(evaluations)}")
+
+        by_index = {}
+        for item in evaluations:
+            index = item['index']
+            if index > len(qa_pairs) or index in by_index:
+                raise ValueError(f"Invalid or duplicate evaluation index: {index!r}")
+            by_index[index] = item
+
+        return {'evaluations': [by_index[i] for i in range(1, len(qa_pairs) + 1)], 'overall_remark': result['overall_remark']}
+
+    return parse
+
+
+def grade_text_responses_single_pass(qa_pairs, bypass_cache=False):
+    """
+    Write remarks and scores for all text responses in ONE LLM call
+    
+    Same output shape as evaluate_text_responses + grade_text_responses merged
+    (see grade_text), but answers are sent once and never echoed back, so it
+    takes one round trip instead of two and far fewer tokens.
+    
+    Input: qa_pairs (List[Dict]) - List of { "question": str, "answer": str }
+           bypass_cache (bool) - Force a fresh LLM call instead of the cached response
+    Output: Merged grading dict (see grade_text)
+    
+    Raises:
+        ValueError: If the response fails schema validation (after the gateway's retries)
+    """
+    if not qa_pairs:
+        return {"remarks": [], "overall_remark": "", "remark": "", "grades": [], "communication_score": 0}
+    
+    numbered = [
+        {"index": i, "question": qa.get('question', ''), "answer": qa.get('answer', '')}
+        for i, qa in enumerate(qa_pairs, start=1)
+    ]
+    
+    prompt = f"""
+    You are a strict but fair evaluator grading candidate answers for a hiring assessment.
+    
+    Candidate Q&A responses:
+    {prompt_json(numbered)}
+    
+    Task:
+    1. For EACH answer, write a brief 1-2 sentence professional remark evaluating the quality, relevance, depth, and articulation of the answer.
+    2. Assign each answer a score from 0 to 100 with a one sentence justification.
+    3. Provide a SINGLE overall sentence summarizing the candidate's communication skills across all responses.
+    
+    SCORING GUIDE:
+    - 90-100: Excellent — thorough, articulate, highly relevant, demonstrates deep understanding.
+    - 70-89: Good — clear and relevant, minor gaps in depth or articulation.
+    - 50-69: Average — partially relevant, lacks depth or clarity, acceptable but not impressive.
+    - 20-49: Poor — vague, off-topic, shallow, or poorly communicated.
+    - 0-19: Very Poor — blank, gibberish, completely irrelevant, or single-word non-answer.
+    
+    Be very critical and keep the tone professional. Do NOT repeat the questions or answers.
+    
+    Return ONLY valid JSON in this exact format, with one entry per index:
+    {{
+        "evaluations": [
+            {{ "index": <question index>, "remark": "<1-2 sentence evaluation>", "score": <0-100>, "justification": "<one sentence why>" }},
+            ...
+        ],
+        "overall_remark": "<one sentence overall summary>"
+    }}
+    """
+    
+    result = routed_completion(
+        'text_single_pass',
+        [{"role": "user", "content": prompt}],
+        parse=_single_pass_parser(qa_pairs),
+        quality=lambda result: check_scores_spread([e['score'] for e in result['evaluations']]),
+        bypass_cache=bypass_cache,
+        response_format={"type": "json_object"}
+    )
+    
+    remarks = []
+    grades = []
+    for qa, item in zip(qa_pairs, result['evaluations']):
+        remarks.append({"question": qa.get('question', ''), "answer": qa.get('answer', ''), "remark": item['remark']})
+        grades.append({"question": qa.get('question', ''), "score": item['score'], "justification": item.get('justification', '')})
+    
+    return {
+        "remarks": remarks,
+        "overall_remark": result['overall_remark'],
+        "remark": result['overall_remark'],  # backward compat
+        "grades": grades,
+        "communication_score": _average_score(grades)
+    }
+
+
+def grade_text_responses_two_pass(qa_pairs, bypass_cache=False):
+    """
+    Original two-call path: remarks first, then scores for those remarks
+    
+    Returns the merged grading dict (see grade_text). LLM failures surface as
+    the services' fallback values (error remark / empty grades).
+    """
+    grading_result = evaluate_text_responses(qa_pairs, bypass_cache=bypass_cache)
+    if grading_result.get('remark') == TEXT_GRADING_ERROR_REMARK:
+        return grading_result
+    
+    grades_result = grade_text_responses(grading_result, bypass_cache=bypass_cache)
+    grading_result['grades'] = grades_result.get('grades', [])
+    grading_result['communication_score'] = grades_result.get('communication_score', 0)
+    return grading_result
+
+
+def grade_text(qa_pairs, mode=None, bypass_cache=False):
+    """
+    Grade text responses using the configured mode
+    
+    Input: qa_pairs (List[Dict]) - List of { "question": str, "answer": str }
+           mode (str) - "single_pass" or "two_pass" (default: Config.TEXT_GRADING_MODE)
+           bypass_cache (bool) - Force fresh LLM calls
+    Output: JSON Object:
+    {
+        "remarks": [{ "question": "...", "answer": "...", "remark": "..." }, ...],
+        "overall_remark": "...",
+        "remark": "...",                 # backward compat
+        "grades": [{ "question": "...", "score": 85, "justification": "..." }, ...],
+        "communication_score": 72.5,
+        "grading_mode": "single_pass"    # path that produced the result
+    }
+    
+    Single-pass falls back to the two-pass path when its response is missing,
+    malformed or fails validation.
+    """
+    mode = mode or Config.TEXT_GRADING_MODE
+    
+    if mode == 'single_pass':
+        try:
+            result = grade_text_responses_single_pass(qa_pairs, bypass_cache=bypass_cache)
+            result['grading_mode'] = 'single_pass'
+            return result
+        except Exception as e:
+            print(f"⚠️ Single-pass text grading failed ({e}), falling back to two-pass")
+    
+    result = grade_text_responses_two_pass(qa_pairs, bypass_cache=bypass_cache)
+    result['grading_mode'] = 'two_pass'
+    return result
+
 
 if __name__ == "__main__":
     test_data = [
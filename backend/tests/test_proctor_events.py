@@ -0,0 +1,161 @@
+"""
+Proctoring event ingestion and violation counters (app/services/proctor_events.py), on SQLite
+Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from app.extensions import db
+from app.models import ProctoringViolation, ProctoringViolationArchive, ProctorViolationCount, ProctorSession
+from app.services import proctor_events
+from app.services.proctor_events import ProctorEventBuffer, build_event, rebuild_violation_counts
+
+T0 = datetime(2026, 1, 1, 10, 0, 0)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'proctor.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def buffer(app):
+    # No size/time triggers: the tests flush explicitly
+    buffer = ProctorEventBuffer(app, flush_rows=10000, flush_seconds=3600, max_rows=10000)
+    yield buffer
+    buffer.stop()
+
+
+def _session(session_uuid, candidate_id=1, status='active'):
+    db.session.add(ProctorSession(candidate_id=candidate_id, session_uuid=session_uuid, status=status))
+    db.session.commit()
+
+
+def _event(session_id, violation_type, seconds=0, candidate_id=1):
+    return build_event(session_id, candidate_id, violation_type, timestamp=T0 + timedelta(seconds=seconds))
+
+
+def _counters():
+    return {
+        (row.session_id, row.violation_type): (row.count, row.last_event_at)
+        for row in ProctorViolationCount.query.all()
+    }
+
+
+def test_batch_flush_upserts_counters(buffer):
+    _session('s1')
+    _session('s2', candidate_id=2)
+    buffer.add([
+        _event('s1', 'tab_switch', 5), _event('s1', 'tab_switch', 1), _event('s1', 'no_face', 2),
+        _event('s2', 'tab_switch', 3, candidate_id=2)
+    ])
+    assert buffer.flush() == 4
+
+    assert ProctoringViolation.query.count() == 4
+    assert _counters() == {
+        ('s1', 'tab_switch'): (2, T0 + timedelta(seconds=5)),
+        ('s1', 'no_face'): (1, T0 + timedelta(seconds=2)),
+        ('s2', 'tab_switch'): (1, T0 + timedelta(seconds=3)),
+    }
+
+    # A later flush adds to the existing rows; an older event keeps the newest timestamp
+    buffer.add([_event('s1', 'tab_switch', 0), _event('s1', 'tab_switch', 9)])
+    assert buffer.flush() == 2
+    assert _counters()[('s1', 'tab_switch')] == (4, T0 + timedelta(seconds=9))
+    assert ProctorViolationCount.query.filter_by(session_id='s2').one().candidate_id == 2
+
+
+def test_integrity_error_falls_back_to_row_by_row(buffer):
+    _session('s1')
+    bad = _event('s1', 'no_face', 1)
+    bad['candidate_id'] = None  # NOT NULL violation: rejects the multi-row INSERT
+    buffer.add([_event('s1', 'tab_switch', 0), bad, _event('s1', 'tab_switch', 2)])
+
+    assert buffer.flush() == 2
+    assert buffer.stats['rows_dropped'] == 1
+    assert buffer.pending() == 0
+    assert ProctoringViolation.query.count() == 2
+    assert _counters() == {('s1', 'tab_switch'): (2, T0 + timedelta(seconds=2))}
+
+
+def test_failed_flush_requeues_rows_in_order(buffer, monkeypatch):
+    _session('s1')
+    first = [_event('s1', 'tab_switch', 0), _event('s1', 'no_face', 1)]
+    buffer.add(first)
+
+    def down(conn, rows):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(proctor_events, 'write_events', down)
+    assert buffer.flush() == 0
+    assert buffer.stats['flush_errors'] == 1
+
+    buffer.add([_event('s1', 'tab_switch', 2)])
+    assert buffer.rows[:2] == first
+    assert buffer.pending() == 3
+
+    monkeypatch.undo()
+    assert buffer.flush() == 3
+    assert _counters() == {
+        ('s1', 'tab_switch'): (2, T0 + timedelta(seconds=2)),
+        ('s1', 'no_face'): (1, T0 + timedelta(seconds=1)),
+    }
+
+
+def test_requeue_drops_oldest_beyond_max_rows(app):
+    buffer = ProctorEventBuffer(app, flush_rows=10000, flush_seconds=3600, max_rows=3)
+    rows = [_event('s1', 'tab_switch', seconds) for seconds in range(5)]
+    buffer._requeue(rows)
+    assert buffer.rows == rows[2:]
+    assert buffer.stats['rows_dropped'] == 2
+
+
+def test_events_of_terminated_sessions_are_dropped(buffer):
+    _session('live')
+    _session('reset', status='terminated')
+    buffer.add([_event('reset', 'tab_switch', 0), _event('live', 'tab_switch', 1), _event('reset', 'no_face', 2)])
+
+    assert buffer.flush() == 1
+    assert buffer.pending() == 0
+    assert [row.session_id for row in ProctoringViolation.query.all()] == ['live']
+    assert _counters() == {('live', 'tab_switch'): (1, T0 + timedelta(seconds=1))}
+
+    # Only reset sessions in the batch: nothing is written
+    buffer.add([_event('reset', 'tab_switch', 3)])
+    assert buffer.flush() == 0
+    assert ProctoringViolation.query.count() == 1
+
+
+def test_rebuild_violation_counts_includes_archived_events(app):
+    db.session.add_all([
+        ProctoringViolation(session_id='s1', candidate_id=1, violation_type='tab_switch', timestamp=T0),
+        ProctoringViolation(session_id='s1', candidate_id=1, violation_type='tab_switch',
+                            timestamp=T0 + timedelta(seconds=4)),
+        ProctoringViolationArchive(id=100, session_id='s1', candidate_id=1, violation_type='tab_switch',
+                                   timestamp=T0 - timedelta(days=1), severity='medium'),
+        ProctoringViolationArchive(id=101, session_id='s0', candidate_id=1, violation_type='no_face',
+                                   timestamp=T0 - timedelta(days=1), severity='high'),
+        # Stale counter: replaced by the recount
+        ProctorViolationCount(session_id='s1', violation_type='tab_switch', candidate_id=1, count=99),
+    ])
+    db.session.commit()
+
+    assert rebuild_violation_counts() == 2
+    assert _counters() == {
+        ('s1', 'tab_switch'): (3, T0 + timedelta(seconds=4)),
+        ('s0', 'no_face'): (1, T0 - timedelta(days=1)),
+    }
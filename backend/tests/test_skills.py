@@ -0,0 +1,41 @@
+"""
+Skill normalization and extraction (app/services/skills.py)
+Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.services.skills import normalize_skill, extract_skills, parse_skill_filter
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('S3', 's3'),
+    ('EC2', 'ec2'),
+    ('H2', 'h2'),
+    ('IPv6', 'ipv6'),
+    ('OAuth2', 'oauth2'),
+    ('Web3', 'web3'),
+    ('Office 365', 'office 365'),
+    ('Python 3.11', 'python'),
+    ('python3.11', 'python'),
+    ('Java 8', 'java'),
+    ('Angular v14', 'angular'),
+    ('ReactJS', 'react'),
+    ('.NET Core', '.net'),
+    ('AWS (EC2, S3)', 'aws'),
+])
+def test_normalize_skill(raw, expected):
+    assert normalize_skill(raw) == expected
+
+
+def test_extract_skills_strips_qualifiers_before_splitting():
+    resume = {'skills': ['AWS (EC2, S3)', 'Python (3.x), Java', 'S3; EC2', {'name': 'Docker'}]}
+    assert extract_skills(resume) == ['aws', 'python', 'java', 's3', 'ec2', 'docker']
+
+
+def test_parse_skill_filter():
+    assert parse_skill_filter('AWS (EC2, S3), S3, python 3') == ['aws', 's3', 'python']
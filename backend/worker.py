@@ -0,0 +1,32 @@
+"""
+Standalone AI job worker process
+
+Runs the background AI job queue (text grading, psychometric grading, resume
+parsing, final rationale) outside the web process:
+
+    python worker.py [num_workers]
+"""
+
+from app import create_app
+from app.config import Config
+from app.job_queue import start_job_workers, stop_job_workers
+import sys
+import time
+
+if __name__ == '__main__':
+    app = create_app()
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(Config.AI_JOB_WORKERS, 1)
+
+    print("\n" + "="*60)
+    print("Starting HR Evaluation System AI Job Worker")
+    print("="*60)
+
+    start_job_workers(app, num_workers)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+        stop_job_workers()
+        print("✓ Shutdown complete")
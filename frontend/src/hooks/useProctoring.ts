@@ -7,9 +7,19 @@ interface AnalysisResult {
     multiple_faces: boolean;
     looking_away: boolean;
     phone_detected?: boolean;
+    deduplicated?: boolean;
     error?: string;
 }
 
+// Server's suggested frame interval (grows when frame analysis is backlogged)
+interface SamplingHint {
+    interval_ms: number;
+    queue_depth: number;
+    reason: 'normal' | 'backlog';
+}
+
+const DEFAULT_FRAME_INTERVAL_MS = 2000;
+
 interface UseProctoringProps {
     assessmentId?: string;
     onViolation?: (type: string, data: AnalysisResult) => void;
@@ -20,6 +30,7 @@ export function useProctoring({ assessmentId, onViolation }: UseProctoringProps
     const [isMonitoring, setIsMonitoring] = useState(false);
     const [status, setStatus] = useState<'active' | 'warning' | 'error' | 'idle'>('idle');
     const [lastAnalysis, setLastAnalysis] = useState<AnalysisResult | null>(null);
+    const [frameIntervalMs, setFrameIntervalMs] = useState(DEFAULT_FRAME_INTERVAL_MS);
 
     const monitorInterval = useRef<NodeJS.Timeout | null>(null);
 
@@ -151,6 +162,11 @@ export function useProctoring({ assessmentId, onViolation }: UseProctoringProps
             });
 
             const data = await response.json();
+            // Callers capturing frames should wait this long before the next one
+            const sampling: SamplingHint | undefined = data.sampling;
+            if (sampling?.interval_ms) {
+                setFrameIntervalMs(sampling.interval_ms);
+            }
             if (data.success && data.analysis) {
                 const result = data.analysis;
                 setLastAnalysis(result);
@@ -204,6 +220,7 @@ export function useProctoring({ assessmentId, onViolation }: UseProctoringProps
         isMonitoring,
         status,
         lastAnalysis,
+        frameIntervalMs, // Delay before the next analyzeFrame call
         startSession,
         stopSession,
         analyzeFrame,
@@ -65,6 +65,68 @@ async function request<T>(
   }
 }
 
+export interface StreamEvent {
+  event: string;
+  data: any;
+}
+
+/**
+ * POST to a Server-Sent Events endpoint and invoke onEvent for each event.
+ * (EventSource cannot send POST requests or Authorization headers.)
+ */
+async function streamEvents(
+  endpoint: string,
+  token: string | null,
+  onEvent: (event: StreamEvent) => void,
+  body?: Record<string, unknown>
+): Promise<{ error: string | null }> {
+  try {
+    const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify(body || {}),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; lines starting with ':' are comments
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        let event = 'message';
+        let data = '';
+        for (const line of raw.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (data) onEvent({ event, data: JSON.parse(data) });
+      }
+    }
+    return { error: null };
+  } catch (error) {
+    return {
+      error: error instanceof Error ? error.message : 'An error occurred',
+    };
+  }
+}
+
 // ============ Candidate Endpoints ============
 
 export const candidateApi = {
@@ -114,7 +176,7 @@ export const candidateApi = {
     });
   },
 
-  /** Finish assessment and generate rationale */
+  /** Finish assessment and queue rationale generation */
   finishAssessment: async () => {
     const token = localStorage.getItem('candidate_token');
     return request('/api/assessment/finish', {
@@ -125,6 +187,21 @@ export const candidateApi = {
     });
   },
 
+  /** Finish assessment and follow rationale generation progress as it streams */
+  finishAssessmentStream: async (onEvent: (event: StreamEvent) => void) => {
+    return streamEvents('/api/assessment/finish/stream', localStorage.getItem('candidate_token'), onEvent);
+  },
+
+  /** Get status of background AI grading jobs (all, or a single job) */
+  getJobStatus: async (jobId?: number) => {
+    const token = localStorage.getItem('candidate_token');
+    return request(jobId ? `/api/assessment/jobs/${jobId}` : '/api/assessment/jobs', {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+      },
+    });
+  },
+
   /** Send heartbeat to track exam progress */
   sendHeartbeat: async (currentQuestion?: number) => {
     const token = localStorage.getItem('candidate_token');
@@ -187,6 +264,14 @@ export const recruiterApi = {
     });
   },
 
+  /** Generate AI Rationale, receiving text and completed sections as they stream */
+  streamRationale: async (candidateId: number, onEvent: (event: StreamEvent) => void, refresh = false) => {
+    const token = localStorage.getItem('recruiterToken');
+    if (!token) return { error: 'Auth required' };
+
+    return streamEvents(`/api/recruiter/candidates/${candidateId}/analyze/stream`, token, onEvent, { refresh });
+  },
+
   /** Allow candidate to resume suspended exam */
   allowResume: async (candidateId: number) => {
     const token = localStorage.getItem('recruiterToken');
@@ -341,6 +426,22 @@ export const mcqApi = {
     });
   },
 
+  /** Submit many answers at once (e.g. on navigation or on a timer) */
+  submitAnswersBatch: async (answers: { question_id: number; selected_option: number }[]) => {
+    const token = localStorage.getItem('candidate_token');
+    if (!token) {
+      return { data: null, error: 'No authentication token found' };
+    }
+
+    return request('/api/mcq/submit-batch', {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+      },
+      body: JSON.stringify({ answers }),
+    });
+  },
+
   /** Get current MCQ result/score */
   getResult: async () => {
     const token = localStorage.getItem('candidate_token');
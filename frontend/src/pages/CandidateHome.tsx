@@ -63,7 +63,7 @@ export default function CandidateHome() {
         try {
           const res = await candidateApi.finishAssessment();
           if ((res.data as any)?.success) {
-            alert("Assessment Finished! Rationale Generated.");
+            alert("Assessment Finished! Your final report is being generated.");
             // In a real app, maybe show the rationale or redirect to a results page.
           } else {
             alert("Error finishing assessment: " + ((res.data as any)?.message || res.error));